@@ -56,6 +56,16 @@ except ImportError:
 admin_integration = None
 socketio = None
 
+def _engine_options(database_uri):
+    """Pool options sized from the shared PostgreSQL connection budget"""
+    if not database_uri or not database_uri.startswith('postgresql'):
+        return {}
+    try:
+        from backend.engine_registry import engine_registry, POOL_OLTP
+    except ImportError:
+        return {}
+    return engine_registry.engine_options(POOL_OLTP)
+
 def create_app(config_name=None):
     """Factory function to create the Flask application"""
     global admin_integration, socketio
@@ -66,6 +76,7 @@ def create_app(config_name=None):
     if config_name is None:
         config_name = os.getenv('FLASK_ENV', 'development')
     app.config.from_object(get_config(config_name))
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', _engine_options(app.config.get('SQLALCHEMY_DATABASE_URI')))
     
     # Initialize extensions
     db.init_app(app)
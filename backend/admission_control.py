@@ -0,0 +1,245 @@
+"""
+Admission Control for Chat Requests
+
+Bounds the number of chat turns executing at once so that a traffic spike
+queues or sheds the excess instead of slowing every request down together.
+
+The concurrency limit adapts to observed latency with a gradient rule: a
+slow average tracks the latency of the unloaded system and a fast one the
+current latency. While the current latency stays within a tolerance of the
+baseline the limit grows by about its square root; when it rises past the
+tolerance the limit shrinks in proportion. Requests over the limit wait in a
+short priority queue. Whatever cannot be queued, or waited too long, is shed
+early: routed to cheap simplified processing while that has capacity, or
+rejected with 503 and a Retry-After hint.
+"""
+
+import os
+import math
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from enum import Enum
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHAT_INITIAL_CONCURRENCY = int(os.getenv("CHAT_INITIAL_CONCURRENCY", "16"))
+CHAT_MIN_CONCURRENCY = int(os.getenv("CHAT_MIN_CONCURRENCY", "2"))
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", "64"))
+CHAT_LATENCY_TOLERANCE = float(os.getenv("CHAT_LATENCY_TOLERANCE", "1.5"))
+CHAT_ADMISSION_QUEUE_SIZE = int(os.getenv("CHAT_ADMISSION_QUEUE_SIZE", "32"))
+CHAT_ADMISSION_QUEUE_TIMEOUT = float(os.getenv("CHAT_ADMISSION_QUEUE_TIMEOUT", "2.0"))
+CHAT_DEGRADED_CONCURRENCY = int(os.getenv("CHAT_DEGRADED_CONCURRENCY", "32"))
+MAX_RETRY_AFTER_SECONDS = 30
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+class AdmissionDecision(str, Enum):
+    """Outcome of asking for a chat slot"""
+    ADMITTED = "admitted"
+    DEGRADED = "degraded"
+    REJECTED = "rejected"
+
+
+class AdaptiveConcurrencyLimit:
+    """Concurrency limit following the gradient between baseline and current latency"""
+
+    def __init__(self, initial_limit: int = CHAT_INITIAL_CONCURRENCY, min_limit: int = CHAT_MIN_CONCURRENCY,
+                 max_limit: int = CHAT_MAX_CONCURRENCY, tolerance: float = CHAT_LATENCY_TOLERANCE,
+                 smoothing: float = 0.2, short_alpha: float = 0.3, long_alpha: float = 0.02):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.short_alpha = short_alpha
+        self.long_alpha = long_alpha
+        self._limit = float(max(min_limit, min(max_limit, initial_limit)))
+        self.short_latency: Optional[float] = None
+        self.long_latency: Optional[float] = None
+
+    @property
+    def value(self) -> int:
+        return int(self._limit)
+
+    def update(self, latency: float, in_flight: int) -> int:
+        """Record the latency of a finished request and return the new limit
+
+        Args:
+            latency: Duration of the request in seconds
+            in_flight: Requests executing when it finished, itself included
+        """
+        if self.short_latency is None:
+            self.short_latency = self.long_latency = latency
+            return self.value
+
+        self.short_latency += self.short_alpha * (latency - self.short_latency)
+        self.long_latency += self.long_alpha * (latency - self.long_latency)
+        # Let the baseline come down quickly once the overload is over
+        if self.long_latency > 2 * self.short_latency:
+            self.long_latency *= 0.95
+
+        # With the limit far from reached latency says nothing about it
+        if in_flight < self._limit / 2:
+            return self.value
+
+        gradient = max(0.5, min(1.0, self.tolerance * self.long_latency / max(self.short_latency, 1e-6)))
+        target = self._limit * gradient + math.sqrt(self._limit)
+        self._limit = self._limit * (1 - self.smoothing) + target * self.smoothing
+        self._limit = max(self.min_limit, min(self.max_limit, self._limit))
+        return self.value
+
+
+class AdmissionController:
+    """Bounds in-flight chat turns with a short priority queue in front"""
+
+    def __init__(self, limiter: Optional[AdaptiveConcurrencyLimit] = None,
+                 max_queue: int = CHAT_ADMISSION_QUEUE_SIZE,
+                 queue_timeout: float = CHAT_ADMISSION_QUEUE_TIMEOUT,
+                 degraded_limit: int = CHAT_DEGRADED_CONCURRENCY,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.limiter = limiter or AdaptiveConcurrencyLimit()
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.degraded_limit = degraded_limit
+        self.clock = clock
+        self.in_flight = 0
+        self.degraded_in_flight = 0
+        # Waiters as [priority, sequence, future], best priority and oldest first
+        self._queue: List[List[Any]] = []
+        self._sequence = itertools.count()
+        self.stats = {"admitted": 0, "queued": 0, "degraded": 0, "rejected": 0, "queue_timeouts": 0, "evicted": 0}
+
+    @property
+    def queue_length(self) -> int:
+        return len(self._queue)
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL) -> AdmissionDecision:
+        """Wait for a slot, or decide how the request is shed"""
+        if self.in_flight < self.limiter.value and not self._queue:
+            self.in_flight += 1
+            self.stats["admitted"] += 1
+            return AdmissionDecision.ADMITTED
+
+        if self.max_queue > 0 and self.queue_timeout > 0 and await self._wait_in_queue(priority):
+            self.stats["admitted"] += 1
+            return AdmissionDecision.ADMITTED
+        return self._shed()
+
+    def release(self, decision: AdmissionDecision, latency: Optional[float] = None):
+        """Give a slot back, feeding the latency of admitted requests to the limit"""
+        if decision == AdmissionDecision.DEGRADED:
+            self.degraded_in_flight = max(0, self.degraded_in_flight - 1)
+            return
+        if decision != AdmissionDecision.ADMITTED:
+            return
+        if latency is not None:
+            self.limiter.update(latency, self.in_flight)
+        self.in_flight = max(0, self.in_flight - 1)
+        self._grant_waiters()
+
+    @asynccontextmanager
+    async def admit(self, priority: int = PRIORITY_NORMAL):
+        """Hold a slot for the duration of the block
+
+        Yields the decision; the block must not do full processing unless it
+        is ADMITTED.
+        """
+        decision = await self.acquire(priority)
+        start = self.clock()
+        try:
+            yield decision
+        finally:
+            self.release(decision, self.clock() - start)
+
+    def retry_after(self) -> int:
+        """Seconds after which a rejected client should try again"""
+        latency = self.limiter.short_latency or 1.0
+        backlog = (self.in_flight + len(self._queue) + 1) / max(self.limiter.value, 1)
+        return max(1, min(MAX_RETRY_AFTER_SECONDS, math.ceil(latency * backlog)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current limit, occupancy and shedding counters"""
+        return {
+            "limit": self.limiter.value,
+            "in_flight": self.in_flight,
+            "queued": len(self._queue),
+            "degraded_in_flight": self.degraded_in_flight,
+            "latency_baseline_ms": round((self.limiter.long_latency or 0) * 1000, 1),
+            "latency_current_ms": round((self.limiter.short_latency or 0) * 1000, 1),
+            **self.stats
+        }
+
+    async def _wait_in_queue(self, priority: int) -> bool:
+        if len(self._queue) >= self.max_queue:
+            # A full queue makes room only for a better priority than its worst waiter
+            worst = max(self._queue)
+            if priority >= worst[0]:
+                return False
+            self._queue.remove(worst)
+            heapq.heapify(self._queue)
+            worst[2].set_result(False)
+            self.stats["evicted"] += 1
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._sequence), future]
+        heapq.heappush(self._queue, entry)
+        self.stats["queued"] += 1
+
+        try:
+            await asyncio.wait({future}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._leave_queue(entry)
+            if future.done() and not future.cancelled() and future.result():
+                # The slot was granted, but the cancelled request will never release it
+                self.in_flight = max(0, self.in_flight - 1)
+                self._grant_waiters()
+            else:
+                future.cancel()
+            raise
+        if future.done():
+            return future.result()
+
+        self.stats["queue_timeouts"] += 1
+        future.cancel()
+        self._leave_queue(entry)
+        return False
+
+    def _leave_queue(self, entry: List[Any]):
+        if entry in self._queue:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+
+    def _grant_waiters(self):
+        while self._queue and self.in_flight < self.limiter.value:
+            _, _, future = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(True)
+
+    def _shed(self) -> AdmissionDecision:
+        if self.degraded_in_flight < self.degraded_limit:
+            self.degraded_in_flight += 1
+            self.stats["degraded"] += 1
+            return AdmissionDecision.DEGRADED
+        self.stats["rejected"] += 1
+        return AdmissionDecision.REJECTED
+
+
+# Global admission controller for /chat
+_chat_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the global chat admission controller"""
+    global _chat_admission_controller
+    if _chat_admission_controller is None:
+        _chat_admission_controller = AdmissionController()
+    return _chat_admission_controller
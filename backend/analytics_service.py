@@ -11,7 +11,7 @@ from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from sqlalchemy.orm import Session
 from sqlalchemy import func, text, and_, or_
-from backend.database import SessionLocal
+from backend.database import AnalyticsSessionLocal as SessionLocal
 from backend.unified_models import (
     UnifiedUser, UnifiedTicket, UnifiedChatHistory, UnifiedVoiceAnalytics,
     UnifiedPerformanceMetric, UnifiedCustomerSatisfaction, UnifiedChatSession,
@@ -22,7 +22,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from contextlib import contextmanager
 
-from backend.database import SessionLocal as MainSessionLocal
+from backend.database import BackgroundSessionLocal as MainSessionLocal
 from backend.models import User as LegacyUser, UserSession as LegacyUserSession
 from backend.unified_models import UnifiedUser, UnifiedUserSession
 from backend.data_validation import ValidationResult
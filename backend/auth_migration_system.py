@@ -40,7 +40,7 @@ from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from contextlib import contextmanager
 
 # Import models
-from backend.database import engine as main_engine, SessionLocal as MainSessionLocal
+from backend.database import engine as main_engine, BackgroundSessionLocal as MainSessionLocal
 from backend.models import User as LegacyUser, UserSession as LegacyUserSession
 from backend.unified_models import (
     Base as UnifiedBase,
@@ -295,6 +295,7 @@ class DatabaseConfigValidator:
         """
         try:
             from sqlalchemy import create_engine, text
+            from sqlalchemy.pool import NullPool
             
             # Parse URL to get connection parameters
             db_params = self.parse_database_url(url)
@@ -305,19 +306,22 @@ class DatabaseConfigValidator:
                     'connect_timeout': 5,  # Short timeout for health check
                     'application_name': 'ai_agent_health_check'
                 }
-                engine = create_engine(url, connect_args=connect_args, pool_pre_ping=True)
+                engine = create_engine(url, connect_args=connect_args, poolclass=NullPool)
             else:
-                engine = create_engine(url, connect_args={'check_same_thread': False})
+                engine = create_engine(url, connect_args={'check_same_thread': False}, poolclass=NullPool)
             
-            # Test connection
-            with engine.connect() as conn:
-                if db_params['database_type'] == 'postgresql':
-                    result = conn.execute(text("SELECT version()"))
-                    version_info = result.fetchone()[0]
-                    return True, f"PostgreSQL connection successful: {version_info[:50]}..."
-                else:
-                    conn.execute(text("SELECT 1"))
-                    return True, "SQLite connection successful"
+            # Test connection; the probe engine keeps no pooled connections
+            try:
+                with engine.connect() as conn:
+                    if db_params['database_type'] == 'postgresql':
+                        result = conn.execute(text("SELECT version()"))
+                        version_info = result.fetchone()[0]
+                        return True, f"PostgreSQL connection successful: {version_info[:50]}..."
+                    else:
+                        conn.execute(text("SELECT 1"))
+                        return True, "SQLite connection successful"
+            finally:
+                engine.dispose()
                     
         except Exception as e:
             return False, f"Connection failed: {str(e)}"
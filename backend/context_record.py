@@ -0,0 +1,135 @@
+"""
+Shared context record for the memory layer and the intelligent chat system.
+
+A single compact, immutable record type describes every piece of context from
+the moment the memory layer reads it until it is packed into a prompt, so
+entries pass between the two layers without being copied. Records are slotted
+to keep the many short-lived entries built per turn small, and they are not
+validated on construction: internal producers build them from trusted data and
+the checks run only where data enters from outside (``from_dict``, database
+cache rows and API input) by calling ``validate()``.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+ALLOWED_CONTEXT_TYPES = ('conversation', 'tool_usage', 'document', 'summary', 'user_preference')
+
+
+class ContextRecord:
+    """Immutable context entry shared by memory layer and intelligent chat"""
+
+    __slots__ = ('content', 'source', 'relevance_score', 'context_type', 'timestamp', 'metadata')
+
+    def __init__(self, content: str, source: str, relevance_score: float, context_type: str,
+                 timestamp: Optional[datetime] = None, metadata: Optional[Dict[str, Any]] = None):
+        setter = object.__setattr__
+        setter(self, 'content', content)
+        setter(self, 'source', source)
+        setter(self, 'relevance_score', relevance_score)
+        setter(self, 'context_type', context_type)
+        setter(self, 'timestamp', timestamp if timestamp is not None else datetime.now(timezone.utc))
+        setter(self, 'metadata', metadata if metadata is not None else {})
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"ContextRecord is immutable; use replace({name}=...) instead")
+
+    def __delattr__(self, name: str):
+        raise AttributeError("ContextRecord is immutable")
+
+    def __reduce__(self):
+        return (self.__class__, self._values())
+
+    def _values(self) -> tuple:
+        return (self.content, self.source, self.relevance_score, self.context_type, self.timestamp, self.metadata)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ContextRecord):
+            return NotImplemented
+        return self._values() == other._values()
+
+    # Metadata is a dict, so records are not hashable, like the dataclasses they replace
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"ContextRecord(content={self.content!r}, source={self.source!r}, "
+                f"relevance_score={self.relevance_score!r}, context_type={self.context_type!r}, "
+                f"timestamp={self.timestamp!r}, metadata={self.metadata!r})")
+
+    def replace(self, **changes: Any) -> 'ContextRecord':
+        """Return a copy with the given fields changed"""
+        values = dict(zip(self.__slots__, self._values()))
+        unknown = set(changes) - set(values)
+        if unknown:
+            raise TypeError(f"Unknown ContextRecord fields: {', '.join(sorted(unknown))}")
+        values.update(changes)
+        return self.__class__(**values)
+
+    def validate(self) -> 'ContextRecord':
+        """Check the record at a trust boundary and return it"""
+        if not self.content or not isinstance(self.content, str):
+            raise ValueError("content must be a non-empty string")
+
+        if not self.source or not isinstance(self.source, str):
+            raise ValueError("source must be a non-empty string")
+
+        if not isinstance(self.relevance_score, (int, float)):
+            raise ValueError("relevance_score must be a number")
+
+        if not 0.0 <= self.relevance_score <= 1.0:
+            raise ValueError("relevance_score must be between 0.0 and 1.0")
+
+        if not self.context_type or not isinstance(self.context_type, str):
+            raise ValueError("context_type must be a non-empty string")
+
+        if self.context_type not in ALLOWED_CONTEXT_TYPES:
+            raise ValueError(f"context_type must be one of: {', '.join(ALLOWED_CONTEXT_TYPES)}")
+
+        if not isinstance(self.metadata, dict):
+            raise ValueError("metadata must be a dictionary")
+
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'content': self.content,
+            'source': self.source,
+            'relevance_score': self.relevance_score,
+            'context_type': self.context_type,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'metadata': self.metadata
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ContextRecord':
+        """Create a validated record from untrusted dictionary data"""
+        timestamp = None
+        if data.get('timestamp'):
+            if isinstance(data['timestamp'], str):
+                timestamp = datetime.fromisoformat(data['timestamp'].replace('Z', '+00:00'))
+            elif isinstance(data['timestamp'], datetime):
+                timestamp = data['timestamp']
+
+        return cls(
+            content=data['content'],
+            source=data['source'],
+            relevance_score=data['relevance_score'],
+            context_type=data['context_type'],
+            timestamp=timestamp,
+            metadata=data.get('metadata', {})
+        ).validate()
+
+
+def as_context_record(context: Any) -> ContextRecord:
+    """Return ``context`` itself when it is a record, else a record copied from its attributes"""
+    if isinstance(context, ContextRecord):
+        return context
+    return ContextRecord(
+        content=context.content,
+        source=context.source,
+        relevance_score=context.relevance_score,
+        context_type=context.context_type,
+        timestamp=getattr(context, 'timestamp', None),
+        metadata=getattr(context, 'metadata', None)
+    )
@@ -457,7 +457,8 @@ class ContextRetrievalEngine:
         start_time = time.time()
         
         try:
-            # Calculate enhanced relevance scores
+            # Calculate enhanced relevance scores; records are immutable, so rescored copies replace them
+            rescored = []
             for context in contexts:
                 # Base similarity score
                 base_score = self.calculate_context_similarity(query, context.content)
@@ -465,8 +466,8 @@ class ContextRetrievalEngine:
                 # Apply boosting factors
                 boosted_score = self._apply_relevance_boosting(base_score, context, query)
                 
-                # Update relevance score
-                context.relevance_score = boosted_score
+                rescored.append(context.replace(relevance_score=boosted_score))
+            contexts = rescored
             
             # Filter by minimum relevance threshold
             filtered_contexts = [
@@ -0,0 +1,342 @@
+"""
+Incremental rolling conversation summaries backed by ConversationSummary.
+
+Older turns of each session are folded into one summary row per session, and
+the session summaries of a user into one row per user (``session_id`` NULL).
+The latest turns of every session stay raw. Each pass only reads turns added
+since the previous one: the id of the last folded turn is kept in
+``important_context`` and ``date_range_end`` marks the time of the last
+folded turn. Context retrieval reads the summaries of the user's latest
+sessions plus, per session, every turn after its summary's last folded turn,
+so the rows read per turn and the prompt size stay bounded however long a
+conversation grows.
+
+Every worker runs its own summarizer. On PostgreSQL each summary row is
+updated under a transaction-scoped advisory lock on its user and session, so
+two workers never create the same row twice; should duplicates exist anyway,
+the newest row is kept and the others are deleted on the next update.
+
+Summaries are extractive by default. Lines of the previous summary and of
+the new turns are scored by the frequency of their content words, and the
+best are kept in conversation order. An LLM with an ``invoke`` method can be
+given instead, and the extractive method is the fallback when it fails.
+"""
+
+import re
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, asc, desc, func, or_, text
+from sqlalchemy.orm import Session
+
+from backend.memory_models import EnhancedChatHistory, ConversationSummary, create_conversation_summary
+
+logger = logging.getLogger(__name__)
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+STOP_WORDS = frozenset(
+    "a an and are as at be been but by can could did do does for from had has have how i if in "
+    "into is it its me my no not of on or our please so that the their them then there these "
+    "they this to up us was we were what when where which who why will with would you your "
+    "yes ok okay thanks thank hi hello".split()
+)
+MAX_LINE_LENGTH = 300
+MAX_KEY_TOPICS = 8
+# Session summaries combined into the per-user summary
+MAX_USER_SESSIONS = 20
+# Most recently active sessions whose summaries and unfolded turns are read as context
+MAX_CONTEXT_SESSIONS = 3
+# Unfolded turns read per session, in case summarization falls behind
+MAX_UNFOLDED_TURNS = 200
+
+
+@dataclass
+class SummarizedHistory:
+    """Rolling summaries of a user and the raw turns they do not cover yet"""
+    summaries: List[ConversationSummary] = field(default_factory=list)
+    recent_turns: List[EnhancedChatHistory] = field(default_factory=list)
+
+
+def _content_words(text: str) -> List[str]:
+    return [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOP_WORDS and len(word) > 2]
+
+
+def _turn_lines(turn: EnhancedChatHistory) -> List[str]:
+    lines = []
+    for role, text in (("User", turn.user_message), ("Assistant", turn.bot_response)):
+        if not text:
+            continue
+        for sentence in SENTENCE_SPLIT.split(text.strip()):
+            sentence = " ".join(sentence.split())
+            if len(_content_words(sentence)) >= 2:
+                lines.append(f"{role}: {sentence[:MAX_LINE_LENGTH]}")
+    return lines
+
+
+def extractive_summary(lines: List[str], max_sentences: int) -> Tuple[str, List[str]]:
+    """Keep the most informative lines in their original order
+
+    Returns the summary text and its key topics.
+    """
+    words_per_line = [_content_words(line.split(": ", 1)[-1]) for line in lines]
+    # Document frequency, counted in order of first appearance so ties stay stable
+    frequencies = Counter(word for words in words_per_line for word in dict.fromkeys(words))
+    if not frequencies:
+        return "", []
+
+    top = max(frequencies.values())
+    scored = []
+    for index, words in enumerate(words_per_line):
+        if not words:
+            continue
+        unique = set(words)
+        score = sum(frequencies[word] for word in unique) / (top * (len(unique) + 2))
+        scored.append((score, index))
+
+    keep = sorted(index for _, index in sorted(scored, key=lambda item: (-item[0], -item[1]))[:max_sentences])
+    topics = [word for word, _ in frequencies.most_common(MAX_KEY_TOPICS)]
+    return "\n".join(lines[index] for index in keep), topics
+
+
+def load_summarized_history(
+    db: Session,
+    user_id: str,
+    sessions: int = MAX_CONTEXT_SESSIONS,
+    since: Optional[datetime] = None,
+    max_turns: int = MAX_UNFOLDED_TURNS
+) -> SummarizedHistory:
+    """Summaries of a user's latest sessions plus every turn they do not cover yet
+
+    Three bounded queries: the ``sessions`` most recently active sessions,
+    the user summary and the summaries of those sessions, then per session
+    the turns after its summary's ``last_turn_id`` (at most ``max_turns``
+    each). Turns waiting for the next summarization pass are never skipped.
+    """
+    conditions = [EnhancedChatHistory.user_id == user_id, EnhancedChatHistory.deleted_at.is_(None)]
+    if since is not None:
+        conditions.append(EnhancedChatHistory.created_at >= since)
+    last_id = func.max(EnhancedChatHistory.id)
+    session_ids = [row[0] for row in db.query(EnhancedChatHistory.session_id, last_id).filter(
+        and_(*conditions)
+    ).group_by(EnhancedChatHistory.session_id).order_by(desc(last_id)).limit(sessions).all()]
+    if not session_ids:
+        return SummarizedHistory()
+
+    rows = db.query(ConversationSummary).filter(
+        and_(
+            ConversationSummary.user_id == user_id,
+            or_(ConversationSummary.session_id.is_(None), ConversationSummary.session_id.in_(session_ids))
+        )
+    ).order_by(desc(ConversationSummary.date_range_end), desc(ConversationSummary.id)).all()
+    # Duplicates left by concurrent workers are skipped
+    summaries, seen = [], set()
+    for row in rows:
+        if row.session_id not in seen:
+            seen.add(row.session_id)
+            summaries.append(row)
+    watermarks = {
+        summary.session_id: (summary.important_context or {}).get("last_turn_id", 0)
+        for summary in summaries if summary.session_id is not None
+    }
+
+    unfolded = or_(*[
+        and_(EnhancedChatHistory.session_id == session_id, EnhancedChatHistory.id > watermarks.get(session_id, 0))
+        for session_id in session_ids
+    ])
+    turns = db.query(EnhancedChatHistory).filter(and_(*conditions, unfolded)).order_by(
+        desc(EnhancedChatHistory.created_at), desc(EnhancedChatHistory.id)
+    ).limit(max_turns * len(session_ids)).all()
+
+    return SummarizedHistory(summaries=summaries, recent_turns=turns)
+
+
+class ConversationSummarizer:
+    """Folds older turns into per-session and per-user rolling summaries"""
+
+    def __init__(self, recent_turns: int = 5, max_sentences: int = 12, llm: Any = None,
+                 batch_limit: int = 200):
+        """
+        Args:
+            recent_turns: Latest turns of each session that stay raw
+            max_sentences: Lines kept in an extractive summary
+            llm: Optional model with an ``invoke(prompt)`` method
+            batch_limit: Maximum turns folded into one session per pass
+        """
+        self.recent_turns = recent_turns
+        self.max_sentences = max_sentences
+        self.llm = llm
+        self.batch_limit = batch_limit
+        self._last_seen_id = 0
+        self.stats = {"passes": 0, "turns_folded": 0, "session_summaries": 0, "user_summaries": 0}
+
+    def summarize_pending(self, db: Session) -> Dict[str, int]:
+        """One pass over the sessions that received turns since the previous pass"""
+        groups = db.query(
+            EnhancedChatHistory.user_id, EnhancedChatHistory.session_id, func.max(EnhancedChatHistory.id)
+        ).filter(EnhancedChatHistory.id > self._last_seen_id).group_by(
+            EnhancedChatHistory.user_id, EnhancedChatHistory.session_id
+        ).all()
+
+        folded = 0
+        users: Set[str] = set()
+        # A session cut off by batch_limit still has foldable turns after its
+        # last folded one, so the next pass has to see it again
+        ceiling = None
+        for user_id, session_id, max_id in groups:
+            turns, last_folded_id = self._fold(db, user_id, session_id)
+            if turns:
+                folded += turns
+                users.add(user_id)
+            if turns >= self.batch_limit:
+                ceiling = last_folded_id if ceiling is None else min(ceiling, last_folded_id)
+        if groups:
+            highest = max(max_id for _, _, max_id in groups)
+            self._last_seen_id = max(self._last_seen_id, highest if ceiling is None else min(highest, ceiling))
+
+        for user_id in sorted(users):
+            self.refresh_user_summary(db, user_id)
+
+        self.stats["passes"] += 1
+        self.stats["turns_folded"] += folded
+        return {"sessions_checked": len(groups), "turns_folded": folded, "users_updated": len(users)}
+
+    def fold_session(self, db: Session, user_id: str, session_id: str) -> int:
+        """Fold the turns older than the latest ``recent_turns`` into the session summary
+
+        Returns the number of turns folded.
+        """
+        return self._fold(db, user_id, session_id)[0]
+
+    def _fold(self, db: Session, user_id: str, session_id: str) -> Tuple[int, Optional[int]]:
+        """Turns folded into the session summary and the id of the last one"""
+        session_filter = and_(
+            EnhancedChatHistory.user_id == user_id,
+            EnhancedChatHistory.session_id == session_id,
+            EnhancedChatHistory.deleted_at.is_(None)
+        )
+        recent_ids = [row[0] for row in db.query(EnhancedChatHistory.id).filter(session_filter).order_by(
+            desc(EnhancedChatHistory.id)
+        ).limit(self.recent_turns).all()]
+        if len(recent_ids) < self.recent_turns:
+            return 0, None
+
+        self._lock_summary(db, user_id, session_id)
+        summary = self._get_summary(db, user_id, session_id)
+        context = dict(summary.important_context or {}) if summary else {}
+        watermark = context.get("last_turn_id", 0)
+
+        turns = db.query(EnhancedChatHistory).filter(
+            and_(session_filter, EnhancedChatHistory.id > watermark, EnhancedChatHistory.id < min(recent_ids))
+        ).order_by(asc(EnhancedChatHistory.id)).limit(self.batch_limit).all()
+        if not turns:
+            return 0, None
+
+        lines = []
+        for turn in turns:
+            lines.extend(_turn_lines(turn))
+        previous = summary.summary_text if summary else ""
+        text, topics, method = self._summarize(previous, lines)
+
+        context.update({
+            "scope": "session",
+            "last_turn_id": turns[-1].id,
+            "turns_folded": context.get("turns_folded", 0) + len(turns),
+            "method": method
+        })
+        self._save(db, summary, user_id, session_id, text or previous, topics, context,
+                   turns[0].created_at, turns[-1].created_at)
+        self.stats["session_summaries"] += 1
+        return len(turns), turns[-1].id
+
+    def refresh_user_summary(self, db: Session, user_id: str) -> bool:
+        """Rebuild the per-user summary from the latest session summaries"""
+        sessions = db.query(ConversationSummary).filter(
+            and_(ConversationSummary.user_id == user_id, ConversationSummary.session_id.isnot(None))
+        ).order_by(desc(ConversationSummary.date_range_end)).limit(MAX_USER_SESSIONS).all()
+        if not sessions:
+            return False
+        sessions.reverse()
+
+        lines = [line for row in sessions for line in (row.summary_text or "").splitlines() if line]
+        text, topics, method = self._summarize("", lines)
+        if not text:
+            return False
+
+        self._lock_summary(db, user_id, None)
+        summary = self._get_summary(db, user_id, None)
+        context = {
+            "scope": "user",
+            "sessions": len(sessions),
+            "turns_folded": sum((row.important_context or {}).get("turns_folded", 0) for row in sessions),
+            "method": method
+        }
+        self._save(db, summary, user_id, None, text, topics, context,
+                   sessions[0].date_range_start, sessions[-1].date_range_end)
+        self.stats["user_summaries"] += 1
+        return True
+
+    def _lock_summary(self, db: Session, user_id: str, session_id: Optional[str]):
+        """Serialize updates of one summary row across workers until the next commit
+
+        The table has no unique constraint on user and session, so without the
+        lock two workers could both find no row and insert one each.
+        """
+        if db.bind is not None and db.bind.dialect.name == "postgresql":
+            db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+                       {"key": f"conversation_summary:{user_id}:{session_id or ''}"})
+
+    def _get_summary(self, db: Session, user_id: str, session_id: Optional[str]) -> Optional[ConversationSummary]:
+        """Newest summary row of a user or session, deleting older duplicates"""
+        session_condition = (ConversationSummary.session_id.is_(None) if session_id is None
+                             else ConversationSummary.session_id == session_id)
+        rows = db.query(ConversationSummary).filter(
+            and_(ConversationSummary.user_id == user_id, session_condition)
+        ).order_by(desc(ConversationSummary.id)).all()
+        for duplicate in rows[1:]:
+            db.delete(duplicate)
+        return rows[0] if rows else None
+
+    def _summarize(self, previous: str, lines: List[str]) -> Tuple[str, List[str], str]:
+        """Summary text, key topics and the method used"""
+        candidates = [line for line in previous.splitlines() if line] + lines
+        text, topics = extractive_summary(candidates, self.max_sentences)
+        if self.llm is None or not lines:
+            return text, topics, "extractive"
+
+        prompt = (
+            "Update the running summary of a customer support conversation. Keep facts, "
+            "requests and outcomes, one short line each.\n\n"
+            f"Current summary:\n{previous or '(none)'}\n\nNew messages:\n" + "\n".join(lines)
+        )
+        try:
+            response = self.llm.invoke(prompt)
+            llm_text = getattr(response, "content", response)
+            if isinstance(llm_text, str) and llm_text.strip():
+                return llm_text.strip(), topics, "llm"
+        except Exception as e:
+            logger.warning(f"LLM summarization failed, using extractive summary: {e}")
+        return text, topics, "extractive"
+
+    def _save(self, db: Session, summary: Optional[ConversationSummary], user_id: str,
+              session_id: Optional[str], text: str, topics: List[str], context: Dict[str, Any],
+              range_start: Optional[datetime], range_end: Optional[datetime]):
+        try:
+            if summary is None:
+                db.add(create_conversation_summary(
+                    user_id=user_id, session_id=session_id, summary_text=text, key_topics=topics,
+                    important_context=context, date_range_start=range_start, date_range_end=range_end
+                ))
+            else:
+                summary.summary_text = text
+                summary.key_topics = topics
+                summary.important_context = context
+                summary.date_range_start = summary.date_range_start or range_start
+                summary.date_range_end = range_end
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
@@ -8,15 +8,21 @@ Requirements: 2.1, 2.2, 2.3, 2.4
 """
 
 import logging
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Tuple, Any
-from sqlalchemy.orm import Session
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Any, FrozenSet, Iterable, Iterator, Sequence, Union
+from sqlalchemy import and_, bindparam, case, or_, update
+from sqlalchemy.orm import Session, Query
+from dataclasses import dataclass, field
 from enum import Enum
 import re
 import json
 
-from backend.database import SessionLocal
+from backend.database import SessionLocal, BackgroundSessionLocal
 from backend.unified_models import (
     UnifiedUser, UnifiedTicket, UnifiedChatHistory, UnifiedTicketComment,
     UnifiedTicketActivity, TicketStatus, TicketPriority, TicketCategory
@@ -24,6 +30,94 @@ from backend.unified_models import (
 
 logger = logging.getLogger(__name__)
 
+ERROR_CODE_PATTERN = re.compile(r'\b(?:error|err)[-_]?\d+\b', re.IGNORECASE)
+URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+DIGIT_PATTERN = re.compile(r'\d')
+PHONE_PATTERN = re.compile(r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b')
+
+# Ticket statuses that nightly re-triage may still change
+RETRIAGE_STATUSES = (TicketStatus.OPEN, TicketStatus.IN_PROGRESS, TicketStatus.PENDING)
+
+
+class KeywordMatcher:
+    """
+    Finds which of a fixed set of keywords occur in a text.
+
+    A match means the same as ``keyword in text``, so keywords also match
+    inside longer words. Keywords without whitespace can only occur inside a
+    single whitespace-separated token; the keywords each distinct token
+    contains are found once by a trie-shaped regex and remembered, and
+    support conversations reuse a small vocabulary, so most tokens cost one
+    dict lookup. The few keywords containing spaces are checked directly.
+    """
+
+    def __init__(self, keywords: Iterable[str], max_cached_tokens: int = 100000):
+        unique = sorted({keyword for keyword in keywords if keyword})
+        self.keywords = frozenset(unique)
+        self.max_cached_tokens = max_cached_tokens
+        self._phrases = tuple(keyword for keyword in unique if any(char.isspace() for char in keyword))
+        words = [keyword for keyword in unique if keyword not in self._phrases]
+        self._pattern = re.compile(f"(?=({self._trie_pattern(words)}))") if words else None
+        self._contained = {
+            word: frozenset(other for other in words if other in word) for word in words
+        }
+        self._token_keywords: Dict[str, FrozenSet[str]] = {}
+
+    @staticmethod
+    def _trie_pattern(keywords: Sequence[str]) -> str:
+        trie: Dict[str, Any] = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def build(node: Dict[str, Any]) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            # Optional extensions are greedy, so the longest keyword wins
+            return f"(?:{body})?" if "" in node else body
+
+        return build(trie)
+
+    def _scan_token(self, token: str) -> FrozenSet[str]:
+        if self._pattern is None:
+            return frozenset()
+        # The lookahead reports the longest keyword at every position;
+        # shorter keywords starting there are contained in it
+        found = set()
+        for keyword in set(self._pattern.findall(token)):
+            found |= self._contained[keyword]
+        return frozenset(found)
+
+    def match(self, text: str) -> FrozenSet[str]:
+        """Keywords occurring in text, which should already be lowercased"""
+        if not text:
+            return frozenset()
+        cache = self._token_keywords
+        present = {phrase for phrase in self._phrases if phrase in text}
+        for token in set(text.split()):
+            found = cache.get(token)
+            if found is None:
+                found = self._scan_token(token)
+                if len(cache) >= self.max_cached_tokens:
+                    cache.clear()
+                cache[token] = found
+            if found:
+                present.update(found)
+        return frozenset(present)
+
+
+@dataclass
+class MessageTerms:
+    """Keywords found in each side of a conversation"""
+    user: FrozenSet[str]
+    bot: FrozenSet[str]
+
+
 class ConversationAnalysisResult(Enum):
     """Results of conversation analysis"""
     NEEDS_TICKET = "needs_ticket"
@@ -61,6 +155,21 @@ class ConversationAnalysis:
         if self.extracted_entities is None:
             self.extracted_entities = {}
 
+@dataclass
+class BatchAnalysisSummary:
+    """Outcome of a bulk conversation analysis run"""
+    processed: int = 0
+    results: Dict[str, int] = field(default_factory=dict)
+    tickets_updated: int = 0
+    chunks: int = 0
+    errors: int = 0
+    duration_seconds: float = 0.0
+    analyses: List[ConversationAnalysis] = field(default_factory=list)
+
+    @property
+    def conversations_per_second(self) -> float:
+        return self.processed / self.duration_seconds if self.duration_seconds else 0.0
+
 class ConversationAnalyzer:
     """
     Analyzes AI agent conversations to determine if they need to be converted to tickets
@@ -134,6 +243,76 @@ class ConversationAnalyzer:
             "multiple", "several", "various", "complex", "complicated", "integration",
             "system", "database", "network", "configuration", "setup"
         ]
+        
+        # Ticket need indicators
+        self.problem_indicators = [
+            "problem", "issue", "error", "bug", "not working", "broken", "help",
+            "support", "can't", "unable", "difficulty", "trouble", "wrong"
+        ]
+        
+        self.resolution_indicators = [
+            "resolved", "fixed", "solved", "working now", "should work", "try this",
+            "here's how", "follow these steps", "solution"
+        ]
+        
+        self.escalation_indicators = [
+            "contact support", "human agent", "escalate", "transfer", "speak to someone",
+            "not resolved", "still having issues", "doesn't work"
+        ]
+        
+        self.info_indicators = [
+            "what is", "how does", "explain", "tell me about", "information",
+            "learn more", "understand", "definition"
+        ]
+        
+        # Confidence indicators
+        self.confidence_words = {
+            ConversationAnalysisResult.NEEDS_TICKET: ["problem", "issue", "error", "bug", "broken", "help"],
+            ConversationAnalysisResult.RESOLVED: ["resolved", "fixed", "solved", "working", "thanks"],
+            ConversationAnalysisResult.ESCALATION_REQUIRED: ["contact support", "human", "escalate", "transfer"]
+        }
+        
+        # Entity and tag vocabularies
+        self.products = ["internet", "phone", "tv", "cable", "fiber", "broadband", "wifi", "router", "modem"]
+        self.features = ["speed", "bandwidth", "connection", "signal", "coverage", "plan", "package"]
+        self.tag_keywords = {
+            "billing": ["billing", "payment"],
+            "technical": ["technical", "error"],
+            "account": ["account", "login"]
+        }
+        self.reasoning_urgent_words = ["urgent", "critical", "emergency"]
+        
+        # Every keyword is matched in one pass per message; each family is then
+        # counted by intersecting its set with the keywords found
+        families = self._keyword_families()
+        self.matcher = KeywordMatcher(keyword for family in families for keyword in family)
+        self._family_sets = {id(family): frozenset(family) for family in families}
+    
+    def _keyword_families(self) -> List[List[str]]:
+        """Every keyword list the analysis looks for"""
+        families = [
+            self.negative_sentiment, self.positive_sentiment, self.urgency_indicators,
+            self.complexity_indicators, self.problem_indicators, self.resolution_indicators,
+            self.escalation_indicators, self.info_indicators, self.products, self.features,
+            self.reasoning_urgent_words
+        ]
+        families.extend(self.category_keywords.values())
+        families.extend(self.priority_keywords.values())
+        families.extend(self.confidence_words.values())
+        families.extend(self.tag_keywords.values())
+        return families
+    
+    def _terms(self, text: str) -> FrozenSet[str]:
+        return self.matcher.match((text or "").lower())
+    
+    def _message_terms(self, user_message: str, bot_response: str) -> MessageTerms:
+        return MessageTerms(user=self._terms(user_message), bot=self._terms(bot_response))
+    
+    def _count(self, terms: FrozenSet[str], keywords: List[str]) -> int:
+        return len(terms & self._family_sets[id(keywords)])
+    
+    def _any(self, terms: FrozenSet[str], keywords: List[str]) -> bool:
+        return not terms.isdisjoint(self._family_sets[id(keywords)])
     
     def analyze_conversation(self, conversation_id: int) -> ConversationAnalysis:
         """
@@ -155,34 +334,8 @@ class ConversationAnalyzer:
                         extracted_entities={}
                     )
                 
-                # Analyze the conversation content
-                user_message = conversation.user_message or ""
-                bot_response = conversation.bot_response or ""
-                
-                # Extract entities and metadata
-                extracted_entities = self._extract_entities(user_message, bot_response)
-                
-                # Determine if ticket is needed
-                analysis_result = self._determine_ticket_need(user_message, bot_response, extracted_entities)
-                
-                # Calculate confidence score
-                confidence_score = self._calculate_confidence_score(user_message, bot_response, analysis_result)
-                
-                # Generate ticket metadata if needed
-                ticket_metadata = None
-                if analysis_result in [ConversationAnalysisResult.NEEDS_TICKET, ConversationAnalysisResult.ESCALATION_REQUIRED]:
-                    ticket_metadata = self._generate_ticket_metadata(user_message, bot_response, extracted_entities)
-                
-                # Generate reasoning
-                reasoning = self._generate_reasoning(user_message, bot_response, analysis_result, extracted_entities)
-                
-                return ConversationAnalysis(
-                    conversation_id=conversation_id,
-                    analysis_result=analysis_result,
-                    ticket_metadata=ticket_metadata,
-                    confidence_score=confidence_score,
-                    reasoning=reasoning,
-                    extracted_entities=extracted_entities
+                return self.analyze_messages(
+                    conversation_id, conversation.user_message, conversation.bot_response
                 )
                 
         except Exception as e:
@@ -196,7 +349,222 @@ class ConversationAnalyzer:
                 extracted_entities={}
             )
     
-    def _extract_entities(self, user_message: str, bot_response: str) -> Dict[str, Any]:
+    def analyze_messages(self, conversation_id: int, user_message: Optional[str],
+                         bot_response: Optional[str]) -> ConversationAnalysis:
+        """
+        Analyze a conversation's messages without touching the database
+        """
+        user_message = user_message or ""
+        bot_response = bot_response or ""
+        terms = self._message_terms(user_message, bot_response)
+        
+        # Extract entities and metadata
+        extracted_entities = self._extract_entities(user_message, bot_response, terms)
+        
+        # Determine if ticket is needed
+        analysis_result = self._determine_ticket_need(user_message, bot_response, extracted_entities, terms)
+        
+        # Calculate confidence score
+        confidence_score = self._calculate_confidence_score(user_message, bot_response, analysis_result, terms)
+        
+        # Generate ticket metadata if needed
+        ticket_metadata = None
+        if analysis_result in [ConversationAnalysisResult.NEEDS_TICKET, ConversationAnalysisResult.ESCALATION_REQUIRED]:
+            ticket_metadata = self._generate_ticket_metadata(user_message, bot_response, extracted_entities, terms)
+        
+        # Generate reasoning
+        reasoning = self._generate_reasoning(user_message, bot_response, analysis_result, extracted_entities, terms)
+        
+        return ConversationAnalysis(
+            conversation_id=conversation_id,
+            analysis_result=analysis_result,
+            ticket_metadata=ticket_metadata,
+            confidence_score=confidence_score,
+            reasoning=reasoning,
+            extracted_entities=extracted_entities
+        )
+    
+    def analyze_conversations(self, conversations: Union[Iterable[int], Query, None] = None,
+                              chunk_size: int = 1000, workers: Optional[int] = None,
+                              write_results: bool = True,
+                              collect_results: bool = False) -> BatchAnalysisSummary:
+        """
+        Analyze conversations in bulk, e.g. for nightly re-triage.
+        
+        Conversations are read in keyset-paginated chunks, analyzed across a
+        process pool and, when write_results is set, the ticket metadata of
+        conversations linked to an open ticket is written back one bulk
+        UPDATE per chunk.
+        
+        Args:
+            conversations: Conversation ids, a query over UnifiedChatHistory,
+                or None for every conversation
+            chunk_size: Conversations read, analyzed and written per chunk
+            workers: Worker processes; defaults to the CPU count, and 0 or 1
+                analyzes in this process
+            write_results: Merge the analysis into the metadata and tags of
+                linked open tickets, and set category and priority on those
+                no agent has picked up yet
+            collect_results: Keep every ConversationAnalysis on the summary,
+                for small runs
+        """
+        summary = BatchAnalysisSummary()
+        results: Counter = Counter()
+        started = time.perf_counter()
+        if workers is None:
+            workers = os.cpu_count() or 1
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_batch_worker, initargs=(self,)
+        ) if workers > 1 else None
+        
+        # Several chunks are analyzed ahead of the one being written, but not
+        # the whole table at once
+        max_in_flight = max(2, workers * 2)
+        pending: deque = deque()
+        
+        # A caller's query is read through the caller's session, which stays
+        # open but has each chunk's ticket updates committed on it
+        session = nullcontext(conversations.session) if isinstance(conversations, Query) else BackgroundSessionLocal()
+        try:
+            with session as db:
+                def finish(chunk: List[Tuple], outcome) -> None:
+                    analyses, errors = outcome.result() if executor else outcome
+                    summary.chunks += 1
+                    summary.processed += len(analyses)
+                    summary.errors += errors
+                    for analysis in analyses:
+                        results[analysis.analysis_result.value] += 1
+                    if write_results:
+                        summary.tickets_updated += self._write_ticket_metadata(db, chunk, analyses)
+                    if collect_results:
+                        summary.analyses.extend(analyses)
+                
+                for chunk in self._iter_conversation_chunks(db, conversations, chunk_size):
+                    rows = [(row[0], row[1], row[2]) for row in chunk]
+                    if executor:
+                        pending.append((chunk, executor.submit(_analyze_rows, rows)))
+                        if len(pending) >= max_in_flight:
+                            finish(*pending.popleft())
+                    else:
+                        finish(chunk, _analyze_rows(rows, self))
+                while pending:
+                    finish(*pending.popleft())
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+        
+        summary.results = dict(results)
+        summary.duration_seconds = time.perf_counter() - started
+        logger.info(
+            f"Analyzed {summary.processed} conversations in {summary.chunks} chunks "
+            f"({summary.conversations_per_second:.0f}/s), updated {summary.tickets_updated} tickets"
+        )
+        return summary
+    
+    def _iter_conversation_chunks(self, db: Session, conversations: Union[Iterable[int], Query, None],
+                                  chunk_size: int) -> Iterator[List[Tuple]]:
+        """Yield (id, user_message, bot_response, ticket_id) rows chunk by chunk"""
+        columns = (
+            UnifiedChatHistory.id, UnifiedChatHistory.user_message,
+            UnifiedChatHistory.bot_response, UnifiedChatHistory.ticket_id
+        )
+        if conversations is None or isinstance(conversations, Query):
+            base = conversations if conversations is not None else db.query(UnifiedChatHistory)
+            base = base.with_entities(*columns).order_by(None)
+            last_id = None
+            while True:
+                query = base
+                if last_id is not None:
+                    query = query.filter(UnifiedChatHistory.id > last_id)
+                chunk = query.order_by(UnifiedChatHistory.id).limit(chunk_size).all()
+                if not chunk:
+                    return
+                yield chunk
+                last_id = chunk[-1][0]
+        
+        ids = sorted(set(conversations))
+        for start in range(0, len(ids), chunk_size):
+            chunk = db.query(*columns).filter(
+                UnifiedChatHistory.id.in_(ids[start:start + chunk_size])
+            ).order_by(UnifiedChatHistory.id).all()
+            if chunk:
+                yield chunk
+    
+    def _write_ticket_metadata(self, db: Session, chunk: List[Tuple],
+                               analyses: List[ConversationAnalysis]) -> int:
+        """
+        Write the chunk's analysis to linked re-triageable tickets
+        
+        The analysis is merged into each ticket's existing metadata, and
+        category and priority are only set on tickets that are still open
+        and unassigned, so triage never overrides an agent's decisions.
+        """
+        ticket_ids = {row[0]: row[3] for row in chunk}
+        analyzed_at = datetime.now(timezone.utc).isoformat()
+        # A ticket linked to several conversations takes the latest one's analysis
+        analysis_by_ticket = {}
+        for analysis in sorted(analyses, key=lambda analysis: analysis.conversation_id):
+            ticket_id = ticket_ids.get(analysis.conversation_id)
+            if ticket_id is not None and analysis.ticket_metadata is not None:
+                analysis_by_ticket[ticket_id] = analysis
+        if not analysis_by_ticket:
+            return 0
+        
+        table = UnifiedTicket.__table__
+        current = db.query(table.c.id, table.c.ticket_metadata).filter(
+            table.c.id.in_(list(analysis_by_ticket)),
+            table.c.status.in_(RETRIAGE_STATUSES)
+        ).all()
+        params = []
+        for ticket_id, previous in current:
+            analysis = analysis_by_ticket[ticket_id]
+            metadata = analysis.ticket_metadata
+            merged = _load_ticket_metadata(previous)
+            merged.update({
+                "conversation_id": analysis.conversation_id,
+                "analysis_result": analysis.analysis_result.value,
+                "confidence_score": analysis.confidence_score,
+                "urgency_score": metadata.urgency_score,
+                "complexity_score": metadata.complexity_score,
+                "sentiment_score": metadata.sentiment_score,
+                "analyzed_at": analyzed_at
+            })
+            params.append({
+                "b_id": ticket_id,
+                "b_category": metadata.category,
+                "b_priority": metadata.priority,
+                "b_tags": ",".join(sorted(metadata.tags))[:500],
+                "b_previous": previous,
+                "b_metadata": json.dumps(merged)
+            })
+        if not params:
+            return 0
+        
+        untouched = and_(table.c.status == TicketStatus.OPEN, table.c.assigned_agent_id.is_(None))
+        # Expanding IN parameters cannot be used with executemany, so the
+        # status filter is spelled out. The metadata read above must still be
+        # current, otherwise a concurrent write would be lost in the merge.
+        statement = update(table).where(
+            table.c.id == bindparam("b_id"),
+            or_(*(table.c.status == status for status in RETRIAGE_STATUSES)),
+            table.c.ticket_metadata.is_not_distinct_from(bindparam("b_previous"))
+        ).values(
+            category=case((untouched, bindparam("b_category", type_=table.c.category.type)), else_=table.c.category),
+            priority=case((untouched, bindparam("b_priority", type_=table.c.priority.type)), else_=table.c.priority),
+            tags=bindparam("b_tags"),
+            ticket_metadata=bindparam("b_metadata")
+        )
+        try:
+            result = db.connection().execute(statement, params)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error writing ticket metadata for {len(params)} tickets: {e}")
+            return 0
+        return max(result.rowcount, 0)
+    
+    def _extract_entities(self, user_message: str, bot_response: str,
+                          terms: Optional[MessageTerms] = None) -> Dict[str, Any]:
         """Extract entities and metadata from conversation"""
         entities = {
             "user_keywords": [],
@@ -210,70 +578,54 @@ class ConversationAnalyzer:
         }
         
         combined_text = f"{user_message} {bot_response}".lower()
+        terms = terms or self._message_terms(user_message, bot_response)
+        # Products and features are single words, so none spans the two messages
+        combined_terms = terms.user | terms.bot
+        
+        # Each pattern needs a literal that most messages lack, so a substring
+        # check skips the regex for them
+        has_digits = DIGIT_PATTERN.search(combined_text) is not None
         
         # Extract error codes (pattern: ERROR_123, ERR-456, etc.)
-        error_pattern = r'\b(?:error|err)[-_]?\d+\b'
-        entities["error_codes"] = re.findall(error_pattern, combined_text, re.IGNORECASE)
+        if has_digits and "err" in combined_text:
+            entities["error_codes"] = ERROR_CODE_PATTERN.findall(combined_text)
         
         # Extract URLs
-        url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        entities["urls"] = re.findall(url_pattern, combined_text)
+        if "http" in combined_text:
+            entities["urls"] = URL_PATTERN.findall(combined_text)
         
         # Extract email addresses
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        entities["email_addresses"] = re.findall(email_pattern, combined_text)
+        if "@" in combined_text:
+            entities["email_addresses"] = EMAIL_PATTERN.findall(combined_text)
         
         # Extract phone numbers (basic pattern)
-        phone_pattern = r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b'
-        entities["phone_numbers"] = re.findall(phone_pattern, combined_text)
+        if has_digits:
+            entities["phone_numbers"] = PHONE_PATTERN.findall(combined_text)
         
         # Extract product mentions (common telecom products)
-        products = ["internet", "phone", "tv", "cable", "fiber", "broadband", "wifi", "router", "modem"]
-        entities["mentioned_products"] = [p for p in products if p in combined_text]
+        entities["mentioned_products"] = [p for p in self.products if p in combined_terms]
         
         # Extract feature mentions
-        features = ["speed", "bandwidth", "connection", "signal", "coverage", "plan", "package"]
-        entities["mentioned_features"] = [f for f in features if f in combined_text]
+        entities["mentioned_features"] = [f for f in self.features if f in combined_terms]
         
         return entities
     
-    def _determine_ticket_need(self, user_message: str, bot_response: str, entities: Dict[str, Any]) -> ConversationAnalysisResult:
+    def _determine_ticket_need(self, user_message: str, bot_response: str, entities: Dict[str, Any],
+                               terms: Optional[MessageTerms] = None) -> ConversationAnalysisResult:
         """Determine if the conversation needs to be converted to a ticket"""
-        user_msg_lower = user_message.lower()
-        bot_msg_lower = bot_response.lower()
+        terms = terms or self._message_terms(user_message, bot_response)
         
         # Check for explicit problem indicators
-        problem_indicators = [
-            "problem", "issue", "error", "bug", "not working", "broken", "help",
-            "support", "can't", "unable", "difficulty", "trouble", "wrong"
-        ]
-        
-        has_problem = any(indicator in user_msg_lower for indicator in problem_indicators)
+        has_problem = self._any(terms.user, self.problem_indicators)
         
         # Check for resolution indicators in bot response
-        resolution_indicators = [
-            "resolved", "fixed", "solved", "working now", "should work", "try this",
-            "here's how", "follow these steps", "solution"
-        ]
-        
-        has_resolution = any(indicator in bot_msg_lower for indicator in resolution_indicators)
+        has_resolution = self._any(terms.bot, self.resolution_indicators)
         
         # Check for escalation indicators
-        escalation_indicators = [
-            "contact support", "human agent", "escalate", "transfer", "speak to someone",
-            "not resolved", "still having issues", "doesn't work"
-        ]
-        
-        needs_escalation = any(indicator in user_msg_lower or indicator in bot_msg_lower 
-                              for indicator in escalation_indicators)
+        needs_escalation = self._any(terms.user | terms.bot, self.escalation_indicators)
         
         # Check for informational queries
-        info_indicators = [
-            "what is", "how does", "explain", "tell me about", "information",
-            "learn more", "understand", "definition"
-        ]
-        
-        is_informational = any(indicator in user_msg_lower for indicator in info_indicators)
+        is_informational = self._any(terms.user, self.info_indicators)
         
         # Decision logic
         if needs_escalation:
@@ -292,27 +644,24 @@ class ConversationAnalyzer:
                 return ConversationAnalysisResult.INFORMATIONAL
     
     def _calculate_confidence_score(self, user_message: str, bot_response: str, 
-                                  analysis_result: ConversationAnalysisResult) -> float:
+                                  analysis_result: ConversationAnalysisResult,
+                                  terms: Optional[MessageTerms] = None) -> float:
         """Calculate confidence score for the analysis"""
         score = 0.5  # Base score
         
-        user_msg_lower = user_message.lower()
-        bot_msg_lower = bot_response.lower()
+        terms = terms or self._message_terms(user_message, bot_response)
         
         # Increase confidence based on clear indicators
         if analysis_result == ConversationAnalysisResult.NEEDS_TICKET:
-            problem_words = ["problem", "issue", "error", "bug", "broken", "help"]
-            problem_count = sum(1 for word in problem_words if word in user_msg_lower)
+            problem_count = self._count(terms.user, self.confidence_words[analysis_result])
             score += min(problem_count * 0.1, 0.3)
             
         elif analysis_result == ConversationAnalysisResult.RESOLVED:
-            resolution_words = ["resolved", "fixed", "solved", "working", "thanks"]
-            resolution_count = sum(1 for word in resolution_words if word in bot_msg_lower)
+            resolution_count = self._count(terms.bot, self.confidence_words[analysis_result])
             score += min(resolution_count * 0.1, 0.3)
             
         elif analysis_result == ConversationAnalysisResult.ESCALATION_REQUIRED:
-            escalation_words = ["contact support", "human", "escalate", "transfer"]
-            escalation_count = sum(1 for word in escalation_words if word in user_msg_lower or word in bot_msg_lower)
+            escalation_count = self._count(terms.user | terms.bot, self.confidence_words[analysis_result])
             score += min(escalation_count * 0.15, 0.4)
         
         # Adjust based on message length (longer messages often more complex)
@@ -325,8 +674,10 @@ class ConversationAnalyzer:
         return max(0.0, min(1.0, score))
     
     def _generate_ticket_metadata(self, user_message: str, bot_response: str, 
-                                entities: Dict[str, Any]) -> TicketMetadata:
+                                entities: Dict[str, Any],
+                                terms: Optional[MessageTerms] = None) -> TicketMetadata:
         """Generate ticket metadata from conversation analysis"""
+        user_terms = terms.user if terms else self._terms(user_message)
         
         # Generate title (first 100 chars of user message, cleaned up)
         title = user_message[:100].strip()
@@ -345,18 +696,18 @@ class ConversationAnalyzer:
             description += f"Products Mentioned: {', '.join(entities['mentioned_products'])}\n"
         
         # Determine category
-        category = self._determine_category(user_message)
+        category = self._determine_category(user_message, user_terms)
         
         # Determine priority
-        priority = self._determine_priority(user_message)
+        priority = self._determine_priority(user_message, user_terms)
         
         # Generate tags
-        tags = self._generate_tags(user_message, entities)
+        tags = self._generate_tags(user_message, entities, user_terms)
         
         # Calculate scores
-        urgency_score = self._calculate_urgency_score(user_message)
-        complexity_score = self._calculate_complexity_score(user_message, entities)
-        sentiment_score = self._calculate_sentiment_score(user_message)
+        urgency_score = self._calculate_urgency_score(user_message, user_terms)
+        complexity_score = self._calculate_complexity_score(user_message, entities, user_terms)
+        sentiment_score = self._calculate_sentiment_score(user_message, user_terms)
         
         return TicketMetadata(
             title=title,
@@ -369,14 +720,14 @@ class ConversationAnalyzer:
             sentiment_score=sentiment_score
         )
     
-    def _determine_category(self, user_message: str) -> TicketCategory:
+    def _determine_category(self, user_message: str, terms: Optional[FrozenSet[str]] = None) -> TicketCategory:
         """Determine ticket category based on message content"""
-        user_msg_lower = user_message.lower()
+        terms = self._terms(user_message) if terms is None else terms
         
         category_scores = {}
         
         for category, keywords in self.category_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in user_msg_lower)
+            score = self._count(terms, keywords)
             if score > 0:
                 category_scores[category] = score
         
@@ -385,47 +736,35 @@ class ConversationAnalyzer:
         else:
             return TicketCategory.GENERAL
     
-    def _determine_priority(self, user_message: str) -> TicketPriority:
+    def _determine_priority(self, user_message: str, terms: Optional[FrozenSet[str]] = None) -> TicketPriority:
         """Determine ticket priority based on message content"""
-        user_msg_lower = user_message.lower()
-        
-        # Check for critical priority indicators
-        for keyword in self.priority_keywords[TicketPriority.CRITICAL]:
-            if keyword in user_msg_lower:
-                return TicketPriority.CRITICAL
+        terms = self._terms(user_message) if terms is None else terms
         
-        # Check for high priority indicators
-        for keyword in self.priority_keywords[TicketPriority.HIGH]:
-            if keyword in user_msg_lower:
-                return TicketPriority.HIGH
-        
-        # Check for low priority indicators
-        for keyword in self.priority_keywords[TicketPriority.LOW]:
-            if keyword in user_msg_lower:
-                return TicketPriority.LOW
+        # Check for critical, then high, then low priority indicators
+        for priority in (TicketPriority.CRITICAL, TicketPriority.HIGH, TicketPriority.LOW):
+            if self._any(terms, self.priority_keywords[priority]):
+                return priority
         
         # Default to medium priority
         return TicketPriority.MEDIUM
     
-    def _generate_tags(self, user_message: str, entities: Dict[str, Any]) -> List[str]:
+    def _generate_tags(self, user_message: str, entities: Dict[str, Any],
+                       terms: Optional[FrozenSet[str]] = None) -> List[str]:
         """Generate tags for the ticket"""
         tags = []
-        user_msg_lower = user_message.lower()
+        terms = self._terms(user_message) if terms is None else terms
         
         # Add category-based tags
-        if "billing" in user_msg_lower or "payment" in user_msg_lower:
-            tags.append("billing")
-        if "technical" in user_msg_lower or "error" in user_msg_lower:
-            tags.append("technical")
-        if "account" in user_msg_lower or "login" in user_msg_lower:
-            tags.append("account")
+        for tag, keywords in self.tag_keywords.items():
+            if self._any(terms, keywords):
+                tags.append(tag)
         
         # Add product tags
         if entities.get("mentioned_products"):
             tags.extend(entities["mentioned_products"])
         
         # Add urgency tags
-        if any(indicator in user_msg_lower for indicator in self.urgency_indicators):
+        if self._any(terms, self.urgency_indicators):
             tags.append("urgent")
         
         # Add AI-generated tag
@@ -433,12 +772,11 @@ class ConversationAnalyzer:
         
         return list(set(tags))  # Remove duplicates
     
-    def _calculate_urgency_score(self, user_message: str) -> float:
+    def _calculate_urgency_score(self, user_message: str, terms: Optional[FrozenSet[str]] = None) -> float:
         """Calculate urgency score (0.0 to 1.0)"""
-        user_msg_lower = user_message.lower()
+        terms = self._terms(user_message) if terms is None else terms
         
-        urgency_count = sum(1 for indicator in self.urgency_indicators 
-                           if indicator in user_msg_lower)
+        urgency_count = self._count(terms, self.urgency_indicators)
         
         # Base score
         score = 0.3
@@ -447,22 +785,21 @@ class ConversationAnalyzer:
         score += min(urgency_count * 0.2, 0.6)
         
         # Add points for negative sentiment
-        negative_count = sum(1 for word in self.negative_sentiment 
-                           if word in user_msg_lower)
+        negative_count = self._count(terms, self.negative_sentiment)
         score += min(negative_count * 0.1, 0.3)
         
         return min(1.0, score)
     
-    def _calculate_complexity_score(self, user_message: str, entities: Dict[str, Any]) -> float:
+    def _calculate_complexity_score(self, user_message: str, entities: Dict[str, Any],
+                                    terms: Optional[FrozenSet[str]] = None) -> float:
         """Calculate complexity score (0.0 to 1.0)"""
-        user_msg_lower = user_message.lower()
+        terms = self._terms(user_message) if terms is None else terms
         
         # Base score based on message length
         score = min(len(user_message) / 500, 0.4)
         
         # Add points for complexity indicators
-        complexity_count = sum(1 for indicator in self.complexity_indicators 
-                             if indicator in user_msg_lower)
+        complexity_count = self._count(terms, self.complexity_indicators)
         score += min(complexity_count * 0.15, 0.3)
         
         # Add points for multiple products/features mentioned
@@ -472,14 +809,12 @@ class ConversationAnalyzer:
         
         return min(1.0, score)
     
-    def _calculate_sentiment_score(self, user_message: str) -> float:
+    def _calculate_sentiment_score(self, user_message: str, terms: Optional[FrozenSet[str]] = None) -> float:
         """Calculate sentiment score (-1.0 to 1.0)"""
-        user_msg_lower = user_message.lower()
+        terms = self._terms(user_message) if terms is None else terms
         
-        positive_count = sum(1 for word in self.positive_sentiment 
-                           if word in user_msg_lower)
-        negative_count = sum(1 for word in self.negative_sentiment 
-                           if word in user_msg_lower)
+        positive_count = self._count(terms, self.positive_sentiment)
+        negative_count = self._count(terms, self.negative_sentiment)
         
         # Calculate net sentiment
         net_sentiment = positive_count - negative_count
@@ -490,7 +825,8 @@ class ConversationAnalyzer:
     
     def _generate_reasoning(self, user_message: str, bot_response: str, 
                           analysis_result: ConversationAnalysisResult, 
-                          entities: Dict[str, Any]) -> str:
+                          entities: Dict[str, Any],
+                          terms: Optional[MessageTerms] = None) -> str:
         """Generate human-readable reasoning for the analysis"""
         
         reasoning_parts = []
@@ -508,9 +844,9 @@ class ConversationAnalyzer:
             reasoning_parts.append("Conversation appears to be informational or educational in nature.")
         
         # Add specific indicators found
-        user_msg_lower = user_message.lower()
+        user_terms = terms.user if terms else self._terms(user_message)
         
-        if any(word in user_msg_lower for word in ["urgent", "critical", "emergency"]):
+        if self._any(user_terms, self.reasoning_urgent_words):
             reasoning_parts.append("Urgent language detected in user message.")
             
         if entities.get("error_codes"):
@@ -524,6 +860,37 @@ class ConversationAnalyzer:
 # Global analyzer instance
 conversation_analyzer = ConversationAnalyzer()
 
+# Analyzer used by batch worker processes, set by the pool initializer
+_batch_analyzer: Optional[ConversationAnalyzer] = None
+
+def _init_batch_worker(analyzer: ConversationAnalyzer) -> None:
+    global _batch_analyzer
+    _batch_analyzer = analyzer
+
+def _analyze_rows(rows: List[Tuple[int, Optional[str], Optional[str]]],
+                  analyzer: Optional[ConversationAnalyzer] = None) -> Tuple[List[ConversationAnalysis], int]:
+    """Analyze (id, user_message, bot_response) rows, returning analyses and the error count"""
+    analyzer = analyzer or _batch_analyzer or conversation_analyzer
+    analyses = []
+    errors = 0
+    for conversation_id, user_message, bot_response in rows:
+        try:
+            analyses.append(analyzer.analyze_messages(conversation_id, user_message, bot_response))
+        except Exception as e:
+            errors += 1
+            logger.error(f"Error analyzing conversation {conversation_id}: {e}")
+    return analyses, errors
+
+def _load_ticket_metadata(raw: Optional[str]) -> Dict[str, Any]:
+    """Parse a ticket's stored metadata, keeping text that is not a JSON object"""
+    if not raw:
+        return {}
+    try:
+        metadata = json.loads(raw)
+    except ValueError:
+        metadata = None
+    return metadata if isinstance(metadata, dict) else {"previous_metadata": raw}
+
 # Utility functions
 def analyze_conversation_for_ticket(conversation_id: int) -> ConversationAnalysis:
     """Analyze a conversation to determine if it needs a ticket"""
@@ -540,4 +907,9 @@ def should_create_ticket_from_conversation(conversation_id: int, threshold: floa
 def get_ticket_metadata_from_conversation(conversation_id: int) -> Optional[TicketMetadata]:
     """Get ticket metadata for a conversation"""
     analysis = analyze_conversation_for_ticket(conversation_id)
-    return analysis.ticket_metadata
\ No newline at end of file
+    return analysis.ticket_metadata
+
+def analyze_conversations_batch(conversations: Union[Iterable[int], Query, None] = None,
+                                **kwargs) -> BatchAnalysisSummary:
+    """Analyze conversations in bulk and re-triage their linked open tickets"""
+    return conversation_analyzer.analyze_conversations(conversations, **kwargs)
\ No newline at end of file
@@ -62,6 +62,9 @@ class DataSyncIntegration:
             # Register custom event handlers
             self._register_custom_event_handlers()
             
+            # Start draining the sync event outbox
+            event_sync_manager.start_dispatcher()
+            
             self.is_initialized = True
             logger.info("Data synchronization integration initialized successfully")
             
@@ -77,7 +80,8 @@ class DataSyncIntegration:
         logger.info("Shutting down data synchronization integration")
         
         try:
-            # Stop the data sync service
+            # Stop the outbox dispatcher and the data sync service
+            await event_sync_manager.stop_dispatcher()
             await stop_data_sync_service()
             
             self.is_initialized = False
@@ -148,11 +152,14 @@ async def shutdown_data_sync():
 async def get_sync_status():
     """Get current synchronization service status"""
     try:
+        service_stats = data_sync_service.get_stats()
         status = {
-            "service_running": data_sync_service.is_running,
+            "service_running": service_stats["service_running"],
             "initialized": data_sync_integration.is_initialized,
-            "background_tasks": len(data_sync_service.background_tasks),
-            "queued_events": len(data_sync_service.sync_events),
+            "background_tasks": service_stats["background_tasks"],
+            "queued_events": service_stats["processor"]["queue_depth"],
+            "event_processor": service_stats["processor"],
+            "outbox_events": event_sync_manager.dispatcher.get_stats() if event_sync_manager.dispatcher else {},
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
         
@@ -368,7 +375,7 @@ async def get_recent_sync_events(limit: int = 50):
     """Get recent synchronization events"""
     try:
         # Get recent events from the service
-        recent_events = data_sync_service.sync_events[-limit:] if data_sync_service.sync_events else []
+        recent_events = list(data_sync_service.sync_events)[-limit:] if data_sync_service.sync_events else []
         
         events_data = []
         for event in recent_events:
@@ -402,8 +409,11 @@ async def sync_health_monitor():
                 logger.warning("Data sync service is not running")
             
             # Check for excessive queued events
-            if len(data_sync_service.sync_events) > 1000:
-                logger.warning(f"High number of queued sync events: {len(data_sync_service.sync_events)}")
+            processor_stats = data_sync_service.processor.get_stats()
+            if processor_stats["queue_depth"] > 1000:
+                logger.warning(f"High number of queued sync events: {processor_stats['queue_depth']}")
+            if processor_stats["oldest_pending_age_seconds"] > 60:
+                logger.warning(f"Sync event lag is {processor_stats['oldest_pending_age_seconds']}s")
             
             # Check background task health
             active_tasks = [task for task in data_sync_service.background_tasks if not task.done()]
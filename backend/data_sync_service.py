@@ -9,16 +9,21 @@ Requirements: 2.1, 2.2, 2.3, 2.4
 
 import asyncio
 import logging
+import threading
+import time
+import zlib
+from collections import deque
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Deque, Callable, Awaitable
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, text
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
 import json
 import hashlib
 
 from backend.database import SessionLocal, get_db
+from backend.ticket_similarity import SimilarTicket, get_ticket_index, open_tickets_for
 from backend.unified_models import (
     UnifiedUser, UnifiedTicket, UnifiedChatHistory, UnifiedTicketComment,
     UnifiedTicketActivity, TicketStatus, TicketPriority, TicketCategory
@@ -81,16 +86,249 @@ class ConsistencyCheckResult:
         if self.errors is None:
             self.errors = []
 
+class _SyncLane:
+    """Pending events for one partition of the entity space"""
+    
+    def __init__(self, index: int):
+        self.index = index
+        self.pending: Deque[Tuple[float, SyncEvent]] = deque()
+        # Events that arrived while pending was full, moved back in order
+        self.overflow: Deque[Tuple[float, SyncEvent]] = deque()
+        self.wakeup: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+
+class PartitionedSyncProcessor:
+    """
+    Processes sync events on N concurrent lanes.
+    
+    Events are routed to a lane by a stable hash of their entity, so events for
+    one entity are always handled by the same lane in submission order while
+    different lanes run concurrently. Each lane waits a short coalescing window
+    to collect a burst, collapses consecutive events of the same type for the
+    same entity into one, and hands the batch to the handler so it can be
+    committed in a single transaction.
+    
+    A lane holds at most max_queue_size / num_lanes events. Events arriving
+    while it is full are deferred to the lane's overflow queue and moved back
+    in order as the lane drains, so none are lost and per-entity order holds.
+    """
+    
+    def __init__(self, handler: Callable[[List[SyncEvent]], Awaitable[int]], num_lanes: int = 4,
+                 batch_size: int = 50, coalesce_window: float = 0.05, max_queue_size: int = 10000,
+                 poll_interval: float = 5.0):
+        self.handler = handler
+        self.num_lanes = max(1, num_lanes)
+        self.batch_size = batch_size
+        self.coalesce_window = coalesce_window
+        self.max_queue_size = max_queue_size
+        self.poll_interval = poll_interval
+        self.lanes = [_SyncLane(i) for i in range(self.num_lanes)]
+        self.is_running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._counters = {
+            "submitted": 0, "processed": 0, "coalesced": 0,
+            "failed": 0, "deferred": 0, "batches": 0
+        }
+        self._max_lag = 0.0
+        self._last_lag = 0.0
+    
+    def lane_for(self, event: SyncEvent) -> int:
+        """Stable lane index for the event's entity"""
+        key = f"{event.entity_type}:{event.entity_id}".encode("utf-8")
+        return zlib.crc32(key) % self.num_lanes
+    
+    @property
+    def lane_limit(self) -> int:
+        return max(1, self.max_queue_size // self.num_lanes)
+    
+    def submit(self, event: SyncEvent) -> bool:
+        """
+        Queue an event; safe to call from any thread.
+        
+        Returns False when the lane is full and the event was deferred to its
+        overflow queue, to be processed once the lane has room.
+        """
+        lane = self.lanes[self.lane_for(event)]
+        accepted = True
+        with self._lock:
+            # Once events are deferred, later ones queue behind them
+            if lane.overflow or len(lane.pending) >= self.lane_limit:
+                lane.overflow.append((time.monotonic(), event))
+                self._counters["deferred"] += 1
+                accepted = False
+                if len(lane.overflow) == 1:
+                    logger.warning(f"Sync lane {lane.index} full, deferring events to its overflow queue")
+            else:
+                lane.pending.append((time.monotonic(), event))
+            self._counters["submitted"] += 1
+        self._wake(lane)
+        return accepted
+    
+    def _wake(self, lane: _SyncLane):
+        if self._loop is None or lane.wakeup is None or self._loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            lane.wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(lane.wakeup.set)
+    
+    def _take(self, lane: _SyncLane) -> List[Tuple[float, SyncEvent]]:
+        with self._lock:
+            count = min(self.batch_size, len(lane.pending))
+            items = [lane.pending.popleft() for _ in range(count)]
+            while lane.overflow and len(lane.pending) < self.lane_limit:
+                lane.pending.append(lane.overflow.popleft())
+            return items
+    
+    def coalesce(self, items: List[Tuple[float, SyncEvent]]) -> List[Tuple[float, SyncEvent]]:
+        """
+        Collapse consecutive same-type events per entity, keeping the latest.
+        
+        The merged event keeps the earliest enqueue time (for lag) and the
+        union of the event data, later values winning. Only runs within one
+        entity's sequence are merged, so per-entity order is unchanged.
+        """
+        result: List[Tuple[float, SyncEvent]] = []
+        last_index: Dict[Tuple[str, int], int] = {}
+        for enqueued_at, event in items:
+            entity = (event.entity_type, event.entity_id)
+            index = last_index.get(entity)
+            if index is not None and result[index][1].event_type == event.event_type:
+                first_enqueued, previous = result[index]
+                merged = replace(event, data={**(previous.data or {}), **(event.data or {})})
+                # Move the merged event to this position: anything between the
+                # two belongs to other entities, so relative order is preserved
+                result[index] = None
+                result.append((first_enqueued, merged))
+                last_index[entity] = len(result) - 1
+                self._counters["coalesced"] += 1
+                continue
+            result.append((enqueued_at, event))
+            last_index[entity] = len(result) - 1
+        return [item for item in result if item is not None]
+    
+    async def drain(self):
+        """Process everything currently queued on all lanes"""
+        await asyncio.gather(*(self._drain_lane(lane) for lane in self.lanes))
+    
+    async def _drain_lane(self, lane: _SyncLane):
+        while lane.pending:
+            await self._process_lane_batch(lane)
+    
+    async def _process_lane_batch(self, lane: _SyncLane):
+        items = self.coalesce(self._take(lane))
+        if not items:
+            return
+        now = time.monotonic()
+        lag = max(now - enqueued_at for enqueued_at, _ in items)
+        events = [event for _, event in items]
+        try:
+            failed = await self.handler(events) or 0
+        except Exception as e:
+            logger.error(f"Error processing sync batch on lane {lane.index}: {e}")
+            failed = len(events)
+        with self._lock:
+            self._counters["batches"] += 1
+            self._counters["processed"] += len(events) - failed
+            self._counters["failed"] += failed
+            self._last_lag = lag
+            self._max_lag = max(self._max_lag, lag)
+    
+    async def _run_lane(self, lane: _SyncLane):
+        while self.is_running:
+            try:
+                if not lane.pending:
+                    lane.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(lane.wakeup.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        continue
+                if self.coalesce_window:
+                    # Let a burst accumulate so it can be coalesced and batched
+                    await asyncio.sleep(self.coalesce_window)
+                await self._process_lane_batch(lane)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in sync lane {lane.index}: {e}")
+                await asyncio.sleep(self.poll_interval)
+    
+    def start(self) -> List[asyncio.Task]:
+        """Start one task per lane in the running event loop"""
+        if self.is_running:
+            return [lane.task for lane in self.lanes]
+        self._loop = asyncio.get_running_loop()
+        self.is_running = True
+        for lane in self.lanes:
+            lane.wakeup = asyncio.Event()
+            lane.task = asyncio.create_task(self._run_lane(lane))
+        return [lane.task for lane in self.lanes]
+    
+    async def stop(self, drain: bool = True):
+        """Stop the lanes, optionally processing what is still queued"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        tasks = [lane.task for lane in self.lanes if lane.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for lane in self.lanes:
+            lane.task = None
+        if drain:
+            await self.drain()
+    
+    def queue_depth(self) -> int:
+        """Total number of events waiting on all lanes, deferred ones included"""
+        return sum(len(lane.pending) + len(lane.overflow) for lane in self.lanes)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, lag and throughput counters"""
+        now = time.monotonic()
+        with self._lock:
+            lane_depths = [len(lane.pending) for lane in self.lanes]
+            overflow_depth = sum(len(lane.overflow) for lane in self.lanes)
+            oldest = [lane.pending[0][0] for lane in self.lanes if lane.pending]
+            stats = dict(self._counters)
+            stats.update({
+                "lanes": self.num_lanes,
+                "running": self.is_running,
+                "queue_depth": sum(lane_depths) + overflow_depth,
+                "lane_depths": lane_depths,
+                "overflow_depth": overflow_depth,
+                "oldest_pending_age_seconds": round(now - min(oldest), 3) if oldest else 0.0,
+                "last_batch_lag_seconds": round(self._last_lag, 3),
+                "max_lag_seconds": round(self._max_lag, 3),
+            })
+        return stats
+
 class DataSyncService:
     """
     Main data synchronization service that handles real-time sync between
     AI agent conversations and support tickets.
     """
     
-    def __init__(self):
-        self.sync_events: List[SyncEvent] = []
+    RECENT_EVENTS_LIMIT = 1000
+    DUPLICATE_TICKET_THRESHOLD = 0.8
+    
+    def __init__(self, num_lanes: int = 4, batch_size: int = 50,
+                 coalesce_window: float = 0.05, max_queue_size: int = 10000):
+        # Recent events for monitoring; processing happens on the lanes
+        self.sync_events: Deque[SyncEvent] = deque(maxlen=self.RECENT_EVENTS_LIMIT)
         self.background_tasks: List[asyncio.Task] = []
         self.is_running = False
+        self.processor = PartitionedSyncProcessor(
+            self._process_sync_batch,
+            num_lanes=num_lanes,
+            batch_size=batch_size,
+            coalesce_window=coalesce_window,
+            max_queue_size=max_queue_size
+        )
         
     async def start_service(self):
         """Start the data synchronization service"""
@@ -104,9 +342,8 @@ class DataSyncService:
         # Start background tasks
         self.background_tasks = [
             asyncio.create_task(self._consistency_check_task()),
-            asyncio.create_task(self._sync_event_processor()),
             asyncio.create_task(self._cleanup_old_events())
-        ]
+        ] + self.processor.start()
         
         logger.info("Data synchronization service started successfully")
     
@@ -118,6 +355,9 @@ class DataSyncService:
         self.is_running = False
         logger.info("Stopping data synchronization service")
         
+        # Stop the lanes, flushing queued events
+        await self.processor.stop(drain=True)
+        
         # Cancel background tasks
         for task in self.background_tasks:
             task.cancel()
@@ -204,10 +444,13 @@ class DataSyncService:
                 message=f"Error syncing conversation: {str(e)}"
             )
     
-    def create_ticket_from_conversation(self, conversation_id: int) -> SyncResult:
+    def create_ticket_from_conversation(self, conversation_id: int, check_duplicates: bool = True) -> SyncResult:
         """
         Create a support ticket from an AI agent conversation
         Requirement: 2.2 - Support tickets created in either system visible in both
+        
+        If the same customer already has an open ticket that is a near-duplicate,
+        the conversation is linked to it instead of creating another ticket.
         """
         try:
             with SessionLocal() as db:
@@ -236,6 +479,11 @@ class DataSyncService:
                 if conversation.tools_used:
                     description += f"\n\nTools Used: {', '.join(conversation.tools_used)}"
                 
+                if check_duplicates and conversation.user_id is not None:
+                    duplicate = self._find_duplicate_ticket(db, conversation.user_id, f"{title} {description}")
+                    if duplicate:
+                        return self._link_conversation_to_duplicate(db, conversation, duplicate)
+                
                 # Create the ticket
                 ticket = UnifiedTicket(
                     title=title,
@@ -294,6 +542,59 @@ class DataSyncService:
                 message=f"Error creating ticket: {str(e)}"
             )
     
+    def _find_duplicate_ticket(self, db: Session, customer_id: int, text: str) -> Optional[SimilarTicket]:
+        """Best open ticket of the customer similar enough to count as a duplicate"""
+        try:
+            ticket_index = get_ticket_index(UnifiedTicket)
+            # A few candidates, in case the best were deleted by another worker
+            matches = ticket_index.resolve(db, ticket_index.find_duplicates(
+                db, text,
+                threshold=self.DUPLICATE_TICKET_THRESHOLD,
+                limit=3,
+                where=open_tickets_for(customer_id)
+            ))
+        except Exception as e:
+            logger.error(f"Duplicate ticket check failed: {e}")
+            return None
+        return matches[0] if matches else None
+    
+    def _link_conversation_to_duplicate(self, db: Session, conversation: UnifiedChatHistory,
+                                        duplicate: SimilarTicket) -> SyncResult:
+        """Attach a conversation to an existing ticket instead of creating a new one"""
+        conversation.ticket_id = duplicate.ticket_id
+        db.add(UnifiedTicketActivity(
+            ticket_id=duplicate.ticket_id,
+            activity_type="conversation_linked",
+            description=f"AI conversation {conversation.id} linked as a likely duplicate "
+                        f"(similarity {duplicate.score:.2f})",
+            performed_by_id=conversation.user_id,
+            created_at=datetime.now(timezone.utc)
+        ))
+        db.commit()
+        
+        self._queue_sync_event(SyncEvent(
+            event_type=SyncEventType.CONVERSATION_TO_TICKET,
+            entity_id=duplicate.ticket_id,
+            entity_type="ticket",
+            timestamp=datetime.now(timezone.utc),
+            data={
+                "conversation_id": conversation.id,
+                "ticket_id": duplicate.ticket_id,
+                "action": "linked_duplicate",
+                "similarity": duplicate.score
+            },
+            user_id=conversation.user_id,
+            session_id=conversation.session_id
+        ))
+        
+        return SyncResult(
+            success=True,
+            message=f"Conversation {conversation.id} linked to existing ticket {duplicate.ticket_id}",
+            entity_id=duplicate.ticket_id,
+            conflicts_detected=[f"duplicate_of_ticket_{duplicate.ticket_id}"],
+            actions_taken=["duplicate_detected", "conversation_linked", "activity_recorded"]
+        )
+    
     def sync_user_data(self, user_id: int) -> SyncResult:
         """
         Synchronize user data across systems
@@ -634,52 +935,72 @@ class DataSyncService:
     def _queue_sync_event(self, event: SyncEvent):
         """Queue a synchronization event for processing"""
         self.sync_events.append(event)
+        self.processor.submit(event)
         logger.debug(f"Queued sync event: {event.event_type.value} for {event.entity_type} {event.entity_id}")
     
-    async def _sync_event_processor(self):
-        """Background task to process synchronization events"""
-        while self.is_running:
+    def get_stats(self) -> Dict[str, Any]:
+        """Service status with event processor queue depth and lag"""
+        return {
+            "service_running": self.is_running,
+            "background_tasks": len(self.background_tasks),
+            "recent_events": len(self.sync_events),
+            "processor": self.processor.get_stats()
+        }
+    
+    async def _process_sync_batch(self, events: List[SyncEvent]) -> int:
+        """Process a lane batch off the event loop; returns the number of failures"""
+        return await asyncio.to_thread(self._apply_sync_batch, events)
+    
+    def _apply_sync_batch(self, events: List[SyncEvent]) -> int:
+        """
+        Apply a batch of events in one transaction.
+        
+        If the batch fails it is rolled back and retried one event per
+        transaction, so a single bad event does not sink the others.
+        """
+        try:
+            with SessionLocal() as db:
+                for event in events:
+                    self._apply_sync_event(db, event)
+                db.commit()
+            return 0
+        except Exception as e:
+            logger.warning(f"Sync batch of {len(events)} events failed, retrying individually: {e}")
+        
+        failed = 0
+        for event in events:
             try:
-                if self.sync_events:
-                    # Process events in batches
-                    batch_size = 10
-                    events_to_process = self.sync_events[:batch_size]
-                    self.sync_events = self.sync_events[batch_size:]
-                    
-                    for event in events_to_process:
-                        await self._process_sync_event(event)
-                
-                # Wait before next processing cycle
-                await asyncio.sleep(5)  # Process every 5 seconds
-                
+                with SessionLocal() as db:
+                    self._apply_sync_event(db, event)
+                    db.commit()
             except Exception as e:
-                logger.error(f"Error in sync event processor: {e}")
-                await asyncio.sleep(10)  # Wait longer on error
+                failed += 1
+                logger.error(f"Error processing sync event {event.event_type.value}: {e}")
+        return failed
+    
+    def _apply_sync_event(self, db: Session, event: SyncEvent):
+        """Apply one synchronization event inside the batch session"""
+        logger.debug(f"Processing sync event: {event.event_type.value}")
+        
+        # You could create a sync_events table to log all events
+        # For now, we'll just log to application logs
+        logger.info(f"Sync event processed: {event.event_type.value} for {event.entity_type} {event.entity_id}")
+        
+        # Perform any additional sync operations based on event type
+        if event.event_type == SyncEventType.CONVERSATION_TO_TICKET:
+            # Additional processing for conversation-to-ticket sync
+            pass
+        elif event.event_type == SyncEventType.TICKET_STATUS_CHANGE:
+            # Additional processing for ticket status changes
+            pass
+        elif event.event_type == SyncEventType.USER_DATA_UPDATE:
+            # Additional processing for user data updates
+            pass
     
     async def _process_sync_event(self, event: SyncEvent):
         """Process a single synchronization event"""
-        try:
-            logger.debug(f"Processing sync event: {event.event_type.value}")
-            
-            # Log the event for audit purposes
-            with SessionLocal() as db:
-                # You could create a sync_events table to log all events
-                # For now, we'll just log to application logs
-                logger.info(f"Sync event processed: {event.event_type.value} for {event.entity_type} {event.entity_id}")
-                
-                # Perform any additional sync operations based on event type
-                if event.event_type == SyncEventType.CONVERSATION_TO_TICKET:
-                    # Additional processing for conversation-to-ticket sync
-                    pass
-                elif event.event_type == SyncEventType.TICKET_STATUS_CHANGE:
-                    # Additional processing for ticket status changes
-                    pass
-                elif event.event_type == SyncEventType.USER_DATA_UPDATE:
-                    # Additional processing for user data updates
-                    pass
-                
-        except Exception as e:
-            logger.error(f"Error processing sync event {event.event_type.value}: {e}")
+        failed = await self._process_sync_batch([event])
+        return failed == 0
     
     async def _consistency_check_task(self):
         """Background task for periodic consistency checks"""
@@ -709,10 +1030,10 @@ class DataSyncService:
                 cutoff_time = datetime.now(timezone.utc) - timedelta(hours=24)
                 
                 # Remove old events from memory
-                self.sync_events = [
-                    event for event in self.sync_events 
-                    if event.timestamp > cutoff_time
-                ]
+                self.sync_events = deque(
+                    (event for event in self.sync_events if event.timestamp > cutoff_time),
+                    maxlen=self.RECENT_EVENTS_LIMIT
+                )
                 
                 logger.debug(f"Cleaned up old sync events, {len(self.sync_events)} remaining")
                 
@@ -739,9 +1060,9 @@ def sync_conversation_to_ticket(conversation_id: int, ticket_id: Optional[int] =
     """Sync AI conversation to support ticket"""
     return data_sync_service.sync_ai_conversation_to_ticket(conversation_id, ticket_id)
 
-def create_ticket_from_conversation(conversation_id: int) -> SyncResult:
+def create_ticket_from_conversation(conversation_id: int, check_duplicates: bool = True) -> SyncResult:
     """Create support ticket from AI conversation"""
-    return data_sync_service.create_ticket_from_conversation(conversation_id)
+    return data_sync_service.create_ticket_from_conversation(conversation_id, check_duplicates)
 
 def sync_user_data(user_id: int) -> SyncResult:
     """Sync user data across systems"""
@@ -5,7 +5,6 @@ from sqlalchemy.exc import (
     DatabaseError, TimeoutError, InvalidRequestError,
     IntegrityError, DataError, ProgrammingError
 )
-from sqlalchemy.pool import QueuePool
 import os
 import time
 import logging
@@ -34,6 +33,8 @@ from .database_logging import (
     log_performance_metrics, log_health_check, DatabaseOperationLogger
 )
 
+from .engine_registry import engine_registry, SESSION_OPTIONS, POOL_OLTP, POOL_ANALYTICS, POOL_BACKGROUND
+
 class PostgreSQLErrorHandler:
     """PostgreSQL-specific error handling with categorization and retry logic"""
     
@@ -203,14 +204,12 @@ def create_database_engine(database_url: str = None, max_retries: int = 3) -> Op
                     "options": "-c timezone=UTC"
                 }
                 
-                # Production-ready connection pooling parameters
+                # Pool sized from the per-process connection budget of the
+                # engine registry, which also times checkout waits
+                engine_kwargs.update(engine_registry.engine_options(POOL_OLTP))
                 engine_kwargs.update({
-                    "pool_size": db_params.get('pool_size', 20),
-                    "max_overflow": db_params.get('max_overflow', 30),
-                    "pool_pre_ping": True,  # Enable connection health checks
                     "pool_recycle": db_params.get('pool_recycle', 3600),
                     "pool_timeout": db_params.get('pool_timeout', 30),
-                    "poolclass": QueuePool,
                 })
                 
             elif db_type == "sqlite":
@@ -290,18 +289,16 @@ def health_check_database(engine) -> bool:
         return False
 
 # Create engine with optimized configuration
+engine_registry.configure(DATABASE_URL)
 engine = create_database_engine(DATABASE_URL)
+if engine:
+    engine_registry.register_engine(POOL_OLTP, engine)
 
 # Create session factory with retry logic
 def create_session_factory(engine):
     """Create session factory with proper configuration"""
     if engine:
-        return sessionmaker(
-            autocommit=False, 
-            autoflush=False, 
-            bind=engine,
-            expire_on_commit=False  # Prevent lazy loading issues
-        )
+        return sessionmaker(bind=engine, **SESSION_OPTIONS)
     else:
         # Create a dummy session factory that raises an error when used
         def dummy_session():
@@ -310,6 +307,11 @@ def create_session_factory(engine):
 
 SessionLocal = create_session_factory(engine)
 
+# Session factories for reporting queries and batch jobs; their engines are
+# created on first use and share the OLTP engine on SQLite
+AnalyticsSessionLocal = engine_registry.session_factory(POOL_ANALYTICS)
+BackgroundSessionLocal = engine_registry.session_factory(POOL_BACKGROUND)
+
 # Create base class for models
 Base = declarative_base()
 
@@ -470,6 +472,10 @@ def get_database_info():
                 "checked_in": getattr(engine.pool, 'checkedin', lambda: 'N/A')(),
             })
         
+        # Named pools of the engine registry with checkout wait metrics
+        info["pools"] = engine_registry.get_pool_stats()
+        info["connection_budget"] = engine_registry.get_budget()
+        
         # Test connection
         if health_check_database(engine):
             info["health"] = "healthy"
@@ -5,13 +5,19 @@ Provides comprehensive monitoring, logging, and error handling for PostgreSQL op
 Implements requirements 1.4 and 4.4 from the PostgreSQL migration spec.
 """
 
+import os
+import re
+import sys
+import math
 import time
+import hashlib
 import logging
 import json
 import threading
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Callable
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from collections import defaultdict, deque
 from sqlalchemy import text, event
 from sqlalchemy.engine import Engine
@@ -21,6 +27,157 @@ from .database import engine, PostgreSQLErrorHandler
 
 logger = logging.getLogger(__name__)
 
+# Statements slower than this are captured in the slow-query log
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+# Opt-in EXPLAIN (ANALYZE, BUFFERS) sampling of slow SELECTs on PostgreSQL
+SLOW_QUERY_EXPLAIN = os.getenv("DB_SLOW_QUERY_EXPLAIN", "false").lower() == "true"
+# Minimum seconds between two EXPLAIN samples of the same fingerprint
+EXPLAIN_INTERVAL_SECONDS = 300.0
+# Statement timeout applied to an EXPLAIN sample, which re-runs the query
+EXPLAIN_TIMEOUT_MS = 5000
+
+_COMMENT_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_PATTERN = re.compile(r"(?<![\w$])\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_PLACEHOLDER_PATTERN = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+|(?<![\w?])\?")
+_IN_LIST_PATTERN = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST_PATTERN = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Frames from these path fragments are skipped when resolving a call site
+_CALL_SITE_SKIP = (os.sep + "sqlalchemy" + os.sep, os.sep + "psycopg2" + os.sep, __file__)
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(statement: str) -> str:
+    """Reduce a statement to its shape by replacing literals and placeholders
+
+    Literals, bind placeholders of every paramstyle and repeated IN/VALUES
+    lists collapse to ``?`` so that statements differing only in their
+    values share one fingerprint.
+    """
+    normalized = _COMMENT_PATTERN.sub(" ", statement)
+    normalized = _STRING_PATTERN.sub("?", normalized)
+    normalized = _PLACEHOLDER_PATTERN.sub("?", normalized)
+    normalized = _NUMBER_PATTERN.sub("?", normalized)
+    normalized = _WHITESPACE_PATTERN.sub(" ", normalized).strip()
+    normalized = _IN_LIST_PATTERN.sub("IN (?+)", normalized)
+    normalized = _VALUES_LIST_PATTERN.sub(r"\1, ...", normalized)
+    return normalized
+
+
+def fingerprint_sql(normalized: str) -> str:
+    """Short stable identifier of a normalized statement"""
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def describe_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """Describe the shape of bound parameters without their values"""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else None
+        return {"rows": len(parameters), "row": describe_parameters(first)}
+    if isinstance(parameters, dict):
+        return {str(key): type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    if parameters is None:
+        return None
+    return type(parameters).__name__
+
+
+def find_call_site() -> Optional[str]:
+    """Return the innermost application frame that issued the current query"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not any(fragment in filename for fragment in _CALL_SITE_SKIP) and "<frozen" not in filename:
+            return f"{os.path.relpath(filename)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+class LatencyHistogram:
+    """Fixed-memory histogram with logarithmically spaced buckets
+
+    Bucket bounds grow by ``2 ** (1 / buckets_per_doubling)`` starting at
+    ``min_seconds``, so percentiles carry a bounded relative error whatever
+    the number of recorded values.
+    """
+
+    def __init__(self, min_seconds: float = 0.00001, max_seconds: float = 600.0,
+                 buckets_per_doubling: int = 4):
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.buckets_per_doubling = buckets_per_doubling
+        self.bucket_count = int(math.ceil(math.log2(max_seconds / min_seconds) * buckets_per_doubling)) + 1
+        self.counts = [0] * self.bucket_count
+        self.count = 0
+        self.total = 0.0
+        self.min = 0.0
+        self.max = 0.0
+
+    def _index(self, seconds: float) -> int:
+        if seconds <= self.min_seconds:
+            return 0
+        index = int(math.ceil(math.log2(seconds / self.min_seconds) * self.buckets_per_doubling))
+        return min(index, self.bucket_count - 1)
+
+    def upper_bound(self, index: int) -> float:
+        """Upper latency bound in seconds of a bucket"""
+        return self.min_seconds * 2 ** (index / self.buckets_per_doubling)
+
+    def record(self, seconds: float):
+        """Add one observation"""
+        self.counts[self._index(seconds)] += 1
+        if self.count == 0 or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.count += 1
+        self.total += seconds
+
+    def merge(self, other: "LatencyHistogram"):
+        """Fold another histogram with the same bucket layout into this one"""
+        if other.count == 0:
+            return
+        for index, value in enumerate(other.counts):
+            self.counts[index] += value
+        self.min = other.min if self.count == 0 else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, percentile: float) -> float:
+        """Latency in seconds below which ``percentile`` percent of values fall"""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(math.ceil(self.count * percentile / 100.0)))
+        seen = 0
+        for index, value in enumerate(self.counts):
+            seen += value
+            if seen >= rank:
+                if index == self.bucket_count - 1:
+                    return self.max  # overflow bucket has no upper bound
+                return min(max(self.upper_bound(index), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Counts and latency percentiles in milliseconds"""
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.mean * 1000, 3),
+            "min_ms": round(self.min * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+        }
+
 @dataclass
 class DatabaseMetrics:
     """Database performance and health metrics"""
@@ -49,13 +206,53 @@ class ErrorMetrics:
     resolved: bool
     duration: float
 
+@dataclass
+class QueryStats:
+    """Latency statistics of one statement fingerprint"""
+    fingerprint: str
+    statement: str
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    rows: int = 0
+    last_seen: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        stats = {"fingerprint": self.fingerprint, "statement": self.statement}
+        stats.update(self.histogram.summary())
+        stats["rows"] = self.rows
+        stats["last_seen"] = self.last_seen.isoformat() if self.last_seen else None
+        return stats
+
+@dataclass
+class SlowQuery:
+    """A statement that exceeded the slow-query threshold"""
+    timestamp: datetime
+    fingerprint: str
+    statement: str
+    duration_ms: float
+    parameters: Any
+    call_site: Optional[str]
+    executemany: bool = False
+    explain: Optional[Any] = None
+
 class DatabaseMonitor:
     """Comprehensive database monitoring and metrics collection"""
     
-    def __init__(self, metrics_window_minutes: int = 60):
+    def __init__(self, metrics_window_minutes: int = 60, slow_query_ms: float = None,
+                 max_fingerprints: int = 500, slow_query_log_size: int = 100,
+                 explain_slow_queries: bool = None, bind=None):
         self.metrics_window = timedelta(minutes=metrics_window_minutes)
         self.query_times = deque(maxlen=1000)  # Store last 1000 query times
         self.error_history = deque(maxlen=500)  # Store last 500 errors
+        self.slow_query_seconds = (SLOW_QUERY_MS if slow_query_ms is None else slow_query_ms) / 1000.0
+        self.max_fingerprints = max_fingerprints
+        self.explain_slow_queries = SLOW_QUERY_EXPLAIN if explain_slow_queries is None else explain_slow_queries
+        self.latency = LatencyHistogram()
+        self.query_stats: Dict[str, QueryStats] = {}
+        # Fingerprints beyond max_fingerprints share one catch-all entry
+        self.overflow_stats = QueryStats(fingerprint="other", statement="<other statements>")
+        self.slow_queries = deque(maxlen=slow_query_log_size)
+        self._last_explain: Dict[str, float] = {}
+        self.engine = engine if bind is None else bind
         self.connection_attempts = {"successful": 0, "failed": 0}
         self.query_count = 0
         self.error_count = 0
@@ -67,21 +264,22 @@ class DatabaseMonitor:
     
     def _setup_event_listeners(self):
         """Setup SQLAlchemy event listeners for automatic monitoring"""
-        if not engine:
+        if not self.engine:
             logger.warning("Database engine not available, skipping event listener setup")
             return
         
-        @event.listens_for(engine, "before_cursor_execute")
+        @event.listens_for(self.engine, "before_cursor_execute")
         def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-            context._query_start_time = time.time()
+            context._query_start_time = time.perf_counter()
         
-        @event.listens_for(engine, "after_cursor_execute")
+        @event.listens_for(self.engine, "after_cursor_execute")
         def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
             if hasattr(context, '_query_start_time'):
-                query_time = time.time() - context._query_start_time
-                self.record_query_time(query_time)
+                query_time = time.perf_counter() - context._query_start_time
+                self.record_query(statement, query_time, parameters, executemany,
+                                  rowcount=getattr(cursor, "rowcount", -1))
         
-        @event.listens_for(engine, "handle_error")
+        @event.listens_for(self.engine, "handle_error")
         def handle_error(exception_context):
             self.record_error(
                 error=exception_context.original_exception,
@@ -94,6 +292,133 @@ class DatabaseMonitor:
         with self._lock:
             self.query_times.append((datetime.now(), query_time))
             self.query_count += 1
+            self.latency.record(query_time)
+    
+    def record_query(self, statement: str, query_time: float, parameters: Any = None,
+                     executemany: bool = False, rowcount: int = -1):
+        """Record a statement execution against its fingerprint histogram"""
+        normalized = normalize_sql(statement)
+        fingerprint = fingerprint_sql(normalized)
+        slow = query_time >= self.slow_query_seconds
+        call_site = find_call_site() if slow else None
+        now = datetime.now()
+        
+        with self._lock:
+            self.query_times.append((now, query_time))
+            self.query_count += 1
+            self.latency.record(query_time)
+            
+            stats = self.query_stats.get(fingerprint)
+            if stats is None:
+                if len(self.query_stats) < self.max_fingerprints:
+                    stats = QueryStats(fingerprint=fingerprint, statement=normalized[:2000])
+                    self.query_stats[fingerprint] = stats
+                else:
+                    stats = self.overflow_stats
+            stats.histogram.record(query_time)
+            stats.last_seen = now
+            if rowcount and rowcount > 0:
+                stats.rows += rowcount
+            
+            if not slow:
+                return
+            slow_query = SlowQuery(
+                timestamp=now,
+                fingerprint=fingerprint,
+                statement=normalized[:2000],
+                duration_ms=round(query_time * 1000, 3),
+                parameters=describe_parameters(parameters, executemany),
+                call_site=call_site,
+                executemany=executemany,
+            )
+            self.slow_queries.append(slow_query)
+            explain = self._should_explain(fingerprint, statement, executemany)
+        
+        logger.warning(f"Slow query ({slow_query.duration_ms} ms) at {call_site}: {slow_query.statement[:200]}")
+        if explain:
+            threading.Thread(
+                target=self._capture_explain, args=(slow_query, statement, parameters),
+                name="slow-query-explain", daemon=True
+            ).start()
+    
+    def _should_explain(self, fingerprint: str, statement: str, executemany: bool) -> bool:
+        """Whether a slow statement gets an EXPLAIN sample; call with the lock held"""
+        if not self.explain_slow_queries or executemany or not self.engine:
+            return False
+        if self.engine.dialect.name != "postgresql":
+            return False
+        # EXPLAIN ANALYZE executes the statement, so only plain reads are sampled
+        if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return False
+        now = time.monotonic()
+        last = self._last_explain.get(fingerprint)
+        if last is not None and now - last < EXPLAIN_INTERVAL_SECONDS:
+            return False
+        self._last_explain[fingerprint] = now
+        return True
+    
+    def _capture_explain(self, slow_query: SlowQuery, statement: str, parameters: Any):
+        """Attach an EXPLAIN (ANALYZE, BUFFERS) plan to a slow-query entry
+
+        Runs on a raw DBAPI connection so the sample bypasses the cursor
+        hooks, under a statement timeout and inside a rolled back
+        transaction.
+        """
+        try:
+            raw_connection = self.engine.raw_connection()
+        except Exception as e:
+            logger.debug(f"EXPLAIN sample skipped, no connection: {e}")
+            return
+        try:
+            cursor = raw_connection.cursor()
+            cursor.execute(f"SET LOCAL statement_timeout = {int(EXPLAIN_TIMEOUT_MS)}")
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters or None)
+            plan = cursor.fetchone()[0]
+            cursor.close()
+            with self._lock:
+                slow_query.explain = plan
+        except Exception as e:
+            logger.debug(f"EXPLAIN sample failed for {slow_query.fingerprint}: {e}")
+        finally:
+            try:
+                raw_connection.rollback()
+            finally:
+                raw_connection.close()
+    
+    def get_query_stats(self, limit: int = 20, order_by: str = "total_ms") -> Dict[str, Any]:
+        """Latency summary overall and for the hottest statement fingerprints"""
+        with self._lock:
+            statements = [stats.to_dict() for stats in self.query_stats.values()]
+            if self.overflow_stats.histogram.count:
+                statements.append(self.overflow_stats.to_dict())
+            overall = self.latency.summary()
+            tracked = len(self.query_stats)
+        
+        statements.sort(key=lambda stats: stats.get(order_by, 0), reverse=True)
+        return {
+            "overall": overall,
+            "tracked_fingerprints": tracked,
+            "max_fingerprints": self.max_fingerprints,
+            "statements": statements[:limit],
+        }
+    
+    def get_slow_queries(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent slow queries, newest first"""
+        with self._lock:
+            recent = list(self.slow_queries)[-limit:] if limit else []
+            entries = [asdict(slow_query) for slow_query in reversed(recent)]
+        for entry in entries:
+            entry["timestamp"] = entry["timestamp"].isoformat()
+        return entries
+    
+    def reset_query_stats(self):
+        """Drop all per-statement statistics and the slow-query log"""
+        with self._lock:
+            self.latency = LatencyHistogram()
+            self.query_stats.clear()
+            self.overflow_stats = QueryStats(fingerprint="other", statement="<other statements>")
+            self.slow_queries.clear()
+            self._last_explain.clear()
     
     def record_error(self, error: Exception, operation: str, statement: str = None, retry_count: int = 0):
         """Record database error with categorization"""
@@ -176,11 +501,11 @@ class DatabaseMonitor:
     
     def _get_pool_info(self) -> Dict[str, Any]:
         """Get connection pool information"""
-        if not engine or not hasattr(engine, 'pool'):
+        if not self.engine or not hasattr(self.engine, 'pool'):
             return {}
         
         try:
-            pool = engine.pool
+            pool = self.engine.pool
             return {
                 "pool_size": getattr(pool, 'size', lambda: 0)(),
                 "checked_out": getattr(pool, 'checkedout', lambda: 0)(),
@@ -309,6 +634,14 @@ def get_error_summary(hours: int = 24) -> Dict[str, Any]:
     """Get database error summary"""
     return database_monitor.get_error_summary(hours)
 
+def get_query_stats(limit: int = 20, order_by: str = "total_ms") -> Dict[str, Any]:
+    """Get per-statement latency statistics"""
+    return database_monitor.get_query_stats(limit, order_by)
+
+def get_slow_queries(limit: int = 20) -> List[Dict[str, Any]]:
+    """Get the most recent slow queries"""
+    return database_monitor.get_slow_queries(limit)
+
 def log_database_operation(operation: str):
     """Decorator to log database operations"""
     def decorator(func: Callable) -> Callable:
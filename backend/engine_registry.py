@@ -0,0 +1,454 @@
+"""
+Engine Registry
+
+One place that owns the SQLAlchemy engines of a process, so that the chat
+backend, the intelligent chat subsystem, background jobs and migration tools
+share connection pools instead of each opening their own.
+
+Engines are grouped into named pools:
+- oltp: request handling, short transactions
+- analytics: reporting and export queries that may hold a connection longer
+- background: outbox dispatch, re-triage, migrations and other batch jobs
+
+Pool sizes are derived from a per-process connection budget, so the sum over
+all worker processes stays below the server's connection limit:
+
+    per_process = (DB_MAX_CONNECTIONS - DB_RESERVED_CONNECTIONS) / DB_WORKERS
+
+DB_WORKERS falls back to WEB_CONCURRENCY. Explicit DB_POOL_SIZE and
+DB_MAX_OVERFLOW still size the OLTP pool. SQLite databases have no server
+connection limit, so every pool shares the OLTP engine there.
+
+Each pool records checkouts, checkout wait time, hold time and timeouts.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+POOL_OLTP = "oltp"
+POOL_ANALYTICS = "analytics"
+POOL_BACKGROUND = "background"
+
+# Options of every session factory, so pool sessions behave like SessionLocal's
+SESSION_OPTIONS = {
+    "autocommit": False,
+    "autoflush": False,
+    "expire_on_commit": False  # Prevent lazy loading issues
+}
+
+# Upper bounds of the checkout wait histogram, in seconds
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+@dataclass(frozen=True)
+class PoolSpec:
+    """Share of the connection budget and timeouts of a named pool"""
+    name: str
+    share: float
+    pool_timeout: int
+    pool_recycle: int = 3600
+
+
+@dataclass(frozen=True)
+class PoolSize:
+    """Steady and burst connections of a pool"""
+    pool_size: int
+    max_overflow: int
+
+    @property
+    def total(self) -> int:
+        return self.pool_size + self.max_overflow
+
+
+DEFAULT_POOL_SPECS = (
+    PoolSpec(POOL_OLTP, share=0.6, pool_timeout=30),
+    PoolSpec(POOL_ANALYTICS, share=0.25, pool_timeout=60),
+    PoolSpec(POOL_BACKGROUND, share=0.15, pool_timeout=120),
+)
+
+
+def _env_int(*names: str, default: int) -> int:
+    for name in names:
+        value = os.getenv(name)
+        if value:
+            try:
+                return int(value)
+            except ValueError:
+                logger.warning(f"Ignoring non-integer {name}={value!r}")
+    return default
+
+
+def plan_pool_sizes(max_connections: int, workers: int, reserved: int = 0,
+                    specs=DEFAULT_POOL_SPECS) -> Dict[str, PoolSize]:
+    """
+    Split the per-process connection budget between the named pools.
+
+    About two thirds of each pool's share is kept open and the rest is
+    overflow, opened under load and closed again when returned.
+    """
+    budget = max(1, (max_connections - reserved) // max(1, workers))
+    sizes = {}
+    for spec in specs:
+        total = max(2, int(budget * spec.share))
+        pool_size = max(1, round(total * 2 / 3))
+        sizes[spec.name] = PoolSize(pool_size=pool_size, max_overflow=total - pool_size)
+
+    planned = sum(size.total for size in sizes.values())
+    if planned > budget:
+        logger.warning(
+            f"Pools need {planned} connections per process but the budget is {budget} "
+            f"({max_connections} max, {reserved} reserved, {workers} workers)"
+        )
+    return sizes
+
+
+class PoolMetrics:
+    """Checkout counters and wait/hold timings of one pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self.hold_total = 0.0
+        self.hold_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            for index, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[index] += 1
+                    break
+            else:
+                self.wait_buckets[-1] += 1
+
+    def record_timeout(self, seconds: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+        self.record_wait(seconds)
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def record_checkin(self, held_seconds: Optional[float]) -> None:
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(0, self.checked_out - 1)
+            if held_seconds is not None:
+                self.hold_total += held_seconds
+                self.hold_max = max(self.hold_max, held_seconds)
+
+    def wait_percentile(self, percentile: float) -> Optional[float]:
+        """Upper bound of the wait bucket holding the given percentile"""
+        with self._lock:
+            if not self.wait_count:
+                return None
+            rank = percentile / 100.0 * self.wait_count
+            seen = 0
+            for index, count in enumerate(self.wait_buckets):
+                seen += count
+                if seen >= rank:
+                    return WAIT_BUCKETS[index] if index < len(WAIT_BUCKETS) else self.wait_max
+            return self.wait_max
+
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.wait_percentile(95)
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                "wait_p95_ms": round(p95 * 1000, 3) if p95 is not None else None,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "wait_buckets": dict(zip([str(bound) for bound in WAIT_BUCKETS] + ["+Inf"], self.wait_buckets)),
+                "hold_avg_ms": round(self.hold_total / self.checkins * 1000, 3) if self.checkins else 0.0,
+                "hold_max_ms": round(self.hold_max * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long callers wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class LazySessionFactory:
+    """
+    Session factory for a named pool, whose engine is created on first use.
+
+    Modules bind this at import time the same way as a sessionmaker, without
+    opening connections for pools they never use.
+    """
+
+    def __init__(self, registry: "EngineRegistry", pool: str):
+        self.registry = registry
+        self.pool = pool
+        self._factory: Optional[sessionmaker] = None
+        self._lock = threading.Lock()
+
+    def __call__(self, **kwargs) -> Session:
+        if self._factory is None:
+            with self._lock:
+                if self._factory is None:
+                    self._factory = sessionmaker(bind=self.registry.get_engine(self.pool), **SESSION_OPTIONS)
+        return self._factory(**kwargs)
+
+    def reset(self) -> None:
+        self._factory = None
+
+
+class EngineRegistry:
+    """Named engines and session factories shared by every subsystem"""
+
+    def __init__(self, database_url: Optional[str] = None, workers: Optional[int] = None,
+                 max_connections: Optional[int] = None, reserved_connections: Optional[int] = None,
+                 specs=DEFAULT_POOL_SPECS):
+        self.database_url = database_url
+        self.workers = workers or _env_int("DB_WORKERS", "WEB_CONCURRENCY", default=1)
+        self.max_connections = max_connections or _env_int("DB_MAX_CONNECTIONS", default=100)
+        self.reserved_connections = (
+            reserved_connections if reserved_connections is not None
+            else _env_int("DB_RESERVED_CONNECTIONS", default=10)
+        )
+        self.specs = {spec.name: spec for spec in specs}
+        self._sizes = plan_pool_sizes(
+            self.max_connections, self.workers, self.reserved_connections, specs
+        )
+        self._engines: Dict[str, Engine] = {}
+        self._owned: List[str] = []
+        self._metrics: Dict[str, PoolMetrics] = {}
+        # Pool whose metrics each instrumented engine reports to, by engine id
+        self._instrumented: Dict[int, str] = {}
+        self._session_factories: Dict[str, LazySessionFactory] = {}
+        self._lock = threading.RLock()
+
+    def configure(self, database_url: str) -> None:
+        """Set the database URL engines are created for"""
+        self.database_url = database_url
+
+    @property
+    def is_sqlite(self) -> bool:
+        return bool(self.database_url) and self.database_url.startswith("sqlite")
+
+    def pool_size(self, pool: str) -> PoolSize:
+        """Size of a named pool, honouring DB_POOL_SIZE/DB_MAX_OVERFLOW for OLTP"""
+        size = self._sizes[pool]
+        if pool == POOL_OLTP and (os.getenv("DB_POOL_SIZE") or os.getenv("DB_MAX_OVERFLOW")):
+            size = PoolSize(
+                pool_size=_env_int("DB_POOL_SIZE", default=size.pool_size),
+                max_overflow=_env_int("DB_MAX_OVERFLOW", default=size.max_overflow)
+            )
+        return size
+
+    def engine_options(self, pool: str) -> Dict[str, Any]:
+        """create_engine() keyword arguments for a named PostgreSQL pool"""
+        spec = self.specs[pool]
+        size = self.pool_size(pool)
+        return {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": size.pool_size,
+            "max_overflow": size.max_overflow,
+            "pool_timeout": spec.pool_timeout,
+            "pool_recycle": spec.pool_recycle,
+            "pool_pre_ping": True,
+        }
+
+    def metrics(self, pool: str) -> PoolMetrics:
+        with self._lock:
+            if pool not in self._metrics:
+                self._metrics[pool] = PoolMetrics(pool)
+            return self._metrics[pool]
+
+    def register_engine(self, pool: str, engine: Engine) -> Engine:
+        """Adopt an engine created elsewhere, e.g. the OLTP engine of backend.database"""
+        with self._lock:
+            self._engines[pool] = engine
+            self._instrument(pool, engine)
+            factory = self._session_factories.get(pool)
+            if factory is not None:
+                factory.reset()
+        return engine
+
+    def get_engine(self, pool: str = POOL_OLTP) -> Engine:
+        """Engine of a named pool, created on first use"""
+        if pool not in self.specs:
+            raise KeyError(f"Unknown connection pool: {pool}")
+        with self._lock:
+            engine = self._engines.get(pool)
+            if engine is not None:
+                return engine
+            if pool != POOL_OLTP and self.is_sqlite:
+                engine = self.get_engine(POOL_OLTP)
+                self._engines[pool] = engine
+                return engine
+            engine = self._create_engine(pool)
+            self._engines[pool] = engine
+            self._owned.append(pool)
+            self._instrument(pool, engine)
+            return engine
+
+    def session_factory(self, pool: str = POOL_OLTP) -> LazySessionFactory:
+        """Session factory for a named pool"""
+        with self._lock:
+            if pool not in self._session_factories:
+                self._session_factories[pool] = LazySessionFactory(self, pool)
+            return self._session_factories[pool]
+
+    def _create_engine(self, pool: str) -> Engine:
+        if not self.database_url:
+            raise RuntimeError("Database not available - engine registry has no database URL")
+        if self.is_sqlite:
+            return create_engine(self.database_url, connect_args={"check_same_thread": False})
+        options = self.engine_options(pool)
+        options["connect_args"] = {
+            "connect_timeout": _env_int("DB_CONNECT_TIMEOUT", default=10),
+            "application_name": f"ai_agent_{pool}",
+            "options": "-c timezone=UTC"
+        }
+        logger.info(
+            f"Creating {pool} connection pool "
+            f"(pool_size={options['pool_size']}, max_overflow={options['max_overflow']})"
+        )
+        return create_engine(self.database_url, **options)
+
+    def _instrument(self, pool: str, engine: Engine) -> None:
+        if id(engine) in self._instrumented:
+            return
+        self._instrumented[id(engine)] = pool
+        metrics = self.metrics(pool)
+        if isinstance(engine.pool, InstrumentedQueuePool):
+            engine.pool.metrics = metrics
+
+        def on_connect(dbapi_connection, connection_record):
+            metrics.record_connect()
+
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            connection_record.info["checked_out_at"] = time.perf_counter()
+            metrics.record_checkout()
+
+        def on_checkin(dbapi_connection, connection_record):
+            started = connection_record.info.pop("checked_out_at", None)
+            metrics.record_checkin(time.perf_counter() - started if started is not None else None)
+
+        event.listen(engine, "connect", on_connect)
+        event.listen(engine, "checkout", on_checkout)
+        event.listen(engine, "checkin", on_checkin)
+
+    def get_pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Sizing, occupancy and checkout metrics of every pool in use"""
+        stats = {}
+        with self._lock:
+            engines = dict(self._engines)
+        for pool, engine in engines.items():
+            shared_with = POOL_OLTP if pool != POOL_OLTP and engine is engines.get(POOL_OLTP) else None
+            size = self.pool_size(pool)
+            pool_stats: Dict[str, Any] = {
+                "configured_pool_size": size.pool_size,
+                "configured_max_overflow": size.max_overflow,
+            }
+            if shared_with:
+                pool_stats["shared_with"] = shared_with
+            engine_pool = engine.pool
+            for key in ("size", "checkedin", "checkedout", "overflow"):
+                method = getattr(engine_pool, key, None)
+                if callable(method):
+                    try:
+                        pool_stats[f"pool_{key}"] = method()
+                    except Exception:
+                        pass
+            pool_stats.update(self.metrics(self._instrumented.get(id(engine), pool)).snapshot())
+            stats[pool] = pool_stats
+        return stats
+
+    def get_budget(self) -> Dict[str, Any]:
+        """Connection budget the pool sizes were derived from"""
+        return {
+            "max_connections": self.max_connections,
+            "reserved_connections": self.reserved_connections,
+            "workers": self.workers,
+            "per_process": max(1, (self.max_connections - self.reserved_connections) // max(1, self.workers)),
+            "planned": {name: self.pool_size(name).total for name in self.specs},
+        }
+
+    def dispose(self) -> None:
+        """Close the connections of the engines this registry created"""
+        with self._lock:
+            for pool in self._owned:
+                engine = self._engines.pop(pool, None)
+                if engine is not None:
+                    self._instrumented.pop(id(engine), None)
+                    engine.dispose()
+            self._owned.clear()
+            for factory in self._session_factories.values():
+                factory.reset()
+
+
+# Global registry, configured by backend.database
+engine_registry = EngineRegistry()
+
+
+def get_engine_registry() -> EngineRegistry:
+    """Get the global engine registry"""
+    return engine_registry
+
+
+def get_engine(pool: str = POOL_OLTP) -> Engine:
+    """Engine of a named pool from the global registry"""
+    return engine_registry.get_engine(pool)
+
+
+def get_session_factory(pool: str = POOL_OLTP) -> Callable[..., Session]:
+    """Session factory of a named pool from the global registry"""
+    return engine_registry.session_factory(pool)
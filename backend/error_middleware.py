@@ -362,13 +362,15 @@ class AdminErrorHandlingMiddleware(BaseHTTPMiddleware):
 
 
 def setup_error_middleware(app: FastAPI, error_handler: Optional[UnifiedErrorHandler] = None):
-    """Setup error handling middleware for FastAPI application"""
+    """Setup error handling middleware for FastAPI application
     
-    # Add main error handling middleware
-    app.add_middleware(ErrorHandlingMiddleware, error_handler=error_handler)
+    Error handling runs as a stage of the consolidated middleware pipeline,
+    which uses ErrorHandlingMiddleware and AdminErrorHandlingMiddleware to
+    build the error responses.
+    """
+    from .middleware_pipeline import setup_middleware_pipeline
     
-    # Add admin-specific error handling middleware
-    app.add_middleware(AdminErrorHandlingMiddleware, error_handler=error_handler)
+    setup_middleware_pipeline(app, error_handler=error_handler)
     
     logger.info("Error handling middleware setup completed")
 
@@ -83,6 +83,7 @@ class GDPRComplianceManager:
         self._consent_records: Dict[str, List[ConsentRecord]] = {}
         self._data_requests: Dict[str, DataSubjectRequest] = {}
         self._retention_policies: List[RetentionPolicy] = self._get_default_retention_policies()
+        self._streaming_exporter = None
     
     def _get_default_retention_policies(self) -> List[RetentionPolicy]:
         """Get default data retention policies"""
@@ -260,14 +261,7 @@ class GDPRComplianceManager:
                     user_data["consent_records"].append(asdict(consent))
             
             # Add processing information
-            user_data["processing_info"] = {
-                "data_controller": "AI Agent Memory System",
-                "processing_purposes": self._get_processing_purposes(request.user_id),
-                "legal_basis": self._get_legal_basis(request.user_id),
-                "retention_periods": self._get_retention_info(),
-                "data_sources": ["user_interactions", "system_logs", "session_data"],
-                "data_recipients": ["internal_systems", "analytics_processors"]
-            }
+            user_data["processing_info"] = self.get_processing_info(request.user_id)
             
             request.status = RequestStatus.COMPLETED
             request.completed_at = datetime.utcnow()
@@ -379,6 +373,69 @@ class GDPRComplianceManager:
             logger.error(f"Portability request failed: request_id={request_id}, error={e}")
             raise
     
+    @property
+    def streaming_exporter(self):
+        """Lazily created GDPRStreamingExporter bound to this manager"""
+        if self._streaming_exporter is None:
+            from backend.gdpr_export import GDPRStreamingExporter
+            self._streaming_exporter = GDPRStreamingExporter(self)
+        return self._streaming_exporter
+    
+    def stream_access_request(self, request_id: str, db_session: Session,
+                              export_format: str = "ndjson", anonymize: bool = False):
+        """
+        Stream a data access request (Article 15) with bounded memory
+        
+        Args:
+            request_id: Request ID to process
+            db_session: Database session, kept open until the stream is consumed
+            export_format: "ndjson" or "zip"
+            anonymize: Whether to scrub PII from exported free text
+            
+        Returns:
+            Iterator of export bytes
+        """
+        request = self._data_requests.get(request_id)
+        if not request or request.request_type != DataSubjectRightType.ACCESS:
+            raise ValueError("Invalid access request")
+        
+        return self.streaming_exporter.stream_request(
+            request_id, db_session, export_format, anonymize
+        )
+    
+    def stream_portability_request(self, request_id: str, db_session: Session,
+                                   export_format: str = "ndjson", anonymize: bool = False):
+        """
+        Stream a data portability request (Article 20) with bounded memory
+        
+        Args:
+            request_id: Request ID to process
+            db_session: Database session, kept open until the stream is consumed
+            export_format: "ndjson" or "zip"
+            anonymize: Whether to scrub PII from exported free text
+            
+        Returns:
+            Iterator of export bytes
+        """
+        request = self._data_requests.get(request_id)
+        if not request or request.request_type != DataSubjectRightType.DATA_PORTABILITY:
+            raise ValueError("Invalid portability request")
+        
+        return self.streaming_exporter.stream_request(
+            request_id, db_session, export_format, anonymize
+        )
+    
+    def get_processing_info(self, user_id: str) -> Dict[str, Any]:
+        """Get the processing information section of a data export"""
+        return {
+            "data_controller": "AI Agent Memory System",
+            "processing_purposes": self._get_processing_purposes(user_id),
+            "legal_basis": self._get_legal_basis(user_id),
+            "retention_periods": self._get_retention_info(),
+            "data_sources": ["user_interactions", "system_logs", "session_data"],
+            "data_recipients": ["internal_systems", "analytics_processors"]
+        }
+    
     def _can_erase_data(self, user_id: str) -> bool:
         """
         Check if user data can be erased or if there are legal grounds to refuse
@@ -0,0 +1,497 @@
+"""
+Streaming GDPR data exports
+
+Access (Article 15) and portability (Article 20) exports are produced
+record-by-record instead of being assembled into one dictionary, so memory
+stays bounded no matter how much history a user has. Rows are read through
+server-side cursors (``stream_results`` + ``yield_per``), optionally
+anonymized on the fly, and emitted either as NDJSON or as a zipped JSON
+document. Long exports can run as resumable background jobs that checkpoint
+their keyset position to disk.
+"""
+
+import json
+import os
+import uuid
+import zipfile
+import logging
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterator, Tuple, Callable
+
+from sqlalchemy.orm import Session
+from sqlalchemy import or_
+
+from backend.memory_models import EnhancedChatHistory, UserSession, MemoryContextCache
+from backend.gdpr_compliance import (
+    GDPRComplianceManager, DataSubjectRightType, RequestStatus
+)
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_FORMAT_ZIP = "zip"
+EXPORT_FORMATS = (EXPORT_FORMAT_NDJSON, EXPORT_FORMAT_ZIP)
+
+EXPORT_MEDIA_TYPES = {
+    EXPORT_FORMAT_NDJSON: "application/x-ndjson",
+    EXPORT_FORMAT_ZIP: "application/zip",
+}
+
+# Sections backed by database tables, in export order
+EXPORT_SECTIONS = ("chat_history", "user_sessions", "context_cache")
+
+# Free-text fields scrubbed when an export is anonymized
+ANONYMIZED_FIELDS = ("user_message", "bot_response", "context_data")
+
+
+class _StreamBuffer:
+    """Write-only, unseekable sink that lets zipfile output be drained in pieces"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+@dataclass
+class ExportJob:
+    """State of a resumable background export"""
+    job_id: str
+    request_id: str
+    user_id: str
+    export_format: str
+    output_path: str
+    anonymize: bool = False
+    status: str = RequestStatus.PENDING.value
+    section_index: int = 0
+    last_id: int = 0
+    bytes_written: int = 0
+    records_written: int = 0
+    started_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def checkpoint_path(self) -> str:
+        return os.path.join(os.path.dirname(self.output_path), f"{self.job_id}.checkpoint.json")
+
+
+class GDPRStreamingExporter:
+    """
+    Streams a user's data export without materializing it in memory
+    """
+
+    def __init__(self, gdpr_manager: GDPRComplianceManager, chunk_size: int = 500,
+                 export_dir: Optional[str] = None):
+        self.gdpr_manager = gdpr_manager
+        self.security_manager = gdpr_manager.security_manager
+        self.privacy_utils = gdpr_manager.privacy_utils
+        self.chunk_size = chunk_size
+        self.export_dir = export_dir or os.getenv("GDPR_EXPORT_DIR", os.path.join("data", "gdpr_exports"))
+        self._jobs: Dict[str, ExportJob] = {}
+
+    # Record iteration
+
+    def _section_query(self, section: str, user_id: str, db_session: Session,
+                       after_id: int = 0):
+        """Build the keyset-ordered query for one export section"""
+        if section == "chat_history":
+            model = EnhancedChatHistory
+            query = db_session.query(model).filter(
+                model.user_id == user_id,
+                or_(model.deleted_at.is_(None), model.deleted_at > datetime.utcnow())
+            )
+        elif section == "user_sessions":
+            model = UserSession
+            query = db_session.query(model).filter(model.user_id == user_id)
+        elif section == "context_cache":
+            model = MemoryContextCache
+            query = db_session.query(model).filter(model.user_id == user_id)
+        else:
+            raise ValueError(f"Unknown export section: {section}")
+
+        # yield_per enables stream_results, i.e. a server-side cursor on PostgreSQL
+        return query.filter(model.id > after_id).order_by(model.id).yield_per(self.chunk_size)
+
+    def _serialize(self, section: str, row: Any, anonymize: bool) -> Dict[str, Any]:
+        """Serialize one row, scrubbing PII from free text when requested"""
+        if section == "chat_history":
+            record = self.security_manager.serialize_chat_for_export(row)
+        elif section == "user_sessions":
+            record = self.security_manager.serialize_session_for_export(row)
+        else:
+            record = self.security_manager.serialize_context_cache_for_export(row)
+
+        if anonymize:
+            for field_name in ANONYMIZED_FIELDS:
+                value = record.get(field_name)
+                if isinstance(value, str):
+                    record[field_name] = self.privacy_utils.anonymize_text(value)
+            if record.get("session_id"):
+                record["session_id"] = self.privacy_utils.hash_identifier(record["session_id"])
+
+        return record
+
+    def _check_permission(self, user_id: str) -> None:
+        if not self.security_manager.check_access_permission(user_id, "export"):
+            raise PermissionError(f"User {user_id} does not have export permission")
+
+    def iter_section(self, section: str, user_id: str, db_session: Session,
+                     anonymize: bool = False, after_id: int = 0
+                     ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (row_id, record) for one section, starting after ``after_id``"""
+        for row in self._section_query(section, user_id, db_session, after_id):
+            yield row.id, self._serialize(section, row, anonymize)
+
+    def iter_records(self, user_id: str, db_session: Session, anonymize: bool = False,
+                     section_index: int = 0, after_id: int = 0
+                     ) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+        """
+        Yield (section_index, row_id, record) for every exported row
+
+        Iteration starts at the given keyset position, which is how resumed
+        jobs skip rows that were already written.
+        """
+        self._check_permission(user_id)
+
+        for index in range(section_index, len(EXPORT_SECTIONS)):
+            start_after = after_id if index == section_index else 0
+            for row_id, record in self.iter_section(
+                EXPORT_SECTIONS[index], user_id, db_session, anonymize, start_after
+            ):
+                yield index, row_id, record
+
+    def _metadata(self, request_type: DataSubjectRightType, user_id: str,
+                  anonymize: bool) -> Dict[str, Any]:
+        return {
+            "format": "JSON",
+            "version": "1.0",
+            "request_type": request_type.value,
+            "exported_at": datetime.utcnow().isoformat(),
+            "user_id": self.privacy_utils.hash_identifier(user_id) if anonymize else user_id,
+            "anonymized": anonymize,
+            "data_types": list(EXPORT_SECTIONS),
+        }
+
+    def _trailer_sections(self, user_id: str, anonymize: bool) -> Dict[str, Any]:
+        """Small, in-memory sections appended after the table data"""
+        manager = self.gdpr_manager
+        consent_records = [
+            asdict(consent) for consent in manager._consent_records.get(user_id, [])
+        ]
+        if anonymize:
+            for consent in consent_records:
+                consent["user_id"] = self.privacy_utils.hash_identifier(user_id)
+        return {
+            "consent_records": consent_records,
+            "processing_info": manager.get_processing_info(user_id),
+        }
+
+    # Encoders
+
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, default=str, ensure_ascii=False)
+
+    def iter_ndjson(self, user_id: str, db_session: Session,
+                    request_type: DataSubjectRightType = DataSubjectRightType.ACCESS,
+                    anonymize: bool = False) -> Iterator[bytes]:
+        """
+        Emit the export as NDJSON, one ``{"type": ..., "data": ...}`` per line
+
+        Lines are yielded in batches of ``chunk_size`` records so the transport
+        is not flooded with tiny writes.
+        """
+        yield (self._dumps({"type": "metadata", "data": self._metadata(request_type, user_id, anonymize)}) + "\n").encode("utf-8")
+
+        batch: List[str] = []
+        for section_index, _, record in self.iter_records(user_id, db_session, anonymize):
+            batch.append(self._dumps({"type": EXPORT_SECTIONS[section_index], "data": record}))
+            if len(batch) >= self.chunk_size:
+                yield ("\n".join(batch) + "\n").encode("utf-8")
+                batch = []
+        if batch:
+            yield ("\n".join(batch) + "\n").encode("utf-8")
+
+        for section, data in self._trailer_sections(user_id, anonymize).items():
+            yield (self._dumps({"type": section, "data": data}) + "\n").encode("utf-8")
+
+    def iter_zip(self, user_id: str, db_session: Session,
+                 request_type: DataSubjectRightType = DataSubjectRightType.ACCESS,
+                 anonymize: bool = False) -> Iterator[bytes]:
+        """
+        Emit the export as a zip archive holding a single JSON document
+
+        The document has the same shape as ``SecurityManager.export_user_data``
+        plus consent and processing sections. It is written incrementally
+        through an unseekable buffer, so the archive streams with constant
+        memory.
+        """
+        self._check_permission(user_id)
+
+        buffer = _StreamBuffer()
+        with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            with archive.open("export.json", mode="w", force_zip64=True) as member:
+                def write(text: str) -> None:
+                    member.write(text.encode("utf-8"))
+
+                metadata = self._metadata(request_type, user_id, anonymize)
+                write("{" + ",".join(f"{self._dumps(k)}:{self._dumps(v)}" for k, v in metadata.items()))
+
+                for section in EXPORT_SECTIONS:
+                    write(f",{self._dumps(section)}:[")
+                    separator = ""
+                    pending = 0
+                    for _, record in self.iter_section(section, user_id, db_session, anonymize):
+                        write(separator + self._dumps(record))
+                        separator = ","
+                        pending += 1
+                        if pending >= self.chunk_size:
+                            pending = 0
+                            data = buffer.drain()
+                            if data:
+                                yield data
+                    write("]")
+
+                for section, data in self._trailer_sections(user_id, anonymize).items():
+                    write(f",{self._dumps(section)}:{self._dumps(data)}")
+                write("}")
+
+        data = buffer.drain()
+        if data:
+            yield data
+
+    def iter_export(self, user_id: str, db_session: Session,
+                    request_type: DataSubjectRightType = DataSubjectRightType.ACCESS,
+                    export_format: str = EXPORT_FORMAT_NDJSON,
+                    anonymize: bool = False) -> Iterator[bytes]:
+        """Dispatch to the encoder for the requested format"""
+        if export_format == EXPORT_FORMAT_NDJSON:
+            return self.iter_ndjson(user_id, db_session, request_type, anonymize)
+        if export_format == EXPORT_FORMAT_ZIP:
+            return self.iter_zip(user_id, db_session, request_type, anonymize)
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    # Data subject requests
+
+    def stream_request(self, request_id: str, db_session: Session,
+                       export_format: str = EXPORT_FORMAT_NDJSON,
+                       anonymize: bool = False) -> Iterator[bytes]:
+        """
+        Stream an access or portability request, tracking its status
+
+        The request is marked completed (with the streamed byte count) only
+        once the last chunk has been produced.
+        """
+        request = self.gdpr_manager._data_requests.get(request_id)
+        if not request or request.request_type not in (
+            DataSubjectRightType.ACCESS, DataSubjectRightType.DATA_PORTABILITY
+        ):
+            raise ValueError("Invalid export request")
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        def generate() -> Iterator[bytes]:
+            request.status = RequestStatus.IN_PROGRESS
+            export_size = 0
+            try:
+                for chunk in self.iter_export(request.user_id, db_session, request.request_type,
+                                              export_format, anonymize):
+                    export_size += len(chunk)
+                    yield chunk
+            except Exception as e:
+                request.status = RequestStatus.REJECTED
+                request.notes = f"Streaming export failed: {str(e)}"
+                logger.error(f"Streaming export failed: request_id={request_id}, error={e}")
+                raise
+
+            request.status = RequestStatus.COMPLETED
+            request.completed_at = datetime.utcnow()
+            request.response_data = {"export_size": export_size, "format": export_format}
+            logger.info(f"Streaming export completed: request_id={request_id}, bytes={export_size}")
+
+        return generate()
+
+    def streaming_response(self, request_id: str, db_session: Session,
+                           export_format: str = EXPORT_FORMAT_NDJSON,
+                           anonymize: bool = False):
+        """
+        Wrap stream_request in a FastAPI StreamingResponse
+
+        The caller owns ``db_session`` and must keep it open until the response
+        has been sent, e.g. by closing it in a background task.
+        """
+        from fastapi.responses import StreamingResponse
+
+        body = self.stream_request(request_id, db_session, export_format, anonymize)
+        extension = "ndjson" if export_format == EXPORT_FORMAT_NDJSON else "zip"
+        return StreamingResponse(
+            body,
+            media_type=EXPORT_MEDIA_TYPES[export_format],
+            headers={
+                "Content-Disposition": f'attachment; filename="gdpr_export_{request_id}.{extension}"'
+            }
+        )
+
+    # Resumable background jobs
+
+    def create_job(self, request_id: str, export_format: str = EXPORT_FORMAT_NDJSON,
+                   anonymize: bool = False) -> ExportJob:
+        """Register a background export job for a submitted request"""
+        request = self.gdpr_manager._data_requests.get(request_id)
+        if not request or request.request_type not in (
+            DataSubjectRightType.ACCESS, DataSubjectRightType.DATA_PORTABILITY
+        ):
+            raise ValueError("Invalid export request")
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        os.makedirs(self.export_dir, exist_ok=True)
+        job_id = str(uuid.uuid4())
+        job = ExportJob(
+            job_id=job_id,
+            request_id=request_id,
+            user_id=request.user_id,
+            export_format=export_format,
+            output_path=os.path.join(self.export_dir, f"{job_id}.ndjson"),
+            anonymize=anonymize,
+        )
+        self._jobs[job_id] = job
+        self._save_checkpoint(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[ExportJob]:
+        """Look up a job, reloading its checkpoint from disk if necessary"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            checkpoint = os.path.join(self.export_dir, f"{job_id}.checkpoint.json")
+            if os.path.exists(checkpoint):
+                with open(checkpoint, "r", encoding="utf-8") as f:
+                    job = ExportJob(**json.load(f))
+                self._jobs[job_id] = job
+        return job
+
+    def _save_checkpoint(self, job: ExportJob) -> None:
+        job.updated_at = datetime.utcnow().isoformat()
+        tmp_path = f"{job.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(job), f)
+        os.replace(tmp_path, job.checkpoint_path)
+
+    def run_job(self, job_id: str, session_factory: Optional[Callable[[], Session]] = None) -> ExportJob:
+        """
+        Run or resume a background export job
+
+        Records are appended to an NDJSON file and the keyset position is
+        checkpointed after every chunk. On resume the file is truncated back
+        to the last checkpoint, so a crash between writes never duplicates or
+        loses records. Zip jobs are compressed once the NDJSON is complete.
+        Suitable for ``BackgroundTasks.add_task``.
+        """
+        job = self.get_job(job_id)
+        if job is None:
+            raise ValueError(f"Unknown export job: {job_id}")
+        if job.status == RequestStatus.COMPLETED.value:
+            return job
+
+        if session_factory is None:
+            from backend.database import AnalyticsSessionLocal
+            session_factory = AnalyticsSessionLocal
+
+        request = self.gdpr_manager._data_requests.get(job.request_id)
+        request_type = request.request_type if request else DataSubjectRightType.ACCESS
+        if request:
+            request.status = RequestStatus.IN_PROGRESS
+
+        job.status = RequestStatus.IN_PROGRESS.value
+        job.started_at = job.started_at or datetime.utcnow().isoformat()
+        job.error = None
+
+        db_session = session_factory()
+        try:
+            with open(job.output_path, "ab") as out:
+                out.truncate(job.bytes_written)
+                out.seek(job.bytes_written)
+
+                if job.bytes_written == 0:
+                    header = {"type": "metadata", "data": self._metadata(request_type, job.user_id, job.anonymize)}
+                    out.write((self._dumps(header) + "\n").encode("utf-8"))
+
+                # The job only advances at checkpoints; an interruption rolls
+                # back to the last one
+                position = (job.section_index, job.last_id)
+                records_written = job.records_written
+                pending = 0
+                for section_index, row_id, record in self.iter_records(
+                    job.user_id, db_session, job.anonymize, job.section_index, job.last_id
+                ):
+                    line = {"type": EXPORT_SECTIONS[section_index], "data": record}
+                    out.write((self._dumps(line) + "\n").encode("utf-8"))
+                    position = (section_index, row_id)
+                    records_written += 1
+                    pending += 1
+                    if pending >= self.chunk_size:
+                        pending = 0
+                        out.flush()
+                        job.section_index, job.last_id = position
+                        job.records_written = records_written
+                        job.bytes_written = out.tell()
+                        self._save_checkpoint(job)
+
+                out.flush()
+                job.section_index, job.last_id = position
+                job.records_written = records_written
+                job.bytes_written = out.tell()
+                self._save_checkpoint(job)
+
+                # The trailer is rewritten on resume, so it is not checkpointed
+                for section, data in self._trailer_sections(job.user_id, job.anonymize).items():
+                    out.write((self._dumps({"type": section, "data": data}) + "\n").encode("utf-8"))
+
+            if job.export_format == EXPORT_FORMAT_ZIP:
+                zip_path = job.output_path[:-len(".ndjson")] + ".zip"
+                with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                    archive.write(job.output_path, arcname="export.ndjson")
+                os.remove(job.output_path)
+                job.output_path = zip_path
+
+            job.status = RequestStatus.COMPLETED.value
+            job.completed_at = datetime.utcnow().isoformat()
+            if request:
+                request.status = RequestStatus.COMPLETED
+                request.completed_at = datetime.utcnow()
+                request.response_data = {
+                    "export_size": os.path.getsize(job.output_path),
+                    "format": job.export_format,
+                    "job_id": job.job_id,
+                }
+            logger.info(f"Export job completed: job_id={job_id}, records={job.records_written}")
+
+        except BaseException as e:
+            # Requeue the job resumable from its last checkpoint, also when the
+            # worker is cancelled or shut down mid-run
+            job.status = RequestStatus.PENDING.value
+            job.error = str(e) or type(e).__name__
+            if request:
+                request.status = RequestStatus.PENDING
+            logger.error(f"Export job interrupted: job_id={job_id}, error={job.error}")
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            self._save_checkpoint(job)
+            db_session.close()
+
+        return job
@@ -16,6 +16,7 @@ from fastapi.responses import JSONResponse
 
 from .database_monitoring import get_database_health_score, database_monitor
 from .database import PostgreSQLErrorHandler
+from .admission_control import get_admission_controller
 
 logger = logging.getLogger(__name__)
 
@@ -256,6 +257,7 @@ def get_system_status() -> Dict[str, Any]:
             "degradation_level": degradation_level,
             "health_score": health_score,
             "circuit_breakers": circuit_breakers,
+            "chat_admission": get_admission_controller().get_stats(),
             "timestamp": datetime.now().isoformat(),
             "message": degradation_handler._get_user_friendly_message(degradation_level)
         }
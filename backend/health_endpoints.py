@@ -18,7 +18,7 @@ from .database import get_db, engine, health_check_database, get_database_info
 from .database_health import get_health_status, get_detailed_health_status, get_cached_health_status
 from .database_monitoring import (
     get_database_metrics, get_database_health_score, 
-    get_error_summary, database_monitor
+    get_error_summary, get_query_stats, get_slow_queries, database_monitor
 )
 
 logger = logging.getLogger(__name__)
@@ -37,10 +37,12 @@ async def root_health_check():
     }
 
 @health_router.get("/database")
-async def database_health_check():
+async def database_health_check(top: int = Query(10, ge=0, le=100, description="Hottest statements and slow queries to include")):
     """Quick database health check"""
     try:
-        health_status = get_health_status()
+        health_status = dict(get_health_status())
+        health_status["queries"] = get_query_stats(limit=top)
+        health_status["slow_queries"] = get_slow_queries(limit=top)
         
         # Determine HTTP status code based on health
         status_code = 200 if health_status.get("status") == "healthy" else 503
@@ -120,6 +122,24 @@ async def database_errors(hours: int = Query(24, ge=1, le=168, description="Hour
         logger.error(f"Failed to get error summary: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve error summary: {str(e)}")
 
+@health_router.get("/database/queries")
+async def database_query_stats(
+    limit: int = Query(20, ge=1, le=500, description="Number of statement fingerprints to return"),
+    order_by: str = Query("total_ms", pattern="^(total_ms|count|mean_ms|p95_ms|p99_ms|max_ms)$",
+                          description="Statistic to rank statements by")
+):
+    """Get per-statement latency histograms and the slow-query log"""
+    try:
+        return {
+            "query_stats": get_query_stats(limit=limit, order_by=order_by),
+            "slow_queries": get_slow_queries(limit=limit),
+            "slow_query_threshold_ms": round(database_monitor.slow_query_seconds * 1000, 3),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Failed to get query statistics: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve query statistics: {str(e)}")
+
 @health_router.get("/database/connection")
 async def database_connection_info():
     """Get database connection information and pool status"""
@@ -10,6 +10,7 @@ from .tool_orchestrator import ToolOrchestrator
 from .response_renderer import ResponseRenderer
 from .context_retriever import ContextRetriever
 from .tool_selector import ToolSelector
+from .session_store import SessionStateStore, InMemorySessionBackend, RedisSessionBackend
 from .models import (
     ChatResponse,
     ToolRecommendation,
@@ -22,7 +23,9 @@ from .models import (
     ContentSection,
     InteractiveElement,
     ErrorState,
-    ToolResult
+    ToolResult,
+    CacheScope,
+    ToolCachePolicy
 )
 from .exceptions import (
     ChatUIException,
@@ -38,6 +41,9 @@ __all__ = [
     'ResponseRenderer',
     'ContextRetriever',
     'ToolSelector',
+    'SessionStateStore',
+    'InMemorySessionBackend',
+    'RedisSessionBackend',
     'ChatResponse',
     'ToolRecommendation',
     'UIState',
@@ -50,6 +56,8 @@ __all__ = [
     'InteractiveElement',
     'ErrorState',
     'ToolResult',
+    'CacheScope',
+    'ToolCachePolicy',
     'ChatUIException',
     'ToolExecutionError',
     'ContextRetrievalError',
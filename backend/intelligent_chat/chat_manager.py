@@ -26,7 +26,16 @@ from .models import (
 )
 from .exceptions import ChatUIException, ToolExecutionError, ContextRetrievalError
 from .performance_cache import get_response_cache, get_performance_cache
+from .semantic_cache import get_semantic_response_cache, SEMANTIC_CACHE_ENABLED
+from .context_packing import pack_context_entries, DEFAULT_CONTEXT_TOKEN_BUDGET
 from .resource_monitor import get_resource_monitor
+from .session_store import SessionStateStore, SessionState
+from backend.context_record import as_context_record
+from backend.request_tracing import (
+    trace_stage, record_stage, get_stage_metrics,
+    STAGE_CACHE_LOOKUP, STAGE_CONTEXT, STAGE_TOOL_SELECTION, STAGE_TOOL_EXECUTION,
+    STAGE_RESPONSE, STAGE_PERSISTENCE, STAGE_CHAT_TOTAL
+)
 
 # Import memory layer components
 try:
@@ -58,7 +67,8 @@ class ChatManager(BaseChatManager):
         context_engine=None,
         auto_create_context_engine=True,
         llm=None,
-        agent_executor=None
+        agent_executor=None,
+        session_store: Optional[SessionStateStore] = None
     ):
         """Initialize ChatManager with component dependencies."""
         self.tool_orchestrator = tool_orchestrator
@@ -75,8 +85,9 @@ class ChatManager(BaseChatManager):
         self.llm = llm
         self.agent_executor = agent_executor
         
-        # Session management
-        self._active_sessions: Dict[str, Dict[str, Any]] = {}
+        # Session management, bounded by count, idle TTL and memory budget
+        self._active_sessions = (session_store if session_store is not None
+                                 else SessionStateStore(on_evict=self._on_session_evicted))
         
         # Performance tracking
         self._conversation_count = 0
@@ -98,20 +109,53 @@ class ChatManager(BaseChatManager):
             ChatUIException: If processing fails
         """
         start_time = time.time()
+        stage_start = time.perf_counter()
+        try:
+            return await self._process_message_stages(message, user_id, session_id, start_time)
+        finally:
+            record_stage(STAGE_CHAT_TOTAL, time.perf_counter() - stage_start)
+    
+    async def process_shed_message(self, message: str, user_id: str, session_id: str) -> ChatResponse:
+        """
+        Answer a message shed by admission control with simplified processing.
         
+        No tools, context retrieval or persistence run, so the turn stays cheap
+        while the system is saturated.
+        """
+        response = await self._process_simplified_message(message, user_id, session_id)
+        response.ui_hints["reason"] = "load_shedding"
+        return response
+    
+    async def _process_message_stages(
+        self, message: str, user_id: str, session_id: str, start_time: float
+    ) -> ChatResponse:
+        """Run the stages of process_message, each timed as a trace span."""
         # Get performance optimization components
         response_cache = get_response_cache()
+        semantic_cache = get_semantic_response_cache() if SEMANTIC_CACHE_ENABLED else None
         resource_monitor = get_resource_monitor()
         
         try:
             # Initialize session if needed
             self._ensure_session(user_id, session_id)
             
-            # Generate context hash for caching
-            context_hash = self._generate_context_hash(message, user_id, session_id)
-            
-            # Check response cache first
-            cached_response = response_cache.get_response(message, context_hash)
+            with trace_stage(STAGE_CACHE_LOOKUP):
+                # Answers shared across users for paraphrased FAQ questions
+                shared_response = semantic_cache.lookup(message, session_id) if semantic_cache is not None else None
+                
+                # Generate context hash for caching
+                context_hash = self._generate_context_hash(message, user_id, session_id)
+                
+                # Check response cache first
+                cached_response = None if shared_response else response_cache.get_response(message, context_hash)
+            if shared_response:
+                # Keep the conversation history of this session complete
+                with trace_stage(STAGE_PERSISTENCE):
+                    await self._store_conversation_in_memory(
+                        user_id, session_id, message, shared_response, shared_response.tools_used, {}, []
+                    )
+                    self._update_session_state(user_id, session_id, message, shared_response)
+                return shared_response
             if cached_response:
                 # Update timestamp for cached response
                 cached_response.timestamp = datetime.now(timezone.utc)
@@ -119,20 +163,22 @@ class ChatManager(BaseChatManager):
                 return cached_response
             
             # Track conversation memory usage
-            estimated_memory = self._estimate_conversation_memory(message, session_id)
+            estimated_memory = self._estimate_conversation_memory(message, session_id, user_id)
             if not resource_monitor.track_conversation_memory(session_id, estimated_memory):
                 # Memory limit exceeded, use simplified processing
                 return await self._process_simplified_message(message, user_id, session_id)
             
             # Get conversation context using integrated memory layer
-            context = await self._get_context_with_memory_integration(message, user_id, session_id)
+            with trace_stage(STAGE_CONTEXT):
+                context = await self._get_context_with_memory_integration(message, user_id, session_id)
             
             # Process with enhanced tool orchestration using learning
             tools_used = []
             tool_performance = {}
             
             # Use adaptive tool selection based on learned patterns
-            adaptive_tools = await self._adaptive_tool_selection(message, user_id, context)
+            with trace_stage(STAGE_TOOL_SELECTION):
+                adaptive_tools = await self._adaptive_tool_selection(message, user_id, context)
             
             if self.tool_orchestrator:
                 try:
@@ -140,9 +186,10 @@ class ChatManager(BaseChatManager):
                     with resource_monitor.monitor_tool_execution("ToolOrchestrator", timeout=30.0):
                         # First try learned/adaptive tool selection
                         if adaptive_tools:
-                            tool_results = await self.tool_orchestrator.execute_tools(
-                                adaptive_tools, message, {"context": context}
-                            )
+                            with trace_stage(STAGE_TOOL_EXECUTION):
+                                tool_results = await self.tool_orchestrator.execute_tools(
+                                    adaptive_tools, message, {"context": context, "user_id": user_id}
+                                )
                             tools_used = [result.tool_name for result in tool_results if result.success]
                             
                             # Track tool performance
@@ -155,12 +202,14 @@ class ChatManager(BaseChatManager):
                         
                         # If adaptive tools didn't work well, try orchestrator's selection
                         if not tools_used or len(tools_used) == 0:
-                            tool_recommendations = await self.tool_orchestrator.select_tools(message, context)
+                            with trace_stage(STAGE_TOOL_SELECTION):
+                                tool_recommendations = await self.tool_orchestrator.select_tools(message, context)
                             if tool_recommendations:
                                 tool_names = [rec.tool_name for rec in tool_recommendations]
-                                tool_results = await self.tool_orchestrator.execute_tools(
-                                    tool_names, message, {"context": context}
-                                )
+                                with trace_stage(STAGE_TOOL_EXECUTION):
+                                    tool_results = await self.tool_orchestrator.execute_tools(
+                                        tool_names, message, {"context": context, "user_id": user_id}
+                                    )
                                 tools_used.extend([result.tool_name for result in tool_results if result.success])
                                 
                                 # Track additional tool performance
@@ -190,7 +239,8 @@ class ChatManager(BaseChatManager):
                     print(f"Adaptive tool execution failed: {e}")
             
             # Generate response content
-            response_content = self._generate_response_content(message, context, tools_used)
+            with trace_stage(STAGE_RESPONSE):
+                response_content = self._generate_response_content(message, context, tools_used)
             
             # Calculate confidence score based on context and tools
             confidence_score = self._calculate_confidence_score(context, tools_used, tool_performance)
@@ -213,16 +263,20 @@ class ChatManager(BaseChatManager):
                 timestamp=datetime.now(timezone.utc)
             )
             
-            # Store conversation in memory layer with learning updates
-            await self._store_conversation_in_memory(
-                user_id, session_id, message, response, tools_used, tool_performance, context
-            )
-            
-            # Update learning models based on this interaction
-            await self._update_learning_models(message, tools_used, tool_performance, response.confidence_score)
+            with trace_stage(STAGE_PERSISTENCE):
+                # Store conversation in memory layer with learning updates
+                await self._store_conversation_in_memory(
+                    user_id, session_id, message, response, tools_used, tool_performance, context
+                )
+                
+                # Update learning models based on this interaction
+                await self._update_learning_models(message, tools_used, tool_performance, response.confidence_score)
+                
+                # Update session state
+                self._update_session_state(user_id, session_id, message, response)
             
-            # Update session state
-            self._update_session_state(user_id, session_id, message, response)
+            if semantic_cache is not None:
+                semantic_cache.store(message, response, context)
             
             # Update performance tracking
             self._conversation_count += 1
@@ -320,16 +374,11 @@ class ChatManager(BaseChatManager):
     
     def _ensure_session(self, user_id: str, session_id: str) -> None:
         """Ensure session exists in active sessions."""
-        session_key = f"{user_id}:{session_id}"
-        if session_key not in self._active_sessions:
-            self._active_sessions[session_key] = {
-                "user_id": user_id,
-                "session_id": session_id,
-                "created_at": datetime.now(timezone.utc),
-                "message_count": 0,
-                "last_activity": datetime.now(timezone.utc),
-                "conversation_history": []  # Track conversation within session
-            }
+        self._active_sessions.get_or_create(user_id, session_id)
+    
+    def _on_session_evicted(self, session: SessionState) -> None:
+        """Drop per-session tracking elsewhere once a session leaves the store."""
+        get_resource_monitor().cleanup_conversation_memory(session.session_id)
     
     async def _get_context_with_memory_integration(self, message: str, user_id: str, session_id: str = None) -> List[ContextEntry]:
         """Get context using integrated memory layer with enhanced learning capabilities."""
@@ -337,18 +386,17 @@ class ChatManager(BaseChatManager):
             # Get session-specific context first (most recent conversation in this session)
             session_context = []
             if session_id:
-                session_key = f"{user_id}:{session_id}"
-                session_data = self._active_sessions.get(session_key, {})
+                session_state = self._active_sessions.get_session(user_id, session_id)
                 
                 # Add recent messages from this session as context
-                if "conversation_history" in session_data:
-                    for msg in session_data["conversation_history"][-5:]:  # Last 5 messages
+                if session_state is not None:
+                    for msg in session_state.history.tail(5):  # Last 5 messages
                         session_context.append(ContextEntry(
-                            content=msg["content"],
+                            content=msg.content,
                             source=f"session_{session_id}",
                             relevance_score=1.0,  # High relevance for same session
-                            timestamp=msg.get("timestamp", datetime.now(timezone.utc)),
-                            context_type=msg["type"],
+                            timestamp=msg.timestamp,
+                            context_type=msg.type,
                             metadata={"session_id": session_id, "recent": True}
                         ))
             
@@ -385,47 +433,20 @@ class ChatManager(BaseChatManager):
                     seen_content.add(content_hash)
                     unique_contexts.append(ctx)
             
-            # Sort by relevance score (descending) and return top 10
-            unique_contexts.sort(key=lambda x: x.relevance_score, reverse=True)
-            return unique_contexts[:10]
+            # Pack the most relevant context per token into the prompt budget, at most 10 entries
+            return pack_context_entries(unique_contexts, DEFAULT_CONTEXT_TOKEN_BUDGET, max_entries=10).entries
             
         except Exception as e:
             print(f"Context retrieval failed: {e}")
             return []
     
     def _convert_memory_contexts_to_context_entries(self, memory_contexts: List) -> List[ContextEntry]:
-        """Convert memory layer contexts to ContextEntry objects."""
-        context_entries = []
-        
-        for ctx in memory_contexts:
-            if hasattr(ctx, 'content'):  # ContextEntryDTO
-                context_entries.append(ContextEntry(
-                    content=ctx.content,
-                    source=ctx.source,
-                    relevance_score=ctx.relevance_score,
-                    timestamp=ctx.timestamp,
-                    context_type=ctx.context_type,
-                    metadata=ctx.metadata
-                ))
-        
-        return context_entries
+        """Pass memory layer contexts through; they already are ContextEntry records."""
+        return [as_context_record(ctx) for ctx in memory_contexts if hasattr(ctx, 'content')]
     
     def _convert_engine_contexts_to_context_entries(self, engine_contexts: List) -> List[ContextEntry]:
-        """Convert context engine contexts to ContextEntry objects."""
-        context_entries = []
-        
-        for ctx in engine_contexts:
-            if hasattr(ctx, 'content'):  # ContextEntryDTO
-                context_entries.append(ContextEntry(
-                    content=ctx.content,
-                    source=ctx.source,
-                    relevance_score=ctx.relevance_score,
-                    timestamp=ctx.timestamp,
-                    context_type=ctx.context_type,
-                    metadata=ctx.metadata
-                ))
-        
-        return context_entries
+        """Pass context engine contexts through; they already are ContextEntry records."""
+        return [as_context_record(ctx) for ctx in engine_contexts if hasattr(ctx, 'content')]
     
     async def _store_conversation_in_memory(
         self, 
@@ -613,39 +634,14 @@ class ChatManager(BaseChatManager):
         response: ChatResponse
     ) -> None:
         """Update session state with new interaction."""
-        session_key = f"{user_id}:{session_id}"
-        if session_key in self._active_sessions:
-            session = self._active_sessions[session_key]
-            session["message_count"] += 1
-            session["last_activity"] = datetime.now(timezone.utc)
-            session["last_message"] = message
-            session["last_response"] = response.content
-            session["total_processing_time"] = session.get("total_processing_time", 0.0) + response.execution_time
-            session["tools_used_count"] = session.get("tools_used_count", 0) + len(response.tools_used)
-            
-            # Add to conversation history for context
-            if "conversation_history" not in session:
-                session["conversation_history"] = []
-            
-            # Add user message
-            session["conversation_history"].append({
-                "type": "user_message",
-                "content": message,
-                "timestamp": datetime.now(timezone.utc)
-            })
-            
-            # Add bot response
-            session["conversation_history"].append({
-                "type": "bot_response", 
-                "content": response.content,
-                "timestamp": datetime.now(timezone.utc),
-                "tools_used": response.tools_used,
-                "confidence_score": response.confidence_score
-            })
-            
-            # Keep only last 20 messages (10 exchanges) to prevent memory bloat
-            if len(session["conversation_history"]) > 20:
-                session["conversation_history"] = session["conversation_history"][-20:]
+        session = self._active_sessions.get_session(user_id, session_id)
+        if session is not None:
+            # The history ring keeps the last 20 messages (10 exchanges)
+            session.record_exchange(
+                message, response.content, response.tools_used,
+                response.confidence_score, response.execution_time
+            )
+            self._active_sessions.save(session)
     
     def get_session_stats(self, user_id: str, session_id: str) -> Dict[str, Any]:
         """Get statistics for a specific session."""
@@ -974,7 +970,8 @@ class ChatManager(BaseChatManager):
             ),
             "memory_integration_enabled": self.memory_manager is not None,
             "context_engine_enabled": self.context_engine is not None,
-            "learning_features_enabled": True
+            "learning_features_enabled": True,
+            "session_store": self._active_sessions.get_stats()
         }
         
         # Add memory layer stats if available
@@ -1161,9 +1158,11 @@ class ChatManager(BaseChatManager):
             
             return {
                 "cache_stats": performance_cache.get_stats() if performance_cache else {},
+                "semantic_cache_stats": get_semantic_response_cache().get_stats(),
                 "resource_usage": resource_monitor.get_current_usage() if resource_monitor else {},
                 "conversation_memory": resource_monitor.get_conversation_memory_usage() if resource_monitor else {},
-                "system_stats": resource_monitor.get_system_stats() if resource_monitor else {}
+                "system_stats": resource_monitor.get_system_stats() if resource_monitor else {},
+                "stage_timings": get_stage_metrics().summary()
             }
         except Exception as e:
             print(f"Error getting performance stats: {e}")
@@ -1243,17 +1242,13 @@ class ChatManager(BaseChatManager):
                 ui_hints={"error": True, "session_id": session_id}
             )
 
-    def _estimate_conversation_memory(self, message: str, session_id: str) -> int:
+    def _estimate_conversation_memory(self, message: str, session_id: str, user_id: str = "") -> int:
         """Estimate memory usage for conversation processing."""
         # Much more conservative estimation to avoid false memory alerts
         base_memory = len(message) * 0.001  # Very small estimate in KB
         
-        session_key = f"*:{session_id}"  # Wildcard user for session lookup
-        for key in self._active_sessions:
-            if key.endswith(f":{session_id}"):
-                session_data = self._active_sessions[key]
-                history_size = len(session_data.get("conversation_history", []))
-                base_memory += history_size * 0.01  # Very small estimate per history item in KB
-                break
+        session_data = self._active_sessions.get(f"{user_id}:{session_id}")
+        if session_data is not None:
+            base_memory += len(session_data.history) * 0.01  # Very small estimate per history item in KB
         
         return max(base_memory, 0.1)  # Minimum 0.1KB estimate
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+Token-budget packing of context entries for the LLM prompt.
+
+Entry counts say little about prompt size: a few long bot responses can be
+larger than dozens of short snippets. Packing estimates the tokens of every
+entry with a local approximation and fills a token budget by value per
+token. This is the greedy solution of the knapsack, which is close to
+optimal when the entries are small compared to the budget. The highest
+value entry that no longer fits is truncated into the space left over.
+
+Selection follows the diversity rule of ``ContextRetriever._apply_diversity_filter``.
+In a first pass, once half the budget is used, only entries adding a new
+source or context type are taken. A second pass fills the rest of the budget
+by value per token.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+from .models import ContextEntry
+
+DEFAULT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+
+# Prompt formatting around each entry ("Context 3 (from source):" and separators)
+ENTRY_OVERHEAD_TOKENS = 8
+# Leftover budget below this is not worth a truncated fragment
+MIN_FRAGMENT_TOKENS = 48
+# Characters per token used to turn a token allowance back into text
+CHARS_PER_TOKEN = 4
+
+_TOKEN_PIECES = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def _count_tokens(text: str) -> int:
+    tokens = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        if piece[0].isalpha():
+            tokens += 1 + (len(piece) - 1) // 6
+        elif piece[0].isdigit():
+            tokens += 1 + (len(piece) - 1) // 3
+        else:
+            tokens += 1
+    return tokens
+
+
+@lru_cache(maxsize=1024)
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count without a tokenizer model
+
+    Short words are one token and long words split every ~6 letters. Digit
+    runs split every 3 digits and each punctuation mark is a token.
+    """
+    return _count_tokens(text)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens, at a sentence boundary where possible"""
+    if _count_tokens(text) <= max_tokens:
+        return text
+
+    max_length = max_tokens * CHARS_PER_TOKEN
+    while True:
+        cut = text[:max(max_length - 3, 0)]
+        boundary = cut.rfind(". ")
+        if boundary > max_length // 2:
+            candidate = cut[:boundary + 1] + ".."
+        else:
+            candidate = cut.rstrip() + "..."
+        if _count_tokens(candidate) <= max_tokens or max_length <= 16:
+            return candidate
+        max_length = int(max_length * 0.8)
+
+
+@dataclass
+class PackingResult:
+    """Entries chosen for the prompt and how much of the budget they use"""
+    entries: List[ContextEntry]
+    tokens_used: int
+    tokens_available: int
+    dropped: int = 0
+    truncated: int = 0
+
+
+def pack_context_entries(
+    contexts: List[ContextEntry],
+    token_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET,
+    max_entries: Optional[int] = None,
+    score: Optional[Callable[[ContextEntry], float]] = None,
+) -> PackingResult:
+    """Choose the entries worth the most per token within the budget
+
+    Args:
+        contexts: Candidate context entries
+        token_budget: Maximum estimated prompt tokens for all entries
+        max_entries: Optional cap on the number of entries as well
+        score: Value of an entry, its relevance score by default
+
+    Returns:
+        PackingResult with the entries ordered by value, highest first
+    """
+    score = score or (lambda entry: entry.relevance_score)
+    max_entries = len(contexts) if max_entries is None else max_entries
+    candidates = []
+    for index, entry in enumerate(contexts):
+        value = score(entry)
+        if value <= 0:
+            continue
+        cost = estimate_tokens(entry.content) + ENTRY_OVERHEAD_TOKENS
+        candidates.append((value / cost, value, cost, index, entry))
+    available = sum(cost for _, _, cost, _, _ in candidates)
+    # Highest value per token first, ties by value and then original order
+    candidates.sort(key=lambda item: (-item[0], -item[1], item[3]))
+
+    selected = []
+    chosen = set()
+    used = 0
+    seen_sources = set()
+    seen_types = set()
+
+    def take(item):
+        nonlocal used
+        selected.append(item)
+        chosen.add(item[3])
+        used += item[2]
+        seen_sources.add(item[4].source)
+        seen_types.add(item[4].context_type)
+
+    # First pass: anything in the first half of the budget, then only entries
+    # bringing a new source or type
+    for item in candidates:
+        if len(selected) >= max_entries:
+            break
+        if used + item[2] > token_budget:
+            continue
+        entry = item[4]
+        if (used < token_budget // 2 or entry.source not in seen_sources
+                or entry.context_type not in seen_types):
+            take(item)
+
+    # Second pass: fill what is left by value per token
+    for item in candidates:
+        if len(selected) >= max_entries:
+            break
+        if item[3] not in chosen and used + item[2] <= token_budget:
+            take(item)
+
+    entries = [(value, index, entry) for _, value, _, index, entry in selected]
+    truncated = 0
+
+    # Truncate the most valuable entry that did not fit into the remaining space
+    remaining = token_budget - used - ENTRY_OVERHEAD_TOKENS
+    if len(selected) < max_entries and remaining >= MIN_FRAGMENT_TOKENS:
+        leftovers = [item for item in candidates if item[3] not in chosen]
+        if leftovers:
+            _, value, _, index, entry = max(leftovers, key=lambda item: (item[1], -item[3]))
+            content = truncate_to_tokens(entry.content, remaining)
+            fragment = entry.replace(content=content, metadata={**entry.metadata, "truncated": True})
+            entries.append((value, index, fragment))
+            chosen.add(index)
+            used += estimate_tokens(content) + ENTRY_OVERHEAD_TOKENS
+            truncated = 1
+
+    entries.sort(key=lambda item: (-item[0], item[1]))
+    return PackingResult(
+        entries=[entry for _, _, entry in entries],
+        tokens_used=used,
+        tokens_available=available,
+        dropped=len(contexts) - len(entries),
+        truncated=truncated
+    )
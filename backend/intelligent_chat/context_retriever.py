@@ -9,7 +9,10 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta, timezone
 
 from .models import BaseContextRetriever, ContextEntry
+from .context_packing import pack_context_entries, DEFAULT_CONTEXT_TOKEN_BUDGET
 from .exceptions import ContextRetrievalError
+from backend.request_tracing import traced, STAGE_CONTEXT_RETRIEVER
+from backend.context_record import as_context_record
 
 # Import existing components
 try:
@@ -18,12 +21,10 @@ try:
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from context_retrieval_engine import ContextRetrievalEngine
     from memory_layer_manager import MemoryLayerManager
-    from memory_models import ContextEntryDTO
 except ImportError:
     # Fallback for testing or when components aren't available
     ContextRetrievalEngine = None
     MemoryLayerManager = None
-    ContextEntryDTO = None
 
 
 class ContextRetriever(BaseContextRetriever):
@@ -40,7 +41,8 @@ class ContextRetriever(BaseContextRetriever):
         memory_manager: Optional[MemoryLayerManager] = None,
         max_context_length: int = 4000,
         cache_ttl_seconds: int = 300,
-        compression_threshold: int = 8000
+        compression_threshold: int = 8000,
+        context_token_budget: Optional[int] = None
     ):
         """
         Initialize ContextRetriever.
@@ -51,12 +53,15 @@ class ContextRetriever(BaseContextRetriever):
             max_context_length: Maximum context length for summarization
             cache_ttl_seconds: Cache time-to-live in seconds
             compression_threshold: Context length threshold for compression
+            context_token_budget: Default token budget for context window packing,
+                None keeps the fixed entry counts
         """
         self.context_engine = context_engine
         self.memory_manager = memory_manager
         self.max_context_length = max_context_length
         self.cache_ttl_seconds = cache_ttl_seconds
         self.compression_threshold = compression_threshold
+        self.context_token_budget = context_token_budget
         
         # Context caching with TTL
         self._context_cache: Dict[str, Dict[str, Any]] = {}
@@ -82,11 +87,21 @@ class ContextRetriever(BaseContextRetriever):
             'compressed_sizes': []
         }
         
+        # Token budget packing statistics
+        self._packing_stats = {
+            'total_packed': 0,
+            'tokens_available': 0,
+            'tokens_used': 0,
+            'entries_dropped': 0,
+            'entries_truncated': 0
+        }
+        
         # Setup logging
         self.logger = logging.getLogger(__name__)
         
         self.logger.info("ContextRetriever initialized with UI enhancements")
     
+    @traced(STAGE_CONTEXT_RETRIEVER)
     async def get_relevant_context(
         self, 
         query: str, 
@@ -274,17 +289,28 @@ class ContextRetriever(BaseContextRetriever):
  
     # Context window management methods for performance optimization
     
-    def compress_context_window(self, contexts: List[ContextEntry], target_size: int) -> List[ContextEntry]:
+    def compress_context_window(
+        self, 
+        contexts: List[ContextEntry], 
+        target_size: int, 
+        token_budget: Optional[int] = None
+    ) -> List[ContextEntry]:
         """
         Compress context window to target size with intelligent prioritization.
         
         Args:
             contexts: List of context entries to compress
             target_size: Target number of contexts to keep
+            token_budget: Token budget for the window, defaults to context_token_budget.
+                With a budget, target_size only caps the number of entries.
             
         Returns:
             Compressed list of context entries
         """
+        token_budget = token_budget or self.context_token_budget
+        if token_budget:
+            return self.pack_context_window(contexts, token_budget, max_entries=target_size)
+        
         if len(contexts) <= target_size:
             return contexts
         
@@ -311,17 +337,37 @@ class ContextRetriever(BaseContextRetriever):
         self.logger.debug(f"Compressed {len(contexts)} contexts to {len(compressed)}")
         return compressed
     
-    def optimize_context_for_performance(self, contexts: List[ContextEntry], mode: str = "balanced") -> List[ContextEntry]:
+    def optimize_context_for_performance(
+        self, 
+        contexts: List[ContextEntry], 
+        mode: str = "balanced", 
+        token_budget: Optional[int] = None
+    ) -> List[ContextEntry]:
         """
         Optimize context for different performance modes.
         
         Args:
             contexts: List of context entries to optimize
             mode: Optimization mode - "speed", "accuracy", or "balanced"
+            token_budget: Token budget replacing the fixed entry counts of each mode,
+                defaults to context_token_budget
             
         Returns:
             Optimized list of context entries
         """
+        token_budget = token_budget or self.context_token_budget
+        if token_budget:
+            if mode == "speed":
+                # Highest relevance only, valued by relevance alone
+                high_relevance = [ctx for ctx in contexts if ctx.relevance_score > 0.7]
+                return self.pack_context_window(
+                    high_relevance, token_budget, score=lambda ctx: ctx.relevance_score
+                )
+            elif mode == "accuracy":
+                return self.pack_context_window(contexts, token_budget)
+            else:  # balanced
+                return self.pack_context_window(contexts, token_budget, score=self._calculate_balanced_score)
+        
         if mode == "speed":
             # Prioritize speed - minimal contexts, highest relevance only
             target_size = min(5, len(contexts))
@@ -335,6 +381,46 @@ class ContextRetriever(BaseContextRetriever):
             target_size = min(10, len(contexts))
             return self._optimize_for_balance(contexts, target_size)
     
+    def pack_context_window(
+        self, 
+        contexts: List[ContextEntry], 
+        token_budget: Optional[int] = None, 
+        max_entries: Optional[int] = None,
+        score=None
+    ) -> List[ContextEntry]:
+        """
+        Pack the most valuable context per token into a token budget.
+        
+        Args:
+            contexts: List of context entries to pack
+            token_budget: Estimated token budget, defaults to context_token_budget
+                or CONTEXT_TOKEN_BUDGET
+            max_entries: Optional cap on the number of entries
+            score: Value of an entry, the composite score by default
+            
+        Returns:
+            Packed list of context entries, highest value first
+        """
+        result = pack_context_entries(
+            contexts,
+            token_budget or self.context_token_budget or DEFAULT_CONTEXT_TOKEN_BUDGET,
+            max_entries=max_entries,
+            score=score or self._calculate_composite_score
+        )
+        
+        stats = self._packing_stats
+        stats['total_packed'] += 1
+        stats['tokens_available'] += result.tokens_available
+        stats['tokens_used'] += result.tokens_used
+        stats['entries_dropped'] += result.dropped
+        stats['entries_truncated'] += result.truncated
+        
+        self.logger.debug(
+            f"Packed {len(result.entries)} of {len(contexts)} contexts into "
+            f"{result.tokens_used} tokens ({result.tokens_available} available)"
+        )
+        return result.entries
+    
     def create_context_cache_entry(
         self, 
         contexts: List[ContextEntry], 
@@ -475,13 +561,24 @@ class ContextRetriever(BaseContextRetriever):
             Dictionary with compression statistics
         """
         stats = self._compression_stats
+        packing = self._packing_stats
+        token_packing = {
+            "total_packed_windows": packing['total_packed'],
+            "token_ratio": (
+                packing['tokens_used'] / packing['tokens_available']
+                if packing['tokens_available'] else 0.0
+            ),
+            "entries_dropped": packing['entries_dropped'],
+            "entries_truncated": packing['entries_truncated']
+        }
         
         if not stats['original_sizes'] or not stats['compressed_sizes']:
             return {
                 "compression_ratio": 0.0,
                 "total_compressed_contexts": stats['total_compressed'],
                 "average_original_size": 0.0,
-                "average_compressed_size": 0.0
+                "average_compressed_size": 0.0,
+                "token_packing": token_packing
             }
         
         avg_original = sum(stats['original_sizes']) / len(stats['original_sizes'])
@@ -492,7 +589,8 @@ class ContextRetriever(BaseContextRetriever):
             "compression_ratio": compression_ratio,
             "total_compressed_contexts": stats['total_compressed'],
             "average_original_size": avg_original,
-            "average_compressed_size": avg_compressed
+            "average_compressed_size": avg_compressed,
+            "token_packing": token_packing
         }    
 
     # Private helper methods
@@ -617,15 +715,7 @@ class ContextRetriever(BaseContextRetriever):
     def _optimize_for_balance(self, contexts: List[ContextEntry], target_size: int) -> List[ContextEntry]:
         """Optimize contexts for balanced performance."""
         # Use moderate diversity with good scoring
-        scored_contexts = []
-        for context in contexts:
-            score = self._calculate_composite_score(context)
-            # Apply slight penalty for very old contexts in balanced mode
-            if context.timestamp:
-                age_hours = (datetime.now(timezone.utc) - context.timestamp.replace(tzinfo=timezone.utc)).total_seconds() / 3600
-                if age_hours > 168:  # 1 week
-                    score *= 0.9
-            scored_contexts.append((score, context))
+        scored_contexts = [(self._calculate_balanced_score(context), context) for context in contexts]
         
         scored_contexts.sort(key=lambda x: x[0], reverse=True)
         
@@ -635,6 +725,15 @@ class ContextRetriever(BaseContextRetriever):
             target_size
         )
     
+    def _calculate_balanced_score(self, context: ContextEntry) -> float:
+        """Composite score with a slight penalty for very old contexts."""
+        score = self._calculate_composite_score(context)
+        if context.timestamp:
+            age_hours = (datetime.now(timezone.utc) - context.timestamp.replace(tzinfo=timezone.utc)).total_seconds() / 3600
+            if age_hours > 168:  # 1 week
+                score *= 0.9
+        return score
+    
     def _get_effectiveness_boost(self, source: str) -> float:
         """Get effectiveness boost for a source."""
         if source not in self._effectiveness_tracking:
@@ -822,35 +921,9 @@ class ContextRetriever(BaseContextRetriever):
         return compressed[:target_length - 3] + "..."
     
     def _convert_memory_contexts_to_context_entries(self, memory_contexts: List) -> List[ContextEntry]:
-        """Convert memory layer contexts to ContextEntry objects."""
-        context_entries = []
-        
-        for ctx in memory_contexts:
-            if hasattr(ctx, 'content'):  # ContextEntryDTO
-                context_entries.append(ContextEntry(
-                    content=ctx.content,
-                    source=ctx.source,
-                    relevance_score=ctx.relevance_score,
-                    timestamp=ctx.timestamp,
-                    context_type=ctx.context_type,
-                    metadata=ctx.metadata
-                ))
-        
-        return context_entries
+        """Pass memory layer contexts through; they already are ContextEntry records."""
+        return [as_context_record(ctx) for ctx in memory_contexts if hasattr(ctx, 'content')]
     
     def _convert_engine_contexts_to_context_entries(self, engine_contexts: List) -> List[ContextEntry]:
-        """Convert context engine contexts to ContextEntry objects."""
-        context_entries = []
-        
-        for ctx in engine_contexts:
-            if hasattr(ctx, 'content'):  # ContextEntryDTO
-                context_entries.append(ContextEntry(
-                    content=ctx.content,
-                    source=ctx.source,
-                    relevance_score=ctx.relevance_score,
-                    timestamp=ctx.timestamp,
-                    context_type=ctx.context_type,
-                    metadata=ctx.metadata
-                ))
-        
-        return context_entries
\ No newline at end of file
+        """Pass context engine contexts through; they already are ContextEntry records."""
+        return [as_context_record(ctx) for ctx in engine_contexts if hasattr(ctx, 'content')]
\ No newline at end of file
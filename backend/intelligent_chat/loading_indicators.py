@@ -3,9 +3,11 @@ Loading indicator system for visual feedback during tool execution.
 """
 
 import asyncio
+import math
 import time
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, List, Optional, Callable, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from .models import LoadingIndicator, LoadingState
@@ -31,6 +33,7 @@ class ProgressUpdate:
     message: str
     timestamp: datetime = field(default_factory=datetime.now)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    session_id: Optional[str] = None
 
 
 @dataclass
@@ -45,15 +48,89 @@ class LoadingConfiguration:
     update_interval: float = 0.5
 
 
+IndicatorKey = Tuple[Optional[str], str]
+
+LOADING_TICK_INTERVAL = 0.25
+LOADING_WHEEL_SLOTS = 64
+LOADING_CLEANUP_DELAY = 2.0
+
+_STEP = "step"
+_CLEANUP = "cleanup"
+
+
+class TimingWheel:
+    """Hashed timing wheel keeping at most one timer per key.
+
+    A timer lands in the slot of the tick it is due on, so advancing one tick
+    only visits that slot rather than every pending timer. Timers further out
+    than one revolution stay in their slot until their tick comes round.
+    """
+
+    def __init__(self, tick_interval: float = LOADING_TICK_INTERVAL, slots: int = LOADING_WHEEL_SLOTS):
+        self.tick_interval = tick_interval
+        self.tick = 0
+        self._slots: List[Dict[Any, Tuple[int, Any]]] = [{} for _ in range(slots)]
+        self._timers: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._timers
+
+    def schedule(self, key: Any, delay: float, payload: Any = None):
+        """Schedule ``payload`` for ``key`` after ``delay`` seconds, replacing its current timer"""
+        self.cancel(key)
+        due = self.tick + max(1, math.ceil(delay / self.tick_interval))
+        slot = due % len(self._slots)
+        self._slots[slot][key] = (due, payload)
+        self._timers[key] = slot
+
+    def cancel(self, key: Any) -> bool:
+        slot = self._timers.pop(key, None)
+        if slot is None:
+            return False
+        self._slots[slot].pop(key, None)
+        return True
+
+    def advance(self) -> List[Tuple[Any, Any]]:
+        """Move one tick forward and return the ``(key, payload)`` timers now due"""
+        self.tick += 1
+        slot = self._slots[self.tick % len(self._slots)]
+        due = [(key, payload) for key, (due_tick, payload) in slot.items() if due_tick <= self.tick]
+        for key, _ in due:
+            del slot[key]
+            del self._timers[key]
+        return due
+
+
 class LoadingIndicatorManager:
-    """Manages loading indicators for tool execution."""
+    """Manages loading indicators for tool execution.
+
+    Indicators are keyed by ``(session_id, tool_name)`` so concurrent sessions
+    running the same tool keep separate indicators. Callers that pass no
+    session address the sessionless indicator, or else the tool's most
+    recently started one. Automatic step progress and delayed
+    cleanup of every indicator run on one timing wheel driven by a single
+    ticker task, which exists only while timers are pending and hands each
+    tick's updates to batch callbacks in one call.
+    """
     
-    def __init__(self):
-        self._active_indicators: Dict[str, LoadingIndicator] = {}
+    def __init__(self, tick_interval: float = LOADING_TICK_INTERVAL, cleanup_delay: float = LOADING_CLEANUP_DELAY):
+        self._active_indicators: Dict[IndicatorKey, LoadingIndicator] = {}
         self._progress_callbacks: Dict[str, List[Callable]] = {}
+        self._batch_callbacks: List[Callable[[List[ProgressUpdate]], Any]] = []
         self._configurations: Dict[str, LoadingConfiguration] = {}
-        self._start_times: Dict[str, datetime] = {}
-        self._update_tasks: Dict[str, asyncio.Task] = {}
+        self._start_times: Dict[IndicatorKey, datetime] = {}
+        # Indicators per tool name, so per-tool callbacks go once its last indicator does
+        self._tool_counts: Counter = Counter()
+        # Most recently started indicator per tool, for callers that do not pass a session
+        self._latest_by_tool: Dict[str, IndicatorKey] = {}
+        # Step plans of indicators advancing on the wheel: key -> (config, next step index)
+        self._step_plans: Dict[IndicatorKey, Tuple[LoadingConfiguration, int]] = {}
+        self._wheel = TimingWheel(tick_interval)
+        self._ticker_task: Optional[asyncio.Task] = None
+        self.cleanup_delay = cleanup_delay
         
         # Default configurations for different tool types
         self._setup_default_configurations()
@@ -132,7 +209,8 @@ class LoadingIndicatorManager:
         self._configurations[tool_name] = config
     
     def start_loading(self, tool_name: str, tool_type: Optional[ToolType] = None, 
-                     custom_message: Optional[str] = None) -> LoadingIndicator:
+                     custom_message: Optional[str] = None,
+                     session_id: Optional[str] = None) -> LoadingIndicator:
         """Start loading indicator for a tool."""
         # Determine configuration
         config_key = tool_name if tool_name in self._configurations else (
@@ -149,51 +227,85 @@ class LoadingIndicatorManager:
             estimated_time=config.estimated_duration
         )
         
-        self._active_indicators[tool_name] = indicator
-        self._start_times[tool_name] = datetime.now()
+        key = (session_id, tool_name)
+        if key not in self._active_indicators:
+            self._tool_counts[tool_name] += 1
+        self._active_indicators[key] = indicator
+        self._latest_by_tool[tool_name] = key
+        self._start_times[key] = datetime.now()
+        self._step_plans.pop(key, None)
         
-        # Start progress update task if needed and event loop is running
-        if config.progress_steps:
-            try:
-                loop = asyncio.get_running_loop()
-                self._update_tasks[tool_name] = loop.create_task(
-                    self._auto_update_progress(tool_name, config)
-                )
-            except RuntimeError:
-                # No event loop running, skip auto-update
-                pass
+        # Walk through the progress steps on the shared ticker if an event loop is running
+        if config.progress_steps and self._schedule(key, 0.0, _STEP):
+            self._step_plans[key] = (config, 0)
         
         return indicator
     
-    async def _auto_update_progress(self, tool_name: str, config: LoadingConfiguration):
-        """Automatically update progress based on configuration."""
+    def _schedule(self, key: IndicatorKey, delay: float, kind: str) -> bool:
+        """Put a timer on the wheel, starting the ticker; False without a running event loop."""
         try:
-            steps = config.progress_steps
-            step_duration = config.estimated_duration / len(steps)
-            
-            for i, step_message in enumerate(steps):
-                if tool_name not in self._active_indicators:
-                    break
-                
-                progress = (i + 1) / len(steps)
-                await self.update_progress(tool_name, progress, step_message)
-                
-                # Wait for step duration or until completion
-                await asyncio.sleep(step_duration)
-                
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        
+        self._wheel.schedule(key, delay, kind)
+        if self._ticker_task is None or self._ticker_task.done() or self._ticker_task.get_loop() is not loop:
+            self._ticker_task = loop.create_task(self._run_ticker())
+        return True
+    
+    async def _run_ticker(self):
+        """Advance the wheel while timers are pending, then exit."""
+        loop = asyncio.get_running_loop()
+        started = loop.time() - self._wheel.tick * self._wheel.tick_interval
+        try:
+            while len(self._wheel):
+                await asyncio.sleep(self._wheel.tick_interval)
+                # Catch up on ticks missed while the loop was busy
+                target = int((loop.time() - started) / self._wheel.tick_interval)
+                for _ in range(max(1, target - self._wheel.tick)):
+                    await self._tick()
         except asyncio.CancelledError:
             pass
         except Exception as e:
             # Log error but don't crash
-            print(f"Error in auto progress update for {tool_name}: {e}")
+            print(f"Error in loading indicator ticker: {e}")
     
-    async def update_progress(self, tool_name: str, progress: float, 
-                            message: Optional[str] = None) -> bool:
-        """Update progress for a tool."""
-        if tool_name not in self._active_indicators:
-            return False
+    async def _tick(self):
+        """Apply the timers due on this tick and publish their updates as one batch."""
+        updates = []
+        for key, kind in self._wheel.advance():
+            if kind == _CLEANUP:
+                self._remove(key)
+            elif kind == _STEP and key in self._step_plans:
+                update = self._advance_step(key)
+                if update:
+                    updates.append(update)
+        
+        if not updates:
+            return
+        for update in updates:
+            await self._notify_progress_callbacks(update.tool_name, update.progress, update.message)
+        await self._notify_batch_callbacks(updates)
+    
+    def _advance_step(self, key: IndicatorKey) -> Optional[ProgressUpdate]:
+        """Move an indicator to its next configured step and schedule the one after."""
+        config, step = self._step_plans.pop(key)
+        steps = config.progress_steps
+        indicator = self._active_indicators.get(key)
+        if indicator is None or indicator.state not in (LoadingState.LOADING, LoadingState.PROCESSING):
+            return None
         
-        indicator = self._active_indicators[tool_name]
+        progress = (step + 1) / len(steps)
+        self._apply_progress(key, indicator, progress, steps[step])
+        if step + 1 < len(steps) and self._schedule(key, config.estimated_duration / len(steps), _STEP):
+            self._step_plans[key] = (config, step + 1)
+        
+        session_id, tool_name = key
+        return ProgressUpdate(tool_name=tool_name, progress=indicator.progress,
+                              message=steps[step], session_id=session_id)
+    
+    def _apply_progress(self, key: IndicatorKey, indicator: LoadingIndicator, progress: float,
+                        message: Optional[str]):
         indicator.progress = min(max(progress, 0.0), 1.0)
         indicator.state = LoadingState.PROCESSING if progress < 1.0 else LoadingState.COMPLETED
         
@@ -201,10 +313,21 @@ class LoadingIndicatorManager:
             indicator.message = message
         
         # Update estimated time based on actual progress
-        if progress > 0 and tool_name in self._start_times:
-            elapsed = (datetime.now() - self._start_times[tool_name]).total_seconds()
+        if progress > 0 and key in self._start_times:
+            elapsed = (datetime.now() - self._start_times[key]).total_seconds()
             estimated_total = elapsed / progress
             indicator.estimated_time = max(0, estimated_total - elapsed)
+    
+    async def update_progress(self, tool_name: str, progress: float, 
+                            message: Optional[str] = None,
+                            session_id: Optional[str] = None) -> bool:
+        """Update progress for a tool."""
+        key = self._resolve_key(tool_name, session_id)
+        indicator = self._active_indicators.get(key)
+        if indicator is None:
+            return False
+        
+        self._apply_progress(key, indicator, progress, message)
         
         # Notify callbacks
         await self._notify_progress_callbacks(tool_name, progress, message or "")
@@ -212,12 +335,14 @@ class LoadingIndicatorManager:
         return True
     
     def complete_loading(self, tool_name: str, success: bool = True, 
-                        final_message: Optional[str] = None) -> bool:
+                        final_message: Optional[str] = None,
+                        session_id: Optional[str] = None) -> bool:
         """Complete loading for a tool."""
-        if tool_name not in self._active_indicators:
+        key = self._resolve_key(tool_name, session_id)
+        indicator = self._active_indicators.get(key)
+        if indicator is None:
             return False
         
-        indicator = self._active_indicators[tool_name]
         indicator.progress = 1.0
         indicator.state = LoadingState.COMPLETED if success else LoadingState.ERROR
         indicator.estimated_time = 0.0
@@ -229,40 +354,50 @@ class LoadingIndicatorManager:
         else:
             indicator.message = f"{tool_name} failed"
         
-        # Cancel auto-update task
-        if tool_name in self._update_tasks:
-            self._update_tasks[tool_name].cancel()
-            del self._update_tasks[tool_name]
-        
-        # Clean up after a delay if event loop is running
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(self._cleanup_indicator(tool_name, delay=2.0))
-        except RuntimeError:
-            # No event loop running, don't clean up immediately in tests
-            # Let the indicator remain for inspection
-            pass
+        # Replace any pending step with a delayed cleanup; without an event loop
+        # the indicator remains for inspection
+        self._step_plans.pop(key, None)
+        if not self._schedule(key, self.cleanup_delay, _CLEANUP):
+            self._wheel.cancel(key)
         
         return True
     
-    async def _cleanup_indicator(self, tool_name: str, delay: float = 2.0):
-        """Clean up indicator after delay."""
-        await asyncio.sleep(delay)
-        self._active_indicators.pop(tool_name, None)
-        self._start_times.pop(tool_name, None)
-        self._progress_callbacks.pop(tool_name, None)
+    def _remove(self, key: IndicatorKey):
+        self._wheel.cancel(key)
+        self._step_plans.pop(key, None)
+        self._start_times.pop(key, None)
+        if self._active_indicators.pop(key, None) is None:
+            return
+        tool_name = key[1]
+        if self._latest_by_tool.get(tool_name) == key:
+            del self._latest_by_tool[tool_name]
+        self._tool_counts[tool_name] -= 1
+        if self._tool_counts[tool_name] <= 0:
+            del self._tool_counts[tool_name]
+            self._progress_callbacks.pop(tool_name, None)
+    
+    def _resolve_key(self, tool_name: str, session_id: Optional[str]) -> IndicatorKey:
+        """Key of an indicator; without a session, fall back to the tool's latest indicator."""
+        key = (session_id, tool_name)
+        if session_id is not None or key in self._active_indicators:
+            return key
+        return self._latest_by_tool.get(tool_name, key)
     
     def get_active_indicators(self) -> List[LoadingIndicator]:
         """Get all active loading indicators."""
         return list(self._active_indicators.values())
     
-    def get_indicator(self, tool_name: str) -> Optional[LoadingIndicator]:
+    def get_session_indicators(self, session_id: Optional[str]) -> List[LoadingIndicator]:
+        """Get the loading indicators of one session."""
+        return [indicator for (session, _), indicator in self._active_indicators.items() if session == session_id]
+    
+    def get_indicator(self, tool_name: str, session_id: Optional[str] = None) -> Optional[LoadingIndicator]:
         """Get specific loading indicator."""
-        return self._active_indicators.get(tool_name)
+        return self._active_indicators.get(self._resolve_key(tool_name, session_id))
     
-    def is_loading(self, tool_name: str) -> bool:
+    def is_loading(self, tool_name: str, session_id: Optional[str] = None) -> bool:
         """Check if tool is currently loading."""
-        indicator = self._active_indicators.get(tool_name)
+        indicator = self._active_indicators.get(self._resolve_key(tool_name, session_id))
         return indicator is not None and indicator.state in [LoadingState.LOADING, LoadingState.PROCESSING]
     
     def add_progress_callback(self, tool_name: str, callback: Callable[[str, float, str], None]):
@@ -271,6 +406,10 @@ class LoadingIndicatorManager:
             self._progress_callbacks[tool_name] = []
         self._progress_callbacks[tool_name].append(callback)
     
+    def add_batch_callback(self, callback: Callable[[List[ProgressUpdate]], Any]):
+        """Add callback receiving all automatic progress updates of a ticker tick at once."""
+        self._batch_callbacks.append(callback)
+    
     async def _notify_progress_callbacks(self, tool_name: str, progress: float, message: str):
         """Notify progress callbacks."""
         callbacks = self._progress_callbacks.get(tool_name, [])
@@ -283,6 +422,17 @@ class LoadingIndicatorManager:
             except Exception as e:
                 print(f"Error in progress callback for {tool_name}: {e}")
     
+    async def _notify_batch_callbacks(self, updates: List[ProgressUpdate]):
+        """Notify batch callbacks."""
+        for callback in self._batch_callbacks:
+            try:
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(updates)
+                else:
+                    callback(updates)
+            except Exception as e:
+                print(f"Error in batch progress callback: {e}")
+    
     def get_concurrent_loading_count(self) -> int:
         """Get number of currently loading tools."""
         return len([i for i in self._active_indicators.values() 
@@ -297,17 +447,14 @@ class LoadingIndicatorManager:
             "processing": len([i for i in indicators if i.state == LoadingState.PROCESSING]),
             "completed": len([i for i in indicators if i.state == LoadingState.COMPLETED]),
             "error": len([i for i in indicators if i.state == LoadingState.ERROR]),
-            "tools": [i.tool_name for i in indicators]
+            "tools": [i.tool_name for i in indicators],
+            "sessions": len({session for session, _ in self._active_indicators}),
+            "pending_timers": len(self._wheel)
         }
     
-    def manual_cleanup(self, tool_name: str):
+    def manual_cleanup(self, tool_name: str, session_id: Optional[str] = None):
         """Manually clean up indicator (useful for testing)."""
-        self._active_indicators.pop(tool_name, None)
-        self._start_times.pop(tool_name, None)
-        self._progress_callbacks.pop(tool_name, None)
-        if tool_name in self._update_tasks:
-            self._update_tasks[tool_name].cancel()
-            del self._update_tasks[tool_name]
+        self._remove(self._resolve_key(tool_name, session_id))
 
 
 class ConcurrentLoadingManager:
@@ -317,23 +464,26 @@ class ConcurrentLoadingManager:
         self.loading_manager = loading_manager
         self._coordination_groups: Dict[str, List[str]] = {}
         self._group_progress: Dict[str, float] = {}
+        self._group_sessions: Dict[str, Optional[str]] = {}
     
     def create_coordination_group(self, group_id: str, tool_names: List[str]):
         """Create a coordination group for related tools."""
         self._coordination_groups[group_id] = tool_names
         self._group_progress[group_id] = 0.0
     
-    async def start_coordinated_loading(self, group_id: str, tool_configs: Dict[str, ToolType]):
+    async def start_coordinated_loading(self, group_id: str, tool_configs: Dict[str, ToolType],
+                                        session_id: Optional[str] = None):
         """Start loading for a coordinated group of tools."""
         if group_id not in self._coordination_groups:
             raise ValueError(f"Coordination group {group_id} not found")
         
         tool_names = self._coordination_groups[group_id]
         indicators = []
+        self._group_sessions[group_id] = session_id
         
         for tool_name in tool_names:
             tool_type = tool_configs.get(tool_name, ToolType.UNKNOWN)
-            indicator = self.loading_manager.start_loading(tool_name, tool_type)
+            indicator = self.loading_manager.start_loading(tool_name, tool_type, session_id=session_id)
             indicators.append(indicator)
         
         return indicators
@@ -347,8 +497,9 @@ class ConcurrentLoadingManager:
         total_progress = 0.0
         active_tools = 0
         
+        session_id = self._group_sessions.get(group_id)
         for tool_name in tool_names:
-            indicator = self.loading_manager.get_indicator(tool_name)
+            indicator = self.loading_manager.get_indicator(tool_name, session_id)
             if indicator:
                 total_progress += indicator.progress
                 active_tools += 1
@@ -363,4 +514,5 @@ class ConcurrentLoadingManager:
     def cleanup_group(self, group_id: str):
         """Clean up coordination group."""
         self._coordination_groups.pop(group_id, None)
-        self._group_progress.pop(group_id, None)
\ No newline at end of file
+        self._group_progress.pop(group_id, None)
+        self._group_sessions.pop(group_id, None)
\ No newline at end of file
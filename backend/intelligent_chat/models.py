@@ -5,9 +5,11 @@ Data models and interfaces for the intelligent chat UI system.
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 from abc import ABC, abstractmethod
 
+from backend.context_record import ContextRecord
+
 
 class ContentType(Enum):
     """Content types for response rendering."""
@@ -110,15 +112,8 @@ class UIState:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
-class ContextEntry:
-    """Context entry for conversation history."""
-    content: str
-    source: str
-    relevance_score: float
-    timestamp: datetime
-    context_type: str
-    metadata: Dict[str, Any] = field(default_factory=dict)
+# Context entries are the memory layer's slotted record, passed through without conversion
+ContextEntry = ContextRecord
 
 
 @dataclass
@@ -143,6 +138,20 @@ class ToolResult:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+class CacheScope(Enum):
+    """Who may reuse a cached tool result."""
+    GLOBAL = "global"
+    USER = "user"
+
+
+@dataclass(frozen=True)
+class ToolCachePolicy:
+    """Declares that a tool's results may be cached and reused."""
+    ttl: int
+    scope: CacheScope = CacheScope.GLOBAL
+    key_func: Optional[Callable[[str], str]] = None
+
+
 # Base interfaces for core components
 
 class BaseChatManager(ABC):
@@ -117,6 +117,7 @@ class PerformanceCache:
             'response_cache': 600,  # 10 minutes
             'context_cache': 900,  # 15 minutes
             'query_analysis': 1200,  # 20 minutes
+            'tool_results': 600,  # 10 minutes, overridden per tool
         }
     
     def get(self, key: str, category: str = 'default') -> Optional[Any]:
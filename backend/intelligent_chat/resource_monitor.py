@@ -27,6 +27,7 @@ from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import QueuePool
 
 from backend.database import DATABASE_URL
+from backend.engine_registry import engine_registry, POOL_OLTP
 
 
 class ResourceType(Enum):
@@ -468,9 +469,14 @@ class DatabaseConnectionManager:
     Optimized database connection manager with pooling and monitoring.
     """
     
-    def __init__(self, database_url: str = DATABASE_URL):
-        """Initialize connection manager."""
-        self.database_url = database_url
+    def __init__(self, database_url: Optional[str] = None):
+        """
+        Initialize connection manager.
+        
+        Without a database_url the OLTP engine of the engine registry is
+        shared; an explicit URL gets a dedicated engine.
+        """
+        self.database_url = database_url or DATABASE_URL
         self.logger = logging.getLogger(__name__)
         
         # Connection pool configuration
@@ -479,8 +485,13 @@ class DatabaseConnectionManager:
         self.pool_timeout = 30
         self.pool_recycle = 3600  # 1 hour
         
-        # Create optimized engine
-        self.engine = self._create_optimized_engine()
+        if database_url is None:
+            size = engine_registry.pool_size(POOL_OLTP)
+            self.pool_size = size.pool_size
+            self.max_overflow = size.max_overflow
+            self.engine = engine_registry.get_engine(POOL_OLTP)
+        else:
+            self.engine = self._create_optimized_engine()
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         
         # Connection monitoring
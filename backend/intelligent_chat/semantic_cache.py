@@ -0,0 +1,367 @@
+"""
+Semantic Response Cache
+
+Shares chat responses between paraphrases of the same question, across users
+and sessions. "What are your support hours?" and "support hours please"
+normalize to the same key. Looser paraphrases are matched by MinHash/LSH
+candidates re-ranked by TF-IDF cosine similarity, using the index from
+``backend.ticket_similarity``.
+
+Only answers that cannot depend on the asking user are shared:
+- the query must match a cacheable intent (support hours, knowledge-base
+  how-tos) and must not mention account data such as bills or orders
+- every tool behind the answer must be user-independent
+- the answer must not repeat the user's own conversation history
+
+Each intent has its own TTL. Intents answered from the knowledge base are
+invalidated by SQLAlchemy listeners when KnowledgeEntry or
+UnifiedKnowledgeEntry rows are written by this process; the TTL bounds how
+long other workers keep serving an answer after such a change. The same
+listeners drop the cached results of the knowledge-base tools.
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from backend.ticket_similarity import TicketSimilarityIndex, tokenize
+from .models import ChatResponse, ContentType, ContextEntry
+from .tool_orchestrator import KNOWLEDGE_BASE_TOOLS, ToolOrchestrator
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000"))
+
+# Politeness and filler words that do not change what is being asked
+FILLER_WORDS = frozenset({
+    "please", "pls", "plz", "thank", "thanks", "hi", "hello", "hey", "tell", "know",
+    "could", "would", "like", "want", "wonder", "just", "kindly", "about", "any",
+    "get", "some", "info", "information", "again", "quick", "question", "us", "am",
+})
+
+# Words that make an answer specific to the asking customer
+_PERSONAL_PATTERN = re.compile(
+    r"\b(account|bill|billing|balance|invoice|order|payment|charge|refund|contract|"
+    r"usage|ticket|password|address|postcode|engineer|appointment|complaint)s?\b"
+    r"|\d{4,}|@"
+)
+
+# Tools whose results are the same for every user
+USER_INDEPENDENT_TOOLS = frozenset({
+    "SupportKnowledgeBase", "BTSupportHours", "BTWebsiteSearch", "BTPlansInformation",
+})
+
+# Context types holding the user's own conversation
+USER_CONTEXT_TYPES = frozenset({"user_message", "bot_response", "conversation", "session"})
+
+
+@dataclass(frozen=True)
+class CacheIntent:
+    """A class of questions whose answers can be shared between users"""
+    name: str
+    ttl: int
+    terms: FrozenSet[str]
+    depends_on_knowledge: bool = True
+
+
+# Terms are matched against normalized (stemmed) query terms
+DEFAULT_INTENTS: Tuple[CacheIntent, ...] = (
+    CacheIntent("support_hours", ttl=3600,
+                terms=frozenset({"hour", "open", "clos", "close", "weekend", "holiday"})),
+    CacheIntent("knowledge_base", ttl=900,
+                terms=frozenset({"reset", "setup", "install", "configure", "router", "hub",
+                                 "wifi", "troubleshoot", "restart", "guide", "faq", "speed"})),
+)
+
+
+def normalize_query(text: Optional[str]) -> str:
+    """Lowercased, stemmed query terms without stop words or filler words"""
+    return " ".join(token for token in tokenize(text) if token not in FILLER_WORDS)
+
+
+@dataclass
+class SemanticCacheEntry:
+    """A cached response and the normalized query it answers"""
+    entry_id: int
+    key: str
+    intent: str
+    response: Dict[str, Any]
+    expires_at: float
+    hits: int = 0
+
+
+@dataclass
+class SemanticCacheStats:
+    """Counters of cache activity"""
+    lookups: int = 0
+    exact_hits: int = 0
+    similar_hits: int = 0
+    stores: int = 0
+    rejected: int = 0
+    invalidations: int = 0
+    evictions: int = 0
+    hits_by_intent: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def hits(self) -> int:
+        return self.exact_hits + self.similar_hits
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+class SemanticResponseCache:
+    """
+    Response cache keyed by normalized query within an intent.
+
+    Lookups try the exact normalized key first and then the most similar
+    cached query of the same intent scoring at least ``threshold``.
+    """
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+                 intents: Iterable[CacheIntent] = DEFAULT_INTENTS,
+                 min_confidence: float = 0.5,
+                 clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.intents = tuple(intents)
+        self.min_confidence = min_confidence
+        self.clock = clock
+        self.stats = SemanticCacheStats()
+
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[int, SemanticCacheEntry]" = OrderedDict()
+        self._keys: Dict[Tuple[str, str], int] = {}
+        self._index = TicketSimilarityIndex()
+        self._next_id = 1
+        self._listeners: List[Tuple[Any, str, Callable]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def classify(self, message: str) -> Optional[CacheIntent]:
+        """Cacheable intent of a query, None when its answer may be user-specific"""
+        if not message or _PERSONAL_PATTERN.search(message.lower()):
+            return None
+        terms = set(normalize_query(message).split())
+        for intent in self.intents:
+            if terms & intent.terms:
+                return intent
+        return None
+
+    def lookup(self, message: str, session_id: Optional[str] = None) -> Optional[ChatResponse]:
+        """Cached response to a paraphrase of ``message``, or None"""
+        intent = self.classify(message)
+        if intent is None:
+            return None
+        key = normalize_query(message)
+
+        with self._lock:
+            self.stats.lookups += 1
+            entry = self._live_entry(self._keys.get((intent.name, key)))
+            similarity = 1.0
+            if entry is not None:
+                self.stats.exact_hits += 1
+            else:
+                for match in self._index.query(key, limit=3, min_score=self.threshold,
+                                               where=lambda metadata: metadata["intent"] == intent.name):
+                    entry = self._live_entry(match.ticket_id)
+                    if entry is not None:
+                        similarity = match.score
+                        self.stats.similar_hits += 1
+                        break
+            if entry is None:
+                return None
+
+            entry.hits += 1
+            self._entries.move_to_end(entry.entry_id)
+            self.stats.hits_by_intent[intent.name] = self.stats.hits_by_intent.get(intent.name, 0) + 1
+            data = entry.response
+
+        ui_hints = dict(data["ui_hints"])
+        ui_hints.update({
+            "cached": True,
+            "semantic_cache": {"intent": intent.name, "similarity": similarity},
+        })
+        if session_id is not None:
+            ui_hints["session_id"] = session_id
+        return ChatResponse(
+            content=data["content"],
+            content_type=data["content_type"],
+            tools_used=list(data["tools_used"]),
+            context_used=list(data["context_used"]),
+            confidence_score=data["confidence_score"],
+            execution_time=data["execution_time"],
+            ui_hints=ui_hints,
+            timestamp=datetime.now(timezone.utc)
+        )
+
+    def is_cacheable(self, response: ChatResponse, context: Optional[List[ContextEntry]] = None) -> bool:
+        """Whether a response is safe to share with other users"""
+        if response.content_type == ContentType.ERROR_MESSAGE or response.ui_hints.get("error"):
+            return False
+        if response.confidence_score < self.min_confidence or not response.content:
+            return False
+        if not response.tools_used or not set(response.tools_used) <= USER_INDEPENDENT_TOOLS:
+            return False
+        for entry in context or ():
+            if entry.context_type in USER_CONTEXT_TYPES and entry.content and entry.content in response.content:
+                return False
+        return True
+
+    def store(self, message: str, response: ChatResponse,
+              context: Optional[List[ContextEntry]] = None) -> bool:
+        """Cache a response when its query and content are user-independent"""
+        intent = self.classify(message)
+        if intent is None:
+            return False
+        if not self.is_cacheable(response, context):
+            with self._lock:
+                self.stats.rejected += 1
+            return False
+
+        key = normalize_query(message)
+        data = {
+            "content": response.content,
+            "content_type": response.content_type,
+            "tools_used": list(response.tools_used),
+            "context_used": list(response.context_used),
+            "confidence_score": response.confidence_score,
+            "execution_time": response.execution_time,
+            "ui_hints": {name: value for name, value in response.ui_hints.items() if name != "session_id"},
+        }
+        with self._lock:
+            self._remove_locked(self._keys.get((intent.name, key)))
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = SemanticCacheEntry(
+                entry_id=entry_id, key=key, intent=intent.name, response=data,
+                expires_at=self.clock() + intent.ttl
+            )
+            self._keys[(intent.name, key)] = entry_id
+            self._index.add(entry_id, key, {"intent": intent.name})
+            self.stats.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._remove_locked(next(iter(self._entries)))
+                self.stats.evictions += 1
+        return True
+
+    def _live_entry(self, entry_id: Optional[int]) -> Optional[SemanticCacheEntry]:
+        if entry_id is None:
+            return None
+        entry = self._entries.get(entry_id)
+        if entry is not None and entry.expires_at <= self.clock():
+            self._remove_locked(entry_id)
+            return None
+        return entry
+
+    def _remove_locked(self, entry_id: Optional[int]):
+        entry = self._entries.pop(entry_id, None) if entry_id is not None else None
+        if entry is None:
+            return
+        self._keys.pop((entry.intent, entry.key), None)
+        self._index.remove(entry_id)
+
+    def invalidate(self, intents: Optional[Iterable[str]] = None) -> int:
+        """Drop the entries of some intents, or of all intents"""
+        names = None if intents is None else set(intents)
+        with self._lock:
+            stale = [entry_id for entry_id, entry in self._entries.items()
+                     if names is None or entry.intent in names]
+            for entry_id in stale:
+                self._remove_locked(entry_id)
+            self.stats.invalidations += len(stale)
+        return len(stale)
+
+    def invalidate_knowledge(self) -> int:
+        """Drop answers built from knowledge-base content"""
+        return self.invalidate(intent.name for intent in self.intents if intent.depends_on_knowledge)
+
+    def cleanup_expired(self) -> int:
+        """Drop expired entries"""
+        now = self.clock()
+        with self._lock:
+            expired = [entry_id for entry_id, entry in self._entries.items() if entry.expires_at <= now]
+            for entry_id in expired:
+                self._remove_locked(entry_id)
+        return len(expired)
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+            self._index = TicketSimilarityIndex()
+            self.stats = SemanticCacheStats()
+
+    def register_knowledge_listeners(self, models: Iterable[Any]):
+        """Invalidate knowledge-based answers and tool results when rows of ``models`` are written"""
+        def knowledge_written(mapper, connection, target):
+            dropped = self.invalidate_knowledge()
+            dropped_results = sum(ToolOrchestrator.invalidate_tool_results(tool) for tool in KNOWLEDGE_BASE_TOOLS)
+            if dropped or dropped_results:
+                logger.info(f"Knowledge entry {getattr(target, 'id', None)} changed, "
+                            f"dropped {dropped} cached responses and {dropped_results} tool results")
+
+        for model in models:
+            for identifier in ("after_insert", "after_update", "after_delete"):
+                if not event.contains(model, identifier, knowledge_written):
+                    event.listen(model, identifier, knowledge_written)
+                    self._listeners.append((model, identifier, knowledge_written))
+
+    def unregister_listeners(self):
+        for model, identifier, listener in self._listeners:
+            if event.contains(model, identifier, listener):
+                event.remove(model, identifier, listener)
+        self._listeners = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate and counters for monitoring"""
+        with self._lock:
+            stats = self.stats
+            return {
+                "enabled": SEMANTIC_CACHE_ENABLED,
+                "entries": len(self._entries),
+                "threshold": self.threshold,
+                "lookups": stats.lookups,
+                "hits": stats.hits,
+                "exact_hits": stats.exact_hits,
+                "similar_hits": stats.similar_hits,
+                "hit_rate": round(stats.hit_rate, 4),
+                "hits_by_intent": dict(stats.hits_by_intent),
+                "stores": stats.stores,
+                "rejected": stats.rejected,
+                "invalidations": stats.invalidations,
+                "evictions": stats.evictions,
+            }
+
+
+_semantic_cache: Optional[SemanticResponseCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_response_cache() -> SemanticResponseCache:
+    """Get the global semantic response cache, invalidated by knowledge base writes"""
+    global _semantic_cache
+    with _semantic_cache_lock:
+        if _semantic_cache is None:
+            _semantic_cache = SemanticResponseCache()
+            try:
+                from backend.models import KnowledgeEntry
+                from backend.unified_models import UnifiedKnowledgeEntry
+                _semantic_cache.register_knowledge_listeners([KnowledgeEntry, UnifiedKnowledgeEntry])
+            except Exception as e:
+                logger.warning(f"Semantic cache knowledge invalidation unavailable: {e}")
+        return _semantic_cache
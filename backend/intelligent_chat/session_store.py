@@ -0,0 +1,452 @@
+"""
+Bounded per-session state for ChatManager.
+
+Each session keeps its counters in a slotted object and its recent messages
+in a fixed-size ring buffer of slotted records, so an idle session costs a
+few hundred bytes and an active one is bounded by the ring size. Sessions
+live in an LRU ordered by last use. Sessions idle past the TTL are evicted
+first, then the least recently used ones while the store is over its
+session count or memory budget. Access is O(1): the LRU order doubles as
+idle order, so expired sessions are always at the front.
+
+An optional backend shares session state between workers. The local store
+then acts as a write-through cache, and a session missing locally is
+loaded from the backend before a new one is created. Every save bumps the
+session version; a local copy older than the local TTL is checked against
+the backend on its next use and replaced when another worker saved a newer
+version, so a stale copy never overwrites newer shared state.
+"""
+
+import os
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SESSION_HISTORY_SIZE = int(os.getenv("CHAT_SESSION_HISTORY_SIZE", "20"))
+SESSION_MAX_COUNT = int(os.getenv("CHAT_SESSION_MAX_COUNT", "10000"))
+SESSION_MEMORY_BUDGET_MB = float(os.getenv("CHAT_SESSION_MEMORY_BUDGET_MB", "64"))
+SESSION_IDLE_TTL_SECONDS = float(os.getenv("CHAT_SESSION_IDLE_TTL_SECONDS", "86400"))
+# Seconds a local copy is used before it is checked against the shared backend
+SESSION_LOCAL_TTL_SECONDS = float(os.getenv("CHAT_SESSION_LOCAL_TTL_SECONDS", "1"))
+
+# Longest message text kept in session history
+MAX_RECORD_CHARS = 4000
+# Approximate footprint of the slotted objects, keys and small strings
+SESSION_BASE_BYTES = 400
+RECORD_BASE_BYTES = 120
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+class MessageRecord:
+    """One message of the session history"""
+
+    __slots__ = ("type", "content", "timestamp", "tools_used", "confidence_score")
+
+    def __init__(self, type: str, content: str, timestamp: Optional[datetime] = None,
+                 tools_used: Iterable[str] = (), confidence_score: Optional[float] = None):
+        self.type = type
+        self.content = (content or "")[:MAX_RECORD_CHARS]
+        self.timestamp = timestamp or datetime.now(timezone.utc)
+        self.tools_used = tuple(tools_used)
+        self.confidence_score = confidence_score
+
+    def size_bytes(self) -> int:
+        return RECORD_BASE_BYTES + len(self.content) + sum(len(tool) for tool in self.tools_used)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "content": self.content,
+            "timestamp": self.timestamp.isoformat(),
+            "tools_used": list(self.tools_used),
+            "confidence_score": self.confidence_score
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MessageRecord":
+        return cls(data["type"], data["content"], _parse_time(data.get("timestamp")),
+                   data.get("tools_used", ()), data.get("confidence_score"))
+
+
+class MessageRing:
+    """Fixed-capacity ring buffer, the oldest record is overwritten when full"""
+
+    __slots__ = ("capacity", "_items", "_start")
+
+    def __init__(self, capacity: int = SESSION_HISTORY_SIZE):
+        self.capacity = capacity
+        # Grows up to capacity, then wraps around _start
+        self._items: List[MessageRecord] = []
+        self._start = 0
+
+    def append(self, record: MessageRecord) -> Optional[MessageRecord]:
+        """Add a record and return the one it replaced, if any"""
+        if len(self._items) < self.capacity:
+            self._items.append(record)
+            return None
+        replaced = self._items[self._start]
+        self._items[self._start] = record
+        self._start = (self._start + 1) % self.capacity
+        return replaced
+
+    def tail(self, count: int) -> List[MessageRecord]:
+        """The latest records, oldest first"""
+        return list(self)[-count:] if count > 0 else []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[MessageRecord]:
+        for offset in range(len(self._items)):
+            yield self._items[(self._start + offset) % len(self._items)]
+
+
+class SessionState:
+    """Counters and recent history of one chat session
+
+    Supports mapping-style reads and writes of its fields so callers
+    written against the former plain-dict sessions keep working.
+    """
+
+    __slots__ = ("user_id", "session_id", "created_at", "last_activity", "message_count",
+                 "last_message", "last_response", "total_processing_time", "tools_used_count",
+                 "history", "size_bytes", "accounted_bytes", "touched_at", "version", "synced_at")
+
+    def __init__(self, user_id: str, session_id: str, history_size: int = SESSION_HISTORY_SIZE,
+                 created_at: Optional[datetime] = None):
+        now = datetime.now(timezone.utc)
+        self.user_id = user_id
+        self.session_id = session_id
+        self.created_at = created_at or now
+        self.last_activity = self.created_at
+        self.message_count = 0
+        self.last_message = ""
+        self.last_response = ""
+        self.total_processing_time = 0.0
+        self.tools_used_count = 0
+        self.history = MessageRing(history_size)
+        self.size_bytes = SESSION_BASE_BYTES + len(user_id) + len(session_id)
+        # Size last added to the store total
+        self.accounted_bytes = 0
+        self.touched_at = 0.0
+        # Saves so far, and when the local copy last matched the backend
+        self.version = 0
+        self.synced_at = 0.0
+
+    @property
+    def key(self) -> str:
+        return f"{self.user_id}:{self.session_id}"
+
+    def add_message(self, record: MessageRecord):
+        replaced = self.history.append(record)
+        self.size_bytes += record.size_bytes() - (replaced.size_bytes() if replaced else 0)
+
+    def record_exchange(self, message: str, response: str, tools_used: Iterable[str] = (),
+                        confidence_score: Optional[float] = None, processing_time: float = 0.0):
+        """Count one user message and bot response and add both to the history"""
+        now = datetime.now(timezone.utc)
+        tools_used = tuple(tools_used)
+        self.message_count += 1
+        self.last_activity = now
+        self.size_bytes -= len(self.last_message) + len(self.last_response)
+        self.last_message = message[:MAX_RECORD_CHARS]
+        self.last_response = response[:MAX_RECORD_CHARS]
+        self.size_bytes += len(self.last_message) + len(self.last_response)
+        self.total_processing_time += processing_time
+        self.tools_used_count += len(tools_used)
+        self.add_message(MessageRecord("user_message", message, now))
+        self.add_message(MessageRecord("bot_response", response, now, tools_used, confidence_score))
+
+    def __getitem__(self, name: str) -> Any:
+        if name == "conversation_history":
+            return [record.to_dict() for record in self.history]
+        if name not in self.__slots__:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __setitem__(self, name: str, value: Any):
+        if name not in self.__slots__:
+            raise KeyError(name)
+        setattr(self, name, value)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.__slots__ or name == "conversation_history"
+
+    def get(self, name: str, default: Any = None) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "user_id": self.user_id,
+            "session_id": self.session_id,
+            "created_at": self.created_at.isoformat(),
+            "last_activity": self.last_activity.isoformat(),
+            "message_count": self.message_count,
+            "last_message": self.last_message,
+            "last_response": self.last_response,
+            "total_processing_time": self.total_processing_time,
+            "tools_used_count": self.tools_used_count,
+            "history": [record.to_dict() for record in self.history],
+            "version": self.version
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], history_size: int = SESSION_HISTORY_SIZE) -> "SessionState":
+        state = cls(data.get("user_id", ""), data.get("session_id", ""), history_size,
+                    _parse_time(data["created_at"]) if isinstance(data.get("created_at"), str)
+                    else data.get("created_at"))
+        last_activity = data.get("last_activity")
+        state.last_activity = (_parse_time(last_activity) if isinstance(last_activity, str)
+                               else last_activity or state.created_at)
+        state.message_count = data.get("message_count", 0)
+        state.last_message = data.get("last_message", "")
+        state.last_response = data.get("last_response", "")
+        state.size_bytes += len(state.last_message) + len(state.last_response)
+        state.total_processing_time = data.get("total_processing_time", 0.0)
+        state.tools_used_count = data.get("tools_used_count", 0)
+        state.version = data.get("version", 0)
+        for record in data.get("history", []):
+            state.add_message(MessageRecord.from_dict(record))
+        return state
+
+
+class SessionStateBackend:
+    """Shared storage of session state between workers; the default keeps nothing"""
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        return None
+
+    def save(self, key: str, data: Dict[str, Any], ttl_seconds: float):
+        pass
+
+    def delete(self, key: str):
+        pass
+
+
+class InMemorySessionBackend(SessionStateBackend):
+    """Backend within one process, for tests and single-worker setups"""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._data: Dict[str, Tuple[float, str]] = {}
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self.clock():
+            del self._data[key]
+            return None
+        return json.loads(entry[1])
+
+    def save(self, key: str, data: Dict[str, Any], ttl_seconds: float):
+        self._data[key] = (self.clock() + ttl_seconds, json.dumps(data))
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisSessionBackend(SessionStateBackend):
+    """Backend on a Redis client, shared by all workers
+
+    Args:
+        redis_client: Client with get, setex and delete, e.g. redis.Redis
+        prefix: Key prefix for session entries
+    """
+
+    def __init__(self, redis_client, prefix: str = "chat_session:"):
+        self.redis_client = redis_client
+        self.prefix = prefix
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self.redis_client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    def save(self, key: str, data: Dict[str, Any], ttl_seconds: float):
+        self.redis_client.setex(self.prefix + key, max(1, int(ttl_seconds)), json.dumps(data))
+
+    def delete(self, key: str):
+        self.redis_client.delete(self.prefix + key)
+
+
+class SessionStateStore:
+    """LRU of session states with idle TTL, session count and memory budget"""
+
+    def __init__(self, max_sessions: int = SESSION_MAX_COUNT,
+                 memory_budget_bytes: int = int(SESSION_MEMORY_BUDGET_MB * 1024 * 1024),
+                 idle_ttl_seconds: float = SESSION_IDLE_TTL_SECONDS,
+                 history_size: int = SESSION_HISTORY_SIZE,
+                 local_ttl_seconds: float = SESSION_LOCAL_TTL_SECONDS,
+                 backend: Optional[SessionStateBackend] = None,
+                 on_evict: Optional[Callable[[SessionState], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_sessions = max_sessions
+        self.memory_budget_bytes = memory_budget_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.history_size = history_size
+        self.local_ttl_seconds = local_ttl_seconds
+        self.backend = backend if backend is not None else SessionStateBackend()
+        self.on_evict = on_evict
+        self.clock = clock
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._memory_bytes = 0
+        self.stats = {"created": 0, "loaded": 0, "refreshed": 0, "evicted_idle": 0, "evicted_lru": 0}
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def get_session(self, user_id: str, session_id: str) -> Optional[SessionState]:
+        """The session marked as just used, loaded from the backend if needed
+
+        A local copy older than the local TTL is replaced by the backend copy
+        when that has a newer version.
+        """
+        key = f"{user_id}:{session_id}"
+        state = self._sessions.get(key)
+        now = self.clock()
+        if state is not None and now - state.synced_at < self.local_ttl_seconds:
+            self._touch(key, state)
+            return state
+
+        data = self.backend.load(key)
+        if state is not None:
+            if data is None or data.get("version", 0) <= state.version:
+                state.synced_at = now
+                self._touch(key, state)
+                return state
+            self._discard(key)
+            self.stats["refreshed"] += 1
+        elif data is None:
+            return None
+        else:
+            self.stats["loaded"] += 1
+        state = SessionState.from_dict(data, self.history_size)
+        state.synced_at = now
+        self._insert(key, state)
+        return state
+
+    def get_or_create(self, user_id: str, session_id: str) -> SessionState:
+        """The existing session, or a new one"""
+        state = self.get_session(user_id, session_id)
+        if state is None:
+            state = SessionState(user_id, session_id, self.history_size)
+            state.synced_at = self.clock()
+            self.stats["created"] += 1
+            self._insert(state.key, state)
+        return state
+
+    def save(self, state: SessionState):
+        """Account for changes of a session and write it through to the backend"""
+        key = state.key
+        if key not in self._sessions:
+            self._insert(key, state)
+        else:
+            self._memory_bytes += state.size_bytes - state.accounted_bytes
+            state.accounted_bytes = state.size_bytes
+            self._touch(key, state)
+            self._enforce_limits()
+        state.version += 1
+        state.synced_at = self.clock()
+        self.backend.save(key, state.to_dict(), self.idle_ttl_seconds)
+
+    def evict_idle(self) -> int:
+        """Evict the sessions idle for longer than the TTL"""
+        return self._evict_expired(self.clock())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "memory_bytes": self._memory_bytes,
+            "memory_budget_bytes": self.memory_budget_bytes,
+            **self.stats
+        }
+
+    # Mapping access by "user_id:session_id" key, without marking use
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._sessions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._sessions))
+
+    def __getitem__(self, key: str) -> SessionState:
+        return self._sessions[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._sessions.get(key, default)
+
+    def __setitem__(self, key: str, value: Any):
+        state = value if isinstance(value, SessionState) else SessionState.from_dict(dict(value), self.history_size)
+        if key in self._sessions:
+            self._discard(key)
+        self._insert(key, state)
+
+    def __delitem__(self, key: str):
+        if key not in self._sessions:
+            raise KeyError(key)
+        self._discard(key)
+        self.backend.delete(key)
+
+    def keys(self) -> List[str]:
+        return list(self._sessions)
+
+    def values(self) -> List[SessionState]:
+        return list(self._sessions.values())
+
+    def items(self) -> List[Tuple[str, SessionState]]:
+        return list(self._sessions.items())
+
+    def _touch(self, key: str, state: SessionState):
+        state.touched_at = self.clock()
+        self._sessions.move_to_end(key)
+
+    def _insert(self, key: str, state: SessionState):
+        state.touched_at = self.clock()
+        self._sessions[key] = state
+        state.accounted_bytes = state.size_bytes
+        self._memory_bytes += state.size_bytes
+        self._enforce_limits()
+
+    def _discard(self, key: str) -> SessionState:
+        state = self._sessions.pop(key)
+        self._memory_bytes -= state.accounted_bytes
+        return state
+
+    def _evict(self, key: str, reason: str):
+        state = self._discard(key)
+        self.stats[reason] += 1
+        if self.on_evict:
+            self.on_evict(state)
+
+    def _evict_expired(self, now: float) -> int:
+        evicted = 0
+        # Least recently used first, so the idle sessions are all at the front
+        while self._sessions:
+            key, state = next(iter(self._sessions.items()))
+            if now - state.touched_at <= self.idle_ttl_seconds:
+                break
+            self._evict(key, "evicted_idle")
+            evicted += 1
+        return evicted
+
+    def _enforce_limits(self):
+        self._evict_expired(self.clock())
+        # Never evict the session just used, it is at the end
+        while len(self._sessions) > 1 and (
+                len(self._sessions) > self.max_sessions or self._memory_bytes > self.memory_budget_bytes):
+            self._evict(next(iter(self._sessions)), "evicted_lru")
@@ -5,12 +5,15 @@ Tool execution status monitoring system for comprehensive tracking and user feed
 import asyncio
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Callable, Any, Set
+from typing import Dict, List, Optional, Callable, Any, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from .models import LoadingState, ErrorSeverity
 from .loading_indicators import LoadingIndicatorManager, ToolType
 
+# Monitored executions are keyed like loading indicators: (session_id, tool_name)
+ExecutionKey = Tuple[Optional[str], str]
+
 
 class ExecutionStatus(Enum):
     """Execution status for tools."""
@@ -57,6 +60,7 @@ class StatusUpdate:
     timestamp: datetime = field(default_factory=datetime.now)
     metadata: Dict[str, Any] = field(default_factory=dict)
     metrics: Optional[ExecutionMetrics] = None
+    session_id: Optional[str] = None
 
 
 @dataclass
@@ -72,6 +76,7 @@ class Notification:
     dismiss_after: float = 5.0
     actions: List[str] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    session_id: Optional[str] = None
 
 
 @dataclass
@@ -99,19 +104,23 @@ class ErrorVisualization:
 
 
 class ToolExecutionMonitor:
-    """Monitors tool execution with comprehensive status tracking."""
+    """Monitors tool execution with comprehensive status tracking.
+
+    Executions are keyed by ``(session_id, tool_name)`` so the same tool running
+    in two sessions keeps separate status, history and loading indicators.
+    """
     
     def __init__(self, loading_manager: LoadingIndicatorManager):
         self.loading_manager = loading_manager
-        self._execution_status: Dict[str, ExecutionStatus] = {}
-        self._execution_metrics: Dict[str, ExecutionMetrics] = {}
-        self._status_history: Dict[str, List[StatusUpdate]] = {}
+        self._execution_status: Dict[ExecutionKey, ExecutionStatus] = {}
+        self._execution_metrics: Dict[ExecutionKey, ExecutionMetrics] = {}
+        self._status_history: Dict[ExecutionKey, List[StatusUpdate]] = {}
         self._notifications: Dict[str, Notification] = {}
-        self._error_visualizations: Dict[str, ErrorVisualization] = {}
+        self._error_visualizations: Dict[ExecutionKey, ErrorVisualization] = {}
         self._status_callbacks: List[Callable[[StatusUpdate], None]] = []
         self._notification_callbacks: List[Callable[[Notification], None]] = []
-        self._monitoring_tasks: Dict[str, asyncio.Task] = {}
-        self._completion_callbacks: Dict[str, List[Callable]] = {}
+        self._monitoring_tasks: Dict[ExecutionKey, asyncio.Task] = {}
+        self._completion_callbacks: Dict[ExecutionKey, List[Callable]] = {}
         
         # Configuration
         self.default_timeout = 300.0  # 5 minutes
@@ -121,32 +130,35 @@ class ToolExecutionMonitor:
     
     def start_monitoring(self, tool_name: str, tool_type: Optional[ToolType] = None,
                         timeout: Optional[float] = None, 
-                        custom_message: Optional[str] = None) -> str:
+                        custom_message: Optional[str] = None,
+                        session_id: Optional[str] = None) -> str:
         """Start monitoring a tool execution."""
         # Start loading indicator
-        self.loading_manager.start_loading(tool_name, tool_type, custom_message)
+        self.loading_manager.start_loading(tool_name, tool_type, custom_message, session_id=session_id)
         
         # Initialize execution tracking
-        self._execution_status[tool_name] = ExecutionStatus.PENDING
-        self._execution_metrics[tool_name] = ExecutionMetrics(start_time=datetime.now())
-        self._status_history[tool_name] = []
+        key = (session_id, tool_name)
+        self._execution_status[key] = ExecutionStatus.PENDING
+        self._execution_metrics[key] = ExecutionMetrics(start_time=datetime.now())
+        self._status_history[key] = []
         
         # Create initial status update
         status_update = StatusUpdate(
             tool_name=tool_name,
+            session_id=key[0],
             status=ExecutionStatus.PENDING,
             progress=0.0,
             message=custom_message or f"Starting {tool_name}...",
-            metrics=self._execution_metrics[tool_name]
+            metrics=self._execution_metrics[key]
         )
-        self._add_status_update(tool_name, status_update)
+        self._add_status_update(key, status_update)
         
         # Start monitoring task
         monitor_timeout = timeout or self.default_timeout
         try:
             loop = asyncio.get_running_loop()
-            self._monitoring_tasks[tool_name] = loop.create_task(
-                self._monitor_execution(tool_name, monitor_timeout)
+            self._monitoring_tasks[key] = loop.create_task(
+                self._monitor_execution(key, monitor_timeout)
             )
         except RuntimeError:
             # No event loop running
@@ -154,11 +166,12 @@ class ToolExecutionMonitor:
         
         # Create notification
         notification = Notification(
-            notification_id=f"{tool_name}_started",
+            notification_id=self._notification_id(key, "started"),
             notification_type=NotificationType.INFO,
             title="Tool Started",
             message=f"{tool_name} execution started",
             tool_name=tool_name,
+            session_id=key[0],
             auto_dismiss=True,
             dismiss_after=3.0
         )
@@ -166,26 +179,27 @@ class ToolExecutionMonitor:
         
         return tool_name
     
-    async def _monitor_execution(self, tool_name: str, timeout: float):
+    async def _monitor_execution(self, key: ExecutionKey, timeout: float):
         """Monitor tool execution with timeout and progress tracking."""
+        session_id, tool_name = key
         start_time = time.time()
         
         try:
-            while tool_name in self._execution_status:
+            while key in self._execution_status:
                 current_time = time.time()
                 elapsed = current_time - start_time
                 
                 # Check timeout
                 if elapsed > timeout:
-                    await self._handle_timeout(tool_name)
+                    await self._handle_timeout(key)
                     break
                 
                 # Update progress based on elapsed time (if no manual updates)
-                status = self._execution_status.get(tool_name)
+                status = self._execution_status.get(key)
                 if status in [ExecutionStatus.RUNNING, ExecutionStatus.STARTING]:
                     # Estimate progress based on time (rough approximation)
                     estimated_progress = min(elapsed / timeout, 0.9)  # Cap at 90%
-                    await self.update_progress(tool_name, estimated_progress)
+                    await self.update_progress(tool_name, estimated_progress, session_id=session_id)
                 
                 # Check if completed
                 if status in [ExecutionStatus.COMPLETED, ExecutionStatus.FAILED, 
@@ -195,121 +209,132 @@ class ToolExecutionMonitor:
                 await asyncio.sleep(self.progress_update_interval)
                 
         except asyncio.CancelledError:
-            await self._handle_cancellation(tool_name)
+            await self._handle_cancellation(key)
         except Exception as e:
-            await self._handle_monitoring_error(tool_name, e)
+            await self._handle_monitoring_error(key, e)
     
     async def update_status(self, tool_name: str, status: ExecutionStatus, 
                            message: Optional[str] = None, 
-                           metadata: Optional[Dict[str, Any]] = None):
+                           metadata: Optional[Dict[str, Any]] = None,
+                           session_id: Optional[str] = None):
         """Update tool execution status."""
-        if tool_name not in self._execution_status:
+        key = self._execution_key(tool_name, session_id)
+        if key not in self._execution_status:
             return False
+        session_id = key[0]
         
-        old_status = self._execution_status[tool_name]
-        self._execution_status[tool_name] = status
+        old_status = self._execution_status[key]
+        self._execution_status[key] = status
         
         # Update metrics
-        metrics = self._execution_metrics.get(tool_name)
+        metrics = self._execution_metrics.get(key)
         if metrics and status == ExecutionStatus.COMPLETED:
             metrics.end_time = datetime.now()
             metrics.duration = (metrics.end_time - metrics.start_time).total_seconds()
         
         # Create status update
-        current_progress = 0.0
-        if tool_name in self.loading_manager._active_indicators:
-            current_progress = self.loading_manager._active_indicators[tool_name].progress
+        indicator = self.loading_manager.get_indicator(tool_name, session_id)
+        current_progress = indicator.progress if indicator else 0.0
         
         status_update = StatusUpdate(
             tool_name=tool_name,
+            session_id=key[0],
             status=status,
             progress=current_progress,
             message=message or self._get_default_status_message(status, tool_name),
             metadata=metadata or {},
             metrics=metrics
         )
-        self._add_status_update(tool_name, status_update)
+        self._add_status_update(key, status_update)
         
         # Update loading indicator
         if status == ExecutionStatus.RUNNING:
-            await self.loading_manager.update_progress(tool_name, current_progress, status_update.message)
+            await self.loading_manager.update_progress(tool_name, current_progress, status_update.message,
+                                                       session_id=session_id)
         elif status == ExecutionStatus.COMPLETED:
-            self.loading_manager.complete_loading(tool_name, True, status_update.message)
+            self.loading_manager.complete_loading(tool_name, True, status_update.message, session_id=session_id)
         elif status in [ExecutionStatus.FAILED, ExecutionStatus.TIMEOUT, ExecutionStatus.CANCELLED]:
-            self.loading_manager.complete_loading(tool_name, False, status_update.message)
+            self.loading_manager.complete_loading(tool_name, False, status_update.message, session_id=session_id)
         
         # Create notifications for important status changes
-        await self._create_status_notification(tool_name, old_status, status, status_update.message)
+        await self._create_status_notification(key, old_status, status, status_update.message)
         
         # Trigger completion callbacks
         if status in [ExecutionStatus.COMPLETED, ExecutionStatus.FAILED, ExecutionStatus.CANCELLED]:
-            await self._trigger_completion_callbacks(tool_name, status)
+            await self._trigger_completion_callbacks(key, status)
         
         return True
     
     async def update_progress(self, tool_name: str, progress: float, 
-                            message: Optional[str] = None):
+                            message: Optional[str] = None,
+                            session_id: Optional[str] = None):
         """Update tool execution progress."""
-        if tool_name not in self._execution_status:
+        key = self._execution_key(tool_name, session_id)
+        if key not in self._execution_status:
             return False
         
         # Update loading indicator
-        success = await self.loading_manager.update_progress(tool_name, progress, message)
+        success = await self.loading_manager.update_progress(tool_name, progress, message, session_id=key[0])
         
         if success:
             # Create progress status update
             status_update = StatusUpdate(
                 tool_name=tool_name,
-                status=self._execution_status[tool_name],
+                session_id=key[0],
+                status=self._execution_status[key],
                 progress=progress,
                 message=message or f"{tool_name} progress: {progress:.1%}",
-                metrics=self._execution_metrics.get(tool_name)
+                metrics=self._execution_metrics.get(key)
             )
-            self._add_status_update(tool_name, status_update)
+            self._add_status_update(key, status_update)
         
         return success
     
     def complete_execution(self, tool_name: str, success: bool, 
                           result_message: Optional[str] = None,
-                          result_data: Optional[Any] = None):
+                          result_data: Optional[Any] = None,
+                          session_id: Optional[str] = None):
         """Complete tool execution."""
-        if tool_name not in self._execution_status:
+        key = self._execution_key(tool_name, session_id)
+        if key not in self._execution_status:
             return False
         
         status = ExecutionStatus.COMPLETED if success else ExecutionStatus.FAILED
         message = result_message or ("Execution completed successfully" if success else "Execution failed")
         
         # Update status synchronously
-        self._execution_status[tool_name] = status
+        self._execution_status[key] = status
         
         # Update metrics
-        metrics = self._execution_metrics.get(tool_name)
+        metrics = self._execution_metrics.get(key)
         if metrics:
             metrics.end_time = datetime.now()
             metrics.duration = (metrics.end_time - metrics.start_time).total_seconds()
         
         # Complete loading indicator
-        self.loading_manager.complete_loading(tool_name, success, message)
+        self.loading_manager.complete_loading(tool_name, success, message, session_id=key[0])
         
         # Create final status update
         status_update = StatusUpdate(
             tool_name=tool_name,
+            session_id=key[0],
             status=status,
             progress=1.0,
             message=message,
             metadata={"result_data": result_data} if result_data else {},
             metrics=metrics
         )
-        self._add_status_update(tool_name, status_update)
+        self._add_status_update(key, status_update)
         
         # Create completion notification
         notification_type = NotificationType.SUCCESS if success else NotificationType.ERROR
         notification = Notification(
-            notification_id=f"{tool_name}_completed",
+            notification_id=self._notification_id(key, "completed"),
             notification_type=notification_type,
             title="Tool Completed" if success else "Tool Failed",
             message=message,
             tool_name=tool_name,
+            session_id=key[0],
             auto_dismiss=success,  # Only auto-dismiss success notifications
             dismiss_after=5.0 if success else 0.0
         )
@@ -318,15 +343,17 @@ class ToolExecutionMonitor:
         # Schedule cleanup
         try:
             loop = asyncio.get_running_loop()
-            loop.create_task(self._cleanup_after_delay(tool_name))
+            loop.create_task(self._cleanup_after_delay(key, metrics))
         except RuntimeError:
             pass
         
         return True
     
     def create_error_visualization(self, tool_name: str, error: Exception,
-                                 context: Optional[Dict[str, Any]] = None) -> ErrorVisualization:
+                                 context: Optional[Dict[str, Any]] = None,
+                                 session_id: Optional[str] = None) -> ErrorVisualization:
         """Create error visualization with recovery options."""
+        key = self._execution_key(tool_name, session_id)
         error_type = type(error).__name__
         error_message = str(error)
         
@@ -352,15 +379,16 @@ class ToolExecutionMonitor:
             related_tools=related_tools
         )
         
-        self._error_visualizations[tool_name] = error_viz
+        self._error_visualizations[key] = error_viz
         
         # Create error notification
         notification = Notification(
-            notification_id=f"{tool_name}_error",
+            notification_id=self._notification_id(key, "error"),
             notification_type=NotificationType.ERROR,
             title=f"Error in {tool_name}",
             message=error_message,
             tool_name=tool_name,
+            session_id=key[0],
             auto_dismiss=False,
             actions=[opt.option_id for opt in recovery_options[:3]]  # Show top 3 options
         )
@@ -368,25 +396,29 @@ class ToolExecutionMonitor:
         
         return error_viz
     
-    def get_execution_status(self, tool_name: str) -> Optional[ExecutionStatus]:
+    def get_execution_status(self, tool_name: str, session_id: Optional[str] = None) -> Optional[ExecutionStatus]:
         """Get current execution status for a tool."""
-        return self._execution_status.get(tool_name)
+        return self._execution_status.get(self._execution_key(tool_name, session_id))
     
-    def get_execution_metrics(self, tool_name: str) -> Optional[ExecutionMetrics]:
+    def get_execution_session(self, tool_name: str) -> Optional[str]:
+        """Get the session of the tool's latest monitored execution."""
+        return self._execution_key(tool_name)[0]
+    
+    def get_execution_metrics(self, tool_name: str, session_id: Optional[str] = None) -> Optional[ExecutionMetrics]:
         """Get execution metrics for a tool."""
-        return self._execution_metrics.get(tool_name)
+        return self._execution_metrics.get(self._execution_key(tool_name, session_id))
     
-    def get_status_history(self, tool_name: str) -> List[StatusUpdate]:
+    def get_status_history(self, tool_name: str, session_id: Optional[str] = None) -> List[StatusUpdate]:
         """Get status history for a tool."""
-        return self._status_history.get(tool_name, [])
+        return self._status_history.get(self._execution_key(tool_name, session_id), [])
     
     def get_active_notifications(self) -> List[Notification]:
         """Get all active notifications."""
         return list(self._notifications.values())
     
-    def get_error_visualization(self, tool_name: str) -> Optional[ErrorVisualization]:
+    def get_error_visualization(self, tool_name: str, session_id: Optional[str] = None) -> Optional[ErrorVisualization]:
         """Get error visualization for a tool."""
-        return self._error_visualizations.get(tool_name)
+        return self._error_visualizations.get(self._execution_key(tool_name, session_id))
     
     def dismiss_notification(self, notification_id: str) -> bool:
         """Dismiss a notification."""
@@ -403,11 +435,12 @@ class ToolExecutionMonitor:
         """Add callback for notifications."""
         self._notification_callbacks.append(callback)
     
-    def add_completion_callback(self, tool_name: str, callback: Callable):
+    def add_completion_callback(self, tool_name: str, callback: Callable, session_id: Optional[str] = None):
         """Add callback for tool completion."""
-        if tool_name not in self._completion_callbacks:
-            self._completion_callbacks[tool_name] = []
-        self._completion_callbacks[tool_name].append(callback)
+        key = self._execution_key(tool_name, session_id)
+        if key not in self._completion_callbacks:
+            self._completion_callbacks[key] = []
+        self._completion_callbacks[key].append(callback)
     
     def get_monitoring_summary(self) -> Dict[str, Any]:
         """Get summary of all monitoring activities."""
@@ -426,21 +459,38 @@ class ToolExecutionMonitor:
             "failed_tools": failed_tools,
             "active_notifications": len(self._notifications),
             "error_visualizations": len(self._error_visualizations),
-            "tools": list(self._execution_status.keys())
+            "tools": list(dict.fromkeys(tool_name for _, tool_name in self._execution_status))
         }
     
     # Private helper methods
     
-    def _add_status_update(self, tool_name: str, status_update: StatusUpdate):
+    def _execution_key(self, tool_name: str, session_id: Optional[str] = None) -> ExecutionKey:
+        """Key of an execution; without a session, fall back to the tool's latest execution."""
+        key = (session_id, tool_name)
+        if session_id is not None or key in self._execution_status:
+            return key
+        for other in reversed(list(self._execution_status)):
+            if other[1] == tool_name:
+                return other
+        return key
+    
+    def _notification_id(self, key: ExecutionKey, suffix: str) -> str:
+        """Notification id of an execution, scoped to its session when it has one."""
+        session_id, tool_name = key
+        if session_id is None:
+            return f"{tool_name}_{suffix}"
+        return f"{session_id}:{tool_name}_{suffix}"
+    
+    def _add_status_update(self, key: ExecutionKey, status_update: StatusUpdate):
         """Add status update to history and notify callbacks."""
-        if tool_name not in self._status_history:
-            self._status_history[tool_name] = []
+        if key not in self._status_history:
+            self._status_history[key] = []
         
-        self._status_history[tool_name].append(status_update)
+        self._status_history[key].append(status_update)
         
         # Limit history size
-        if len(self._status_history[tool_name]) > 100:
-            self._status_history[tool_name] = self._status_history[tool_name][-50:]
+        if len(self._status_history[key]) > 100:
+            self._status_history[key] = self._status_history[key][-50:]
         
         # Notify callbacks
         for callback in self._status_callbacks:
@@ -488,9 +538,10 @@ class ToolExecutionMonitor:
         }
         return messages.get(status, f"{tool_name} status: {status.value}")
     
-    async def _create_status_notification(self, tool_name: str, old_status: ExecutionStatus,
+    async def _create_status_notification(self, key: ExecutionKey, old_status: ExecutionStatus,
                                         new_status: ExecutionStatus, message: str):
         """Create notification for important status changes."""
+        tool_name = key[1]
         important_transitions = [
             ExecutionStatus.COMPLETED,
             ExecutionStatus.FAILED,
@@ -502,19 +553,21 @@ class ToolExecutionMonitor:
             notification_type = NotificationType.SUCCESS if new_status == ExecutionStatus.COMPLETED else NotificationType.ERROR
             
             notification = Notification(
-                notification_id=f"{tool_name}_{new_status.value}",
+                notification_id=self._notification_id(key, new_status.value),
                 notification_type=notification_type,
                 title=f"Tool {new_status.value.title()}",
                 message=message,
                 tool_name=tool_name,
+                session_id=key[0],
                 auto_dismiss=new_status == ExecutionStatus.COMPLETED,
                 dismiss_after=5.0 if new_status == ExecutionStatus.COMPLETED else 0.0
             )
             self._add_notification(notification)
     
-    async def _trigger_completion_callbacks(self, tool_name: str, status: ExecutionStatus):
+    async def _trigger_completion_callbacks(self, key: ExecutionKey, status: ExecutionStatus):
         """Trigger completion callbacks for a tool."""
-        callbacks = self._completion_callbacks.get(tool_name, [])
+        tool_name = key[1]
+        callbacks = self._completion_callbacks.get(key, [])
         for callback in callbacks:
             try:
                 if asyncio.iscoroutinefunction(callback):
@@ -524,36 +577,43 @@ class ToolExecutionMonitor:
             except Exception as e:
                 print(f"Error in completion callback for {tool_name}: {e}")
     
-    async def _handle_timeout(self, tool_name: str):
+    async def _handle_timeout(self, key: ExecutionKey):
         """Handle tool execution timeout."""
+        session_id, tool_name = key
         await self.update_status(tool_name, ExecutionStatus.TIMEOUT, 
-                               f"{tool_name} execution timed out")
+                               f"{tool_name} execution timed out", session_id=session_id)
     
-    async def _handle_cancellation(self, tool_name: str):
+    async def _handle_cancellation(self, key: ExecutionKey):
         """Handle tool execution cancellation."""
+        session_id, tool_name = key
         await self.update_status(tool_name, ExecutionStatus.CANCELLED,
-                               f"{tool_name} execution was cancelled")
+                               f"{tool_name} execution was cancelled", session_id=session_id)
     
-    async def _handle_monitoring_error(self, tool_name: str, error: Exception):
+    async def _handle_monitoring_error(self, key: ExecutionKey, error: Exception):
         """Handle monitoring error."""
+        session_id, tool_name = key
         await self.update_status(tool_name, ExecutionStatus.FAILED,
-                               f"Monitoring error for {tool_name}: {error}")
+                               f"Monitoring error for {tool_name}: {error}", session_id=session_id)
     
-    async def _cleanup_after_delay(self, tool_name: str):
+    async def _cleanup_after_delay(self, key: ExecutionKey, metrics: Optional[ExecutionMetrics]):
         """Clean up monitoring data after delay."""
         await asyncio.sleep(self.auto_cleanup_delay)
         
+        # A restart of the same tool in the same session owns the key now
+        if self._execution_metrics.get(key) is not metrics:
+            return
+        
         # Clean up data structures
-        self._execution_status.pop(tool_name, None)
-        self._execution_metrics.pop(tool_name, None)
-        self._status_history.pop(tool_name, None)
-        self._error_visualizations.pop(tool_name, None)
-        self._completion_callbacks.pop(tool_name, None)
+        self._execution_status.pop(key, None)
+        self._execution_metrics.pop(key, None)
+        self._status_history.pop(key, None)
+        self._error_visualizations.pop(key, None)
+        self._completion_callbacks.pop(key, None)
         
         # Cancel monitoring task
-        if tool_name in self._monitoring_tasks:
-            self._monitoring_tasks[tool_name].cancel()
-            del self._monitoring_tasks[tool_name]
+        if key in self._monitoring_tasks:
+            self._monitoring_tasks[key].cancel()
+            del self._monitoring_tasks[key]
     
     def _determine_error_severity(self, error: Exception) -> ErrorSeverity:
         """Determine error severity based on exception type."""
@@ -650,5 +710,5 @@ class ToolExecutionMonitor:
         """Find tools related to the current tool."""
         # This is a simplified implementation
         # In practice, this could use tool metadata, categories, or dependencies
-        all_tools = list(self._execution_status.keys())
+        all_tools = list(dict.fromkeys(tool for _, tool in self._execution_status))
         return [tool for tool in all_tools if tool != tool_name][:3]  # Return up to 3 related tools
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""
+Live tool latency distributions for adaptive timeouts and hedging.
+
+Each tool keeps two fixed-memory log-bucketed histograms, the current and
+the previous window, so quantiles follow recent behaviour and memory stays
+constant. The quantiles drive:
+- the per-tool timeout, a multiple of p99 capped at the static timeout
+- the hedge delay, p95, after which an idempotent tool gets a duplicate call
+"""
+
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from backend.database_monitoring import LatencyHistogram
+
+TIMEOUT_PERCENTILE = float(os.getenv("TOOL_TIMEOUT_PERCENTILE", "99"))
+TIMEOUT_MULTIPLIER = float(os.getenv("TOOL_TIMEOUT_MULTIPLIER", "1.5"))
+TIMEOUT_FLOOR_SECONDS = float(os.getenv("TOOL_TIMEOUT_FLOOR_SECONDS", "0.5"))
+HEDGE_PERCENTILE = float(os.getenv("TOOL_HEDGE_PERCENTILE", "95"))
+HEDGING_ENABLED = os.getenv("TOOL_HEDGING", "true").lower() == "true"
+# Threads for duplicate calls of sync tools, kept apart from the tool pool
+HEDGE_MAX_THREADS = int(os.getenv("TOOL_HEDGE_MAX_THREADS", "2"))
+MIN_SAMPLES = int(os.getenv("TOOL_LATENCY_MIN_SAMPLES", "20"))
+WINDOW_SECONDS = float(os.getenv("TOOL_LATENCY_WINDOW_SECONDS", "300"))
+
+
+class RollingLatencyHistogram:
+    """Latency histogram over the current and the previous window."""
+
+    def __init__(self, window_seconds: float = WINDOW_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self._current = LatencyHistogram()
+        self._previous = LatencyHistogram()
+        self._window_start = clock()
+
+    def _rotate(self):
+        elapsed = self.clock() - self._window_start
+        if elapsed < self.window_seconds:
+            return
+        # After more than two windows of silence nothing recent is left
+        self._previous = self._current if elapsed < 2 * self.window_seconds else LatencyHistogram()
+        self._current = LatencyHistogram()
+        self._window_start = self.clock()
+
+    def record(self, seconds: float):
+        self._rotate()
+        self._current.record(seconds)
+
+    def snapshot(self) -> LatencyHistogram:
+        """Merged histogram of both windows"""
+        self._rotate()
+        merged = LatencyHistogram()
+        merged.merge(self._previous)
+        merged.merge(self._current)
+        return merged
+
+
+class ToolLatencyTracker:
+    """Per-tool latency quantiles with timeout and hedge delay derivation."""
+
+    def __init__(self, window_seconds: float = WINDOW_SECONDS, min_samples: int = MIN_SAMPLES,
+                 timeout_multiplier: float = TIMEOUT_MULTIPLIER,
+                 timeout_floor: float = TIMEOUT_FLOOR_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.timeout_multiplier = timeout_multiplier
+        self.timeout_floor = timeout_floor
+        self.clock = clock
+        self._tools: Dict[str, RollingLatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, tool_name: str, seconds: float):
+        """Record the duration of a completed or timed-out execution"""
+        with self._lock:
+            histogram = self._tools.get(tool_name)
+            if histogram is None:
+                histogram = self._tools[tool_name] = RollingLatencyHistogram(self.window_seconds, self.clock)
+            histogram.record(seconds)
+
+    def _snapshot(self, tool_name: str) -> Optional[LatencyHistogram]:
+        with self._lock:
+            histogram = self._tools.get(tool_name)
+            return histogram.snapshot() if histogram is not None else None
+
+    def percentile(self, tool_name: str, percentile: float) -> Optional[float]:
+        """Latency percentile in seconds, None until enough samples were seen"""
+        snapshot = self._snapshot(tool_name)
+        if snapshot is None or snapshot.count < self.min_samples:
+            return None
+        return snapshot.percentile(percentile)
+
+    def timeout_for(self, tool_name: str, static_timeout: float) -> float:
+        """Timeout from the live p99, never above the static timeout"""
+        p99 = self.percentile(tool_name, TIMEOUT_PERCENTILE)
+        if p99 is None:
+            return static_timeout
+        return min(static_timeout, max(self.timeout_floor, p99 * self.timeout_multiplier))
+
+    def hedge_delay(self, tool_name: str) -> Optional[float]:
+        """Delay after which a duplicate call is worth launching, None without data"""
+        return self.percentile(tool_name, HEDGE_PERCENTILE)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Latency percentiles in milliseconds per tool"""
+        with self._lock:
+            snapshots = {name: histogram.snapshot() for name, histogram in self._tools.items()}
+        return {name: snapshot.summary() for name, snapshot in sorted(snapshots.items())}
@@ -6,6 +6,7 @@ import asyncio
 import time
 import logging
 import hashlib
+import threading
 from typing import List, Dict, Any, Optional, Callable, Union
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
@@ -13,11 +14,34 @@ from .models import (
     BaseToolOrchestrator,
     ToolRecommendation,
     ToolResult,
-    ContextEntry
+    ContextEntry,
+    CacheScope,
+    ToolCachePolicy
 )
 from .exceptions import ToolExecutionError, ToolSelectionError
 from .performance_cache import get_tool_performance_cache, get_performance_cache
 from .resource_monitor import get_resource_monitor
+from .tool_latency import ToolLatencyTracker, HEDGING_ENABLED, HEDGE_MAX_THREADS
+from backend.request_tracing import record_stage, tool_stage
+
+TOOL_RESULT_CATEGORY = "tool_results"
+# Tools answering from knowledge entries, whose cached results are dropped
+# when a knowledge entry is written
+KNOWLEDGE_BASE_TOOLS = ("SupportKnowledgeBase",)
+
+
+def normalize_tool_query(query: str) -> str:
+    """Default cache key of a tool call: case and spacing insensitive query."""
+    return " ".join(query.lower().split()).strip(" ?!.")
+
+
+def cacheable_tool(ttl: int, scope: CacheScope = CacheScope.GLOBAL,
+                   key_func: Optional[Callable[[str], str]] = None):
+    """Decorator declaring that a tool's results may be cached for ``ttl`` seconds."""
+    def decorator(tool):
+        tool.cache_policy = ToolCachePolicy(ttl=ttl, scope=scope, key_func=key_func)
+        return tool
+    return decorator
 
 
 class ToolOrchestrator(BaseToolOrchestrator):
@@ -34,7 +58,11 @@ class ToolOrchestrator(BaseToolOrchestrator):
         available_tools: Optional[Dict[str, Union[Callable, Any]]] = None,
         max_concurrent_tools: int = 3,
         default_timeout: float = 30.0,
-        analytics_service=None
+        analytics_service=None,
+        cache_policies: Optional[Dict[str, Optional[ToolCachePolicy]]] = None,
+        hedging_enabled: bool = HEDGING_ENABLED,
+        degradation_handler=None,
+        max_hedge_threads: int = HEDGE_MAX_THREADS
     ):
         """
         Initialize ToolOrchestrator.
@@ -45,6 +73,14 @@ class ToolOrchestrator(BaseToolOrchestrator):
             max_concurrent_tools: Maximum number of tools to execute concurrently
             default_timeout: Default timeout for tool execution in seconds
             analytics_service: Analytics service for performance tracking
+            cache_policies: Result cache policies by tool name, overriding the
+                defaults; None disables caching for a tool
+            hedging_enabled: Launch a duplicate call of an idempotent tool that
+                runs past its p95 latency and take the first result
+            degradation_handler: GracefulDegradationHandler holding the per-tool
+                circuit breakers, the global handler by default
+            max_hedge_threads: Threads for duplicate calls of sync tools; a
+                sync tool is not hedged while they are all busy
         """
         self.tool_selector = tool_selector
         self.available_tools = available_tools or {}
@@ -86,6 +122,45 @@ class ToolOrchestrator(BaseToolOrchestrator):
             "file_analysis": 25.0
         }
         
+        # Result cache policies (TTL in seconds) for tools whose output depends
+        # only on the query and slow-changing data
+        self._tool_cache_policies: Dict[str, Optional[ToolCachePolicy]] = {
+            "BTSupportHours": ToolCachePolicy(ttl=3600),
+            "BTPlansInformation": ToolCachePolicy(ttl=1800),
+            "SupportKnowledgeBase": ToolCachePolicy(ttl=900),
+            "BTWebsiteSearch": ToolCachePolicy(ttl=600)
+        }
+        self._tool_cache_policies.update(cache_policies or {})
+        
+        # Executions of cacheable tools in progress, by cache key
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        
+        # Live latency distributions behind adaptive timeouts and hedging
+        self.latency_tracker = ToolLatencyTracker()
+        self.hedging_enabled = hedging_enabled
+        
+        # Duplicate calls of sync tools get their own threads so hedging never
+        # holds more than max_hedge_threads on top of the tool pool
+        self.max_hedge_threads = max_hedge_threads
+        self._hedge_pool = ThreadPoolExecutor(max_workers=max(1, max_hedge_threads))
+        self._hedge_lock = threading.Lock()
+        self._hedge_threads_busy = 0
+        
+        # Read-only tools that are safe to call twice for the same query
+        self._idempotent_tools = {
+            "BTWebsiteSearch", "BTSupportHours", "BTPlansInformation",
+            "SupportKnowledgeBase", "ContextRetriever", "web_search"
+        }
+        
+        if degradation_handler is None:
+            from backend.graceful_degradation import degradation_handler
+        self.degradation_handler = degradation_handler
+        
+        # Registers the knowledge entry write listeners that also drop cached
+        # results of KNOWLEDGE_BASE_TOOLS
+        from .semantic_cache import get_semantic_response_cache
+        get_semantic_response_cache()
+        
     async def select_tools(self, query: str, context: List[ContextEntry]) -> List[ToolRecommendation]:
         """
         Select relevant tools for a query with performance caching.
@@ -325,6 +400,7 @@ class ToolOrchestrator(BaseToolOrchestrator):
                 
                 batch_results.append(tool_result)
                 self._update_execution_stats(tool_name, tool_result)
+                record_stage(tool_stage(tool_name), tool_result.execution_time)
             
             return batch_results
             
@@ -344,6 +420,30 @@ class ToolOrchestrator(BaseToolOrchestrator):
             
             return error_results
     
+    def get_cache_policy(self, tool_name: str) -> Optional[ToolCachePolicy]:
+        """Cache policy of a tool, declared on the tool itself or configured by name."""
+        policy = getattr(self.available_tools.get(tool_name), "cache_policy", None)
+        if isinstance(policy, ToolCachePolicy):
+            return policy
+        return self._tool_cache_policies.get(tool_name)
+    
+    def _result_cache_key(self, tool_name: str, query: str, context: Dict[str, Any]) -> Optional[str]:
+        """Cache key of a tool call, None when the result must not be reused."""
+        policy = self.get_cache_policy(tool_name)
+        if policy is None:
+            return None
+        
+        scope = "global"
+        if policy.scope == CacheScope.USER:
+            user_id = context.get("user_id")
+            if not user_id:
+                return None
+            scope = f"user:{user_id}"
+        
+        key = (policy.key_func or normalize_tool_query)(query)
+        digest = hashlib.md5(f"{scope}:{key}".encode()).hexdigest()
+        return f"{TOOL_RESULT_CATEGORY}:{tool_name}:{digest}"
+    
     async def _execute_single_tool_with_timeout(
         self, 
         tool_name: str, 
@@ -351,9 +451,197 @@ class ToolOrchestrator(BaseToolOrchestrator):
         context: Dict[str, Any],
         previous_results: List[ToolResult]
     ) -> ToolResult:
-        """Execute a single tool with timeout and dependency context."""
+        """
+        Execute a single tool, reusing cached or in-flight results of cacheable tools.
+        
+        Results served without running the tool carry ``metadata["cache"]`` of
+        "hit" (from the result cache) or "coalesced" (shared with a concurrent
+        identical call); executions of cacheable tools are marked "miss".
+        """
+        cache_key = self._result_cache_key(tool_name, query, context)
+        if cache_key is None:
+            return await self._run_tool(tool_name, query, context, previous_results)
+        
         start_time = time.time()
-        timeout = self._tool_timeouts.get(tool_name, self.default_timeout)
+        cached = get_performance_cache().get(cache_key, TOOL_RESULT_CATEGORY)
+        if cached is not None:
+            return ToolResult(
+                tool_name=tool_name,
+                success=True,
+                result=cached["result"],
+                execution_time=time.time() - start_time,
+                metadata={
+                    "query": query,
+                    "cache": "hit",
+                    "cache_age": time.time() - cached["cached_at"],
+                    "cached_execution_time": cached["execution_time"]
+                }
+            )
+        
+        in_flight = self._in_flight.get(cache_key)
+        if in_flight is not None:
+            shared = await asyncio.shield(in_flight)
+            return ToolResult(
+                tool_name=tool_name,
+                success=shared.success,
+                result=shared.result,
+                execution_time=time.time() - start_time,
+                error_message=shared.error_message,
+                metadata={**shared.metadata, "cache": "coalesced"}
+            )
+        
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[cache_key] = future
+        try:
+            result = await self._run_tool(tool_name, query, context, previous_results)
+            result.metadata["cache"] = "miss"
+            if result.success and result.result is not None:
+                get_performance_cache().set(
+                    cache_key,
+                    {"result": result.result, "execution_time": result.execution_time, "cached_at": time.time()},
+                    TOOL_RESULT_CATEGORY,
+                    ttl=self.get_cache_policy(tool_name).ttl
+                )
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            # Waiters get a failed result instead of this call's exception or cancellation
+            if not future.done():
+                future.set_result(ToolResult(
+                    tool_name=tool_name,
+                    success=False,
+                    result=None,
+                    execution_time=time.time() - start_time,
+                    error_message=f"Shared execution of '{tool_name}' did not complete: {type(e).__name__}",
+                    metadata={"query": query}
+                ))
+            raise
+        finally:
+            if self._in_flight.get(cache_key) is future:
+                del self._in_flight[cache_key]
+    
+    @staticmethod
+    def invalidate_tool_results(tool_name: Optional[str] = None) -> int:
+        """Drop cached results of one tool, or of all tools."""
+        category = f"{TOOL_RESULT_CATEGORY}:{tool_name}" if tool_name else TOOL_RESULT_CATEGORY
+        return get_performance_cache().clear_category(category)
+    
+    def get_tool_timeout(self, tool_name: str) -> float:
+        """Timeout derived from the tool's live p99 latency, capped at its static timeout."""
+        static_timeout = self._tool_timeouts.get(tool_name, self.default_timeout)
+        return self.latency_tracker.timeout_for(tool_name, static_timeout)
+    
+    def _get_hedge_delay(self, tool_name: str, timeout: float) -> Optional[float]:
+        """Seconds after which to launch a duplicate call, None when not hedging."""
+        if not self.hedging_enabled or tool_name not in self._idempotent_tools:
+            return None
+        delay = self.latency_tracker.hedge_delay(tool_name)
+        if delay is None or delay >= timeout:
+            return None
+        return delay
+    
+    async def _invoke_tool(self, tool_function: Callable, query: str) -> Any:
+        """Call a sync or async tool function."""
+        if asyncio.iscoroutinefunction(tool_function):
+            return await tool_function(query)
+        # Run sync function in thread pool
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._thread_pool, tool_function, query)
+    
+    def _start_hedge(self, tool_function: Callable, query: str) -> Optional[asyncio.Future]:
+        """Launch a duplicate call, None when the hedge threads are all busy."""
+        if asyncio.iscoroutinefunction(tool_function):
+            return asyncio.ensure_future(tool_function(query))
+        with self._hedge_lock:
+            if self._hedge_threads_busy >= self.max_hedge_threads:
+                return None
+            self._hedge_threads_busy += 1
+        loop = asyncio.get_running_loop()
+        return asyncio.ensure_future(loop.run_in_executor(self._hedge_pool, self._run_hedge, tool_function, query))
+    
+    def _run_hedge(self, tool_function: Callable, query: str) -> Any:
+        # A cancelled hedge keeps its thread until the call returns
+        try:
+            return tool_function(query)
+        finally:
+            with self._hedge_lock:
+                self._hedge_threads_busy -= 1
+    
+    async def _invoke_with_hedging(
+        self,
+        tool_function: Callable,
+        query: str,
+        timeout: float,
+        hedge_delay: Optional[float]
+    ) -> tuple:
+        """
+        Call a tool within ``timeout``, adding a duplicate call after ``hedge_delay``.
+        
+        The duplicate of a sync tool runs on the hedge threads and is skipped
+        while they are all busy.
+        Returns the first successful result, which call produced it (0 for
+        the original, 1 for the hedge) and whether a hedge was launched.
+        Raises asyncio.TimeoutError
+        when no call succeeds in time, or the last error when all calls fail.
+        """
+        deadline = time.monotonic() + timeout
+        tasks = [asyncio.ensure_future(self._invoke_tool(tool_function, query))]
+        last_error = None
+        try:
+            if hedge_delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                if not done:
+                    hedge = self._start_hedge(tool_function, query)
+                    if hedge is not None:
+                        tasks.append(hedge)
+            
+            pending = set(tasks)
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError()
+                for task in done:
+                    if task.exception() is None:
+                        return task.result(), tasks.index(task), len(tasks) > 1
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    async def _run_tool(
+        self, 
+        tool_name: str, 
+        query: str, 
+        context: Dict[str, Any],
+        previous_results: List[ToolResult]
+    ) -> ToolResult:
+        """
+        Execute a single tool with an adaptive timeout, hedging and its circuit breaker.
+        
+        While a tool's breaker is open it fails immediately with
+        ``metadata["circuit_open"]``; breakers live in the degradation
+        handler under the operation name ``tool.<name>``.
+        """
+        start_time = time.time()
+        timeout = self.get_tool_timeout(tool_name)
+        operation = tool_stage(tool_name)
+        
+        if self.degradation_handler.is_circuit_breaker_open(operation):
+            return ToolResult(
+                tool_name=tool_name,
+                success=False,
+                result=None,
+                execution_time=0.0,
+                error_message=f"Tool '{tool_name}' is temporarily unavailable (circuit open)",
+                metadata={"circuit_open": True}
+            )
         
         try:
             # Get tool function
@@ -373,23 +661,15 @@ class ToolOrchestrator(BaseToolOrchestrator):
                 if result.success
             }
             
+            hedge_delay = self._get_hedge_delay(tool_name, timeout)
+            
             # Execute tool with timeout
             try:
-                # Check if tool is async or sync
-                if asyncio.iscoroutinefunction(tool_function):
-                    result = await asyncio.wait_for(
-                        tool_function(query), 
-                        timeout=timeout
-                    )
-                else:
-                    # Run sync function in thread pool with timeout
-                    loop = asyncio.get_event_loop()
-                    result = await asyncio.wait_for(
-                        loop.run_in_executor(self._thread_pool, tool_function, query),
-                        timeout=timeout
-                    )
+                result, winner, hedged = await self._invoke_with_hedging(tool_function, query, timeout, hedge_delay)
                 
                 execution_time = time.time() - start_time
+                self.latency_tracker.record(tool_name, execution_time)
+                self.degradation_handler.record_operation_result(operation, True)
                 
                 return ToolResult(
                     tool_name=tool_name,
@@ -399,22 +679,29 @@ class ToolOrchestrator(BaseToolOrchestrator):
                     metadata={
                         "query": query, 
                         "timeout": timeout,
+                        "hedged": hedged,
+                        "hedge_won": winner == 1,
                         "context_keys": list(enhanced_context.keys())
                     }
                 )
                 
             except asyncio.TimeoutError:
                 execution_time = time.time() - start_time
+                # Timed-out calls count at the timeout so p99 cannot shrink below real latency
+                self.latency_tracker.record(tool_name, execution_time)
+                self.degradation_handler.record_operation_result(operation, False)
                 return ToolResult(
                     tool_name=tool_name,
                     success=False,
                     result=None,
                     execution_time=execution_time,
-                    error_message=f"Tool execution timed out after {timeout} seconds"
+                    error_message=f"Tool execution timed out after {timeout:.2f} seconds",
+                    metadata={"timeout": timeout}
                 )
                 
         except Exception as e:
             execution_time = time.time() - start_time
+            self.degradation_handler.record_operation_result(operation, False)
             return ToolResult(
                 tool_name=tool_name,
                 success=False,
@@ -488,6 +775,9 @@ class ToolOrchestrator(BaseToolOrchestrator):
     
     def _estimate_execution_time(self, tool_name: str) -> float:
         """Estimate execution time for a tool based on historical data."""
+        median = self.latency_tracker.percentile(tool_name, 50)
+        if median is not None:
+            return median
         if tool_name in self._execution_stats:
             stats = self._execution_stats[tool_name]
             return stats.get("avg_execution_time", 1.0)
@@ -506,10 +796,26 @@ class ToolOrchestrator(BaseToolOrchestrator):
                 "total_execution_time": 0.0,
                 "avg_execution_time": 0.0,
                 "success_rate": 0.0,
-                "last_execution": None
+                "last_execution": None,
+                "cache_hits": 0,
+                "coalesced_executions": 0,
+                "short_circuited": 0
             }
         
         stats = self._execution_stats[tool_name]
+        
+        # Results served without running the tool say nothing about its speed
+        cache_status = result.metadata.get("cache") if result.metadata else None
+        if cache_status == "hit":
+            stats["cache_hits"] += 1
+            return
+        if cache_status == "coalesced":
+            stats["coalesced_executions"] += 1
+            return
+        if result.metadata and result.metadata.get("circuit_open"):
+            stats["short_circuited"] += 1
+            return
+        
         stats["total_executions"] += 1
         stats["total_execution_time"] += result.execution_time
         stats["last_execution"] = time.time()
@@ -568,6 +874,8 @@ class ToolOrchestrator(BaseToolOrchestrator):
         try:
             if hasattr(self, '_thread_pool'):
                 self._thread_pool.shutdown(wait=False)
+            if hasattr(self, '_hedge_pool'):
+                self._hedge_pool.shutdown(wait=False)
         except Exception:
             pass    
     
@@ -652,6 +960,8 @@ class ToolOrchestrator(BaseToolOrchestrator):
         return {
             "execution_stats": self.get_execution_stats(),
             "active_executions": len(self._active_executions),
+            "in_flight_cacheable_executions": len(self._in_flight),
+            "latency": self.latency_tracker.summary(),
             "cache_stats": performance_cache.get_stats(),
             "resource_usage": resource_monitor.get_current_usage(),
             "tool_performance_cache_size": len(tool_cache._tool_cache._cache) if hasattr(tool_cache, '_tool_cache') else 0
@@ -6,7 +6,7 @@ for comprehensive user experience during tool execution.
 import asyncio
 from typing import Dict, List, Optional, Any, Callable
 from dataclasses import dataclass
-from .loading_indicators import LoadingIndicatorManager, ConcurrentLoadingManager, ToolType
+from .loading_indicators import LoadingIndicatorManager, ConcurrentLoadingManager, ToolType, ProgressUpdate
 from .status_monitor import ToolExecutionMonitor, ExecutionStatus, NotificationType
 from .models import LoadingState, UIState, LoadingIndicator
 
@@ -53,8 +53,8 @@ class VisualFeedbackSystem:
         self.status_monitor.add_status_callback(self._on_status_update)
         self.status_monitor.add_notification_callback(self._on_notification)
         
-        # Loading manager callbacks
-        self.loading_manager.add_progress_callback("*", self._on_progress_update)
+        # Loading manager pushes each ticker tick's automatic progress as one batch
+        self.loading_manager.add_batch_callback(self._on_progress_batch)
     
     async def start_tool_execution(self, tool_name: str, session_id: str,
                                  tool_type: Optional[ToolType] = None,
@@ -80,7 +80,7 @@ class VisualFeedbackSystem:
         
         # Start monitoring
         execution_id = self.status_monitor.start_monitoring(
-            tool_name, tool_type, timeout, custom_message
+            tool_name, tool_type, timeout, custom_message, session_id=session_id
         )
         
         # Update UI state
@@ -117,7 +117,7 @@ class VisualFeedbackSystem:
         self.concurrent_manager.create_coordination_group(group_id, tool_names)
         
         # Start coordinated loading
-        indicators = await self.concurrent_manager.start_coordinated_loading(group_id, tool_configs)
+        indicators = await self.concurrent_manager.start_coordinated_loading(group_id, tool_configs, session_id)
         
         # Start monitoring for each tool
         for tool_name in tool_names:
@@ -139,7 +139,8 @@ class VisualFeedbackSystem:
     
     async def update_tool_progress(self, tool_name: str, progress: float,
                                  message: Optional[str] = None,
-                                 metadata: Optional[Dict[str, Any]] = None) -> bool:
+                                 metadata: Optional[Dict[str, Any]] = None,
+                                 session_id: Optional[str] = None) -> bool:
         """
         Update progress for a tool with comprehensive feedback.
         
@@ -148,21 +149,23 @@ class VisualFeedbackSystem:
             progress: Progress value (0.0 to 1.0)
             message: Progress message
             metadata: Additional metadata
+            session_id: Session of the execution (default: the tool's latest)
             
         Returns:
             True if update was successful
         """
+        session_id = session_id or self.status_monitor.get_execution_session(tool_name)
+        
         # Update status monitor
-        success = await self.status_monitor.update_progress(tool_name, progress, message)
+        success = await self.status_monitor.update_progress(tool_name, progress, message, session_id=session_id)
         
         if success and metadata:
             # Update status with metadata
             await self.status_monitor.update_status(
-                tool_name, ExecutionStatus.RUNNING, message, metadata
+                tool_name, ExecutionStatus.RUNNING, message, metadata, session_id=session_id
             )
         
-        # Find session and update UI
-        session_id = self._find_session_for_tool(tool_name)
+        # Update UI
         if session_id:
             await self._update_ui_state(session_id)
         
@@ -170,7 +173,8 @@ class VisualFeedbackSystem:
     
     async def update_tool_status(self, tool_name: str, status: ExecutionStatus,
                                message: Optional[str] = None,
-                               metadata: Optional[Dict[str, Any]] = None) -> bool:
+                               metadata: Optional[Dict[str, Any]] = None,
+                               session_id: Optional[str] = None) -> bool:
         """
         Update status for a tool with visual feedback.
         
@@ -179,14 +183,16 @@ class VisualFeedbackSystem:
             status: New execution status
             message: Status message
             metadata: Additional metadata
+            session_id: Session of the execution (default: the tool's latest)
             
         Returns:
             True if update was successful
         """
-        success = await self.status_monitor.update_status(tool_name, status, message, metadata)
+        session_id = session_id or self.status_monitor.get_execution_session(tool_name)
+        success = await self.status_monitor.update_status(tool_name, status, message, metadata,
+                                                          session_id=session_id)
         
         # Update UI state
-        session_id = self._find_session_for_tool(tool_name)
         if session_id:
             await self._update_ui_state(session_id)
         
@@ -194,7 +200,8 @@ class VisualFeedbackSystem:
     
     def complete_tool_execution(self, tool_name: str, success: bool,
                               result_message: Optional[str] = None,
-                              result_data: Optional[Any] = None) -> bool:
+                              result_data: Optional[Any] = None,
+                              session_id: Optional[str] = None) -> bool:
         """
         Complete tool execution with final feedback.
         
@@ -203,13 +210,16 @@ class VisualFeedbackSystem:
             success: Whether execution was successful
             result_message: Final result message
             result_data: Result data
+            session_id: Session of the execution (default: the tool's latest)
             
         Returns:
             True if completion was successful
         """
+        session_id = session_id or self.status_monitor.get_execution_session(tool_name)
+        
         # Complete monitoring
         completion_success = self.status_monitor.complete_execution(
-            tool_name, success, result_message, result_data
+            tool_name, success, result_message, result_data, session_id=session_id
         )
         
         # Record completion event
@@ -221,7 +231,6 @@ class VisualFeedbackSystem:
         })
         
         # Schedule UI update
-        session_id = self._find_session_for_tool(tool_name)
         if session_id:
             try:
                 loop = asyncio.get_running_loop()
@@ -232,7 +241,8 @@ class VisualFeedbackSystem:
         return completion_success
     
     def handle_tool_error(self, tool_name: str, error: Exception,
-                         context: Optional[Dict[str, Any]] = None) -> bool:
+                         context: Optional[Dict[str, Any]] = None,
+                         session_id: Optional[str] = None) -> bool:
         """
         Handle tool error with comprehensive error visualization.
         
@@ -240,15 +250,19 @@ class VisualFeedbackSystem:
             tool_name: Name of the tool that failed
             error: The exception that occurred
             context: Additional error context
+            session_id: Session of the execution (default: the tool's latest)
             
         Returns:
             True if error handling was successful
         """
+        session_id = session_id or self.status_monitor.get_execution_session(tool_name)
+        
         # Create error visualization
-        error_viz = self.status_monitor.create_error_visualization(tool_name, error, context)
+        error_viz = self.status_monitor.create_error_visualization(tool_name, error, context,
+                                                                   session_id=session_id)
         
         # Complete execution as failed
-        self.complete_tool_execution(tool_name, False, f"Error: {str(error)}")
+        self.complete_tool_execution(tool_name, False, f"Error: {str(error)}", session_id=session_id)
         
         # Record error event
         self._record_feedback_event("tool_error", {
@@ -276,19 +290,21 @@ class VisualFeedbackSystem:
         # Collect loading indicators
         loading_indicators = []
         for tool_name in tool_names:
-            indicator = self.loading_manager.get_indicator(tool_name)
+            indicator = self.loading_manager.get_indicator(tool_name, self._execution_scope(tool_name, session_id))
             if indicator:
                 loading_indicators.append(indicator)
         
         # Collect notifications
         notifications = self.status_monitor.get_active_notifications()
         session_notifications = [n for n in notifications 
-                               if n.tool_name in tool_names or n.tool_name is None]
+                               if (n.tool_name in tool_names and n.session_id in (session_id, None))
+                               or n.tool_name is None]
         
         # Collect error states
         error_states = []
         for tool_name in tool_names:
-            error_viz = self.status_monitor.get_error_visualization(tool_name)
+            error_viz = self.status_monitor.get_error_visualization(tool_name,
+                                                                    self._execution_scope(tool_name, session_id))
             if error_viz:
                 from .models import ErrorState
                 error_state = ErrorState(
@@ -396,7 +412,7 @@ class VisualFeedbackSystem:
         
         # Clean up each tool
         for tool_name in tool_names:
-            self.loading_manager.manual_cleanup(tool_name)
+            self.loading_manager.manual_cleanup(tool_name, session_id)
         
         # Remove session
         self._active_sessions.pop(session_id, None)
@@ -409,6 +425,14 @@ class VisualFeedbackSystem:
     
     # Private helper methods
     
+    def _execution_scope(self, tool_name: str, session_id: str) -> Optional[str]:
+        """Session a tool of this session is monitored under; None when it was started without one."""
+        if (self.status_monitor.get_execution_status(tool_name, session_id) is None
+                and self.status_monitor.get_execution_status(tool_name) is not None
+                and self.status_monitor.get_execution_session(tool_name) is None):
+            return None
+        return session_id
+    
     def _find_session_for_tool(self, tool_name: str) -> Optional[str]:
         """Find session ID for a tool."""
         for session_id, tool_names in self._active_sessions.items():
@@ -429,7 +453,7 @@ class VisualFeedbackSystem:
     
     def _on_status_update(self, status_update):
         """Handle status updates from monitor."""
-        session_id = self._find_session_for_tool(status_update.tool_name)
+        session_id = status_update.session_id or self._find_session_for_tool(status_update.tool_name)
         if session_id:
             try:
                 loop = asyncio.get_running_loop()
@@ -440,7 +464,7 @@ class VisualFeedbackSystem:
     def _on_notification(self, notification):
         """Handle notifications from monitor."""
         if notification.tool_name:
-            session_id = self._find_session_for_tool(notification.tool_name)
+            session_id = notification.session_id or self._find_session_for_tool(notification.tool_name)
             if session_id:
                 try:
                     loop = asyncio.get_running_loop()
@@ -448,15 +472,11 @@ class VisualFeedbackSystem:
                 except RuntimeError:
                     pass
     
-    def _on_progress_update(self, tool_name: str, progress: float, message: str):
-        """Handle progress updates from loading manager."""
-        session_id = self._find_session_for_tool(tool_name)
-        if session_id:
-            try:
-                loop = asyncio.get_running_loop()
-                loop.create_task(self._update_ui_state(session_id))
-            except RuntimeError:
-                pass
+    async def _on_progress_batch(self, updates: List[ProgressUpdate]):
+        """Handle a batch of progress updates from the loading manager, once per session."""
+        for session_id in dict.fromkeys(update.session_id for update in updates):
+            if session_id in self._active_sessions:
+                await self._update_ui_state(session_id)
     
     def _record_feedback_event(self, event_type: str, data: Dict[str, Any]):
         """Record feedback event for analytics."""
@@ -0,0 +1,725 @@
+"""
+End-to-end load testing of the serving path.
+
+Boots the FastAPI application in process with a deterministic stub in place
+of the Gemini LLM and stub agent tools whose latency follows configurable
+distributions, seeds the database with realistic history volumes and drives
+a weighted mix of endpoints at a target request rate.
+
+Requests are issued open-loop: each one starts at its scheduled time whatever
+happened to earlier ones, and its latency is measured from that time. A server
+that falls behind therefore shows up as higher latency, not as a quietly lower
+request rate.
+
+The report gives p50/p95/p99 latency, throughput, error counts and SLO status
+per endpoint as JSON, and ``compare_reports`` lists the regressions between
+two reports so runs can be compared across commits.
+"""
+
+import os
+import json
+import math
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from pydantic import PrivateAttr
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import BaseTool
+
+from backend.database_monitoring import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+LOAD_TEST_SEED = int(os.getenv("LOAD_TEST_SEED", "1234"))
+LOAD_TEST_USER_PREFIX = os.getenv("LOAD_TEST_USER_PREFIX", "loadtest_")
+LOAD_TEST_PASSWORD = os.getenv("LOAD_TEST_PASSWORD", "LoadTest!2024")
+LOAD_TEST_CUSTOMERS = int(os.getenv("LOAD_TEST_CUSTOMERS", "50"))
+LOAD_TEST_ADMINS = int(os.getenv("LOAD_TEST_ADMINS", "2"))
+LOAD_TEST_HISTORY_PER_USER = int(os.getenv("LOAD_TEST_HISTORY_PER_USER", "200"))
+LOAD_TEST_TICKETS_PER_USER = int(os.getenv("LOAD_TEST_TICKETS_PER_USER", "3"))
+LOAD_TEST_HISTORY_DAYS = int(os.getenv("LOAD_TEST_HISTORY_DAYS", "90"))
+LOAD_TEST_TURNS_PER_SESSION = 20
+LOAD_TEST_INSERT_BATCH = 5000
+LOAD_TEST_MAX_IN_FLIGHT = int(os.getenv("LOAD_TEST_MAX_IN_FLIGHT", "256"))
+LOAD_TEST_REGRESSION_TOLERANCE = float(os.getenv("LOAD_TEST_REGRESSION_TOLERANCE", "0.10"))
+
+# 32 buckets per doubling keeps reported percentiles within ~2%
+LOAD_TEST_HISTOGRAM_RESOLUTION = 32
+
+DEFAULT_LLM_LATENCY = os.getenv("LOAD_TEST_LLM_LATENCY", "lognormal:0.6,2.5")
+DEFAULT_TOOL_LATENCY = os.getenv("LOAD_TEST_TOOL_LATENCY", "lognormal:0.15,0.8")
+
+# Middleware pipeline limits, read when the app is imported; every simulated
+# client connects from the same address
+RATE_LIMIT_ENVS = ("REQUEST_RATE_LIMIT_PER_MINUTE", "LOGIN_RATE_LIMIT_PER_MINUTE")
+
+# Tools the chat manager selects by default, stubbed under their real names
+STUB_TOOL_NAMES = (
+    "ContextRetriever", "SupportKnowledgeBase", "CreateSupportTicket",
+    "BTPlansInformation", "BTWebsiteSearch", "BTSupportHours"
+)
+
+CHAT_QUERIES = (
+    "My broadband keeps dropping every evening, can you help?",
+    "What plans can I upgrade to for faster internet?",
+    "What are your support hours at the weekend?",
+    "Why is my bill higher than usual this month?",
+    "How do I set up direct debit for my account?",
+    "My wifi is slow upstairs, is there anything I can do?",
+    "I have a problem with my router lights flashing orange",
+    "What is the price of the full fibre package?",
+    "How do I contact someone about moving house?",
+    "Can you help me change my email password?",
+    "There is an issue with my TV box not connecting",
+    "Do you have any deals for existing customers?",
+)
+
+STUB_ANSWERS = (
+    "Restart your router, check the cables are secure and run a line test from your account.",
+    "You can upgrade to Full Fibre 500 or Full Fibre 900 from the upgrades page in your account.",
+    "Our support team is available 8am to 8pm Monday to Saturday and 9am to 5pm on Sunday.",
+    "Your latest bill includes a one-off charge; the breakdown is in the billing section of your account.",
+    "Direct debit can be set up under Payments in your account in a couple of minutes.",
+)
+
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """Latency distribution in seconds, written as ``kind:params``
+
+    - ``fixed:0.2`` always 200ms
+    - ``uniform:0.1,0.5`` uniform between 100ms and 500ms
+    - ``exponential:0.3`` exponential with a 300ms mean
+    - ``lognormal:0.4,2.0`` lognormal with a 400ms median and a 2s p99
+    """
+
+    kind: str
+    params: tuple
+
+    KINDS = {"fixed": 1, "uniform": 2, "exponential": 1, "lognormal": 2}
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        return _parse_latency(spec)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds"""
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "exponential":
+            return rng.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+        median, p99 = self.params
+        if median <= 0:
+            return 0.0
+        # 2.326 is the standard normal quantile of 0.99
+        sigma = math.log(p99 / median) / 2.326 if p99 > median else 0.0
+        return rng.lognormvariate(math.log(median), sigma)
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{','.join(str(p) for p in self.params)}"
+
+
+@lru_cache(maxsize=64)
+def _parse_latency(spec: str) -> LatencyDistribution:
+    kind, _, raw_params = spec.strip().partition(":")
+    kind = kind.lower()
+    if kind not in LatencyDistribution.KINDS:
+        raise ValueError(f"Unknown latency distribution '{kind}', expected one of: {', '.join(LatencyDistribution.KINDS)}")
+    try:
+        params = tuple(float(p) for p in raw_params.split(",") if p.strip())
+    except ValueError:
+        raise ValueError(f"Invalid latency distribution parameters in '{spec}'")
+    if len(params) != LatencyDistribution.KINDS[kind] or any(p < 0 for p in params):
+        raise ValueError(f"'{kind}' latency takes {LatencyDistribution.KINDS[kind]} non-negative parameter(s), got '{spec}'")
+    return LatencyDistribution(kind, params)
+
+
+class LatencySampler:
+    """Thread-safe seeded stream of latencies from one distribution
+
+    Concurrent callers may receive the values in any order, but a given seed
+    always produces the same set of latencies.
+    """
+
+    def __init__(self, spec: str, seed: int):
+        self.distribution = LatencyDistribution.parse(spec)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def next(self) -> float:
+        with self._lock:
+            return self.distribution.sample(self._rng)
+
+
+def _digest(*parts: Any) -> int:
+    """Stable hash of the parts, unlike hash() which changes per process"""
+    text = "\x1f".join(str(part) for part in parts)
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _last_message(messages: List[BaseMessage], message_type: type) -> Optional[BaseMessage]:
+    for message in reversed(messages):
+        if isinstance(message, message_type):
+            return message
+    return None
+
+
+class StubChatModel(BaseChatModel):
+    """Deterministic stand-in for the Gemini chat model
+
+    Replies depend only on the conversation, so identical requests get
+    identical answers. Once tools are bound, a share of first turns asks
+    for a tool call, and the model answers after the tool result comes back.
+    Each call blocks for a latency drawn from ``latency``, the same as the
+    synchronous client calls the real model makes.
+    """
+
+    latency: str = DEFAULT_LLM_LATENCY
+    seed: int = LOAD_TEST_SEED
+    tool_call_ratio: float = 0.5
+    tool_names: List[str] = []
+
+    _sampler: Optional[LatencySampler] = PrivateAttr(default=None)
+
+    @property
+    def _llm_type(self) -> str:
+        return "load-test-stub"
+
+    def bind_tools(self, tools: List[Any], **kwargs: Any) -> "StubChatModel":
+        bound = self.model_copy(update={"tool_names": [getattr(tool, "name", str(tool)) for tool in tools]})
+        bound._sampler = self._latency_sampler()
+        return bound
+
+    def _latency_sampler(self) -> LatencySampler:
+        if self._sampler is None:
+            self._sampler = LatencySampler(self.latency, self.seed)
+        return self._sampler
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self._latency_sampler().next())
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        human = _last_message(messages, HumanMessage)
+        query = str(human.content) if human else ""
+        key = _digest(self.seed, query)
+
+        if self.tool_names and not isinstance(messages[-1], ToolMessage):
+            if (key % 1000) / 1000.0 < self.tool_call_ratio:
+                tool_name = self.tool_names[key % len(self.tool_names)]
+                return AIMessage(content="", tool_calls=[{
+                    "name": tool_name,
+                    "args": {"query": query},
+                    "id": f"call_{key:016x}"
+                }])
+
+        answer = STUB_ANSWERS[key % len(STUB_ANSWERS)]
+        tool_result = _last_message(messages, ToolMessage)
+        if tool_result is not None:
+            answer = f"{answer} (checked {tool_result.name or 'a tool'})"
+        return AIMessage(content=f"Summary: {answer}")
+
+
+class StubTool(BaseTool):
+    """Agent tool that returns a canned result after a sampled latency"""
+
+    name: str
+    description: str = "Load-test stand-in for an agent tool"
+    latency: str = DEFAULT_TOOL_LATENCY
+    seed: int = LOAD_TEST_SEED
+
+    _sampler: Optional[LatencySampler] = PrivateAttr(default=None)
+
+    def _run(self, query: str) -> str:
+        if self._sampler is None:
+            self._sampler = LatencySampler(self.latency, _digest(self.seed, self.name))
+        time.sleep(self._sampler.next())
+        return f"{self.name} result for: {query}"
+
+    def __call__(self, query: str) -> str:
+        # The tool orchestrator calls tool objects directly with the query
+        return self._run(query)
+
+
+def create_stub_tools(latency: str = DEFAULT_TOOL_LATENCY, seed: int = LOAD_TEST_SEED,
+                      names: tuple = STUB_TOOL_NAMES) -> List[StubTool]:
+    """Stub agent tools under the names the chat manager selects"""
+    return [StubTool(name=name, latency=latency, seed=seed) for name in names]
+
+
+def boot_application(llm_latency: str = DEFAULT_LLM_LATENCY, tool_latency: str = DEFAULT_TOOL_LATENCY,
+                     seed: int = LOAD_TEST_SEED):
+    """Import the FastAPI app with the stub LLM and stub tools in place of the real ones
+
+    Set DATABASE_URL before calling, the database module reads it on import.
+    Fast-start mode keeps the real LLM from being built at import time; when
+    the app was already imported the AI components are rebuilt with the stubs.
+    Rate limits are turned off, all simulated clients share one address.
+    """
+    from backend.startup_profiler import FAST_START_ENV
+    os.environ.setdefault(FAST_START_ENV, "true")
+    for name in RATE_LIMIT_ENVS:
+        os.environ[name] = "0"
+
+    import main
+
+    disable_rate_limits(main.app)
+    main.create_llm = lambda: StubChatModel(latency=llm_latency, seed=seed)
+    main.create_agent_tools = lambda: create_stub_tools(tool_latency, seed)
+    main._ai_components_ready.clear()
+    main.init_ai_components()
+    logger.info(f"Application booted with stub LLM ({llm_latency}) and stub tools ({tool_latency})")
+    return main.app
+
+
+def disable_rate_limits(app) -> bool:
+    """Turn off the middleware pipeline rate limits of an app that has not started yet
+
+    Returns False when the app has no pipeline installed.
+    """
+    from backend.middleware_pipeline import MiddlewarePipeline
+
+    for middleware in app.user_middleware:
+        if middleware.cls is MiddlewarePipeline:
+            middleware.kwargs["rate_limit_per_minute"] = 0
+            middleware.kwargs["login_rate_limit_per_minute"] = 0
+            return True
+    return False
+
+
+@asynccontextmanager
+async def asgi_lifespan(app):
+    """Run an ASGI app's startup and shutdown events around an in-process test"""
+    to_app: asyncio.Queue = asyncio.Queue()
+    from_app: asyncio.Queue = asyncio.Queue()
+    scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+    task = asyncio.ensure_future(app(scope, to_app.get, from_app.put))
+
+    async def expect(event: str):
+        reply = asyncio.ensure_future(from_app.get())
+        await asyncio.wait({task, reply}, return_when=asyncio.FIRST_COMPLETED)
+        if not reply.done():
+            reply.cancel()
+            task.result()  # re-raises an app that failed instead of answering
+            return
+        message = reply.result()
+        if message["type"] == f"lifespan.{event}.failed":
+            raise RuntimeError(f"Application {event} failed: {message.get('message', '')}")
+
+    await to_app.put({"type": "lifespan.startup"})
+    await expect("startup")
+    try:
+        yield app
+    finally:
+        if not task.done():
+            await to_app.put({"type": "lifespan.shutdown"})
+            await expect("shutdown")
+
+
+# -------------------- Database seeding --------------------
+
+@dataclass
+class SeededData:
+    """Credentials of the load-test users"""
+    customers: List[str]
+    admins: List[str]
+    password: str = LOAD_TEST_PASSWORD
+    history_rows: int = 0
+    ticket_rows: int = 0
+
+
+def load_test_users(customers: int = LOAD_TEST_CUSTOMERS, admins: int = LOAD_TEST_ADMINS,
+                    password: str = LOAD_TEST_PASSWORD) -> SeededData:
+    """Usernames seed_database creates, for runs against an already seeded database"""
+    return SeededData(
+        customers=[f"{LOAD_TEST_USER_PREFIX}customer_{i:04d}" for i in range(customers)],
+        admins=[f"{LOAD_TEST_USER_PREFIX}admin_{i:02d}" for i in range(admins)],
+        password=password
+    )
+
+
+def _create_schema(engine) -> List[str]:
+    """Create every table the dialect can express; return the names skipped
+
+    The memory tables use PostgreSQL-only types, so on SQLite the harness runs
+    with the unified tables alone and the memory layer falls back as it does
+    when its tables are missing.
+    """
+    from sqlalchemy.exc import CompileError
+    from sqlalchemy.schema import CreateTable
+    from backend.database import Base
+    import backend.unified_models  # noqa: F401 - registers the tables
+    import backend.memory_models  # noqa: F401
+
+    creatable, skipped = [], []
+    for table in Base.metadata.sorted_tables:
+        try:
+            CreateTable(table).compile(dialect=engine.dialect)
+            creatable.append(table)
+        except CompileError:
+            skipped.append(table.name)
+    Base.metadata.create_all(bind=engine, tables=creatable)
+    if skipped:
+        logger.info(f"Skipped tables not supported by {engine.dialect.name}: {', '.join(skipped)}")
+    return skipped
+
+
+def _insert_batched(connection, table, rows: List[Dict[str, Any]]):
+    for start in range(0, len(rows), LOAD_TEST_INSERT_BATCH):
+        connection.execute(table.insert(), rows[start:start + LOAD_TEST_INSERT_BATCH])
+
+
+def seed_database(engine, customers: int = LOAD_TEST_CUSTOMERS, admins: int = LOAD_TEST_ADMINS,
+                  history_per_user: int = LOAD_TEST_HISTORY_PER_USER,
+                  tickets_per_user: int = LOAD_TEST_TICKETS_PER_USER,
+                  password: str = LOAD_TEST_PASSWORD, seed: int = LOAD_TEST_SEED) -> SeededData:
+    """Create load-test users with chat history and tickets spread over past months
+
+    Works on SQLite and PostgreSQL. Seeding is skipped when the users already
+    exist, so a database can be seeded once and reused across runs.
+    """
+    from sqlalchemy import inspect, select, func
+    from backend.unified_auth import auth_service
+    from backend.unified_models import (
+        UnifiedUser, UnifiedTicket, UnifiedChatHistory, UserRole,
+        TicketStatus, TicketPriority, TicketCategory
+    )
+    from backend.memory_models import EnhancedChatHistory
+
+    seeded = load_test_users(customers, admins, password)
+    _create_schema(engine)
+    users = UnifiedUser.__table__
+
+    with engine.begin() as connection:
+        existing = connection.execute(
+            select(func.count()).select_from(users).where(users.c.user_id.like(f"{LOAD_TEST_USER_PREFIX}%"))
+        ).scalar()
+        if existing >= customers + admins:
+            logger.info(f"Database already holds {existing} load-test users, skipping seeding")
+            return seeded
+
+        # bcrypt is deliberately slow, so every user shares one hash
+        password_hash = auth_service.hash_password(password)
+        now = datetime.now(timezone.utc)
+        _insert_batched(connection, users, [
+            {
+                "user_id": username,
+                "username": username,
+                "email": f"{username}@loadtest.example.com",
+                "password_hash": password_hash,
+                "full_name": username.replace("_", " ").title(),
+                "is_admin": username in seeded.admins,
+                "is_active": True,
+                "role": UserRole.ADMIN if username in seeded.admins else UserRole.CUSTOMER,
+                "created_at": now,
+                "updated_at": now
+            }
+            for username in seeded.admins + seeded.customers
+        ])
+        ids = dict(connection.execute(
+            select(users.c.user_id, users.c.id).where(users.c.user_id.like(f"{LOAD_TEST_USER_PREFIX}%"))
+        ).all())
+
+        rng = random.Random(seed)
+        history_window = LOAD_TEST_HISTORY_DAYS * 86400
+        history, enhanced_history, tickets = [], [], []
+        for username in seeded.customers:
+            for turn in range(history_per_user):
+                query = rng.choice(CHAT_QUERIES)
+                row = {
+                    "session_id": f"{username}-{turn // LOAD_TEST_TURNS_PER_SESSION}",
+                    "user_message": query,
+                    "bot_response": rng.choice(STUB_ANSWERS),
+                    "tools_used": rng.sample(STUB_TOOL_NAMES, 2),
+                    "created_at": now - timedelta(seconds=rng.uniform(0, history_window))
+                }
+                history.append({**row, "sources": [], "user_id": ids[username]})
+                enhanced_history.append({**row, "user_id": username, "response_quality_score": rng.uniform(0.5, 1.0)})
+            for _ in range(tickets_per_user):
+                created_at = now - timedelta(seconds=rng.uniform(0, history_window))
+                tickets.append({
+                    "title": rng.choice(CHAT_QUERIES)[:120],
+                    "description": rng.choice(STUB_ANSWERS),
+                    "status": rng.choice(list(TicketStatus)),
+                    "priority": rng.choice(list(TicketPriority)),
+                    "category": rng.choice(list(TicketCategory)),
+                    "customer_id": ids[username],
+                    "created_at": created_at,
+                    "updated_at": created_at
+                })
+
+        _insert_batched(connection, UnifiedChatHistory.__table__, history)
+        _insert_batched(connection, UnifiedTicket.__table__, tickets)
+        if inspect(connection).has_table(EnhancedChatHistory.__tablename__):
+            _insert_batched(connection, EnhancedChatHistory.__table__, enhanced_history)
+
+    seeded.history_rows = len(history)
+    seeded.ticket_rows = len(tickets)
+    logger.info(f"Seeded {customers} customers, {admins} admins, {len(history)} chat turns and {len(tickets)} tickets")
+    return seeded
+
+
+# -------------------- Load generation --------------------
+
+ROLE_ANONYMOUS = "anonymous"
+ROLE_CUSTOMER = "customer"
+ROLE_ADMIN = "admin"
+
+
+def _login_request(rng: random.Random, seeded: SeededData) -> Dict[str, Any]:
+    return {"data": {"username": rng.choice(seeded.customers), "password": seeded.password}}
+
+
+def _chat_request(rng: random.Random, seeded: SeededData) -> Dict[str, Any]:
+    return {"json": {"query": rng.choice(CHAT_QUERIES)}}
+
+
+@dataclass
+class EndpointSpec:
+    """One endpoint of the workload mix"""
+    name: str
+    method: str
+    path: str
+    weight: float
+    role: str = ROLE_CUSTOMER
+    slo_p99_ms: Optional[float] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+    build: Optional[Callable[[random.Random, SeededData], Dict[str, Any]]] = None
+
+
+def default_workload() -> List[EndpointSpec]:
+    """Login, chat, context, analytics and admin traffic in a typical mix"""
+    return [
+        EndpointSpec("login", "POST", "/login", 0.05, ROLE_ANONYMOUS, slo_p99_ms=1500, build=_login_request),
+        EndpointSpec("chat", "POST", "/chat", 0.50, slo_p99_ms=8000, build=_chat_request),
+        EndpointSpec("chat_context", "GET", "/chat/context", 0.20, slo_p99_ms=750, params={"limit": 10}),
+        EndpointSpec("analytics", "GET", "/api/analytics/unified-dashboard", 0.10, ROLE_ADMIN,
+                     slo_p99_ms=2000, params={"period": "week"}),
+        EndpointSpec("admin_dashboard", "GET", "/api/admin/dashboard", 0.15, ROLE_ADMIN, slo_p99_ms=1000),
+    ]
+
+
+@dataclass
+class LoadTestConfig:
+    """Request rate, duration and workload of a run"""
+    rps: float = 10.0
+    duration_seconds: float = 30.0
+    warmup_seconds: float = 5.0
+    sessions: int = 10
+    max_in_flight: int = LOAD_TEST_MAX_IN_FLIGHT
+    request_timeout: float = 60.0
+    seed: int = LOAD_TEST_SEED
+    workload: List[EndpointSpec] = field(default_factory=default_workload)
+
+
+@dataclass
+class PlannedRequest:
+    offset: float
+    endpoint: EndpointSpec
+    kwargs: Dict[str, Any]
+    warmup: bool
+
+
+class EndpointStats:
+    """Latency histogram and status counts of one endpoint"""
+
+    def __init__(self, spec: EndpointSpec):
+        self.spec = spec
+        self.histogram = LatencyHistogram(buckets_per_doubling=LOAD_TEST_HISTOGRAM_RESOLUTION)
+        self.status_codes: Counter = Counter()
+        self.errors = 0
+
+    def record(self, seconds: float, status: Optional[int]):
+        self.histogram.record(seconds)
+        self.status_codes["error" if status is None else str(status)] += 1
+        if status is None or status >= 400:
+            self.errors += 1
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        histogram = self.histogram
+        p99_ms = round(histogram.percentile(99) * 1000, 2)
+        summary = {
+            "requests": histogram.count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / histogram.count, 4) if histogram.count else 0.0,
+            "throughput_rps": round(histogram.count / duration, 3) if duration > 0 else 0.0,
+            "p50_ms": round(histogram.percentile(50) * 1000, 2),
+            "p95_ms": round(histogram.percentile(95) * 1000, 2),
+            "p99_ms": p99_ms,
+            "mean_ms": round(histogram.mean * 1000, 2),
+            "max_ms": round(histogram.max * 1000, 2),
+            "status_codes": dict(sorted(self.status_codes.items())),
+        }
+        if self.spec.slo_p99_ms is not None:
+            summary["slo"] = {"p99_ms": self.spec.slo_p99_ms, "met": histogram.count > 0 and p99_ms <= self.spec.slo_p99_ms}
+        return summary
+
+
+async def open_sessions(client: httpx.AsyncClient, seeded: SeededData, sessions: int) -> Dict[str, List[str]]:
+    """Log in customers and admins, returning session tokens by role"""
+    tokens: Dict[str, List[str]] = {ROLE_CUSTOMER: [], ROLE_ADMIN: []}
+    logins = [(ROLE_CUSTOMER, name) for name in seeded.customers[:max(1, sessions)]]
+    logins += [(ROLE_ADMIN, name) for name in seeded.admins]
+    for role, username in logins:
+        response = await client.post("/login", data={"username": username, "password": seeded.password})
+        if response.status_code != 200:
+            raise RuntimeError(f"Login of {username} failed with {response.status_code}: {response.text[:200]}")
+        tokens[role].append(response.json()["access_token"])
+    return tokens
+
+
+def plan_requests(config: LoadTestConfig, seeded: SeededData, tokens: Dict[str, List[str]]) -> List[PlannedRequest]:
+    """Deterministic schedule of the run: evenly spaced starts, endpoints drawn by weight"""
+    rng = random.Random(config.seed)
+    workload = [spec for spec in config.workload if spec.weight > 0]
+    if not workload:
+        raise ValueError("Workload has no endpoint with a positive weight")
+    for spec in workload:
+        if spec.role != ROLE_ANONYMOUS and not tokens.get(spec.role):
+            raise ValueError(f"Endpoint '{spec.name}' needs a {spec.role} session but none was opened")
+
+    weights = [spec.weight for spec in workload]
+    total = int((config.warmup_seconds + config.duration_seconds) * config.rps)
+    plan = []
+    for index in range(total):
+        offset = index / config.rps
+        spec = rng.choices(workload, weights)[0]
+        kwargs = spec.build(rng, seeded) if spec.build else {}
+        if spec.params:
+            kwargs["params"] = dict(spec.params)
+        if spec.role != ROLE_ANONYMOUS:
+            kwargs["headers"] = {"Cookie": f"session_token={rng.choice(tokens[spec.role])}"}
+        plan.append(PlannedRequest(offset, spec, kwargs, offset < config.warmup_seconds))
+    return plan
+
+
+async def run_load_test(client: httpx.AsyncClient, config: LoadTestConfig, seeded: SeededData) -> Dict[str, Any]:
+    """Drive the workload against ``client`` and return the JSON report"""
+    tokens = await open_sessions(client, seeded, config.sessions)
+    plan = plan_requests(config, seeded, tokens)
+    stats = {spec.name: EndpointStats(spec) for spec in config.workload if spec.weight > 0}
+    semaphore = asyncio.Semaphore(config.max_in_flight)
+    loop = asyncio.get_running_loop()
+    last_completion = [0.0]
+
+    async def issue(request: PlannedRequest, scheduled: float):
+        status = None
+        async with semaphore:
+            try:
+                response = await client.request(request.endpoint.method, request.endpoint.path,
+                                                 timeout=config.request_timeout, **request.kwargs)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                logger.debug(f"{request.endpoint.name} request failed: {e}")
+        finished = loop.time()
+        if not request.warmup:
+            stats[request.endpoint.name].record(finished - scheduled, status)
+            last_completion[0] = max(last_completion[0], finished)
+
+    started = loop.time()
+    measure_start = started + config.warmup_seconds
+    tasks = []
+    for request in plan:
+        scheduled = started + request.offset
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(issue(request, scheduled)))
+    await asyncio.gather(*tasks)
+
+    duration = max(last_completion[0] - measure_start, config.duration_seconds)
+    measured = sum(entry.histogram.count for entry in stats.values())
+    overall = LatencyHistogram(buckets_per_doubling=LOAD_TEST_HISTOGRAM_RESOLUTION)
+    for entry in stats.values():
+        overall.merge(entry.histogram)
+    endpoints = {name: entry.summary(duration) for name, entry in stats.items()}
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "target_rps": config.rps,
+            "duration_seconds": config.duration_seconds,
+            "warmup_seconds": config.warmup_seconds,
+            "sessions": config.sessions,
+            "max_in_flight": config.max_in_flight,
+            "seed": config.seed,
+            "workload": {spec.name: spec.weight for spec in config.workload if spec.weight > 0},
+        },
+        "duration_seconds": round(duration, 3),
+        "achieved_rps": round(measured / duration, 3) if duration > 0 else 0.0,
+        "total": {
+            "requests": measured,
+            "errors": sum(entry.errors for entry in stats.values()),
+            "p50_ms": round(overall.percentile(50) * 1000, 2),
+            "p95_ms": round(overall.percentile(95) * 1000, 2),
+            "p99_ms": round(overall.percentile(99) * 1000, 2),
+        },
+        "slo_met": all(summary.get("slo", {}).get("met", True) for summary in endpoints.values()),
+        "endpoints": endpoints,
+    }
+
+
+# -------------------- Reports --------------------
+
+def save_report(report: Dict[str, Any], path: str):
+    """Write a report as JSON"""
+    with open(path, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, indent=2)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as report_file:
+        return json.load(report_file)
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    tolerance: float = LOAD_TEST_REGRESSION_TOLERANCE) -> List[str]:
+    """Describe each endpoint metric that got worse than the baseline by more than ``tolerance``
+
+    Latency percentiles and error rates regress when they grow, throughput
+    when it shrinks. Endpoints missing from either report are ignored.
+    """
+    regressions = []
+    for name, before in baseline.get("endpoints", {}).items():
+        after = current.get("endpoints", {}).get(name)
+        if after is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if before[metric] > 0 and after[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{name} {metric}: {before[metric]} -> {after[metric]} "
+                                   f"(+{(after[metric] / before[metric] - 1) * 100:.0f}%)")
+        if after["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name} throughput_rps: {before['throughput_rps']} -> {after['throughput_rps']}")
+        if after["error_rate"] > before["error_rate"] + tolerance / 10:
+            regressions.append(f"{name} error_rate: {before['error_rate']} -> {after['error_rate']}")
+    return regressions
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Plain-text table of a report"""
+    lines = [f"{'endpoint':<18}{'requests':>9}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  SLO"]
+    for name, summary in report["endpoints"].items():
+        slo = summary.get("slo")
+        verdict = "-" if slo is None else ("ok" if slo["met"] else f"MISSED (p99 <= {slo['p99_ms']})")
+        lines.append(f"{name:<18}{summary['requests']:>9}{summary['errors']:>8}{summary['throughput_rps']:>9}"
+                     f"{summary['p50_ms']:>10}{summary['p95_ms']:>10}{summary['p99_ms']:>10}  {verdict}")
+    total = report["total"]
+    lines.append(f"{'total':<18}{total['requests']:>9}{total['errors']:>8}{report['achieved_rps']:>9}"
+                 f"{total['p50_ms']:>10}{total['p95_ms']:>10}{total['p99_ms']:>10}")
+    return "\n".join(lines)
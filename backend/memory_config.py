@@ -91,6 +91,12 @@ class PerformanceConfig:
     intelligent_chat_cache_size: int = 100
     intelligent_chat_priority_weight: float = 0.9
     context_retrieval_max_results: int = 5
+    
+    # Rolling conversation summaries: turns older than the latest
+    # summary_recent_turns are folded into the summary in the background
+    summary_recent_turns: int = 5
+    summary_interval_seconds: int = 300
+    summary_max_sentences: int = 12
 
 
 @dataclass
@@ -246,7 +252,10 @@ class MemoryConfig:
                 'prioritize_intelligent_chat': self.performance.prioritize_intelligent_chat,
                 'intelligent_chat_cache_size': self.performance.intelligent_chat_cache_size,
                 'intelligent_chat_priority_weight': self.performance.intelligent_chat_priority_weight,
-                'context_retrieval_max_results': self.performance.context_retrieval_max_results
+                'context_retrieval_max_results': self.performance.context_retrieval_max_results,
+                'summary_recent_turns': self.performance.summary_recent_turns,
+                'summary_interval_seconds': self.performance.summary_interval_seconds,
+                'summary_max_sentences': self.performance.summary_max_sentences
             },
             'security': {
                 'encrypt_sensitive_data': self.security.encrypt_sensitive_data,
@@ -330,6 +339,12 @@ class MemoryConfig:
             errors.append("connection_pool_size must be positive")
         if self.performance.max_concurrent_operations <= 0:
             errors.append("max_concurrent_operations must be positive")
+        if self.performance.summary_recent_turns <= 0:
+            errors.append("summary_recent_turns must be positive")
+        if self.performance.summary_interval_seconds <= 0:
+            errors.append("summary_interval_seconds must be positive")
+        if self.performance.summary_max_sentences <= 0:
+            errors.append("summary_max_sentences must be positive")
         
         # Validate security config
         if self.security.max_failed_attempts <= 0:
@@ -407,6 +422,10 @@ class MemoryConfig:
             self.performance.max_context_entries = int(os.getenv(f"{env_prefix}MAX_CONTEXT_ENTRIES"))
         if os.getenv(f"{env_prefix}CACHE_SIZE_MB"):
             self.performance.cache_size_mb = int(os.getenv(f"{env_prefix}CACHE_SIZE_MB"))
+        if os.getenv(f"{env_prefix}SUMMARY_RECENT_TURNS"):
+            self.performance.summary_recent_turns = int(os.getenv(f"{env_prefix}SUMMARY_RECENT_TURNS"))
+        if os.getenv(f"{env_prefix}SUMMARY_INTERVAL_SECONDS"):
+            self.performance.summary_interval_seconds = int(os.getenv(f"{env_prefix}SUMMARY_INTERVAL_SECONDS"))
         
         # Security overrides
         if os.getenv(f"{env_prefix}ENCRYPT_SENSITIVE_DATA"):
@@ -28,6 +28,7 @@ from backend.memory_models import (
     create_context_cache_entry,
     create_tool_usage_metric
 )
+from backend.conversation_summarizer import ConversationSummarizer, load_summarized_history
 
 
 class MemoryStats:
@@ -108,6 +109,7 @@ class MemoryLayerManager:
         self._operation_times: Dict[str, List[float]] = {}
         self._error_count = 0
         self._last_cleanup = None
+        self._summarizer: Optional[ConversationSummarizer] = None
         
         # Validate configuration
         config_errors = self.config.validate()
@@ -227,47 +229,62 @@ class MemoryLayerManager:
             # Limit by configuration
             actual_limit = min(limit, self.config.performance.max_context_entries)
             
-            # Query recent conversations for context
-            recent_conversations = session.query(EnhancedChatHistory).filter(
-                and_(
-                    EnhancedChatHistory.user_id == user_id,
-                    EnhancedChatHistory.created_at >= datetime.now(timezone.utc) - timedelta(
-                        days=self.config.retention.conversation_retention_days
+            retention_cutoff = datetime.now(timezone.utc) - timedelta(
+                days=self.config.retention.conversation_retention_days
+            )
+            summary_entries = []
+            
+            if self.config.enable_conversation_summaries:
+                # Rolling summaries plus the turns they do not cover yet keep reads and prompt size bounded
+                history = load_summarized_history(session, user_id, since=retention_cutoff)
+                recent_conversations = history.recent_turns
+                summary_entries = [
+                    self._summary_to_context_entry(query, summary)
+                    for summary in history.summaries if summary.summary_text
+                ]
+            else:
+                # Query recent conversations for context
+                recent_conversations = session.query(EnhancedChatHistory).filter(
+                    and_(
+                        EnhancedChatHistory.user_id == user_id,
+                        EnhancedChatHistory.created_at >= retention_cutoff
                     )
-                )
-            ).order_by(desc(EnhancedChatHistory.created_at)).limit(actual_limit).all()
+                ).order_by(desc(EnhancedChatHistory.created_at)).limit(actual_limit).all()
             
-            # Convert to context entries
+            # Convert to context entries; records are not validated per turn, so
+            # messages stored only in encrypted form are skipped here
             for conv in recent_conversations:
                 # Add user message as context
-                context_entries.append(ContextEntryDTO(
-                    content=conv.user_message,
-                    source=f"conversation_{conv.id}",
-                    relevance_score=self._calculate_relevance_score(query, conv.user_message),
-                    context_type="conversation",  # Use valid context type
-                    timestamp=conv.created_at,
-                    metadata={
-                        'session_id': conv.session_id,
-                        'tools_used': conv.tools_used or [],
-                        'response_quality': conv.response_quality_score,
-                        'message_type': 'user_message'
-                    }
-                ))
+                if conv.user_message:
+                    context_entries.append(ContextEntryDTO(
+                        content=conv.user_message,
+                        source=f"conversation_{conv.id}",
+                        relevance_score=self._calculate_relevance_score(query, conv.user_message),
+                        context_type="conversation",  # Use valid context type
+                        timestamp=conv.created_at,
+                        metadata={
+                            'session_id': conv.session_id,
+                            'tools_used': conv.tools_used or [],
+                            'response_quality': conv.response_quality_score,
+                            'message_type': 'user_message'
+                        }
+                    ))
                 
                 # Add bot response as context
-                context_entries.append(ContextEntryDTO(
-                    content=conv.bot_response,
-                    source=f"conversation_{conv.id}",
-                    relevance_score=self._calculate_relevance_score(query, conv.bot_response),
-                    context_type="conversation",  # Use valid context type
-                    timestamp=conv.created_at,
-                    metadata={
-                        'session_id': conv.session_id,
-                        'tools_used': conv.tools_used or [],
-                        'response_quality': conv.response_quality_score,
-                        'message_type': 'bot_response'
-                    }
-                ))
+                if conv.bot_response:
+                    context_entries.append(ContextEntryDTO(
+                        content=conv.bot_response,
+                        source=f"conversation_{conv.id}",
+                        relevance_score=self._calculate_relevance_score(query, conv.bot_response),
+                        context_type="conversation",  # Use valid context type
+                        timestamp=conv.created_at,
+                        metadata={
+                            'session_id': conv.session_id,
+                            'tools_used': conv.tools_used or [],
+                            'response_quality': conv.response_quality_score,
+                            'message_type': 'bot_response'
+                        }
+                    ))
             
             # Filter by minimum relevance score (but allow at least some entries)
             filtered_entries = [
@@ -285,8 +302,8 @@ class MemoryLayerManager:
             # Sort by relevance score
             filtered_entries.sort(key=lambda x: x.relevance_score, reverse=True)
             
-            # Return top entries
-            result = filtered_entries[:actual_limit]
+            # Return top entries, summaries first as they cover everything older
+            result = (summary_entries + filtered_entries)[:actual_limit]
             
             duration = time.time() - start_time
             self._track_operation_time('retrieve_context', duration)
@@ -304,6 +321,57 @@ class MemoryLayerManager:
             if session:
                 self._close_session(session)
     
+    def _summary_to_context_entry(self, query: str, summary: ConversationSummary) -> ContextEntryDTO:
+        """Convert a rolling conversation summary into a context entry"""
+        relevance = max(
+            self._calculate_relevance_score(query, summary.summary_text),
+            self.config.quality.min_relevance_score
+        )
+        return ContextEntryDTO(
+            content=summary.summary_text,
+            source=f"summary_{summary.id}",
+            relevance_score=min(relevance, 1.0),
+            context_type="summary",
+            timestamp=summary.date_range_end or summary.created_at,
+            metadata={
+                'session_id': summary.session_id,
+                'key_topics': summary.key_topics or [],
+                'turns_folded': (summary.important_context or {}).get('turns_folded', 0),
+                'message_type': 'summary'
+            }
+        )
+    
+    def summarize_conversations(self) -> Dict[str, int]:
+        """
+        Fold older turns into the rolling conversation summaries.
+        
+        Only turns added since the previous call are read, so this is cheap
+        enough to run on a short background schedule.
+        
+        Returns:
+            Counts of sessions checked, turns folded and users updated
+        """
+        if not self.config.enable_conversation_summaries:
+            return {'sessions_checked': 0, 'turns_folded': 0, 'users_updated': 0}
+        
+        if self._summarizer is None:
+            self._summarizer = ConversationSummarizer(
+                recent_turns=self.config.performance.summary_recent_turns,
+                max_sentences=self.config.performance.summary_max_sentences
+            )
+        
+        start_time = time.time()
+        session = self._get_session()
+        try:
+            result = self._summarizer.summarize_pending(session)
+            self._track_operation_time('summarize_conversations', time.time() - start_time)
+            return result
+        except Exception as e:
+            self._log_error('summarize_conversations', e)
+            return {'sessions_checked': 0, 'turns_folded': 0, 'users_updated': 0}
+        finally:
+            self._close_session(session)
+    
     def _calculate_relevance_score(self, query: str, content: str) -> float:
         """
         Calculate relevance score between query and content.
@@ -9,13 +9,12 @@ import os
 import sys
 from datetime import datetime, timedelta
 from sqlalchemy import create_engine, text, inspect
-from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
 # Add the current directory to Python path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from backend.database import Base, DATABASE_URL, engine
+from backend.database import Base, DATABASE_URL, engine, BackgroundSessionLocal
 from backend.memory_models import (
     EnhancedChatHistory,
     MemoryContextCache,
@@ -88,8 +87,7 @@ def migrate_existing_chat_history():
     try:
         print("🔄 Migrating existing chat history...")
         
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        db = SessionLocal()
+        db = BackgroundSessionLocal()
         
         # Check if there's existing chat history to migrate
         result = db.execute(text("SELECT COUNT(*) FROM chat_history"))
@@ -142,8 +140,7 @@ def create_default_configurations():
     try:
         print("⚙️ Creating default memory configurations...")
         
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        db = SessionLocal()
+        db = BackgroundSessionLocal()
         
         default_configs = [
             {
@@ -210,8 +207,7 @@ def create_initial_health_metrics():
     try:
         print("📊 Creating initial health metrics...")
         
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        db = SessionLocal()
+        db = BackgroundSessionLocal()
         
         from memory_models import MemoryHealthMetrics
         
@@ -271,8 +267,7 @@ def verify_migration():
             return False
         
         # Check table structures
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        db = SessionLocal()
+        db = BackgroundSessionLocal()
         
         # Verify we can query each table
         for table in required_tables:
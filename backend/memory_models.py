@@ -4,10 +4,11 @@ These models extend the existing database schema to support
 persistent conversation memory, context caching, and tool analytics.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, Boolean, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, Boolean, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP, UUID, ARRAY
 from sqlalchemy.orm import relationship
 from backend.database import Base
+from backend.context_record import ContextRecord
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Any, Optional, Union
 from dataclasses import dataclass, field, asdict
@@ -95,7 +96,7 @@ class MemoryContextCache(Base):
     )
     
     def to_context_entry(self) -> 'ContextEntry':
-        """Convert to ContextEntry DTO"""
+        """Convert to a validated ContextEntry"""
         return ContextEntry(
             content=str(self.context_data.get('content', '')),
             source=str(self.context_data.get('source', 'cache')),
@@ -103,7 +104,7 @@ class MemoryContextCache(Base):
             context_type=self.context_type,
             timestamp=self.created_at,
             metadata=self.context_data.get('metadata', {})
-        )
+        ).validate()
     
     def is_expired(self) -> bool:
         """Check if cache entry is expired"""
@@ -130,6 +131,8 @@ class ToolUsageMetrics(Base):
         Index('idx_tool_metrics_success', 'success_rate'),
         Index('idx_tool_metrics_quality', 'response_quality_score'),
         Index('idx_tool_metrics_usage', 'usage_count'),
+        # Conflict target for the batched UPSERT in ToolUsageAnalytics.flush
+        UniqueConstraint('tool_name', 'query_hash', name='uq_tool_metrics_name_hash'),
         {'extend_existing': True}
     )
     
@@ -242,6 +245,9 @@ class EnhancedUserSession(Base):
         {'extend_existing': True}
     )
 
+# Backward-compatible name used by the security and GDPR modules
+UserSession = EnhancedUserSession
+
 class DataProcessingConsent(Base):
     """GDPR consent records for data processing"""
     __tablename__ = "data_processing_consent"
@@ -377,74 +383,8 @@ class ConversationEntry:
             timestamp=timestamp or datetime.now(timezone.utc)
         )
 
-@dataclass
-class ContextEntry:
-    """Data transfer object for context entries with validation"""
-    content: str
-    source: str
-    relevance_score: float
-    context_type: str
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
-    metadata: Dict[str, Any] = field(default_factory=dict)
-    
-    def __post_init__(self):
-        """Validate data after initialization"""
-        self.validate()
-    
-    def validate(self) -> None:
-        """Validate context entry data"""
-        if not self.content or not isinstance(self.content, str):
-            raise ValueError("content must be a non-empty string")
-        
-        if not self.source or not isinstance(self.source, str):
-            raise ValueError("source must be a non-empty string")
-        
-        if not isinstance(self.relevance_score, (int, float)):
-            raise ValueError("relevance_score must be a number")
-        
-        if not 0.0 <= self.relevance_score <= 1.0:
-            raise ValueError("relevance_score must be between 0.0 and 1.0")
-        
-        if not self.context_type or not isinstance(self.context_type, str):
-            raise ValueError("context_type must be a non-empty string")
-        
-        # Validate context_type against allowed values
-        allowed_types = ['conversation', 'tool_usage', 'document', 'summary', 'user_preference']
-        if self.context_type not in allowed_types:
-            raise ValueError(f"context_type must be one of: {', '.join(allowed_types)}")
-        
-        if not isinstance(self.metadata, dict):
-            raise ValueError("metadata must be a dictionary")
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
-        return {
-            'content': self.content,
-            'source': self.source,
-            'relevance_score': self.relevance_score,
-            'context_type': self.context_type,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
-            'metadata': self.metadata
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'ContextEntry':
-        """Create instance from dictionary"""
-        timestamp = None
-        if data.get('timestamp'):
-            if isinstance(data['timestamp'], str):
-                timestamp = datetime.fromisoformat(data['timestamp'].replace('Z', '+00:00'))
-            elif isinstance(data['timestamp'], datetime):
-                timestamp = data['timestamp']
-        
-        return cls(
-            content=data['content'],
-            source=data['source'],
-            relevance_score=data['relevance_score'],
-            context_type=data['context_type'],
-            timestamp=timestamp or datetime.now(timezone.utc),
-            metadata=data.get('metadata', {})
-        )
+# Context entries share one slotted record type with the intelligent chat system
+ContextEntry = ContextRecord
 
 @dataclass
 class ToolRecommendation:
@@ -506,9 +446,7 @@ class ConversationEntryDTO(ConversationEntry):
     """Legacy DTO class - use ConversationEntry instead"""
     pass
 
-class ContextEntryDTO(ContextEntry):
-    """Legacy DTO class - use ContextEntry instead"""
-    pass
+ContextEntryDTO = ContextEntry  # Legacy name - use ContextEntry instead
 
 class ToolRecommendationDTO(ToolRecommendation):
     """Legacy DTO class - use ToolRecommendation instead"""
@@ -0,0 +1,519 @@
+"""
+Microbenchmarks for the retrieval, scoring and rendering hot paths.
+
+Each benchmark builds a synthetic corpus of a given size from a fixed seed,
+then times one pass over it: for example, scoring a query against every
+entry, or rendering every response. Passes repeat until ``min_time`` has
+elapsed, and the fastest one gives ops/sec. A further pass under tracemalloc
+gives the pass's peak and retained memory, and a sample of single operations,
+each traced on its own, gives the bytes allocated per operation.
+
+Running the same benchmark at growing sizes gives a scaling curve. The
+``scaling_exponent`` is the slope of log(pass time) against log(size):
+1.0 means the per-entry cost is constant, and anything well above it means
+the cost of an entry grows with the corpus. A size whose pass is estimated to
+exceed ``max_pass_seconds`` is skipped, and so are the sizes above it. This
+lets a full run reach 1M entries on the fast paths without stalling on the
+slow ones.
+
+Results are JSON. ``compare_results`` lists the cases that got slower or
+allocate more than a stored baseline by more than a tolerance. Timings only
+compare meaningfully on the same machine; allocations compare anywhere.
+"""
+
+import os
+import sys
+import math
+import time
+import random
+import logging
+import platform
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+MICROBENCH_SEED = int(os.getenv("MICROBENCH_SEED", "1234"))
+MICROBENCH_MIN_TIME = float(os.getenv("MICROBENCH_MIN_TIME", "0.2"))
+MICROBENCH_MAX_PASSES = int(os.getenv("MICROBENCH_MAX_PASSES", "50"))
+MICROBENCH_MAX_PASS_SECONDS = float(os.getenv("MICROBENCH_MAX_PASS_SECONDS", "20"))
+MICROBENCH_REGRESSION_TOLERANCE = float(os.getenv("MICROBENCH_REGRESSION_TOLERANCE", "0.15"))
+# Allocation differences below this many bytes per op are noise, not regressions
+MICROBENCH_ALLOCATION_SLACK_BYTES = 64
+# Single operations traced to average the bytes allocated per operation
+MICROBENCH_ALLOCATION_SAMPLES = int(os.getenv("MICROBENCH_ALLOCATION_SAMPLES", "200"))
+
+QUICK_SIZES = (100, 1_000, 10_000)
+FULL_SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+
+# A pass returns the number of operations it performed
+Pass = Callable[[], int]
+# One operation of a pass, given its index, returns how many operations it counts as
+Op = Callable[[int], int]
+
+VOCABULARY = (
+    "broadband", "router", "wifi", "connection", "slow", "dropping", "bill", "payment", "invoice",
+    "upgrade", "plan", "package", "fibre", "speed", "support", "hours", "contact", "phone", "mobile",
+    "data", "account", "password", "email", "engineer", "appointment", "fault", "line", "test",
+    "tv", "box", "channel", "contract", "price", "deal", "moving", "house", "refund", "charge",
+    "the", "my", "is", "not", "working", "since", "yesterday", "can", "you", "help", "with", "please",
+)
+
+QUERIES = (
+    "my broadband keeps dropping can you help",
+    "how do I upgrade my fibre plan",
+    "what are your support hours",
+    "why is my bill higher this month",
+    "my wifi is slow since yesterday",
+)
+
+TOOL_NAMES = (
+    "ContextRetriever", "SupportKnowledgeBase", "CreateSupportTicket",
+    "BTPlansInformation", "BTWebsiteSearch", "BTSupportHours", "web_search", "wikipedia",
+)
+
+
+# -------------------- Synthetic corpora --------------------
+
+def _sentence(rng: random.Random, low: int = 6, high: int = 18) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(low, high)))
+
+
+def _pii_text(rng: random.Random) -> str:
+    """Support message where about half carry an email, phone number or address"""
+    parts = [_sentence(rng)]
+    roll = rng.random()
+    if roll < 0.2:
+        parts.append(f"email me at user{rng.randint(1, 99999)}@example.com")
+    elif roll < 0.35:
+        parts.append(f"call {rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}")
+    elif roll < 0.5:
+        parts.append(f"I live at {rng.randint(1, 300)} Station Road")
+    parts.append(_sentence(rng, 3, 8))
+    return " ".join(parts)
+
+
+def _response_text(rng: random.Random) -> str:
+    """Assistant response in one of the formats the renderer distinguishes"""
+    kind = rng.randrange(6)
+    if kind == 0:
+        return _sentence(rng, 20, 60).capitalize() + "."
+    if kind == 1:
+        items = "\n".join(f"* {_sentence(rng, 3, 8)}" for _ in range(rng.randint(2, 5)))
+        return f"## {_sentence(rng, 2, 4).title()}\n\n{items}\n\n**Note:** {_sentence(rng)}"
+    if kind == 2:
+        return f"```python\ndef check_{rng.choice(VOCABULARY)}():\n    return {rng.randint(0, 9)}\n```"
+    if kind == 3:
+        return '{"status": "%s", "speed_mbps": %d, "fault": %s}' % (
+            rng.choice(VOCABULARY), rng.randint(1, 900), rng.choice(("true", "false")))
+    if kind == 4:
+        rows = "\n".join(f"| {rng.choice(VOCABULARY)} | {rng.randint(10, 99)} |" for _ in range(rng.randint(2, 6)))
+        return f"| Plan | Price |\n|------|-------|\n{rows}"
+    return f"Error: {rng.choice(VOCABULARY)} service failed to respond. Please try again later."
+
+
+def _context_records(rng: random.Random, size: int) -> list:
+    from backend.context_record import ContextRecord
+    types = ("conversation", "tool_usage", "document", "summary")
+    return [
+        ContextRecord(
+            content=_sentence(rng),
+            source=f"conversation_{i}",
+            relevance_score=rng.random(),
+            context_type=rng.choice(types),
+            metadata={"tools_used": rng.sample(TOOL_NAMES, 2), "session_id": f"s{i % 50}"}
+        )
+        for i in range(size)
+    ]
+
+
+# -------------------- Benchmarks --------------------
+
+@dataclass
+class Workload:
+    """A timed pass over a corpus and the single operation it repeats"""
+    run: Pass
+    op: Optional[Op] = None
+
+
+def _rag_similarity(size: int, rng: random.Random) -> Pass:
+    from backend.enhanced_rag_orchestrator import EnhancedRAGOrchestrator
+    orchestrator = EnhancedRAGOrchestrator()
+    corpus = [(set(text.split()), text) for text in (_sentence(rng).lower() for _ in range(size))]
+    query = QUERIES[0]
+    query_words = set(query.split())
+
+    def run() -> int:
+        score = orchestrator._calculate_similarity_score
+        for words, text in corpus:
+            score(query_words, words, query, text)
+        return size
+
+    def op(index: int) -> int:
+        words, text = corpus[index]
+        orchestrator._calculate_similarity_score(query_words, words, query, text)
+        return 1
+    return Workload(run, op)
+
+
+def _context_engine():
+    from backend.context_retrieval_engine import ContextRetrievalEngine
+    return ContextRetrievalEngine()
+
+
+def _context_similarity(size: int, rng: random.Random) -> Pass:
+    engine = _context_engine()
+    corpus = [_sentence(rng) for _ in range(size)]
+    query = QUERIES[1]
+
+    def run() -> int:
+        for text in corpus:
+            engine.calculate_context_similarity(query, text)
+        return size
+
+    def op(index: int) -> int:
+        engine.calculate_context_similarity(query, corpus[index])
+        return 1
+    return Workload(run, op)
+
+
+def _semantic_features(size: int, rng: random.Random) -> Pass:
+    engine = _context_engine()
+    corpus = [_sentence(rng) for _ in range(size)]
+
+    def run() -> int:
+        for text in corpus:
+            engine.extract_semantic_features(text)
+        return size
+
+    def op(index: int) -> int:
+        engine.extract_semantic_features(corpus[index])
+        return 1
+    return Workload(run, op)
+
+
+def _score_tools(size: int, rng: random.Random) -> Pass:
+    from backend.intelligent_chat.tool_selector import ToolSelector
+    selector = ToolSelector()
+    queries = [_sentence(rng, 4, 12) for _ in range(size)]
+    tools = list(TOOL_NAMES)
+
+    def run() -> int:
+        for query in queries:
+            selector.score_tools(query, tools)
+        return size
+
+    def op(index: int) -> int:
+        selector.score_tools(queries[index], tools)
+        return 1
+    return Workload(run, op)
+
+
+def _apply_context_boost(size: int, rng: random.Random) -> Pass:
+    from backend.intelligent_chat.tool_selector import ToolSelector
+    selector = ToolSelector()
+    scores = selector.score_tools(QUERIES[0], list(TOOL_NAMES))
+    context = _context_records(rng, size)
+
+    def run() -> int:
+        selector.apply_context_boost(scores, context)
+        return size
+
+    # The boost is a single call over the whole context
+    def op(index: int) -> int:
+        return run()
+    return Workload(run, op)
+
+
+def _detect_content_type(size: int, rng: random.Random) -> Pass:
+    from backend.intelligent_chat.response_renderer import ResponseRenderer
+    renderer = ResponseRenderer()
+    responses = [_response_text(rng) for _ in range(size)]
+
+    def run() -> int:
+        for response in responses:
+            renderer.detect_content_type(response)
+        return size
+
+    def op(index: int) -> int:
+        renderer.detect_content_type(responses[index])
+        return 1
+    return Workload(run, op)
+
+
+def _anonymize_text(size: int, rng: random.Random) -> Pass:
+    from backend.privacy_utils import PrivacyUtils
+    privacy = PrivacyUtils()
+    texts = [_pii_text(rng) for _ in range(size)]
+
+    def run() -> int:
+        for text in texts:
+            privacy.anonymize_text(text)
+        return size
+
+    def op(index: int) -> int:
+        privacy.anonymize_text(texts[index])
+        return 1
+    return Workload(run, op)
+
+
+def _full_cache(size: int):
+    from backend.intelligent_chat.performance_cache import PerformanceCache
+    cache = PerformanceCache(max_size=size, default_ttl=3600)
+    for i in range(size):
+        cache.set(f"key:{i}", i)
+    return cache
+
+
+def _cache_get(size: int, rng: random.Random) -> Pass:
+    cache = _full_cache(size)
+    keys = [f"key:{rng.randrange(size)}" for _ in range(size)]
+
+    def run() -> int:
+        for key in keys:
+            cache.get(key)
+        return size
+
+    def op(index: int) -> int:
+        cache.get(keys[index])
+        return 1
+    return Workload(run, op)
+
+
+def _cache_set(size: int, rng: random.Random) -> Pass:
+    cache = _full_cache(size)
+    # Every set adds a new key to a full cache and so evicts one
+    next_key = [size]
+
+    def run() -> int:
+        start = next_key[0]
+        for i in range(start, start + size):
+            cache.set(f"key:{i}", i)
+        next_key[0] = start + size
+        return size
+
+    def op(index: int) -> int:
+        cache.set(f"key:{next_key[0]}", next_key[0])
+        next_key[0] += 1
+        return 1
+    return Workload(run, op)
+
+
+@dataclass
+class Benchmark:
+    """
+    A hot function and the corpus pass that exercises it
+
+    ``setup`` returns a Workload, or a bare Pass, whose allocations are then
+    only reported for the pass as a whole.
+    """
+    name: str
+    target: str
+    description: str
+    setup: Callable[[int, random.Random], Union[Pass, Workload]]
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("rag_similarity", "EnhancedRAGOrchestrator._calculate_similarity_score",
+              "score a query against each knowledge entry", _rag_similarity),
+    Benchmark("context_similarity", "ContextRetrievalEngine.calculate_context_similarity",
+              "score a query against each context text", _context_similarity),
+    Benchmark("semantic_features", "ContextRetrievalEngine.extract_semantic_features",
+              "extract features of each text", _semantic_features),
+    Benchmark("score_tools", "ToolSelector.score_tools",
+              "score the tool list for each query", _score_tools),
+    Benchmark("apply_context_boost", "ToolSelector.apply_context_boost",
+              "boost tool scores by a context of N entries", _apply_context_boost),
+    Benchmark("detect_content_type", "ResponseRenderer.detect_content_type",
+              "classify each response", _detect_content_type),
+    Benchmark("anonymize_text", "PrivacyUtils.anonymize_text",
+              "redact PII from each message", _anonymize_text),
+    Benchmark("performance_cache_get", "PerformanceCache.get",
+              "look up N keys in a cache of N entries", _cache_get),
+    Benchmark("performance_cache_set", "PerformanceCache.set",
+              "insert N keys into a full cache of N entries", _cache_set),
+]
+
+
+def get_benchmark(name: str) -> Benchmark:
+    for benchmark in BENCHMARKS:
+        if benchmark.name == name:
+            return benchmark
+    raise KeyError(f"Unknown benchmark '{name}'; known: {', '.join(b.name for b in BENCHMARKS)}")
+
+
+# -------------------- Running --------------------
+
+def _time_passes(run: Pass, min_time: float, max_passes: int) -> Tuple[float, int, int]:
+    """Fastest pass in seconds, operations per pass and passes made"""
+    best = math.inf
+    operations = 0
+    passes = 0
+    started = time.perf_counter()
+    while passes < max_passes:
+        pass_start = time.perf_counter()
+        operations = run()
+        best = min(best, time.perf_counter() - pass_start)
+        passes += 1
+        if time.perf_counter() - started >= min_time:
+            break
+    return best, operations, passes
+
+
+def _measure_allocations(workload: Workload, size: int,
+                         samples: int = MICROBENCH_ALLOCATION_SAMPLES) -> Tuple[int, int, Optional[float]]:
+    """
+    Peak bytes allocated during one pass, bytes still held after it, and the
+    mean peak bytes of a single operation
+
+    A pass's peak is the most memory live at once, not the total allocated,
+    so it is not divided by the pass's operations. Instead operations spread
+    over the corpus are traced one at a time, each from a reset peak.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        workload.run()
+        after, peak = tracemalloc.get_traced_memory()
+
+        per_op = None
+        count = min(size, samples)
+        if workload.op is not None and count > 0:
+            allocated = operations = 0
+            for sample in range(count):
+                tracemalloc.reset_peak()
+                current, _ = tracemalloc.get_traced_memory()
+                operations += workload.op(sample * size // count)
+                allocated += max(0, tracemalloc.get_traced_memory()[1] - current)
+            per_op = round(allocated / operations, 1) if operations else None
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return max(0, peak - before), max(0, after - before), per_op
+
+
+def scaling_exponent(points: List[Tuple[int, float]]) -> Optional[float]:
+    """Least-squares slope of log(seconds) over log(size), None with fewer than two sizes"""
+    points = [(size, seconds) for size, seconds in points if size > 0 and seconds > 0]
+    if len(points) < 2:
+        return None
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(seconds) for _, seconds in points]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if variance == 0:
+        return None
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance, 3)
+
+
+def run_benchmark(benchmark: Benchmark, sizes: Tuple[int, ...] = QUICK_SIZES, min_time: float = MICROBENCH_MIN_TIME,
+                  max_passes: int = MICROBENCH_MAX_PASSES, max_pass_seconds: float = MICROBENCH_MAX_PASS_SECONDS,
+                  measure_allocations: bool = True, seed: int = MICROBENCH_SEED) -> Dict[str, Any]:
+    """Run one benchmark at each size and return its results and scaling curve"""
+    summary: Dict[str, Any] = {"target": benchmark.target, "description": benchmark.description,
+                               "results": [], "skipped_sizes": []}
+    previous: Optional[Tuple[int, float]] = None
+    for size in sorted(sizes):
+        if previous is not None:
+            estimate = previous[1] * size / previous[0]
+            if estimate > max_pass_seconds:
+                summary["skipped_sizes"] = [s for s in sorted(sizes) if s >= size]
+                logger.info(f"{benchmark.name}: skipping sizes from {size}, a pass would take ~{estimate:.0f}s")
+                break
+        try:
+            workload = benchmark.setup(size, random.Random(seed))
+        except ImportError as e:
+            summary["error"] = f"unavailable: {e}"
+            logger.warning(f"{benchmark.name}: skipped, {e}")
+            return summary
+
+        if not isinstance(workload, Workload):
+            workload = Workload(workload)
+        best, operations, passes = _time_passes(workload.run, min_time, max_passes)
+        result = {
+            "size": size,
+            "operations": operations,
+            "passes": passes,
+            "pass_seconds": round(best, 6),
+            "ops_per_sec": round(operations / best, 1) if best > 0 else None,
+            "ns_per_op": round(best / operations * 1e9, 1) if operations else None,
+        }
+        if measure_allocations:
+            peak, retained, per_op = _measure_allocations(workload, size)
+            result["peak_alloc_bytes"] = peak
+            result["retained_bytes"] = retained
+            result["alloc_bytes_per_op"] = per_op
+        summary["results"].append(result)
+        previous = (size, best)
+        del workload
+
+    summary["scaling_exponent"] = scaling_exponent([(r["size"], r["pass_seconds"]) for r in summary["results"]])
+    return summary
+
+
+def run_suite(names: Optional[List[str]] = None, sizes: Tuple[int, ...] = QUICK_SIZES, **options: Any) -> Dict[str, Any]:
+    """Run the named benchmarks, or all of them, and return the JSON report"""
+    benchmarks = [get_benchmark(name) for name in names] if names else BENCHMARKS
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "sizes": list(sizes),
+        "benchmarks": {},
+    }
+    for benchmark in benchmarks:
+        started = time.perf_counter()
+        report["benchmarks"][benchmark.name] = run_benchmark(benchmark, sizes, **options)
+        logger.info(f"{benchmark.name}: done in {time.perf_counter() - started:.1f}s")
+    return report
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    tolerance: float = MICROBENCH_REGRESSION_TOLERANCE) -> List[str]:
+    """Describe each benchmark size that got slower or allocates more than the baseline beyond ``tolerance``
+
+    Only benchmark sizes present in both reports are compared.
+    """
+    regressions = []
+    for name, before in baseline.get("benchmarks", {}).items():
+        after = current.get("benchmarks", {}).get(name)
+        if after is None:
+            continue
+        after_by_size = {result["size"]: result for result in after.get("results", [])}
+        for old in before.get("results", []):
+            new = after_by_size.get(old["size"])
+            if new is None:
+                continue
+            label = f"{name}[{old['size']}]"
+            if old.get("ops_per_sec") and new.get("ops_per_sec") is not None:
+                if new["ops_per_sec"] < old["ops_per_sec"] * (1 - tolerance):
+                    regressions.append(f"{label} ops_per_sec: {old['ops_per_sec']} -> {new['ops_per_sec']} "
+                                       f"({(new['ops_per_sec'] / old['ops_per_sec'] - 1) * 100:.0f}%)")
+            old_alloc, new_alloc = old.get("alloc_bytes_per_op"), new.get("alloc_bytes_per_op")
+            if old_alloc is not None and new_alloc is not None:
+                if new_alloc > old_alloc * (1 + tolerance) + MICROBENCH_ALLOCATION_SLACK_BYTES:
+                    regressions.append(f"{label} alloc_bytes_per_op: {old_alloc} -> {new_alloc}")
+    return regressions
+
+
+def format_results(report: Dict[str, Any]) -> str:
+    """Plain-text table of a report"""
+    lines = [f"{'benchmark':<24}{'size':>10}{'ops/sec':>14}{'ns/op':>12}{'alloc B/op':>12}  scaling"]
+    for name, summary in report["benchmarks"].items():
+        if "error" in summary:
+            lines.append(f"{name:<24}  {summary['error']}")
+            continue
+        exponent = summary.get("scaling_exponent")
+        for index, result in enumerate(summary["results"]):
+            scaling = (f"n^{exponent}" if exponent is not None else "-") if index == 0 else ""
+            lines.append(f"{name if index == 0 else '':<24}{result['size']:>10}{str(result['ops_per_sec']):>14}"
+                         f"{str(result['ns_per_op']):>12}{str(result.get('alloc_bytes_per_op', '-')):>12}  {scaling}")
+        if summary["skipped_sizes"]:
+            lines.append(f"{'':<24}skipped sizes: {', '.join(str(s) for s in summary['skipped_sizes'])}")
+    return "\n".join(lines)
@@ -0,0 +1,640 @@
+"""
+Consolidated ASGI Middleware Pipeline
+
+A single pure-ASGI middleware that replaces the stacked ``BaseHTTPMiddleware``
+layers for rate limiting, request validation, authentication, security headers
+and error handling.
+
+Each request path is classified against a prefix table that is compiled once at
+startup. Each route class runs only the stages it needs. Static files skip the
+pipeline entirely, and health checks only get error handling. Header, query and
+body values are scanned once with a single combined pattern and suspicious
+values are rejected; setting ``MIDDLEWARE_REJECT_SUSPICIOUS=false`` only logs
+them. Requests are limited to 60 and logins to 5 per minute unless the limits
+are set to 0. Responses are never buffered or wrapped, so streaming bodies pass
+straight through.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import logging
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from fastapi.responses import JSONResponse, RedirectResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from .error_middleware import ErrorHandlingMiddleware, AdminErrorHandlingMiddleware
+from .request_tracing import record_stage, STAGE_MIDDLEWARE
+from .unified_error_handler import ErrorContext, UnifiedErrorHandler, get_error_handler
+
+logger = logging.getLogger(__name__)
+
+# 0 disables the limit
+REQUEST_RATE_LIMIT_PER_MINUTE = int(os.getenv("REQUEST_RATE_LIMIT_PER_MINUTE", "60"))
+LOGIN_RATE_LIMIT_PER_MINUTE = int(os.getenv("LOGIN_RATE_LIMIT_PER_MINUTE", "5"))
+# Proxy addresses whose X-Forwarded-For header names the real client
+TRUSTED_PROXIES = frozenset(
+    address.strip() for address in os.getenv("TRUSTED_PROXIES", "").split(",") if address.strip()
+)
+REJECT_SUSPICIOUS_REQUESTS = os.getenv("MIDDLEWARE_REJECT_SUSPICIOUS", "true").lower() == "true"
+MAX_SCANNED_BODY_BYTES = int(os.getenv("MAX_SCANNED_BODY_BYTES", str(1024 * 1024)))
+AUTH_ENABLED = os.getenv("MIDDLEWARE_AUTH_ENABLED", "false").lower() == "true"
+MAX_QUERY_PARAM_LENGTH = 1000
+MAX_USER_AGENT_LENGTH = 500
+
+# Route classes
+ROUTE_STATIC = "static"
+ROUTE_HEALTH = "health"
+ROUTE_PUBLIC = "public"
+ROUTE_LOGIN = "login"
+ROUTE_API = "api"
+ROUTE_ADMIN = "admin"
+ROUTE_PAGE = "page"
+
+# Pipeline stages
+STAGE_ERRORS = "errors"
+STAGE_RATE_LIMIT = "rate_limit"
+STAGE_VALIDATION = "validation"
+STAGE_AUTH = "auth"
+STAGE_SECURITY_HEADERS = "security_headers"
+
+_GUARDED_STAGES = frozenset({STAGE_ERRORS, STAGE_RATE_LIMIT, STAGE_VALIDATION, STAGE_SECURITY_HEADERS})
+
+ROUTE_STAGES: Dict[str, FrozenSet[str]] = {
+    ROUTE_STATIC: frozenset(),
+    ROUTE_HEALTH: frozenset({STAGE_ERRORS}),
+    ROUTE_PUBLIC: _GUARDED_STAGES,
+    ROUTE_LOGIN: _GUARDED_STAGES,
+    ROUTE_API: _GUARDED_STAGES | {STAGE_AUTH},
+    ROUTE_ADMIN: _GUARDED_STAGES | {STAGE_AUTH},
+    ROUTE_PAGE: _GUARDED_STAGES | {STAGE_AUTH},
+}
+
+# (path prefix, route class); a trailing "$" matches the whole path exactly.
+# The longest matching prefix wins, paths matching nothing are ROUTE_PAGE.
+DEFAULT_ROUTES: Tuple[Tuple[str, str], ...] = (
+    ("/static/", ROUTE_STATIC),
+    ("/admin-static/", ROUTE_STATIC),
+    ("/admin/css/", ROUTE_STATIC),
+    ("/admin/js/", ROUTE_STATIC),
+    ("/css/", ROUTE_STATIC),
+    ("/js/", ROUTE_STATIC),
+    ("/favicon.ico", ROUTE_STATIC),
+    ("/robots.txt", ROUTE_STATIC),
+    ("/health", ROUTE_HEALTH),
+    ("/metrics", ROUTE_HEALTH),
+    ("/$", ROUTE_PUBLIC),
+    ("/login.html", ROUTE_PUBLIC),
+    ("/register.html", ROUTE_PUBLIC),
+    ("/docs", ROUTE_PUBLIC),
+    ("/openapi.json", ROUTE_PUBLIC),
+    ("/login", ROUTE_LOGIN),
+    ("/register", ROUTE_LOGIN),
+    ("/logout", ROUTE_LOGIN),
+    ("/api/auth/", ROUTE_LOGIN),
+    ("/admin", ROUTE_ADMIN),
+    ("/api/", ROUTE_API),
+)
+
+# The RequestValidationMiddleware patterns, combined into one alternation
+SECURITY_PATTERNS: Tuple[str, ...] = (
+    r"<script[^>]*>.*?</script>",
+    r"javascript:",
+    r"on\w+\s*=",
+    r"(?:union|select|insert|update|delete|drop|create|alter)\s+",
+    r"(?:\.\./|\.\.\\)",
+)
+
+# Headers and query strings carry free text such as search queries and
+# referrer URLs, where SQL words and "on...=" runs are ordinary
+PARAMETER_PATTERNS: Tuple[str, ...] = (
+    r"<script[^>]*>.*?</script>",
+    r"javascript:",
+    r"(?:\.\./|\.\.\\)",
+)
+
+# Opaque credentials: session cookies and JWTs routinely contain "on...=" runs
+UNSCANNED_HEADERS = frozenset({b"cookie", b"authorization"})
+
+BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
+SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "X-XSS-Protection": "1; mode=block",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "Content-Security-Policy": "default-src 'self'; script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; img-src 'self' data: https:; font-src 'self' https://cdn.jsdelivr.net;",
+}
+_SECURITY_HEADER_ITEMS = [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                          for name, value in SECURITY_HEADERS.items()]
+
+
+class RouteTable:
+    """Longest-prefix route classification compiled into a single pattern"""
+
+    def __init__(self, routes: Iterable[Tuple[str, str]] = DEFAULT_ROUTES, default: str = ROUTE_PAGE):
+        self.routes = tuple(routes)
+        self.default = default
+        self._classes: Dict[str, str] = {}
+
+        # Alternatives are tried in order, so longer prefixes go first
+        ordered = sorted(enumerate(self.routes), key=lambda item: -len(item[1][0].rstrip("$")))
+        alternatives = []
+        for index, (prefix, route_class) in ordered:
+            group = f"r{index}"
+            self._classes[group] = route_class
+            if prefix.endswith("$"):
+                alternatives.append(f"(?P<{group}>{re.escape(prefix[:-1])}$)")
+            else:
+                alternatives.append(f"(?P<{group}>{re.escape(prefix)})")
+        self._pattern = re.compile("|".join(alternatives)) if alternatives else None
+
+    def classify(self, path: str) -> str:
+        """Route class of a request path"""
+        match = self._pattern.match(path) if self._pattern is not None else None
+        return self._classes[match.lastgroup] if match else self.default
+
+
+class PayloadScanner:
+    """Single-pass detection of script injection, SQL keywords and path traversal"""
+
+    def __init__(self, patterns: Iterable[str] = SECURITY_PATTERNS):
+        self.pattern = re.compile("|".join(f"(?:{pattern})" for pattern in patterns),
+                                  re.IGNORECASE | re.DOTALL)
+
+    def contains_malicious_content(self, value: str) -> bool:
+        return self.pattern.search(value) is not None
+
+    def first_match(self, items: List[Tuple[str, str]]) -> Optional[str]:
+        """Name of the first suspicious (name, value) item, None if all are clean
+
+        All values are scanned together in one search. Only when that finds
+        something are they checked one by one to name the culprit.
+        """
+        if not items or self.pattern.search("\x00".join(value for _, value in items)) is None:
+            return None
+        for name, value in items:
+            if self.pattern.search(value):
+                return name
+        # The match spanned two values
+        return None
+
+
+class FixedWindowRateLimiter:
+    """Per-client request counts over the current and the previous window"""
+
+    def __init__(self, limit: int, window_seconds: int = 60, clock: Callable[[], float] = time.time):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.clock = clock
+        # client -> (window, previous window count, current window count)
+        self._counts: Dict[str, Tuple[int, int, int]] = {}
+        self._pruned_window = None
+
+    def allow(self, client: str) -> bool:
+        window = int(self.clock() // self.window_seconds)
+        if window != self._pruned_window:
+            self._prune(window)
+
+        entry = self._counts.get(client)
+        if entry is None or entry[0] < window - 1:
+            previous, current = 0, 0
+        elif entry[0] == window - 1:
+            previous, current = entry[2], 0
+        else:
+            previous, current = entry[1], entry[2]
+
+        if previous + current >= self.limit:
+            self._counts[client] = (window, previous, current)
+            return False
+        self._counts[client] = (window, previous, current + 1)
+        return True
+
+    def _prune(self, window: int):
+        self._pruned_window = window
+        self._counts = {client: entry for client, entry in self._counts.items() if entry[0] >= window - 1}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+def _reject(status_code: int, detail: str) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"detail": detail})
+
+
+def _with_security_headers(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Add missing security headers to an HTML or JSON response start message"""
+    headers = message.get("headers") or []
+    present = set()
+    content_type = b""
+    for name, value in headers:
+        name = name.lower()
+        present.add(name)
+        if name == b"content-type":
+            content_type = value
+    if not content_type.startswith((b"text/html", b"application/json")):
+        return message
+
+    missing = [item for item in _SECURITY_HEADER_ITEMS if item[0] not in present]
+    if not missing:
+        return message
+    message = dict(message)
+    message["headers"] = list(headers) + missing
+    return message
+
+
+def _replay_receive(chunks: List[bytes], more_body: bool, trailing: Optional[Dict[str, Any]], receive):
+    """Receive callable that first returns the already consumed body"""
+    pending = [{"type": "http.request", "body": b"".join(chunks), "more_body": more_body}]
+    if trailing is not None:
+        pending.append(trailing)
+
+    async def replay():
+        if pending:
+            return pending.pop(0)
+        return await receive()
+
+    return replay
+
+
+def _string_values(data: Any) -> Iterable[str]:
+    if isinstance(data, str):
+        yield data
+    elif isinstance(data, dict):
+        for value in data.values():
+            yield from _string_values(value)
+    elif isinstance(data, list):
+        for item in data:
+            yield from _string_values(item)
+
+
+class MiddlewarePipeline:
+    """Pure ASGI middleware running the stages each route class needs
+
+    Stages, in order:
+    - rate limiting per session, bearer token or client address, with a
+      separate limit for login routes; a limit of 0 disables it
+    - validation of headers, query parameters and JSON bodies; suspicious
+      values are logged, and rejected only with ``reject_suspicious``
+    - authentication and route permissions, when ``auth_enabled``
+    - security headers on HTML and JSON responses
+    - error handling, converting exceptions raised before the response
+      started into the unified error responses
+    """
+
+    def __init__(
+        self,
+        app,
+        error_handler: Optional[UnifiedErrorHandler] = None,
+        route_table: Optional[RouteTable] = None,
+        scanner: Optional[PayloadScanner] = None,
+        parameter_scanner: Optional[PayloadScanner] = None,
+        reject_suspicious: bool = REJECT_SUSPICIOUS_REQUESTS,
+        rate_limit_per_minute: int = REQUEST_RATE_LIMIT_PER_MINUTE,
+        login_rate_limit_per_minute: int = LOGIN_RATE_LIMIT_PER_MINUTE,
+        trusted_proxies: Iterable[str] = TRUSTED_PROXIES,
+        max_scanned_body_bytes: int = MAX_SCANNED_BODY_BYTES,
+        auth_enabled: bool = AUTH_ENABLED,
+        route_permissions: Optional[Dict[str, list]] = None,
+        require_admin_for_admin_routes: bool = True,
+        user_loader: Optional[Callable[[Optional[str], Optional[str]], Any]] = None,
+    ):
+        self.app = app
+        self.route_table = route_table or RouteTable()
+        self.scanner = scanner or PayloadScanner()
+        self.parameter_scanner = parameter_scanner or PayloadScanner(PARAMETER_PATTERNS)
+        self.reject_suspicious = reject_suspicious
+        self.rate_limiter = FixedWindowRateLimiter(rate_limit_per_minute) if rate_limit_per_minute > 0 else None
+        self.login_rate_limiter = (FixedWindowRateLimiter(login_rate_limit_per_minute)
+                                   if login_rate_limit_per_minute > 0 else None)
+        self.trusted_proxies = frozenset(trusted_proxies)
+        self.max_scanned_body_bytes = max_scanned_body_bytes
+        self.auth_enabled = auth_enabled
+        self.route_permissions = route_permissions or {}
+        self.require_admin_for_admin_routes = require_admin_for_admin_routes
+        self.user_loader = user_loader or self._load_user
+        self._error_handler = error_handler
+        self._error_responders = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        route_class = self.route_table.classify(scope["path"])
+        stages = ROUTE_STAGES[route_class]
+        if not stages:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+        add_security_headers = STAGE_SECURITY_HEADERS in stages
+        response_status = None
+
+        async def send_wrapper(message):
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+                if add_security_headers:
+                    message = _with_security_headers(message)
+            await send(message)
+
+        try:
+            rejection = None
+            if STAGE_RATE_LIMIT in stages:
+                rejection = self._check_rate_limit(scope, route_class)
+            if rejection is None and STAGE_VALIDATION in stages:
+                rejection, receive = await self._validate(scope, receive)
+            if rejection is None and self.auth_enabled and STAGE_AUTH in stages:
+                rejection = await self._authenticate(scope, route_class)
+            record_stage(STAGE_MIDDLEWARE, time.perf_counter() - started)
+
+            if rejection is not None:
+                await rejection(scope, receive, send_wrapper)
+            else:
+                await self.app(scope, receive, send_wrapper)
+
+            logger.info(
+                "Request completed - %s %s - Status: %s - Duration: %.3fs - Request ID: %s",
+                scope["method"], scope["path"], response_status, time.perf_counter() - started, request_id
+            )
+
+        except Exception as error:
+            # Once the response has started there is nothing left to replace
+            if response_status is not None or STAGE_ERRORS not in stages:
+                raise
+            logger.error(
+                "Request failed - %s %s - Error: %s - Duration: %.3fs - Request ID: %s",
+                scope["method"], scope["path"], error, time.perf_counter() - started, request_id
+            )
+            response = await self._error_response(error, scope, route_class, request_id)
+            await response(scope, receive, send)
+
+    # Rate limiting
+
+    def _check_rate_limit(self, scope, route_class: str) -> Optional[JSONResponse]:
+        if self.rate_limiter is None and self.login_rate_limiter is None:
+            return None
+        address = self._client_address(scope)
+        # Logins are counted per address, everything else per signed-in client
+        if route_class == ROUTE_LOGIN:
+            limited = self.login_rate_limiter is not None and not self.login_rate_limiter.allow(f"ip:{address}")
+        else:
+            limited = self.rate_limiter is not None and not self.rate_limiter.allow(self._client_key(scope, address))
+        if limited:
+            logger.warning("Rate limit exceeded for client: %s", address)
+            return _reject(429, "Rate limit exceeded. Please try again later.")
+        return None
+
+    def _client_address(self, scope) -> Optional[str]:
+        """Client address, taken from X-Forwarded-For when a trusted proxy sent the request"""
+        client = scope.get("client")
+        host = client[0] if client else None
+        if host not in self.trusted_proxies:
+            return host
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                # The rightmost address not added by one of our own proxies
+                for address in reversed(value.decode("latin-1").split(",")):
+                    address = address.strip()
+                    if address and address not in self.trusted_proxies:
+                        return address
+                break
+        return host
+
+    def _client_key(self, scope, address: Optional[str]) -> str:
+        """Session or bearer token of the request, else its client address"""
+        request = Request(scope)
+        session_token = request.cookies.get("session_token")
+        if session_token:
+            return f"session:{session_token}"
+        authorization = request.headers.get("authorization")
+        if authorization and authorization.startswith("Bearer "):
+            return f"bearer:{authorization[7:]}"
+        return f"ip:{address}"
+
+    # Validation
+
+    async def _validate(self, scope, receive):
+        """Check headers, query parameters and JSON bodies
+
+        Returns the rejection response, if any, and the receive callable to
+        hand on, which replays the body when it had to be read.
+        """
+        content_type = ""
+        scanned = []
+        for name, value in scope["headers"]:
+            if name == b"content-type":
+                content_type = value.decode("latin-1")
+            elif name == b"user-agent" and len(value) > MAX_USER_AGENT_LENGTH:
+                logger.warning("Suspiciously long user agent from IP: %s", (scope.get("client") or ("",))[0])
+            if name not in UNSCANNED_HEADERS:
+                scanned.append((name.decode("latin-1"), value.decode("latin-1")))
+
+        header_name = self.parameter_scanner.first_match(scanned)
+        if header_name is not None:
+            logger.warning("Suspicious content in header: %s", header_name)
+            if self.reject_suspicious:
+                return _reject(400, f"Invalid header content detected: {header_name}"), receive
+
+        query_string = scope.get("query_string")
+        if query_string:
+            params = parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)
+            for name, value in params:
+                if len(value) > MAX_QUERY_PARAM_LENGTH:
+                    return _reject(400, f"Query parameter too long: {name}"), receive
+            param_name = self.parameter_scanner.first_match(params)
+            if param_name is not None:
+                logger.warning("Suspicious content in query parameter: %s", param_name)
+                if self.reject_suspicious:
+                    return _reject(400, f"Invalid query parameter content: {param_name}"), receive
+
+        if scope["method"] in BODY_METHODS:
+            if "/api/" in scope["path"] and not content_type.startswith(
+                ("application/json", "application/x-www-form-urlencoded")
+            ):
+                logger.warning("Invalid content type: %s for API endpoint", content_type)
+            if content_type.startswith("application/json"):
+                return await self._validate_json_body(receive)
+
+        return None, receive
+
+    async def _validate_json_body(self, receive):
+        """Read a JSON body up to the scan limit, check it parses and scan its strings"""
+        chunks: List[bytes] = []
+        size = 0
+        more_body = True
+        trailing = None
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                trailing = message
+                break
+            chunk = message.get("body", b"")
+            chunks.append(chunk)
+            size += len(chunk)
+            more_body = message.get("more_body", False)
+            if size > self.max_scanned_body_bytes:
+                break
+
+        replay = _replay_receive(chunks, more_body, trailing, receive)
+        # Oversized bodies stream on unscanned, disconnects are left to the app
+        if more_body or trailing is not None:
+            return None, replay
+
+        body = b"".join(chunks)
+        if not body:
+            return None, replay
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return _reject(400, "Invalid JSON format"), replay
+
+        if self.scanner.contains_malicious_content("\x00".join(_string_values(data))):
+            logger.warning("Potentially malicious content detected in request body")
+        return None, replay
+
+    # Authentication
+
+    def _load_user(self, session_token: Optional[str], authorization: Optional[str]):
+        """Resolve the user from a session cookie or a bearer token"""
+        from .database import get_db
+        from .unified_auth import auth_service
+
+        db = next(get_db())
+        try:
+            user = None
+            if session_token:
+                user = auth_service.get_user_from_session(session_token, db)
+            if not user and authorization and authorization.startswith("Bearer "):
+                user = auth_service.get_user_from_jwt(authorization.split(" ")[1], db)
+            return user
+        finally:
+            db.close()
+
+    async def _authenticate(self, scope, route_class: str):
+        """UnifiedAuthMiddleware and PermissionMiddleware rules for protected routes"""
+        request = Request(scope)
+        try:
+            user = await run_in_threadpool(
+                self.user_loader, request.cookies.get("session_token"), request.headers.get("authorization")
+            )
+        except Exception as e:
+            logger.error(f"Authentication middleware error: {e}")
+            return JSONResponse(status_code=500, content={"error": "Authentication service unavailable"})
+
+        is_get = scope["method"] == "GET"
+        wants_html = request.headers.get("accept", "").startswith("text/html")
+
+        if not user:
+            if (route_class == ROUTE_ADMIN and is_get) or (route_class == ROUTE_PAGE and wants_html):
+                return RedirectResponse(url="/login.html", status_code=302)
+            return JSONResponse(status_code=401, content={"error": "Authentication required"})
+
+        if route_class == ROUTE_ADMIN and self.require_admin_for_admin_routes and not self._is_admin(user):
+            if is_get:
+                return RedirectResponse(url="/login.html?error=access_denied", status_code=302)
+            return JSONResponse(status_code=403, content={"error": "Admin access required"})
+
+        scope["state"]["user"] = user
+
+        missing_permissions = [
+            permission.value for permission in self._required_permissions(scope["path"])
+            if not user.has_permission(permission)
+        ]
+        if missing_permissions:
+            logger.warning(
+                f"User {user.username} denied access to {scope['path']}. "
+                f"Missing permissions: {missing_permissions}"
+            )
+            if wants_html:
+                return RedirectResponse(url="/login.html?error=insufficient_permissions", status_code=302)
+            return JSONResponse(
+                status_code=403,
+                content={"error": "Insufficient permissions", "required_permissions": missing_permissions}
+            )
+        return None
+
+    @staticmethod
+    def _is_admin(user) -> bool:
+        if user.is_admin:
+            return True
+        from .unified_models import UserRole
+        return user.role in (UserRole.ADMIN, UserRole.SUPER_ADMIN)
+
+    def _required_permissions(self, path: str) -> list:
+        for prefix, permissions in self.route_permissions.items():
+            if path.startswith(prefix):
+                return permissions
+        return []
+
+    # Error handling
+
+    def _responders(self):
+        """Error response builders shared with the standalone error middlewares"""
+        if self._error_responders is None:
+            handler = self._error_handler or get_error_handler()
+            self._error_responders = (
+                ErrorHandlingMiddleware(self.app, error_handler=handler),
+                AdminErrorHandlingMiddleware(self.app, error_handler=handler),
+            )
+        return self._error_responders
+
+    async def _error_response(self, error: Exception, scope, route_class: str, request_id: str) -> JSONResponse:
+        responder, admin_responder = self._responders()
+        request = Request(scope)
+        client_ip = request.client.host if request.client else None
+
+        if route_class == ROUTE_ADMIN:
+            context = ErrorContext(
+                request_id=request_id,
+                endpoint=scope["path"],
+                method=scope["method"],
+                component="admin_dashboard",
+                additional_data={
+                    "is_admin_request": True,
+                    "user_agent": request.headers.get("user-agent"),
+                    "client_ip": client_ip
+                }
+            )
+            error_result = await admin_responder.error_handler.handle_error(error, context)
+            return await admin_responder._create_admin_error_response(error, error_result, request_id)
+
+        context = ErrorContext(
+            session_id=request.cookies.get("session_token"),
+            request_id=request_id,
+            endpoint=scope["path"],
+            method=scope["method"],
+            component="fastapi_app",
+            additional_data={
+                "user_agent": request.headers.get("user-agent"),
+                "client_ip": client_ip,
+                "query_params": dict(request.query_params)
+            }
+        )
+        error_result = await responder.error_handler.handle_error(error, context)
+        return await responder._create_error_response(error, error_result, request_id)
+
+
+def setup_middleware_pipeline(app, error_handler: Optional[UnifiedErrorHandler] = None, **options) -> bool:
+    """Add the middleware pipeline to an app once
+
+    Returns False when the pipeline is already installed. A later call can
+    still supply the error handler if the first one did not.
+    """
+    for middleware in app.user_middleware:
+        if middleware.cls is MiddlewarePipeline:
+            if error_handler is not None and middleware.kwargs.get("error_handler") is None:
+                middleware.kwargs["error_handler"] = error_handler
+            return False
+
+    app.add_middleware(MiddlewarePipeline, error_handler=error_handler, **options)
+    logger.info("✅ Middleware pipeline added")
+    return True
@@ -48,7 +48,7 @@ from backend.model_adapters import (
     ADMIN_MODELS_AVAILABLE,
 )
 
-from backend.database import engine as main_engine, SessionLocal as MainSessionLocal
+from backend.database import engine as main_engine, BackgroundSessionLocal as MainSessionLocal
 
 logger = logging.getLogger(__name__)
 
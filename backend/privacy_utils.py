@@ -4,8 +4,10 @@ Privacy utilities for data anonymization and GDPR compliance
 
 import re
 import hashlib
+import os
 import secrets
-from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Iterator
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import logging
@@ -29,6 +31,74 @@ class PIIPattern:
     replacement: str
     confidence_threshold: float = 0.8
 
+_NON_DIGIT_RE = re.compile(r'\D')
+
+class PIIScanner:
+    """
+    Single-pass PII scanner.
+
+    All patterns are compiled once into a single alternation of named groups,
+    so a text is scanned exactly once regardless of how many PII types are
+    configured. Matches never overlap: at each position the first pattern (in
+    list order) that matches wins, which is also the order used to resolve
+    ambiguous matches such as phone numbers versus SSNs.
+    """
+
+    def __init__(self, patterns: List[PIIPattern]):
+        self.patterns = list(patterns)
+        self._by_group: Dict[str, PIIPattern] = {}
+        alternatives = []
+        for index, pattern in enumerate(self.patterns):
+            group = f"p{index}"
+            self._by_group[group] = pattern
+            alternatives.append(f"(?P<{group}>{pattern.pattern})")
+        self._regex = re.compile("|".join(alternatives), re.IGNORECASE)
+
+    def finditer(self, text: str) -> Iterator[Tuple[PIIPattern, "re.Match"]]:
+        """Yield (pattern, match) pairs in text order"""
+        by_group = self._by_group
+        for match in self._regex.finditer(text):
+            yield by_group[match.lastgroup], match
+
+    def scan(self, text: str) -> List[Dict[str, Any]]:
+        """Return all PII detections in text order"""
+        return [
+            {
+                "type": pattern.name,
+                "value": match.group(),
+                "start": match.start(),
+                "end": match.end(),
+                "confidence": pattern.confidence_threshold,
+                "replacement": pattern.replacement
+            }
+            for pattern, match in self.finditer(text)
+        ]
+
+    def redact(self, text: str, replacer=None) -> str:
+        """
+        Replace every detection in a single pass.
+
+        Args:
+            text: Text to redact
+            replacer: Optional callable (original_value, pii_type) -> str; the
+                pattern's placeholder is used when omitted
+
+        Returns:
+            Redacted text
+        """
+        by_group = self._by_group
+        if replacer is None:
+            return self._regex.sub(lambda m: by_group[m.lastgroup].replacement, text)
+        return self._regex.sub(
+            lambda m: replacer(m.group(), by_group[m.lastgroup].name), text
+        )
+
+def _anonymize_conversation_chunk(config: "AnonymizationConfig",
+                                  conversations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Process pool worker for PrivacyUtils.anonymize_conversations_batch"""
+    utils = PrivacyUtils(config)
+    return [utils.anonymize_conversation_data(conversation) for conversation in conversations]
+
 class PrivacyUtils:
     """
     Utilities for data privacy, anonymization, and PII detection
@@ -45,9 +115,14 @@ class PrivacyUtils:
         PIIPattern("address", r'\b\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl)\b', "[ADDRESS]"),
     ]
     
+    # Conversations below this count are anonymized in-process; the pool's
+    # pickling overhead outweighs the parallelism for small batches.
+    BATCH_PARALLEL_THRESHOLD = 500
+    
     def __init__(self, config: AnonymizationConfig = None):
         self.config = config or AnonymizationConfig()
         self._identifier_cache: Dict[str, str] = {}
+        self._scanner = PIIScanner(self.PII_PATTERNS)
     
     def detect_pii(self, text: str) -> List[Dict[str, Any]]:
         """
@@ -59,21 +134,7 @@ class PrivacyUtils:
         Returns:
             List of detected PII with positions and types
         """
-        detected_pii = []
-        
-        for pattern in self.PII_PATTERNS:
-            matches = re.finditer(pattern.pattern, text, re.IGNORECASE)
-            for match in matches:
-                detected_pii.append({
-                    "type": pattern.name,
-                    "value": match.group(),
-                    "start": match.start(),
-                    "end": match.end(),
-                    "confidence": pattern.confidence_threshold,
-                    "replacement": pattern.replacement
-                })
-        
-        return detected_pii
+        return self._scanner.scan(text)
     
     def anonymize_text(self, text: str, preserve_length: bool = True) -> str:
         """
@@ -89,26 +150,11 @@ class PrivacyUtils:
         if not text:
             return text
         
-        anonymized = text
-        pii_detections = self.detect_pii(text)
-        
-        # Sort by position (reverse order to maintain positions)
-        pii_detections.sort(key=lambda x: x["start"], reverse=True)
-        
-        for detection in pii_detections:
-            start, end = detection["start"], detection["end"]
-            original_value = detection["value"]
-            replacement = detection["replacement"]
-            
-            if preserve_length and self.config.preserve_structure:
-                # Create replacement that preserves length and some structure
-                replacement = self._create_structured_replacement(
-                    original_value, detection["type"]
-                )
-            
-            anonymized = anonymized[:start] + replacement + anonymized[end:]
+        if preserve_length and self.config.preserve_structure:
+            # Create replacements that preserve length and some structure
+            return self._scanner.redact(text, self._create_structured_replacement)
         
-        return anonymized
+        return self._scanner.redact(text)
     
     def _create_structured_replacement(self, original: str, pii_type: str) -> str:
         """Create a replacement that preserves structure"""
@@ -121,7 +167,7 @@ class PrivacyUtils:
         
         elif pii_type == "phone":
             # Preserve phone number structure
-            digits_only = re.sub(r'\D', '', original)
+            digits_only = _NON_DIGIT_RE.sub('', original)
             if len(digits_only) == 10:
                 return "xxx-xxx-xxxx"
             elif len(digits_only) == 11:
@@ -199,6 +245,50 @@ class PrivacyUtils:
         
         return anonymized
     
+    def anonymize_conversations_batch(self, conversations: Iterable[Dict[str, Any]],
+                                      max_workers: Optional[int] = None,
+                                      chunk_size: int = 200) -> List[Dict[str, Any]]:
+        """
+        Anonymize many conversations, fanning out to a process pool
+        
+        Used by GDPR exports and analytics jobs that handle thousands of
+        conversations at once. Identifier hashing is deterministic, so results
+        match anonymize_conversation_data regardless of which worker ran.
+        
+        Args:
+            conversations: Conversation dicts to anonymize
+            max_workers: Pool size (defaults to the CPU count)
+            chunk_size: Conversations sent to a worker per task
+            
+        Returns:
+            Anonymized conversations in input order
+        """
+        conversations = list(conversations)
+        workers = max_workers or os.cpu_count() or 1
+        
+        if workers <= 1 or len(conversations) < self.BATCH_PARALLEL_THRESHOLD:
+            return [self.anonymize_conversation_data(c) for c in conversations]
+        
+        chunks = [
+            conversations[i:i + chunk_size]
+            for i in range(0, len(conversations), chunk_size)
+        ]
+        
+        results: List[Dict[str, Any]] = []
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for chunk_result in executor.map(
+                    _anonymize_conversation_chunk,
+                    [self.config] * len(chunks),
+                    chunks
+                ):
+                    results.extend(chunk_result)
+        except Exception as e:
+            logger.warning(f"Parallel anonymization failed, falling back to in-process: {e}")
+            return [self.anonymize_conversation_data(c) for c in conversations]
+        
+        return results
+    
     def _fuzz_timestamp(self, timestamp: Any) -> Any:
         """Add small random offset to timestamp for privacy"""
         if isinstance(timestamp, datetime):
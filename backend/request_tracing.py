@@ -0,0 +1,294 @@
+"""
+Request Stage Tracing
+
+Lightweight spans for the chat pipeline. Each span adds its duration to a
+fixed-bucket histogram per stage, which is exported on ``/metrics`` in the
+Prometheus text format. It is also appended to the trace of the current
+request, which can be returned to the client as a ``Server-Timing`` header.
+
+Spans cost two ``perf_counter`` calls and one short locked update, so they
+can wrap every stage of every request.
+"""
+
+import os
+import re
+import time
+import logging
+import asyncio
+import functools
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the stage duration histogram buckets
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Chat pipeline stages
+STAGE_AUTH = "auth"
+STAGE_CACHE_LOOKUP = "cache_lookup"
+STAGE_CONTEXT = "context_retrieval"
+STAGE_CONTEXT_RETRIEVER = "context_retriever"
+STAGE_TOOL_SELECTION = "tool_selection"
+STAGE_TOOL_EXECUTION = "tool_execution"
+STAGE_RESPONSE = "response_generation"
+STAGE_PERSISTENCE = "persistence"
+STAGE_CHAT_TOTAL = "chat_total"
+
+# Time spent in the middleware pipeline before the route handler
+STAGE_MIDDLEWARE = "middleware"
+
+# "on" always sends Server-Timing, "request" only when the client asks with
+# an X-Server-Timing request header, "off" never
+SERVER_TIMING_MODE = os.getenv("SERVER_TIMING", "request").lower()
+
+_TOKEN_PATTERN = re.compile(r"[^A-Za-z0-9_.\-]")
+
+
+def tool_stage(tool_name: str) -> str:
+    """Stage name of a single tool execution"""
+    return f"tool.{tool_name}"
+
+
+class StageHistogram:
+    """Cumulative-bucket duration histogram of one stage"""
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self, bucket_count: int):
+        self.counts = [0] * (bucket_count + 1)
+        self.count = 0
+        self.sum = 0.0
+
+
+class StageMetrics:
+    """Per-stage duration histograms shared by all requests"""
+
+    def __init__(self, buckets: Tuple[float, ...] = STAGE_BUCKETS, max_stages: int = 200):
+        self.buckets = tuple(buckets)
+        self.max_stages = max_stages
+        self._stages: Dict[str, StageHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        """Add one stage duration"""
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                if len(self._stages) >= self.max_stages:
+                    stage = "other"
+                    histogram = self._stages.get(stage)
+                if histogram is None:
+                    histogram = self._stages[stage] = StageHistogram(len(self.buckets))
+            histogram.counts[index] += 1
+            histogram.count += 1
+            histogram.sum += seconds
+
+    def _percentile_ms(self, counts: List[int], count: int, percentile: float) -> Optional[float]:
+        """Upper bucket bound of a percentile, None when it is past the last bucket"""
+        rank = count * percentile / 100.0
+        seen = 0
+        for index, value in enumerate(counts):
+            seen += value
+            if value and seen >= rank:
+                return self.buckets[index] * 1000 if index < len(self.buckets) else None
+        return 0.0
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Count, mean and bucket-resolution percentiles per stage"""
+        with self._lock:
+            stages = [
+                (stage, histogram.count, histogram.sum, list(histogram.counts))
+                for stage, histogram in self._stages.items()
+            ]
+        return {
+            stage: {
+                "count": count,
+                "mean_ms": round(total / count * 1000, 3) if count else 0.0,
+                "p50_le_ms": self._percentile_ms(counts, count, 50),
+                "p95_le_ms": self._percentile_ms(counts, count, 95),
+                "p99_le_ms": self._percentile_ms(counts, count, 99),
+            }
+            for stage, count, total, counts in sorted(stages)
+        }
+
+    def render_prometheus(self, metric: str = "chat_stage_duration_seconds") -> str:
+        """Render all stages in the Prometheus text exposition format"""
+        with self._lock:
+            stages = sorted(
+                (stage, list(histogram.counts), histogram.count, histogram.sum)
+                for stage, histogram in self._stages.items()
+            )
+        bounds = [repr(float(bound)) for bound in self.buckets] + ["+Inf"]
+        lines = [
+            f"# HELP {metric} Duration of chat pipeline stages in seconds.",
+            f"# TYPE {metric} histogram",
+        ]
+        for stage, counts, count, total in stages:
+            label = stage.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            cumulative = 0
+            for bound, value in zip(bounds, counts):
+                cumulative += value
+                lines.append(f'{metric}_bucket{{stage="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{stage="{label}"}} {total!r}')
+            lines.append(f'{metric}_count{{stage="{label}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Drop all recorded durations"""
+        with self._lock:
+            self._stages.clear()
+
+
+class RequestTrace:
+    """Stage durations recorded while handling one request"""
+
+    __slots__ = ("spans", "started")
+
+    def __init__(self):
+        self.spans: List[Tuple[str, float]] = []
+        self.started = time.perf_counter()
+
+    def add(self, stage: str, seconds: float):
+        self.spans.append((stage, seconds))
+
+    def totals(self) -> Dict[str, float]:
+        """Summed duration per stage in order of first occurrence"""
+        totals: Dict[str, float] = {}
+        for stage, seconds in self.spans:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        return totals
+
+    def server_timing(self, total: float = None) -> str:
+        """Format the trace as a Server-Timing header value"""
+        entries = [
+            f"{_TOKEN_PATTERN.sub('_', stage)};dur={seconds * 1000:.2f}"
+            for stage, seconds in self.totals().items()
+        ]
+        if total is not None:
+            entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+stage_metrics = StageMetrics()
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+def get_stage_metrics() -> StageMetrics:
+    """Get the global stage metrics"""
+    return stage_metrics
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """Trace of the request being handled, if one was started"""
+    return _current_trace.get()
+
+
+def record_stage(stage: str, seconds: float):
+    """Record a stage duration in the histograms and the current trace"""
+    stage_metrics.observe(stage, seconds)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(stage, seconds)
+
+
+class trace_stage:
+    """Context manager timing one pipeline stage
+
+    Usage:
+        with trace_stage(STAGE_CONTEXT):
+            context = await retrieve(...)
+    """
+
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record_stage(self.stage, time.perf_counter() - self._start)
+        return False
+
+
+def traced(stage: str):
+    """Decorator timing every call of a sync or async function as ``stage``"""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    record_stage(stage, time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_stage(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware that starts a trace per HTTP request
+
+    Depending on ``mode`` the collected stages are returned in a
+    ``Server-Timing`` response header.
+    """
+
+    def __init__(self, app, mode: str = None):
+        self.app = app
+        self.mode = (mode or SERVER_TIMING_MODE).lower()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _current_trace.set(trace)
+        emit = self.mode == "on" or (
+            self.mode == "request" and any(name == b"x-server-timing" for name, _ in scope.get("headers", ()))
+        )
+
+        async def send_with_timing(message):
+            if emit and message["type"] == "http.response.start":
+                value = trace.server_timing(total=time.perf_counter() - trace.started)
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", value.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+
+
+metrics_router = APIRouter(tags=["metrics"])
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage duration histograms in the Prometheus text format"""
+    return PlainTextResponse(
+        stage_metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -259,6 +259,12 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
 
 
 def setup_request_validation_middleware(app):
-    """Setup request validation middleware"""
-    app.add_middleware(RequestValidationMiddleware)
-    logger.info("✅ Request validation middleware added")
\ No newline at end of file
+    """Setup request validation middleware
+    
+    Validation runs as a stage of the consolidated middleware pipeline
+    rather than as a separate BaseHTTPMiddleware layer.
+    """
+    from .middleware_pipeline import setup_middleware_pipeline
+    
+    if setup_middleware_pipeline(app):
+        logger.info("✅ Request validation middleware added")
\ No newline at end of file
@@ -157,7 +157,7 @@ class SecureMemoryLayerManager:
                         decrypted_content = self.security_manager.decrypt_data(
                             context.metadata['encrypted_data']
                         )
-                        context.content = decrypted_content
+                        context = context.replace(content=decrypted_content)
                     
                     decrypted_contexts.append(context)
                     
@@ -373,29 +373,9 @@ class SecurityManager:
             
             chat_history = chat_query.all()
             
-            export_data["chat_history"] = []
-            for chat in chat_history:
-                chat_dict = {
-                    "session_id": chat.session_id,
-                    "created_at": chat.created_at.isoformat() if chat.created_at else None,
-                    "tools_used": chat.tools_used,
-                    "tool_performance": chat.tool_performance,
-                    "context_used": chat.context_used,
-                    "response_quality_score": chat.response_quality_score
-                }
-                
-                # Decrypt sensitive data for export
-                if hasattr(chat, 'user_message_encrypted') and chat.user_message_encrypted:
-                    chat_dict["user_message"] = self.decrypt_data(chat.user_message_encrypted)
-                else:
-                    chat_dict["user_message"] = getattr(chat, 'user_message', '')
-                
-                if hasattr(chat, 'bot_response_encrypted') and chat.bot_response_encrypted:
-                    chat_dict["bot_response"] = self.decrypt_data(chat.bot_response_encrypted)
-                else:
-                    chat_dict["bot_response"] = getattr(chat, 'bot_response', '')
-                
-                export_data["chat_history"].append(chat_dict)
+            export_data["chat_history"] = [
+                self.serialize_chat_for_export(chat) for chat in chat_history
+            ]
             
             export_data["data_types"].append("chat_history")
             
@@ -404,16 +384,9 @@ class SecurityManager:
                 UserSession.user_id == user_id
             ).all()
             
-            export_data["user_sessions"] = []
-            for session in user_sessions:
-                session_dict = {
-                    "session_id": session.session_id,
-                    "created_at": session.created_at.isoformat() if session.created_at else None,
-                    "last_activity": session.last_activity.isoformat() if session.last_activity else None,
-                    "is_active": session.is_active,
-                    "session_metadata": session.session_metadata
-                }
-                export_data["user_sessions"].append(session_dict)
+            export_data["user_sessions"] = [
+                self.serialize_session_for_export(session) for session in user_sessions
+            ]
             
             export_data["data_types"].append("user_sessions")
             
@@ -422,23 +395,9 @@ class SecurityManager:
                 MemoryContextCache.user_id == user_id
             ).all()
             
-            export_data["context_cache"] = []
-            for cache in context_cache:
-                cache_dict = {
-                    "cache_key": cache.cache_key,
-                    "context_type": cache.context_type,
-                    "relevance_score": cache.relevance_score,
-                    "created_at": cache.created_at.isoformat() if cache.created_at else None,
-                    "expires_at": cache.expires_at.isoformat() if cache.expires_at else None
-                }
-                
-                # Decrypt context data
-                if hasattr(cache, 'context_data_encrypted') and cache.context_data_encrypted:
-                    cache_dict["context_data"] = self.decrypt_data(cache.context_data_encrypted)
-                else:
-                    cache_dict["context_data"] = cache.context_data
-                
-                export_data["context_cache"].append(cache_dict)
+            export_data["context_cache"] = [
+                self.serialize_context_cache_for_export(cache) for cache in context_cache
+            ]
             
             export_data["data_types"].append("context_cache")
             
@@ -449,6 +408,58 @@ class SecurityManager:
             logger.error(f"Data export failed for user {self._hash_identifier(user_id)}: {e}")
             raise
     
+    def serialize_chat_for_export(self, chat: EnhancedChatHistory) -> Dict[str, Any]:
+        """Serialize a chat history row for a data export, decrypting messages"""
+        chat_dict = {
+            "session_id": chat.session_id,
+            "created_at": chat.created_at.isoformat() if chat.created_at else None,
+            "tools_used": chat.tools_used,
+            "tool_performance": chat.tool_performance,
+            "context_used": chat.context_used,
+            "response_quality_score": chat.response_quality_score
+        }
+        
+        # Decrypt sensitive data for export
+        if hasattr(chat, 'user_message_encrypted') and chat.user_message_encrypted:
+            chat_dict["user_message"] = self.decrypt_data(chat.user_message_encrypted)
+        else:
+            chat_dict["user_message"] = getattr(chat, 'user_message', '')
+        
+        if hasattr(chat, 'bot_response_encrypted') and chat.bot_response_encrypted:
+            chat_dict["bot_response"] = self.decrypt_data(chat.bot_response_encrypted)
+        else:
+            chat_dict["bot_response"] = getattr(chat, 'bot_response', '')
+        
+        return chat_dict
+    
+    def serialize_session_for_export(self, session: UserSession) -> Dict[str, Any]:
+        """Serialize a user session row for a data export"""
+        return {
+            "session_id": session.session_id,
+            "created_at": session.created_at.isoformat() if session.created_at else None,
+            "last_activity": session.last_activity.isoformat() if session.last_activity else None,
+            "is_active": session.is_active,
+            "session_metadata": session.session_metadata
+        }
+    
+    def serialize_context_cache_for_export(self, cache: MemoryContextCache) -> Dict[str, Any]:
+        """Serialize a context cache row for a data export, decrypting context data"""
+        cache_dict = {
+            "cache_key": cache.cache_key,
+            "context_type": cache.context_type,
+            "relevance_score": cache.relevance_score,
+            "created_at": cache.created_at.isoformat() if cache.created_at else None,
+            "expires_at": cache.expires_at.isoformat() if cache.expires_at else None
+        }
+        
+        # Decrypt context data
+        if hasattr(cache, 'context_data_encrypted') and cache.context_data_encrypted:
+            cache_dict["context_data"] = self.decrypt_data(cache.context_data_encrypted)
+        else:
+            cache_dict["context_data"] = cache.context_data
+        
+        return cache_dict
+    
     def delete_user_data(self, user_id: str, db_session: Session, 
                         hard_delete: bool = False) -> Dict[str, int]:
         """
@@ -6,7 +6,8 @@ Adds encryption fields and security tables to existing memory layer schema
 import logging
 from sqlalchemy import create_engine, text, MetaData, Table, Column, String, DateTime, Boolean, JSON, Text, Integer, Float, Index
 from sqlalchemy.exc import SQLAlchemyError
-from backend.database import get_database_url
+from backend.database import DATABASE_URL
+from backend.engine_registry import get_engine, POOL_BACKGROUND
 from backend.memory_models import Base, UserSession, DataProcessingConsent, DataSubjectRights
 
 logger = logging.getLogger(__name__)
@@ -15,8 +16,9 @@ class SecurityMigration:
     """Handles database migrations for security features"""
     
     def __init__(self, database_url: str = None):
-        self.database_url = database_url or get_database_url()
-        self.engine = create_engine(self.database_url)
+        self.database_url = database_url or DATABASE_URL
+        # The application database is reached through the shared background pool
+        self.engine = create_engine(database_url) if database_url else get_engine(POOL_BACKGROUND)
         self.metadata = MetaData()
     
     def run_migration(self):
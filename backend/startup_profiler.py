@@ -0,0 +1,192 @@
+"""
+Startup Profiling and Fast-Start Mode
+
+Shows where worker boot time goes. Per-module import times come from
+re-importing the application under ``python -X importtime``. The durations of
+the unified startup steps and of deferred warm-ups are recorded in-process.
+
+It also holds the fast-start switch. With ``FAST_START=true`` heavy
+subsystems such as the LLM, the agent tools and data synchronization
+initialize in a background warm-up or on first use, not at import time.
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+import subprocess
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FAST_START_ENV = "FAST_START"
+
+TIMING_IMPORT = "import"
+TIMING_INIT = "init"
+TIMING_WARMUP = "warmup"
+
+
+def is_fast_start() -> bool:
+    """Whether heavy subsystems should be deferred to a background warm-up"""
+    return os.getenv(FAST_START_ENV, "false").lower() == "true"
+
+
+@dataclass
+class StartupTiming:
+    """Duration of one startup step"""
+    name: str
+    seconds: float
+    kind: str = TIMING_INIT
+    error: Optional[str] = None
+
+
+class StartupProfiler:
+    """Collects durations of imports, startup steps and warm-ups"""
+
+    def __init__(self):
+        self._entries: List[StartupTiming] = []
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, kind: str = TIMING_INIT, error: str = None):
+        """Record the duration of a step"""
+        with self._lock:
+            self._entries.append(StartupTiming(name=name, seconds=seconds, kind=kind, error=error))
+
+    @contextmanager
+    def measure(self, name: str, kind: str = TIMING_INIT):
+        """Time the enclosed block, recording a failure without swallowing it"""
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, kind, error)
+
+    def timings(self, kind: str = None) -> List[Dict[str, Any]]:
+        """Recorded timings in order, optionally of one kind"""
+        with self._lock:
+            entries = list(self._entries)
+        return [asdict(entry) for entry in entries if kind is None or entry.kind == kind]
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+
+startup_profiler = StartupProfiler()
+
+
+def get_startup_profiler() -> StartupProfiler:
+    """Get the global startup profiler"""
+    return startup_profiler
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """Parse ``-X importtime`` output into per-module self and cumulative times
+
+    Depth 0 marks a module imported directly by the profiled statement.
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            stripped = name.lstrip(" ")
+            modules.append({
+                "module": stripped.strip(),
+                "self_ms": int(self_us) / 1000.0,
+                "cumulative_ms": int(cumulative_us) / 1000.0,
+                "depth": (len(name) - len(stripped) - 1) // 2,
+            })
+        except ValueError:
+            continue
+    return modules
+
+
+def profile_imports(target: str = "main", top: int = 25, cwd: str = None,
+                    env: Dict[str, str] = None, timeout: float = 300.0) -> Dict[str, Any]:
+    """Import ``target`` in a fresh interpreter and rank the slowest modules"""
+    command = [sys.executable, "-X", "importtime", "-c", f"import {target}"]
+    start = time.perf_counter()
+    completed = subprocess.run(
+        command, cwd=cwd, env=env if env is not None else dict(os.environ),
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=timeout
+    )
+    wall_seconds = time.perf_counter() - start
+    modules = parse_importtime(completed.stderr)
+    target_entry = next((module for module in modules if module["module"] == target), None)
+
+    result = {
+        "target": target,
+        "wall_seconds": round(wall_seconds, 3),
+        "import_ms": target_entry["cumulative_ms"] if target_entry else None,
+        "module_count": len(modules),
+        "direct_imports": sorted(
+            (module for module in modules if module["depth"] == 1),
+            key=lambda module: module["cumulative_ms"], reverse=True
+        )[:top],
+        "slowest_self": sorted(modules, key=lambda module: module["self_ms"], reverse=True)[:top],
+        "returncode": completed.returncode,
+    }
+    if completed.returncode != 0:
+        errors = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        result["error"] = "\n".join(errors[-5:])
+    return result
+
+
+def format_report(import_profile: Dict[str, Any], timings: List[Dict[str, Any]]) -> str:
+    """Render an import profile and startup timings as a text report"""
+    lines = [f"Startup profile (fast start: {'on' if is_fast_start() else 'off'})", ""]
+
+    if import_profile:
+        import_ms = import_profile.get("import_ms")
+        duration = f"{import_ms:.1f} ms" if import_ms is not None else "failed"
+        lines.append(f"Import of {import_profile['target']}: {duration}")
+        lines.append(f"  modules loaded: {import_profile['module_count']}, "
+                     f"interpreter wall time: {import_profile['wall_seconds']:.2f} s")
+        if import_profile.get("error"):
+            lines.append(f"  error: {import_profile['error']}")
+        lines.append("")
+        lines.append("Direct imports by cumulative time (ms):")
+        for module in import_profile["direct_imports"]:
+            lines.append(f"  {module['cumulative_ms']:10.1f}  {module['module']}")
+        lines.append("")
+        lines.append("Modules by self time (ms):")
+        for module in import_profile["slowest_self"]:
+            lines.append(f"  {module['self_ms']:10.1f}  {module['module']}")
+        lines.append("")
+
+    for kind, title in ((TIMING_INIT, "Startup steps"), (TIMING_WARMUP, "Deferred warm-ups")):
+        entries = [entry for entry in timings if entry["kind"] == kind]
+        if not entries:
+            continue
+        lines.append(f"{title} (ms):")
+        for entry in entries:
+            suffix = f"  [failed: {entry['error']}]" if entry.get("error") else ""
+            lines.append(f"  {entry['seconds'] * 1000:10.1f}  {entry['name']}{suffix}")
+        lines.append(f"  {sum(entry['seconds'] for entry in entries) * 1000:10.1f}  total")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def run_startup_profile(app, app_manager, target: str = "main", top: int = 25) -> str:
+    """Profile imports of ``target`` and one full startup and warm-up of ``app``"""
+    import asyncio
+
+    import_profile = profile_imports(target=target, top=top)
+
+    async def _startup():
+        await app_manager.startup_sequence(app)
+        await app_manager.wait_for_warmup()
+        await app_manager.shutdown_sequence()
+
+    asyncio.run(_startup())
+    return format_report(import_profile, startup_profiler.timings())
@@ -0,0 +1,356 @@
+"""
+Precompressed, Fingerprinted Static Assets
+
+Builds an in-memory index of a frontend directory once per process. Every
+asset gets a content-hashed name (``js/api.js`` -> ``js/api.3f9c2a1b7e04.js``),
+and text assets get gzip and, when the optional ``brotli`` package is
+installed, brotli variants. HTML pages are rewritten to reference the
+fingerprinted names.
+
+Fingerprinted URLs are served with ``Cache-Control: immutable`` and a one-year
+max-age, because their content can never change under that name. Original
+names and HTML pages are revalidated on every use through their ``ETag``.
+Requests are answered from memory, conditional ones with a bodyless 304, so
+serving a static file costs no disk I/O. Files the index skips, such as large
+binaries and ``node_modules``, fall through to a regular ``StaticFiles`` app.
+"""
+
+import os
+import re
+import gzip
+import hashlib
+import logging
+import mimetypes
+import posixpath
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it assets are precompressed with gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_ASSET_MAX_BYTES = int(os.getenv("STATIC_ASSET_MAX_BYTES", str(2 * 1024 * 1024)))
+STATIC_COMPRESS_MIN_BYTES = int(os.getenv("STATIC_COMPRESS_MIN_BYTES", "512"))
+STATIC_BROTLI_QUALITY = int(os.getenv("STATIC_BROTLI_QUALITY", "9"))
+STATIC_EXCLUDED_DIRS = frozenset({"node_modules", "tests", "__pycache__", ".git"})
+STATIC_EXCLUDED_EXTENSIONS = frozenset({".md", ".py", ".pyc"})
+COMPRESSIBLE_TYPES = frozenset({
+    "text/html", "text/css", "text/javascript", "application/javascript",
+    "application/json", "image/svg+xml", "text/plain", "application/xml", "text/xml",
+})
+
+FINGERPRINT_LENGTH = 12
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# src/href attribute values in HTML, without query string or fragment
+_REFERENCE_PATTERN = re.compile(r"""(?P<attr>\b(?:src|href)\s*=\s*)(?P<quote>["'])(?P<ref>[^"'?#]+)""",
+                                re.IGNORECASE)
+
+
+@dataclass
+class AssetVariant:
+    """One content encoding of an asset and its entity tag"""
+    body: bytes
+    etag: str
+    encoding: Optional[str] = None
+
+
+@dataclass
+class StaticAsset:
+    """An indexed file with its fingerprinted name and encoded variants"""
+    path: str
+    fingerprinted_path: str
+    content_type: str
+    digest: str
+    variants: Dict[Optional[str], AssetVariant]
+    fingerprint_in_use: bool = True
+
+    @property
+    def etags(self) -> FrozenSet[str]:
+        return frozenset(variant.etag for variant in self.variants.values())
+
+
+def _accepted_encodings(header: str) -> FrozenSet[str]:
+    """Content codings from an Accept-Encoding header, leaving out q=0"""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                pass
+        if coding and quality > 0:
+            accepted.add(coding)
+    return frozenset(accepted)
+
+
+def _etag_matches(header: str, etags: FrozenSet[str]) -> bool:
+    """Weak comparison of If-None-Match against the asset's entity tags"""
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in etags:
+            return True
+    return False
+
+
+def fingerprint_name(path: str, digest: str) -> str:
+    """``js/api.js`` -> ``js/api.<digest>.js``"""
+    root, extension = posixpath.splitext(path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{extension}"
+
+
+class StaticAssetIndex:
+    """In-memory index of one static directory served under ``url_prefix``"""
+
+    def __init__(self, directory: str, url_prefix: str = "",
+                 max_asset_bytes: int = STATIC_ASSET_MAX_BYTES,
+                 excluded_dirs: FrozenSet[str] = STATIC_EXCLUDED_DIRS):
+        self.directory = directory
+        self.url_prefix = url_prefix.rstrip("/")
+        self.max_asset_bytes = max_asset_bytes
+        self.excluded_dirs = excluded_dirs
+        self._assets: Dict[str, StaticAsset] = {}
+        self._fingerprinted: Dict[str, StaticAsset] = {}
+        self.stats = {"assets": 0, "bytes": 0, "gzip_bytes": 0, "br_bytes": 0, "skipped": 0}
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._assets or path in self._fingerprinted
+
+    def build(self) -> "StaticAssetIndex":
+        """Read, fingerprint and compress every servable file; HTML is rewritten last"""
+        if not os.path.isdir(self.directory):
+            logger.warning(f"Static asset directory not found: {self.directory}")
+            return self
+
+        html_sources = {}
+        for path, data in self._read_files():
+            content_type = self._content_type(path)
+            if content_type == "text/html":
+                # Fingerprint HTML after rewriting, once all asset names are known
+                html_sources[path] = data
+            else:
+                self._add(path, data, content_type)
+
+        for path, data in html_sources.items():
+            self._add(path, self._rewrite_html(path, data), "text/html", fingerprint_in_use=False)
+
+        logger.info(
+            f"Indexed {self.stats['assets']} static assets from {self.directory}: "
+            f"{self.stats['bytes']} bytes, {self.stats['gzip_bytes']} gzip, {self.stats['br_bytes']} brotli"
+        )
+        return self
+
+    def get(self, path: str) -> Optional[Tuple[StaticAsset, bool]]:
+        """Look up ``path`` relative to the directory; returns the asset and whether the name is fingerprinted"""
+        asset = self._fingerprinted.get(path)
+        if asset is not None:
+            return asset, True
+        asset = self._assets.get(path)
+        if asset is not None:
+            return asset, False
+        return None
+
+    def url_for(self, path: str) -> str:
+        """Public URL of an asset, fingerprinted when indexed"""
+        asset = self._assets.get(path)
+        name = asset.fingerprinted_path if asset is not None and asset.fingerprint_in_use else path
+        return f"{self.url_prefix}/{name}"
+
+    def respond(self, path: str, accept_encoding: str = "", if_none_match: str = "",
+                head: bool = False) -> Optional[Tuple[int, List[Tuple[str, str]], bytes]]:
+        """Status, headers and body for ``path``, or None when it is not indexed"""
+        found = self.get(path)
+        if found is None:
+            return None
+        asset, fingerprinted = found
+
+        accepted = _accepted_encodings(accept_encoding) if len(asset.variants) > 1 else frozenset()
+        variant = asset.variants[None]
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in asset.variants:
+                variant = asset.variants[encoding]
+                break
+
+        headers = [
+            ("etag", variant.etag),
+            ("cache-control", IMMUTABLE_CACHE_CONTROL if fingerprinted else REVALIDATE_CACHE_CONTROL),
+        ]
+        if len(asset.variants) > 1:
+            headers.append(("vary", "Accept-Encoding"))
+        if if_none_match and _etag_matches(if_none_match, asset.etags):
+            return 304, headers, b""
+
+        headers.append(("content-type", asset.content_type))
+        headers.append(("content-length", str(len(variant.body))))
+        if variant.encoding:
+            headers.append(("content-encoding", variant.encoding))
+        return 200, headers, b"" if head else variant.body
+
+    def response(self, path: str, request_headers) -> Optional[Response]:
+        """Starlette response for ``path`` given the request headers, or None when it is not indexed"""
+        result = self.respond(path, request_headers.get("accept-encoding", ""),
+                              request_headers.get("if-none-match", ""))
+        if result is None:
+            return None
+        status, headers, body = result
+        response = Response(status_code=status)
+        response.body = body
+        response.raw_headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+        return response
+
+    def _read_files(self):
+        for current, dirs, files in os.walk(self.directory):
+            dirs[:] = sorted(d for d in dirs if d not in self.excluded_dirs and not d.startswith("."))
+            for filename in sorted(files):
+                full_path = os.path.join(current, filename)
+                relative = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+                if (filename.startswith(".") or posixpath.splitext(filename)[1].lower() in STATIC_EXCLUDED_EXTENSIONS
+                        or os.path.getsize(full_path) > self.max_asset_bytes):
+                    self.stats["skipped"] += 1
+                    continue
+                with open(full_path, "rb") as handle:
+                    yield relative, handle.read()
+
+    @staticmethod
+    def _content_type(path: str) -> str:
+        if path.endswith(".js"):
+            return "text/javascript"
+        return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    def _add(self, path: str, data: bytes, content_type: str, fingerprint_in_use: bool = True):
+        digest = hashlib.sha256(data).hexdigest()
+        etag_base = digest[:20]
+        variants = {None: AssetVariant(data, f'"{etag_base}"')}
+
+        if content_type in COMPRESSIBLE_TYPES and len(data) >= STATIC_COMPRESS_MIN_BYTES:
+            gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(gzipped) < len(data):
+                variants["gzip"] = AssetVariant(gzipped, f'"{etag_base}-gz"', "gzip")
+                self.stats["gzip_bytes"] += len(gzipped)
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=STATIC_BROTLI_QUALITY)
+                if len(compressed) < len(data):
+                    variants["br"] = AssetVariant(compressed, f'"{etag_base}-br"', "br")
+                    self.stats["br_bytes"] += len(compressed)
+
+        if content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        asset = StaticAsset(path, fingerprint_name(path, digest), content_type, digest, variants, fingerprint_in_use)
+        self._assets[path] = asset
+        if fingerprint_in_use:
+            self._fingerprinted[asset.fingerprinted_path] = asset
+        self.stats["assets"] += 1
+        self.stats["bytes"] += len(data)
+
+    def _resolve_reference(self, html_path: str, reference: str) -> Optional[str]:
+        """Fingerprinted asset a src/href value points to, if any; links to pages stay as they are"""
+        if "://" in reference or reference.startswith(("//", "data:", "mailto:", "javascript:")):
+            return None
+        if reference.startswith("/"):
+            prefix = self.url_prefix + "/"
+            if not self.url_prefix or not reference.startswith(prefix):
+                # Pages served at the site root resolve root-relative names in this directory
+                candidate = reference.lstrip("/")
+            else:
+                candidate = reference[len(prefix):]
+        else:
+            candidate = posixpath.normpath(posixpath.join(posixpath.dirname(html_path), reference))
+        asset = self._assets.get(candidate)
+        return candidate if asset is not None and asset.fingerprint_in_use else None
+
+    def _rewrite_html(self, html_path: str, data: bytes) -> bytes:
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError:
+            return data
+
+        def replace(match: re.Match) -> str:
+            target = self._resolve_reference(html_path, match.group("ref"))
+            if target is None:
+                return match.group(0)
+            return f"{match.group('attr')}{match.group('quote')}{self.url_for(target)}"
+
+        return _REFERENCE_PATTERN.sub(replace, text).encode("utf-8")
+
+
+def _route_path(scope) -> str:
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path) and (len(path) == len(root_path) or path[len(root_path)] == "/"):
+        return path[len(root_path):]
+    return path
+
+
+class StaticAssetApp:
+    """ASGI app serving an index from memory, with ``StaticFiles`` for anything not indexed
+
+    Mount it like ``StaticFiles``. ``subdirectory`` serves one folder of the
+    index, e.g. the admin ``css`` folder under ``/css``.
+    """
+
+    def __init__(self, index: StaticAssetIndex, subdirectory: str = "", fallback: bool = True):
+        self.index = index
+        self.subdirectory = subdirectory.strip("/")
+        fallback_directory = os.path.join(index.directory, self.subdirectory) if self.subdirectory else index.directory
+        self.fallback = (StaticFiles(directory=fallback_directory, check_dir=False)
+                         if fallback and os.path.isdir(fallback_directory) else None)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+            path = _route_path(scope).lstrip("/")
+            if self.subdirectory:
+                path = f"{self.subdirectory}/{path}"
+            headers = dict(scope["headers"])
+            result = self.index.respond(
+                path,
+                headers.get(b"accept-encoding", b"").decode("latin-1"),
+                headers.get(b"if-none-match", b"").decode("latin-1"),
+                head=scope["method"] == "HEAD"
+            )
+            if result is not None:
+                status, response_headers, body = result
+                await send({
+                    "type": "http.response.start",
+                    "status": status,
+                    "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in response_headers],
+                })
+                await send({"type": "http.response.body", "body": body})
+                return
+
+        if self.fallback is not None:
+            await self.fallback(scope, receive, send)
+            return
+        response = Response("Not Found", status_code=404, media_type="text/plain")
+        await response(scope, receive, send)
+
+
+# Indexes are built once per process and shared by every mount of a directory
+_asset_indexes: Dict[Tuple[str, str], StaticAssetIndex] = {}
+
+
+def get_asset_index(directory: str, url_prefix: str = "") -> StaticAssetIndex:
+    """Get the built index for ``directory`` served under ``url_prefix``"""
+    key = (os.path.abspath(directory), url_prefix.rstrip("/"))
+    index = _asset_indexes.get(key)
+    if index is None:
+        index = _asset_indexes[key] = StaticAssetIndex(directory, url_prefix).build()
+    return index
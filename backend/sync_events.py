@@ -11,17 +11,19 @@ Requirements: 2.1, 2.2, 2.3, 2.4
 import asyncio
 import logging
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any, Callable
-from sqlalchemy import event, text
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, List, Optional, Any, Callable, Tuple
+from sqlalchemy import event, text, or_, and_, func
 from sqlalchemy.orm import Session
 from dataclasses import dataclass
 from enum import Enum
 import json
 
-from backend.database import SessionLocal, engine
+from backend.database import SessionLocal, BackgroundSessionLocal, engine
 from backend.unified_models import (
     UnifiedUser, UnifiedTicket, UnifiedChatHistory, UnifiedTicketComment,
-    UnifiedTicketActivity, TicketStatus
+    UnifiedTicketActivity, TicketStatus, SyncOutboxEvent
 )
 
 logger = logging.getLogger(__name__)
@@ -34,6 +36,13 @@ class EventTriggerType(Enum):
     BEFORE_INSERT = "before_insert"
     BEFORE_UPDATE = "before_update"
 
+class OutboxStatus(Enum):
+    """Delivery status of a sync outbox event"""
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DISPATCHED = "dispatched"
+    FAILED = "failed"
+
 @dataclass
 class SyncEventData:
     """Data structure for synchronization events"""
@@ -56,6 +65,8 @@ class EventDrivenSyncManager:
     def __init__(self):
         self.event_handlers: Dict[str, List[Callable]] = {}
         self.is_initialized = False
+        self.dispatcher: Optional["OutboxDispatcher"] = None
+        self._listeners: List[Tuple[Any, str, Callable]] = []
         
     def initialize(self):
         """Initialize event-driven synchronization"""
@@ -64,6 +75,10 @@ class EventDrivenSyncManager:
             
         logger.info("Initializing event-driven synchronization")
         
+        # Outbox table must exist before listeners start writing to it
+        self._ensure_outbox_table()
+        self.dispatcher = OutboxDispatcher(self)
+        
         # Register SQLAlchemy event listeners
         self._register_sqlalchemy_events()
         
@@ -73,57 +88,146 @@ class EventDrivenSyncManager:
         self.is_initialized = True
         logger.info("Event-driven synchronization initialized successfully")
     
+    def shutdown(self):
+        """Stop writing outbox events for model changes"""
+        self._remove_sqlalchemy_events()
+        self.is_initialized = False
+    
+    def start_dispatcher(self) -> Optional[asyncio.Task]:
+        """Start draining the outbox in the running event loop"""
+        if self.dispatcher is None:
+            self.dispatcher = OutboxDispatcher(self)
+        return self.dispatcher.start()
+    
+    async def stop_dispatcher(self):
+        """Stop the outbox dispatcher, finishing the batch in flight"""
+        if self.dispatcher is not None:
+            await self.dispatcher.stop()
+    
     def _register_sqlalchemy_events(self):
-        """Register SQLAlchemy event listeners for model changes"""
+        """Register SQLAlchemy event listeners for model changes
+        
+        Listeners run inside the flush, so they only append a row to the
+        outbox on the flushing connection. The row commits or rolls back with
+        the change itself and handlers run later from the OutboxDispatcher.
+        """
         
         # Chat History events
-        @event.listens_for(UnifiedChatHistory, 'after_insert')
         def chat_history_inserted(mapper, connection, target):
             """Handle new chat history entries"""
-            asyncio.create_task(self._handle_chat_history_event(
-                'insert', target, connection
-            ))
+            self._enqueue_event(connection, "chat_history_changed", "unified_chat_history",
+                                "insert", target.id, self._chat_history_values(target))
         
-        @event.listens_for(UnifiedChatHistory, 'after_update')
         def chat_history_updated(mapper, connection, target):
             """Handle chat history updates"""
-            asyncio.create_task(self._handle_chat_history_event(
-                'update', target, connection
-            ))
+            self._enqueue_event(connection, "chat_history_changed", "unified_chat_history",
+                                "update", target.id, self._chat_history_values(target))
         
         # Ticket events
-        @event.listens_for(UnifiedTicket, 'after_insert')
         def ticket_inserted(mapper, connection, target):
             """Handle new ticket creation"""
-            asyncio.create_task(self._handle_ticket_event(
-                'insert', target, connection
-            ))
+            self._enqueue_event(connection, "ticket_changed", "unified_tickets",
+                                "insert", target.id, self._ticket_values(target))
         
-        @event.listens_for(UnifiedTicket, 'after_update')
         def ticket_updated(mapper, connection, target):
             """Handle ticket updates"""
-            asyncio.create_task(self._handle_ticket_event(
-                'update', target, connection
-            ))
+            self._enqueue_event(connection, "ticket_changed", "unified_tickets",
+                                "update", target.id, self._ticket_values(target))
         
         # User events - temporarily disabled to prevent session binding issues
-        # @event.listens_for(UnifiedUser, 'after_update')
         # def user_updated(mapper, connection, target):
         #     """Handle user data updates"""
-        #     asyncio.create_task(self._handle_user_event(
-        #         'update', target, connection
-        #     ))
+        #     self._enqueue_event(connection, "user_changed", "unified_users",
+        #                         "update", target.id, self._user_values(target))
         
         # Ticket Comment events
-        @event.listens_for(UnifiedTicketComment, 'after_insert')
         def ticket_comment_inserted(mapper, connection, target):
             """Handle new ticket comments"""
-            asyncio.create_task(self._handle_ticket_comment_event(
-                'insert', target, connection
-            ))
+            self._enqueue_event(connection, "ticket_comment_added", "unified_ticket_comments",
+                                "insert", target.id, self._ticket_comment_values(target))
+        
+        self._listeners = [
+            (UnifiedChatHistory, 'after_insert', chat_history_inserted),
+            (UnifiedChatHistory, 'after_update', chat_history_updated),
+            (UnifiedTicket, 'after_insert', ticket_inserted),
+            (UnifiedTicket, 'after_update', ticket_updated),
+            (UnifiedTicketComment, 'after_insert', ticket_comment_inserted),
+        ]
+        for model, identifier, listener in self._listeners:
+            event.listen(model, identifier, listener)
         
         logger.info("SQLAlchemy event listeners registered")
     
+    def _remove_sqlalchemy_events(self):
+        """Remove the SQLAlchemy event listeners registered by this manager"""
+        for model, identifier, listener in self._listeners:
+            if event.contains(model, identifier, listener):
+                event.remove(model, identifier, listener)
+        self._listeners = []
+    
+    def _ensure_outbox_table(self):
+        """Create the outbox table if it does not exist yet"""
+        try:
+            SyncOutboxEvent.__table__.create(bind=engine, checkfirst=True)
+        except Exception as e:
+            logger.error(f"Error creating sync outbox table: {e}")
+    
+    def _enqueue_event(self, connection, event_type: str, table_name: str, operation: str,
+                       entity_id: int, new_values: Dict[str, Any]):
+        """Write an event to the outbox using the flushing connection"""
+        connection.execute(
+            SyncOutboxEvent.__table__.insert().values(
+                event_type=event_type,
+                table_name=table_name,
+                operation=operation,
+                entity_id=entity_id,
+                entity_key=f"{table_name}:{entity_id}",
+                payload=new_values,
+                status=OutboxStatus.PENDING.value,
+                attempts=0,
+                created_at=datetime.now(timezone.utc)
+            )
+        )
+    
+    @staticmethod
+    def _chat_history_values(chat: UnifiedChatHistory) -> Dict[str, Any]:
+        return {
+            "user_id": chat.user_id,
+            "session_id": chat.session_id,
+            "user_message": chat.user_message,
+            "bot_response": chat.bot_response,
+            "ticket_id": chat.ticket_id
+        }
+    
+    @staticmethod
+    def _ticket_values(ticket: UnifiedTicket) -> Dict[str, Any]:
+        return {
+            "customer_id": ticket.customer_id,
+            "status": ticket.status.value if ticket.status else None,
+            "priority": ticket.priority.value if ticket.priority else None,
+            "category": ticket.category.value if ticket.category else None,
+            "title": ticket.title
+        }
+    
+    @staticmethod
+    def _user_values(user: UnifiedUser) -> Dict[str, Any]:
+        return {
+            "user_id": user.user_id,
+            "username": user.username,
+            "email": user.email,
+            "is_active": user.is_active,
+            "role": user.role.value if user.role else None
+        }
+    
+    @staticmethod
+    def _ticket_comment_values(comment: UnifiedTicketComment) -> Dict[str, Any]:
+        return {
+            "ticket_id": comment.ticket_id,
+            "author_id": comment.author_id,
+            "comment": comment.comment,
+            "is_internal": comment.is_internal
+        }
+    
     def _create_database_triggers(self):
         """Create database triggers for real-time synchronization"""
         try:
@@ -288,141 +392,48 @@ class EventDrivenSyncManager:
             logger.error(f"Error creating database triggers: {e}")
             # Continue without triggers - application events will still work
     
-    async def _handle_chat_history_event(self, operation: str, target: UnifiedChatHistory, connection):
-        """Handle chat history events"""
-        try:
-            # Create a new session to safely access the chat history object
-            with SessionLocal() as db:
-                # Re-fetch the chat history to ensure it's bound to this session
-                chat = db.query(UnifiedChatHistory).filter(UnifiedChatHistory.id == target.id).first()
-                if not chat:
-                    logger.warning(f"Chat history {target.id} not found during event handling")
-                    return
-                
-                event_data = SyncEventData(
-                    table_name="unified_chat_history",
-                    operation=operation,
-                    entity_id=chat.id,
-                    new_values={
-                        "user_id": chat.user_id,
-                        "session_id": chat.session_id,
-                        "user_message": chat.user_message,
-                        "bot_response": chat.bot_response,
-                        "ticket_id": chat.ticket_id
-                    }
-                )
-                
-                # Trigger registered event handlers
-                await self._trigger_event_handlers("chat_history_changed", event_data)
-                
-                # Auto-create ticket if conversation indicates need for support
-                if operation == "insert" and chat.user_message:
-                    if await self._should_create_ticket_from_conversation(chat):
-                        from backend.data_sync_service import create_ticket_from_conversation
-                        result = create_ticket_from_conversation(chat.id)
-                        if result.success:
-                            logger.info(f"Auto-created ticket {result.entity_id} from conversation {chat.id}")
-            
-        except Exception as e:
-            logger.error(f"Error handling chat history event: {e}")
-    
-    async def _handle_ticket_event(self, operation: str, target: UnifiedTicket, connection):
-        """Handle ticket events"""
-        try:
-            # Create a new session to safely access the ticket object
-            with SessionLocal() as db:
-                # Re-fetch the ticket to ensure it's bound to this session
-                ticket = db.query(UnifiedTicket).filter(UnifiedTicket.id == target.id).first()
-                if not ticket:
-                    logger.warning(f"Ticket {target.id} not found during event handling")
-                    return
-                
-                event_data = SyncEventData(
-                    table_name="unified_tickets",
-                    operation=operation,
-                    entity_id=ticket.id,
-                    new_values={
-                        "customer_id": ticket.customer_id,
-                        "status": ticket.status.value if ticket.status else None,
-                        "priority": ticket.priority.value if ticket.priority else None,
-                        "category": ticket.category.value if ticket.category else None,
-                        "title": ticket.title
-                    }
-                )
-                
-                # Trigger registered event handlers
-                await self._trigger_event_handlers("ticket_changed", event_data)
-            
-        except Exception as e:
-            logger.error(f"Error handling ticket event: {e}")
+    async def dispatch_event(self, event_type: str, event_data: SyncEventData):
+        """
+        Run handlers and built-in follow-ups for one outbox event.
+        
+        Exceptions propagate so the dispatcher can retry the event.
+        """
+        await self._trigger_event_handlers(event_type, event_data, raise_errors=True)
+        
+        if event_data.operation != "insert":
+            return
+        if event_type == "chat_history_changed":
+            await self._handle_chat_history_insert(event_data)
+        elif event_type == "ticket_comment_added":
+            self._handle_ticket_comment_insert(event_data)
     
-    async def _handle_user_event(self, operation: str, target: UnifiedUser, connection):
-        """Handle user events"""
-        try:
-            # Create a new session to safely access the user object
-            with SessionLocal() as db:
-                # Re-fetch the user to ensure it's bound to this session
-                user = db.query(UnifiedUser).filter(UnifiedUser.id == target.id).first()
-                if not user:
-                    logger.warning(f"User {target.id} not found during event handling")
-                    return
-                
-                event_data = SyncEventData(
-                    table_name="unified_users",
-                    operation=operation,
-                    entity_id=user.id,
-                    new_values={
-                        "user_id": user.user_id,
-                        "username": user.username,
-                        "email": user.email,
-                        "is_active": user.is_active,
-                        "role": user.role.value if user.role else None
-                    }
-                )
-                
-                # Trigger registered event handlers
-                await self._trigger_event_handlers("user_changed", event_data)
+    async def _handle_chat_history_insert(self, event_data: SyncEventData):
+        """Auto-create a ticket if the conversation indicates need for support"""
+        with SessionLocal() as db:
+            chat = db.query(UnifiedChatHistory).filter(
+                UnifiedChatHistory.id == event_data.entity_id
+            ).first()
+            if not chat:
+                logger.warning(f"Chat history {event_data.entity_id} not found during event handling")
+                return
             
-        except Exception as e:
-            logger.error(f"Error handling user event: {e}")
+            if chat.user_message and not chat.ticket_id:
+                if await self._should_create_ticket_from_conversation(chat):
+                    from backend.data_sync_service import create_ticket_from_conversation
+                    result = create_ticket_from_conversation(chat.id)
+                    if result.success:
+                        logger.info(f"Auto-created ticket {result.entity_id} from conversation {chat.id}")
     
-    async def _handle_ticket_comment_event(self, operation: str, target: UnifiedTicketComment, connection):
-        """Handle ticket comment events"""
-        try:
-            # Create a new session to safely access the comment object
-            with SessionLocal() as db:
-                # Re-fetch the comment to ensure it's bound to this session
-                comment = db.query(UnifiedTicketComment).filter(UnifiedTicketComment.id == target.id).first()
-                if not comment:
-                    logger.warning(f"Ticket comment {target.id} not found during event handling")
-                    return
-                
-                event_data = SyncEventData(
-                    table_name="unified_ticket_comments",
-                    operation=operation,
-                    entity_id=comment.id,
-                    new_values={
-                        "ticket_id": comment.ticket_id,
-                        "author_id": comment.author_id,
-                        "comment": comment.comment,
-                        "is_internal": comment.is_internal
-                    }
-                )
-                
-                # Trigger registered event handlers
-                await self._trigger_event_handlers("ticket_comment_added", event_data)
-                
-                # Update ticket's updated_at timestamp
-                if operation == "insert":
-                    ticket = db.query(UnifiedTicket).filter(
-                        UnifiedTicket.id == comment.ticket_id
-                    ).first()
-                    if ticket:
-                        ticket.updated_at = datetime.now(timezone.utc)
-                        db.commit()
-            
-        except Exception as e:
-            logger.error(f"Error handling ticket comment event: {e}")
+    def _handle_ticket_comment_insert(self, event_data: SyncEventData):
+        """Update the ticket's updated_at timestamp for a new comment"""
+        ticket_id = (event_data.new_values or {}).get("ticket_id")
+        if not ticket_id:
+            return
+        with SessionLocal() as db:
+            ticket = db.query(UnifiedTicket).filter(UnifiedTicket.id == ticket_id).first()
+            if ticket:
+                ticket.updated_at = datetime.now(timezone.utc)
+                db.commit()
     
     async def _should_create_ticket_from_conversation(self, conversation: UnifiedChatHistory) -> bool:
         """
@@ -459,8 +470,14 @@ class EventDrivenSyncManager:
         self.event_handlers[event_type].append(handler)
         logger.debug(f"Registered event handler for {event_type}")
     
-    async def _trigger_event_handlers(self, event_type: str, event_data: SyncEventData):
-        """Trigger all registered handlers for an event type"""
+    async def _trigger_event_handlers(self, event_type: str, event_data: SyncEventData,
+                                      raise_errors: bool = False):
+        """Trigger all registered handlers for an event type
+        
+        With raise_errors the remaining handlers still run, then the first
+        error is re-raised so the outbox event is retried.
+        """
+        first_error = None
         if event_type in self.event_handlers:
             for handler in self.event_handlers[event_type]:
                 try:
@@ -470,6 +487,271 @@ class EventDrivenSyncManager:
                         handler(event_data)
                 except Exception as e:
                     logger.error(f"Error in event handler for {event_type}: {e}")
+                    if first_error is None:
+                        first_error = e
+        if raise_errors and first_error is not None:
+            raise first_error
+
+class OutboxDispatcher:
+    """
+    Drains the sync outbox in batches with at-least-once delivery.
+    
+    Events for the same entity are handled one after another in outbox order,
+    while different entities are handled concurrently. An event is marked
+    dispatched only after its handlers succeed; failures are retried until
+    max_attempts is reached and the event is parked as failed. Dispatched
+    events older than retention_hours are purged every purge_interval seconds
+    while the polling loop runs.
+    """
+    
+    def __init__(self, manager: EventDrivenSyncManager, session_factory: Callable = None,
+                 batch_size: int = 100, max_concurrency: int = 8, max_attempts: int = 5,
+                 poll_interval: float = 1.0, lease_seconds: int = 60,
+                 retention_hours: int = 24, purge_interval: float = 3600.0):
+        self.manager = manager
+        self.session_factory = session_factory or BackgroundSessionLocal
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retention_hours = retention_hours
+        self.purge_interval = purge_interval
+        self.is_running = False
+        self._task: Optional[asyncio.Task] = None
+    
+    def claim_batch(self) -> List[Dict[str, Any]]:
+        """
+        Claim the next batch of pending events.
+        
+        Events whose entity already has an event claimed by another dispatcher
+        are left alone so per-entity ordering holds across workers. Claims
+        older than the lease are treated as abandoned and claimed again.
+        
+        On PostgreSQL each entity key is claimed under a transaction-scoped
+        advisory lock. A key another dispatcher is claiming right now is
+        skipped, and once its claim commits the busy-key check below sees it.
+        """
+        now = datetime.now(timezone.utc)
+        lease_cutoff = now - timedelta(seconds=self.lease_seconds)
+        
+        with self.session_factory() as db:
+            claimable = or_(
+                SyncOutboxEvent.status == OutboxStatus.PENDING.value,
+                and_(SyncOutboxEvent.status == OutboxStatus.PROCESSING.value,
+                     SyncOutboxEvent.claimed_at < lease_cutoff)
+            )
+            query = db.query(SyncOutboxEvent).filter(claimable).order_by(
+                SyncOutboxEvent.id
+            ).limit(self.batch_size)
+            if db.bind is not None and db.bind.dialect.name == "postgresql":
+                query = query.with_for_update(skip_locked=True)
+            rows = query.all()
+            if not rows:
+                db.rollback()
+                return []
+            
+            keys = {row.entity_key for row in rows}
+            if db.bind is not None and db.bind.dialect.name == "postgresql":
+                keys = {
+                    key for key in keys
+                    if db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"),
+                                  {"key": f"sync_outbox:{key}"}).scalar()
+                }
+            
+            busy_keys = {
+                key for (key,) in db.query(SyncOutboxEvent.entity_key).filter(
+                    SyncOutboxEvent.status == OutboxStatus.PROCESSING.value,
+                    SyncOutboxEvent.claimed_at >= lease_cutoff,
+                    SyncOutboxEvent.entity_key.in_(keys)
+                )
+            } if keys else set()
+            
+            claimed = []
+            for row in rows:
+                if row.entity_key not in keys or row.entity_key in busy_keys:
+                    continue
+                row.status = OutboxStatus.PROCESSING.value
+                row.claimed_at = now
+                claimed.append({
+                    "id": row.id,
+                    "event_type": row.event_type,
+                    "table_name": row.table_name,
+                    "operation": row.operation,
+                    "entity_id": row.entity_id,
+                    "entity_key": row.entity_key,
+                    "payload": row.payload,
+                    "attempts": row.attempts or 0,
+                    "created_at": row.created_at,
+                })
+            db.commit()
+            return claimed
+    
+    async def dispatch_batch(self) -> Dict[str, int]:
+        """Claim one batch, run its handlers and record the outcome
+
+        The database work runs in a worker thread so the event loop keeps
+        serving other tasks while a batch is claimed and recorded.
+        """
+        events = await asyncio.to_thread(self.claim_batch)
+        stats = {"claimed": len(events), "dispatched": 0, "retried": 0, "failed": 0, "released": 0}
+        if not events:
+            return stats
+        
+        groups: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        for outbox_event in events:
+            groups.setdefault(outbox_event["entity_key"], []).append(outbox_event)
+        
+        dispatched: List[int] = []
+        failures: List[Tuple[Dict[str, Any], str]] = []
+        released: List[int] = []
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def run_group(group: List[Dict[str, Any]]):
+            async with semaphore:
+                for index, outbox_event in enumerate(group):
+                    try:
+                        await self.manager.dispatch_event(
+                            outbox_event["event_type"], self._to_event_data(outbox_event)
+                        )
+                        dispatched.append(outbox_event["id"])
+                    except Exception as e:
+                        failures.append((outbox_event, str(e)))
+                        # Later events for this entity wait for the failed one
+                        released.extend(later["id"] for later in group[index + 1:])
+                        return
+        
+        await asyncio.gather(*(run_group(group) for group in groups.values()))
+        
+        retried, failed = await asyncio.to_thread(self._record_results, dispatched, failures, released)
+        stats.update(dispatched=len(dispatched), retried=retried, failed=failed, released=len(released))
+        return stats
+    
+    def _record_results(self, dispatched: List[int], failures: List[Tuple[Dict[str, Any], str]],
+                        released: List[int]) -> Tuple[int, int]:
+        """Persist delivery results in a single transaction"""
+        now = datetime.now(timezone.utc)
+        retried = failed = 0
+        outbox = SyncOutboxEvent.__table__
+        
+        with self.session_factory() as db:
+            if dispatched:
+                db.execute(outbox.update().where(outbox.c.id.in_(dispatched)).values(
+                    status=OutboxStatus.DISPATCHED.value, dispatched_at=now, last_error=None
+                ))
+            if released:
+                db.execute(outbox.update().where(outbox.c.id.in_(released)).values(
+                    status=OutboxStatus.PENDING.value, claimed_at=None
+                ))
+            for outbox_event, error in failures:
+                attempts = outbox_event["attempts"] + 1
+                if attempts >= self.max_attempts:
+                    status = OutboxStatus.FAILED.value
+                    failed += 1
+                    logger.error(f"Giving up on sync event {outbox_event['id']} "
+                                 f"({outbox_event['event_type']}) after {attempts} attempts: {error}")
+                else:
+                    status = OutboxStatus.PENDING.value
+                    retried += 1
+                db.execute(outbox.update().where(outbox.c.id == outbox_event["id"]).values(
+                    status=status, attempts=attempts, last_error=error[:2000], claimed_at=None
+                ))
+            db.commit()
+        return retried, failed
+    
+    @staticmethod
+    def _to_event_data(outbox_event: Dict[str, Any]) -> SyncEventData:
+        return SyncEventData(
+            table_name=outbox_event["table_name"],
+            operation=outbox_event["operation"],
+            entity_id=outbox_event["entity_id"],
+            new_values=outbox_event["payload"],
+            timestamp=outbox_event["created_at"]
+        )
+    
+    async def drain(self, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """Dispatch batches until the outbox is empty or max_batches is reached"""
+        totals = {"claimed": 0, "dispatched": 0, "retried": 0, "failed": 0, "released": 0}
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            stats = await self.dispatch_batch()
+            batches += 1
+            for key, value in stats.items():
+                totals[key] += value
+            # Stop when nothing was claimed or nothing moved, so failing events
+            # are retried on the next poll instead of in a tight loop
+            if not stats["claimed"] or not stats["dispatched"]:
+                break
+        return totals
+    
+    def drain_sync(self, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """Drain the outbox from synchronous code such as scripts or cron jobs"""
+        return asyncio.run(self.drain(max_batches))
+    
+    async def run(self):
+        """Poll the outbox until stopped"""
+        self.is_running = True
+        logger.info("Sync outbox dispatcher started")
+        loop = asyncio.get_running_loop()
+        next_purge = loop.time()
+        while self.is_running:
+            try:
+                if loop.time() >= next_purge:
+                    next_purge = loop.time() + self.purge_interval
+                    purged = await asyncio.to_thread(self.purge_dispatched, self.retention_hours)
+                    if purged:
+                        logger.info(f"Purged {purged} dispatched sync outbox events")
+                stats = await self.drain()
+                if not stats["claimed"] or not stats["dispatched"]:
+                    await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error dispatching sync outbox: {e}")
+                await asyncio.sleep(self.poll_interval)
+        logger.info("Sync outbox dispatcher stopped")
+    
+    def start(self) -> Optional[asyncio.Task]:
+        """Start the polling loop as a task in the running event loop"""
+        if self._task is not None and not self._task.done():
+            return self._task
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning("No running event loop; call drain_sync() to dispatch sync events")
+            return None
+        self._task = loop.create_task(self.run())
+        return self._task
+    
+    async def stop(self):
+        """Stop the polling loop after the current batch"""
+        self.is_running = False
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=self.poll_interval + 30)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+            self._task = None
+    
+    def purge_dispatched(self, older_than_hours: int = 24) -> int:
+        """Delete dispatched events older than the retention window"""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=older_than_hours)
+        outbox = SyncOutboxEvent.__table__
+        with self.session_factory() as db:
+            result = db.execute(outbox.delete().where(and_(
+                outbox.c.status == OutboxStatus.DISPATCHED.value,
+                outbox.c.dispatched_at < cutoff
+            )))
+            db.commit()
+            return result.rowcount
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Count outbox events by status"""
+        with self.session_factory() as db:
+            rows = db.query(SyncOutboxEvent.status, func.count(SyncOutboxEvent.id)).group_by(
+                SyncOutboxEvent.status
+            ).all()
+        return {status: count for status, count in rows}
 
 # Global instance
 event_sync_manager = EventDrivenSyncManager()
@@ -483,6 +765,12 @@ def register_sync_event_handler(event_type: str, handler: Callable):
     """Register an event handler"""
     event_sync_manager.register_event_handler(event_type, handler)
 
+def drain_sync_outbox(max_batches: Optional[int] = None) -> Dict[str, int]:
+    """Dispatch pending outbox events from synchronous code"""
+    if event_sync_manager.dispatcher is None:
+        event_sync_manager.dispatcher = OutboxDispatcher(event_sync_manager)
+    return event_sync_manager.dispatcher.drain_sync(max_batches)
+
 # Example event handlers
 async def log_sync_event(event_data: SyncEventData):
     """Example event handler that logs sync events"""
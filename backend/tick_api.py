@@ -79,6 +79,17 @@ def create_ticket(ticket: TicketCreate, db: Session = Depends(get_db)):
     
     return created_ticket
 
+@app.get("/tickets/duplicates")
+def find_duplicate_tickets(title: str, description: str = "", customer_id: Optional[int] = None,
+                           db: Session = Depends(get_db)):
+    """Open tickets that look like duplicates of a ticket about to be created"""
+    service = TickingService(db)
+    duplicates = service.find_duplicate_tickets(title, description, user_id=customer_id)
+    return [
+        {"id": ticket.id, "title": ticket.title, "status": ticket.status.value, "similarity": score}
+        for ticket, score in duplicates
+    ]
+
 @app.get("/tickets/{ticket_id}", response_model=TicketResponse)
 def get_ticket(ticket_id: int, db: Session = Depends(get_db)):
     """Get a specific ticket"""
@@ -174,7 +185,9 @@ def get_ticket_context(ticket_id: int, db: Session = Depends(get_db)):
     if ticket.customer_id:
         customer_context = context_retriever.get_customer_context(ticket.customer_id)
     
-    similar_tickets = context_retriever.get_similar_tickets(ticket.title)
+    similar_tickets = context_retriever.get_similar_tickets(
+        f"{ticket.title} {ticket.description}", exclude_ids=[ticket.id]
+    )
     
     return {
         "ticket": ticket,
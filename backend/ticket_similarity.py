@@ -0,0 +1,523 @@
+"""
+Ticket Similarity Index
+
+In-memory similarity index for ticket search, related-ticket suggestions and
+duplicate detection before ticket creation.
+
+Candidates come from two sources, neither of which scans the ticket table:
+- MinHash signatures over word shingles, bucketed with LSH, which find
+  near-duplicates and paraphrases that share most of their terms
+- postings of the query's most selective terms, which find tickets for short
+  keyword queries whose shingle sets are too small for LSH
+
+Candidates are then re-ranked by TF-IDF cosine similarity.
+
+Each ticket model gets a ModelTicketIndex that is built from the database at
+startup (``warm_ticket_indexes``) or, failing that, in a background thread
+started by the first search, updated by SQLAlchemy after_insert/after_update
+listeners in this process, and refreshed from updated_at at an interval to
+pick up writes made by other workers. Tickets deleted by other workers are
+dropped when a match no longer resolves to a row.
+"""
+
+import hashlib
+import logging
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session, sessionmaker
+
+from backend.engine_registry import SESSION_OPTIONS
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "been", "but", "by", "can", "do", "does",
+    "for", "from", "has", "have", "how", "i", "if", "in", "is", "it", "its", "me", "my",
+    "no", "not", "of", "on", "or", "our", "so", "that", "the", "their", "there", "this",
+    "to", "was", "we", "what", "when", "where", "which", "will", "with", "you", "your",
+    "ai", "user", "query", "response", "ticket", "created", "conversation"
+})
+
+_SUFFIXES = ("ing", "ed", "es", "s")
+
+
+def _stem(token: str) -> str:
+    """Strip common English suffixes so inflections share a term"""
+    for suffix in _SUFFIXES:
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased, stemmed terms without stop words"""
+    if not text:
+        return []
+    return [_stem(token) for token in _TOKEN_RE.findall(text.lower())
+            if len(token) > 1 and token not in STOP_WORDS]
+
+
+def shingles(tokens: List[str]) -> Set[str]:
+    """Unigram and bigram shingles; unigrams keep reordered paraphrases similar"""
+    features = set(tokens)
+    features.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+    return features
+
+
+class MinHasher:
+    """MinHash signatures using universal hashing over a Mersenne prime"""
+
+    PRIME = (1 << 61) - 1
+
+    def __init__(self, num_perm: int = 96, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [(rng.randrange(1, self.PRIME), rng.randrange(0, self.PRIME))
+                        for _ in range(num_perm)]
+
+    @staticmethod
+    def _hash(feature: str) -> int:
+        return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def signature(self, features: Iterable[str]) -> Tuple[int, ...]:
+        hashes = [self._hash(feature) for feature in features]
+        if not hashes:
+            return ()
+        prime = self.PRIME
+        return tuple(min((a * h + b) % prime for h in hashes) for a, b in self._params)
+
+
+@dataclass
+class SimilarTicket:
+    """A ticket id with its similarity to the query (TF-IDF cosine, 0.0-1.0)"""
+    ticket_id: int
+    score: float
+    metadata: Dict[str, Any]
+
+
+class TicketSimilarityIndex:
+    """
+    MinHash/LSH candidate generation with TF-IDF cosine re-ranking.
+
+    With the defaults (96 permutations in 32 bands of 3 rows) a pair with
+    shingle Jaccard similarity of 0.3 shares a bucket about 60% of the time,
+    and one of 0.5 about 98% of the time.
+    """
+
+    def __init__(self, num_perm: int = 96, bands: int = 32, max_candidates: int = 500,
+                 max_posting_size: int = 200, posting_terms: int = 3):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_candidates = max_candidates
+        self.max_posting_size = max_posting_size
+        self.posting_terms = posting_terms
+
+        self._lock = threading.RLock()
+        self._signatures: Dict[int, Tuple[int, ...]] = {}
+        self._term_counts: Dict[int, Counter] = {}
+        self._metadata: Dict[int, Dict[str, Any]] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[int]] = defaultdict(set)
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._term_counts)
+
+    def __contains__(self, ticket_id: int) -> bool:
+        return ticket_id in self._term_counts
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        if not signature:
+            return []
+        return [(band, signature[band * self.rows:(band + 1) * self.rows])
+                for band in range(self.bands)]
+
+    def add(self, ticket_id: int, text: str, metadata: Optional[Dict[str, Any]] = None):
+        """Index a ticket, replacing any previous version"""
+        tokens = tokenize(text)
+        signature = self.hasher.signature(shingles(tokens))
+        with self._lock:
+            self._remove_locked(ticket_id)
+            self._signatures[ticket_id] = signature
+            self._term_counts[ticket_id] = Counter(tokens)
+            self._metadata[ticket_id] = dict(metadata or {})
+            for key in self._band_keys(signature):
+                self._buckets[key].add(ticket_id)
+            for term in self._term_counts[ticket_id]:
+                self._postings[term].add(ticket_id)
+
+    def update_metadata(self, ticket_id: int, **metadata):
+        with self._lock:
+            if ticket_id in self._metadata:
+                self._metadata[ticket_id].update(metadata)
+
+    def remove(self, ticket_id: int):
+        with self._lock:
+            self._remove_locked(ticket_id)
+
+    def _remove_locked(self, ticket_id: int):
+        signature = self._signatures.pop(ticket_id, None)
+        if signature is None:
+            return
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(ticket_id)
+                if not bucket:
+                    del self._buckets[key]
+        for term in self._term_counts.pop(ticket_id):
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.discard(ticket_id)
+                if not posting:
+                    del self._postings[term]
+        self._metadata.pop(ticket_id, None)
+
+    def _candidates(self, tokens: List[str], signature: Tuple[int, ...]) -> Set[int]:
+        candidates: Set[int] = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+
+        # Rarest query terms catch short keyword queries; terms too common to
+        # be selective would turn the lookup into a scan, so they are skipped
+        terms = sorted({term for term in tokens if term in self._postings},
+                       key=lambda term: len(self._postings[term]))
+        for term in terms[:self.posting_terms]:
+            posting = self._postings[term]
+            if len(posting) <= self.max_posting_size:
+                candidates.update(posting)
+        return candidates
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + len(self._term_counts)) / (1 + len(self._postings.get(term, ())))) + 1.0
+
+    def _cosine(self, query_weights: Dict[str, float], query_norm: float, ticket_id: int) -> float:
+        counts = self._term_counts[ticket_id]
+        dot = 0.0
+        norm = 0.0
+        for term, count in counts.items():
+            weight = count * self._idf(term)
+            norm += weight * weight
+            if term in query_weights:
+                dot += weight * query_weights[term]
+        if not dot:
+            return 0.0
+        return dot / (query_norm * math.sqrt(norm))
+
+    def query(self, text: str, limit: int = 10, min_score: float = 0.0,
+              exclude_ids: Optional[Iterable[int]] = None,
+              where: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[SimilarTicket]:
+        """
+        Tickets most similar to text, best first.
+
+        Args:
+            text: Free text, a search query or another ticket's content
+            limit: Maximum number of results
+            min_score: Minimum TF-IDF cosine similarity
+            exclude_ids: Ticket ids to leave out
+            where: Predicate on ticket metadata, e.g. open tickets of a customer
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        signature = self.hasher.signature(shingles(tokens))
+        excluded = set(exclude_ids or ())
+
+        with self._lock:
+            candidates = self._candidates(tokens, signature) - excluded
+            if where is not None:
+                candidates = {ticket_id for ticket_id in candidates if where(self._metadata[ticket_id])}
+            if not candidates:
+                return []
+
+            if len(candidates) > self.max_candidates:
+                # Keep the candidates sharing the most MinHash values with the query
+                candidates = sorted(
+                    candidates,
+                    key=lambda ticket_id: sum(
+                        a == b for a, b in zip(signature, self._signatures[ticket_id])
+                    ),
+                    reverse=True
+                )[:self.max_candidates]
+
+            query_weights = {term: count * self._idf(term) for term, count in Counter(tokens).items()}
+            query_norm = math.sqrt(sum(weight * weight for weight in query_weights.values()))
+
+            results = []
+            for ticket_id in candidates:
+                score = self._cosine(query_weights, query_norm, ticket_id)
+                if score > 0 and score >= min_score:
+                    results.append(SimilarTicket(ticket_id, round(score, 4), dict(self._metadata[ticket_id])))
+
+        results.sort(key=lambda result: (-result.score, -result.ticket_id))
+        return results[:limit]
+
+    def find_duplicates(self, text: str, threshold: float = 0.8, limit: int = 5,
+                        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                        exclude_ids: Optional[Iterable[int]] = None) -> List[SimilarTicket]:
+        """Tickets similar enough to text to be considered duplicates"""
+        return self.query(text, limit=limit, min_score=threshold, exclude_ids=exclude_ids, where=where)
+
+
+def ticket_text(ticket) -> str:
+    """Searchable text of a ticket row (title, description and tags)"""
+    return " ".join(part for part in (ticket.title, ticket.description, ticket.tags) if part)
+
+
+def ticket_metadata(ticket) -> Dict[str, Any]:
+    status = getattr(ticket, "status", None)
+    return {
+        "customer_id": getattr(ticket, "customer_id", None),
+        "status": status.value if hasattr(status, "value") else status,
+    }
+
+
+class ModelTicketIndex:
+    """
+    TicketSimilarityIndex bound to a ticket model.
+
+    Works with any model that has id, title, description, tags, status,
+    customer_id and updated_at columns (Ticket and UnifiedTicket).
+    """
+
+    # Rows updated this close to the high-water mark are re-read on refresh,
+    # covering clock skew and transactions that committed out of order
+    REFRESH_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self, model, refresh_interval: float = 30.0, index: Optional[TicketSimilarityIndex] = None):
+        self.model = model
+        self.refresh_interval = refresh_interval
+        self.index = index or TicketSimilarityIndex()
+        self.is_built = False
+        self._high_water: Optional[datetime] = None
+        self._last_refresh = 0.0
+        self._sync_lock = threading.Lock()
+        self._listeners: List[Tuple[Any, str, Callable]] = []
+        # Changes committed while a build is loading, replayed onto the new index
+        self._journal: Optional[List[Tuple[int, Any]]] = None
+        self._journal_lock = threading.Lock()
+        self._build_thread: Optional[threading.Thread] = None
+        self._build_thread_lock = threading.Lock()
+
+    def register_listeners(self):
+        """Keep the index current for tickets written by this process
+
+        Writes are collected per session at flush time and applied to the index
+        when the session commits; a rollback discards them. Deleted tickets are
+        dropped from the index.
+        """
+        if self._listeners:
+            return
+        info_key = ("ticket_index", id(self))
+
+        def pending_for(target) -> Optional[Dict[int, Any]]:
+            session = object_session(target)
+            return None if session is None else session.info.setdefault(info_key, {})
+
+        def ticket_written(mapper, connection, target):
+            pending = pending_for(target)
+            if pending is None:
+                return
+            try:
+                pending[target.id] = (ticket_text(target), ticket_metadata(target))
+            except Exception as e:
+                logger.error(f"Error indexing ticket {target.id}: {e}")
+
+        def ticket_deleted(mapper, connection, target):
+            pending = pending_for(target)
+            if pending is not None:
+                pending[target.id] = None
+
+        def committed(session):
+            changes = session.info.pop(info_key, None)
+            if not changes:
+                return
+            with self._journal_lock:
+                for ticket_id, entry in changes.items():
+                    _apply_change(self.index, ticket_id, entry)
+                if self._journal is not None:
+                    self._journal.extend(changes.items())
+
+        def rolled_back(session):
+            session.info.pop(info_key, None)
+
+        self._listeners = [
+            (self.model, "after_insert", ticket_written),
+            (self.model, "after_update", ticket_written),
+            (self.model, "after_delete", ticket_deleted),
+            (Session, "after_commit", committed),
+            (Session, "after_rollback", rolled_back),
+        ]
+        for target, identifier, listener in self._listeners:
+            event.listen(target, identifier, listener)
+
+    def unregister_listeners(self):
+        for target, identifier, listener in self._listeners:
+            if event.contains(target, identifier, listener):
+                event.remove(target, identifier, listener)
+        self._listeners = []
+
+    def _columns(self):
+        model = self.model
+        return (model.id, model.title, model.description, model.tags,
+                model.status, model.customer_id, model.updated_at)
+
+    def _load(self, rows, index: Optional[TicketSimilarityIndex] = None) -> int:
+        if index is None:
+            index = self.index
+        count = 0
+        for row in rows:
+            index.add(row.id, ticket_text(row), ticket_metadata(row))
+            if row.updated_at is not None and (self._high_water is None or row.updated_at > self._high_water):
+                self._high_water = row.updated_at
+            count += 1
+        return count
+
+    def build(self, db: Session) -> int:
+        """
+        Index every ticket, streaming rows from the database
+
+        Searches keep using the current index until the new one is loaded.
+        Changes committed meanwhile are replayed onto it before the swap.
+        """
+        with self._sync_lock:
+            index = TicketSimilarityIndex(
+                self.index.hasher.num_perm, self.index.bands, self.index.max_candidates,
+                self.index.max_posting_size, self.index.posting_terms
+            )
+            with self._journal_lock:
+                self._journal = []
+            try:
+                self._high_water = None
+                count = self._load(db.query(*self._columns()).order_by(self.model.id).yield_per(1000), index)
+            except Exception:
+                with self._journal_lock:
+                    self._journal = None
+                raise
+            with self._journal_lock:
+                for ticket_id, entry in self._journal:
+                    _apply_change(index, ticket_id, entry)
+                self._journal = None
+                self.index = index
+            self.is_built = True
+            self._last_refresh = time.monotonic()
+            logger.info(f"Built similarity index for {self.model.__tablename__}: {count} tickets")
+            return count
+
+    def build_in_background(self, session_factory: Callable[[], Session]) -> threading.Thread:
+        """Build the index on a daemon thread, unless a build is already running"""
+        with self._build_thread_lock:
+            if self._build_thread is None or not self._build_thread.is_alive():
+                self._build_thread = threading.Thread(
+                    target=self._build_with, args=(session_factory,),
+                    name=f"ticket-index-{self.model.__tablename__}", daemon=True
+                )
+                self._build_thread.start()
+            return self._build_thread
+
+    def _build_with(self, session_factory: Callable[[], Session]):
+        try:
+            with session_factory() as db:
+                self.build(db)
+        except Exception as e:
+            logger.error(f"Building similarity index for {self.model.__tablename__} failed: {e}")
+
+    def _ready(self, db: Session) -> bool:
+        """Refresh a built index; an unbuilt one starts building off the request path"""
+        if not self.is_built:
+            self.build_in_background(sessionmaker(bind=db.get_bind(), **SESSION_OPTIONS))
+            return False
+        self.sync(db)
+        return True
+
+    def forget(self, ticket_ids: Iterable[int]):
+        """Drop tickets that no longer exist, such as ones deleted by another worker"""
+        for ticket_id in ticket_ids:
+            self.index.remove(ticket_id)
+
+    def resolve(self, db: Session, matches: List[SimilarTicket]) -> List[SimilarTicket]:
+        """Matches whose tickets still exist, forgetting the others"""
+        if not matches:
+            return []
+        ids = {match.ticket_id for match in matches}
+        found = {row[0] for row in db.query(self.model.id).filter(self.model.id.in_(ids))}
+        self.forget(ids - found)
+        return [match for match in matches if match.ticket_id in found]
+
+    def sync(self, db: Session, force: bool = False) -> int:
+        """Build if not built yet, then pick up rows changed since the last refresh"""
+        if not self.is_built:
+            return self.build(db)
+        if not force and time.monotonic() - self._last_refresh < self.refresh_interval:
+            return 0
+        with self._sync_lock:
+            self._last_refresh = time.monotonic()
+            query = db.query(*self._columns())
+            if self._high_water is not None:
+                query = query.filter(self.model.updated_at >= self._high_water - self.REFRESH_OVERLAP)
+            return self._load(query.yield_per(1000))
+
+    def query(self, db: Session, text: str, **kwargs) -> List[SimilarTicket]:
+        """Similar tickets, or none while the index is still being built"""
+        return self.index.query(text, **kwargs) if self._ready(db) else []
+
+    def find_duplicates(self, db: Session, text: str, **kwargs) -> List[SimilarTicket]:
+        """Likely duplicates, or none while the index is still being built"""
+        return self.index.find_duplicates(text, **kwargs) if self._ready(db) else []
+
+
+def _apply_change(index: TicketSimilarityIndex, ticket_id: int, entry) -> None:
+    """Apply a committed write (text, metadata) or delete (None) to an index"""
+    if entry is None:
+        index.remove(ticket_id)
+    else:
+        index.add(ticket_id, *entry)
+
+
+_model_indexes: Dict[Any, ModelTicketIndex] = {}
+_model_indexes_lock = threading.Lock()
+
+
+def get_ticket_index(model) -> ModelTicketIndex:
+    """Shared similarity index for a ticket model, with write listeners registered"""
+    with _model_indexes_lock:
+        model_index = _model_indexes.get(model)
+        if model_index is None:
+            model_index = _model_indexes[model] = ModelTicketIndex(model)
+            model_index.register_listeners()
+        return model_index
+
+
+def warm_ticket_indexes() -> None:
+    """Build the shared indexes of both ticket models, as a startup warm-up"""
+    from backend.database import BackgroundSessionLocal
+    from backend.models import Ticket
+    from backend.unified_models import UnifiedTicket
+    for model in (Ticket, UnifiedTicket):
+        with BackgroundSessionLocal() as db:
+            get_ticket_index(model).build(db)
+
+
+OPEN_STATUSES = frozenset({"open", "in_progress", "pending"})
+
+
+def open_tickets_for(customer_id: Optional[int] = None) -> Callable[[Dict[str, Any]], bool]:
+    """Metadata predicate for unresolved tickets, optionally of one customer"""
+    def predicate(metadata: Dict[str, Any]) -> bool:
+        if metadata.get("status") not in OPEN_STATUSES:
+            return False
+        return customer_id is None or metadata.get("customer_id") == customer_id
+    return predicate
@@ -2,18 +2,40 @@
 Ticking Service - Business logic for ticket management
 """
 
-from typing import List, Optional, Dict, Any
+import logging
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 from backend.models import Ticket, TicketComment, TicketActivity, TicketStatus, TicketPriority, TicketCategory
 from backend.database import get_db
+from backend.ticket_similarity import ModelTicketIndex, get_ticket_index, open_tickets_for
+
+logger = logging.getLogger(__name__)
+
+def _tickets_by_rank(db: Session, ticket_ids: List[int],
+                     similarity_index: Optional[ModelTicketIndex] = None) -> List[Ticket]:
+    """
+    Load tickets by id, keeping the order of ticket_ids and dropping missing rows
+
+    Missing rows were deleted, possibly by another worker, and are also
+    dropped from ``similarity_index``.
+    """
+    if not ticket_ids:
+        return []
+    tickets = {ticket.id: ticket for ticket in db.query(Ticket).filter(Ticket.id.in_(ticket_ids)).all()}
+    if similarity_index is not None:
+        similarity_index.forget(ticket_id for ticket_id in ticket_ids if ticket_id not in tickets)
+    return [tickets[ticket_id] for ticket_id in ticket_ids if ticket_id in tickets]
 
 class TickingService:
     """Service class for managing tickets with database context retrieval"""
     
-    def __init__(self, db_session: Session = None):
+    DUPLICATE_THRESHOLD = 0.8
+    
+    def __init__(self, db_session: Session = None, similarity_index: ModelTicketIndex = None):
         self.db = db_session or next(get_db())
+        self.similarity_index = similarity_index or get_ticket_index(Ticket)
     
     def create_ticket(self, title: str, description: str, user_id: int = None, 
                      priority: TicketPriority = TicketPriority.MEDIUM, 
@@ -130,8 +152,16 @@ class TickingService:
         return ticket_comment
     
     def search_tickets(self, query: str, limit: int = 50) -> List[Ticket]:
-        """Search tickets using database context retrieval"""
+        """Search tickets by similarity, falling back to substring matching"""
+        
+        try:
+            matches = self.similarity_index.query(self.db, query, limit=limit)
+            if matches:
+                return _tickets_by_rank(self.db, [match.ticket_id for match in matches], self.similarity_index)
+        except Exception as e:
+            logger.error(f"Ticket similarity search failed: {e}")
         
+        # Substring fallback for fragments the index does not tokenize as terms
         search_term = f"%{query}%"
         return self.db.query(Ticket).filter(
             or_(
@@ -141,6 +171,19 @@ class TickingService:
             )
         ).order_by(Ticket.created_at.desc()).limit(limit).all()
     
+    def find_duplicate_tickets(self, title: str, description: str, user_id: int = None,
+                               threshold: float = None, limit: int = 5) -> List[Tuple[Ticket, float]]:
+        """Open tickets (of the user, if given) that look like duplicates of a new ticket"""
+        
+        matches = self.similarity_index.find_duplicates(
+            self.db, f"{title} {description}",
+            threshold=self.DUPLICATE_THRESHOLD if threshold is None else threshold,
+            limit=limit,
+            where=open_tickets_for(user_id)
+        )
+        scores = {match.ticket_id: match.score for match in matches}
+        return [(ticket, scores[ticket.id]) for ticket in _tickets_by_rank(self.db, list(scores), self.similarity_index)]
+    
     def get_ticket_statistics(self) -> Dict[str, Any]:
         """Get ticket statistics for dashboard"""
         
@@ -173,8 +216,9 @@ class TickingService:
 class TicketContextRetriever:
     """Context retrieval service using database for ticket system"""
     
-    def __init__(self, db_session: Session = None):
+    def __init__(self, db_session: Session = None, similarity_index: ModelTicketIndex = None):
         self.db = db_session or next(get_db())
+        self.similarity_index = similarity_index or get_ticket_index(Ticket)
     
     def get_customer_context(self, user_id: int) -> Dict[str, Any]:
         """Get customer context for ticket creation"""
@@ -206,18 +250,15 @@ class TicketContextRetriever:
             ]
         }
     
-    def get_similar_tickets(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_similar_tickets(self, query: str, limit: int = 10, min_score: float = 0.1,
+                            exclude_ids: List[int] = None) -> List[Dict[str, Any]]:
         """Find similar tickets based on content"""
         
-        from sqlalchemy import or_
-        
-        search_term = f"%{query}%"
-        tickets = self.db.query(Ticket).filter(
-            or_(
-                Ticket.title.ilike(search_term),
-                Ticket.description.ilike(search_term)
-            )
-        ).order_by(Ticket.created_at.desc()).limit(limit).all()
+        matches = self.similarity_index.query(
+            self.db, query, limit=limit, min_score=min_score, exclude_ids=exclude_ids
+        )
+        scores = {match.ticket_id: match.score for match in matches}
+        tickets = _tickets_by_rank(self.db, list(scores), self.similarity_index)
         
         return [
             {
@@ -227,7 +268,8 @@ class TicketContextRetriever:
                 "status": ticket.status.value,
                 "priority": ticket.priority.value,
                 "category": ticket.category.value,
-                "created_at": ticket.created_at.isoformat()
+                "created_at": ticket.created_at.isoformat(),
+                "similarity": scores[ticket.id]
             }
             for ticket in tickets
         ]
@@ -12,18 +12,24 @@ Requirements covered:
 
 import hashlib
 import logging
+import math
+import threading
+import time
+import weakref
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any, Iterable
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import defaultdict, deque
 import json
 import statistics
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, and_, or_
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import func, desc, and_, or_, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
 
 from backend.memory_models import ToolUsageMetrics, ToolRecommendationDTO
-from backend.database import SessionLocal
+from backend.database import SessionLocal, BackgroundSessionLocal
+from backend.engine_registry import SESSION_OPTIONS
 
 
 @dataclass
@@ -48,6 +54,99 @@ class QueryAnalysis:
     confidence: float
 
 
+class LatencySketch:
+    """
+    Log-bucketed latency histogram.
+    
+    Constant memory per tool, mergeable, and accurate to one bucket
+    (25% relative error) for percentile estimates.
+    """
+    
+    GROWTH = 1.25
+    MIN_VALUE = 0.001  # seconds
+    
+    def __init__(self):
+        self.buckets: Dict[int, int] = defaultdict(int)
+        self.count = 0
+        self.max_value = 0.0
+    
+    def add(self, value: float):
+        if value <= self.MIN_VALUE:
+            index = 0
+        else:
+            index = int(math.log(value / self.MIN_VALUE, self.GROWTH)) + 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.max_value = max(self.max_value, value)
+    
+    def merge(self, other: 'LatencySketch'):
+        for index, count in other.buckets.items():
+            self.buckets[index] += count
+        self.count += other.count
+        self.max_value = max(self.max_value, other.max_value)
+    
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.MIN_VALUE * self.GROWTH ** index, self.max_value)
+        return self.max_value
+
+
+@dataclass
+class ToolUsageDelta:
+    """Usage accumulated in memory for one (tool_name, query_hash) key since the last flush"""
+    tool_name: str
+    query_hash: str
+    query_type: str
+    count: int = 0
+    success_sum: float = 0.0
+    quality_sum: float = 0.0
+    timed_count: int = 0
+    time_sum: float = 0.0
+    last_used: Optional[datetime] = None
+    
+    def add(self, success: bool, response_quality: float, response_time: Optional[float], used_at: datetime):
+        self.count += 1
+        self.success_sum += 1.0 if success else 0.0
+        self.quality_sum += response_quality
+        if response_time is not None:
+            self.timed_count += 1
+            self.time_sum += response_time
+        if self.last_used is None or used_at > self.last_used:
+            self.last_used = used_at
+    
+    def merge(self, other: 'ToolUsageDelta'):
+        self.count += other.count
+        self.success_sum += other.success_sum
+        self.quality_sum += other.quality_sum
+        self.timed_count += other.timed_count
+        self.time_sum += other.time_sum
+        if other.last_used and (self.last_used is None or other.last_used > self.last_used):
+            self.last_used = other.last_used
+    
+    def to_row(self) -> Dict[str, Any]:
+        """Insert values for a new metrics row, plus the extra UPSERT parameters"""
+        return {
+            'tool_name': self.tool_name,
+            'query_type': self.query_type,
+            'query_hash': self.query_hash,
+            'usage_count': self.count,
+            'success_rate': self.success_sum / self.count,
+            'response_quality_score': self.quality_sum / self.count,
+            'average_response_time': self.time_sum / self.timed_count if self.timed_count else 0.0,
+            'last_used': self.last_used,
+            'created_at': self.last_used,
+            'delta_timed_count': self.timed_count,
+            'delta_time_sum': self.time_sum,
+        }
+
+
 class ToolUsageAnalytics:
     """
     Analytics system for tracking tool performance and providing intelligent recommendations.
@@ -57,11 +156,27 @@ class ToolUsageAnalytics:
     - Analyzing tool performance patterns
     - Generating tool recommendations based on historical data
     - Optimizing tool selection for better results
+    
+    Usage is accumulated in memory and written with one UPSERT per key every
+    flush_interval seconds, by the next recording or by a background timer
+    when no more usage comes in. Reads combine the cached database row with
+    the unflushed deltas, so recording never invalidates the performance cache.
+    
+    Flushes write through a short-lived session of their own, never through
+    db_session, which belongs to the caller's thread.
     """
     
-    def __init__(self, db_session: Optional[Session] = None):
+    def __init__(
+        self,
+        db_session: Optional[Session] = None,
+        flush_interval: float = 5.0,
+        max_pending: int = 1000,
+        session_factory: Optional[Callable[[], Session]] = None
+    ):
         """Initialize the analytics system with database session"""
         self.db_session = db_session or SessionLocal()
+        self._owns_session = db_session is None
+        self.session_factory = session_factory or self._default_session_factory(db_session)
         self.logger = logging.getLogger(__name__)
         
         # Cache for frequently accessed data
@@ -69,6 +184,22 @@ class ToolUsageAnalytics:
         self._cache_expiry = {}
         self._cache_ttl = 300  # 5 minutes
         
+        # Usage accumulation. Writers only append to the deque (atomic, no
+        # lock); flushes and reads fold it into per-key deltas under _fold_lock.
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._deltas: Dict[Tuple[str, str], ToolUsageDelta] = {}
+        self._inflight: Dict[Tuple[str, str], ToolUsageDelta] = {}
+        self._latency: Dict[str, LatencySketch] = {}
+        self._fold_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+        self._upsert_supported = True
+        self._flush_timer: Optional[threading.Thread] = None
+        self._stop_timer = threading.Event()
+        _live_instances.add(self)
+        
         # Tool categories for better organization
         self.tool_categories = {
             'search': ['search', 'BTWebsiteSearch', 'DuckDuckGoSearchRun'],
@@ -90,6 +221,9 @@ class ToolUsageAnalytics:
         """
         Record tool usage metrics for analytics.
         
+        The sample is accumulated in memory; a flush is triggered when
+        flush_interval has elapsed or max_pending samples are waiting.
+        
         Args:
             tool_name: Name of the tool used
             query: The query that triggered the tool
@@ -99,46 +233,123 @@ class ToolUsageAnalytics:
             context: Additional context information
             
         Returns:
-            bool: True if recording was successful
+            bool: False if the sample could not be recorded or a flush it
+            triggered failed (the unflushed usage is kept for the next flush)
         """
         try:
             # Generate query hash for grouping similar queries
             query_hash = self._generate_query_hash(query)
             query_type = self._analyze_query_type(query)
             
-            # Check if we have existing metrics for this tool/query combination
-            existing_metric = self.db_session.query(ToolUsageMetrics).filter(
-                and_(
-                    ToolUsageMetrics.tool_name == tool_name,
-                    ToolUsageMetrics.query_hash == query_hash
-                )
-            ).first()
-            
-            if existing_metric:
-                # Update existing metrics
-                self._update_existing_metrics(
-                    existing_metric, success, response_quality, response_time
-                )
-            else:
-                # Create new metrics entry
-                self._create_new_metrics(
-                    tool_name, query_type, query_hash, success, 
-                    response_quality, response_time
-                )
+            self._pending.append((
+                tool_name, query_hash, query_type, success, response_quality,
+                response_time, datetime.now(timezone.utc)
+            ))
+            self.logger.debug(f"Recorded usage for tool {tool_name}: success={success}, quality={response_quality}")
             
-            self.db_session.commit()
-            
-            # Clear cache to ensure fresh data
-            self._clear_performance_cache(tool_name)
-            
-            self.logger.info(f"Recorded usage for tool {tool_name}: success={success}, quality={response_quality}")
+            if self._flush_timer is None:
+                self._start_flush_timer()
+            if self._flush_due():
+                return self.flush()
             return True
             
         except Exception as e:
             self.logger.error(f"Error recording tool usage: {e}")
-            self.db_session.rollback()
             return False
     
+    def flush(self) -> bool:
+        """
+        Write accumulated usage to the database.
+        
+        Returns:
+            bool: True if the deltas were committed (or there was nothing to do)
+        """
+        if not self._flush_lock.acquire(blocking=False):
+            return True  # another thread is already flushing
+        try:
+            self._last_flush = time.monotonic()
+            with self._fold_lock:
+                self._fold_pending()
+                self._inflight, self._deltas = self._deltas, {}
+            if not self._inflight:
+                return True
+            
+            deltas = list(self._inflight.values())
+            session = None
+            try:
+                session = self.session_factory()
+                self._write_deltas(deltas, session)
+                session.commit()
+            except Exception as e:
+                self.logger.error(f"Error flushing tool usage: {e}")
+                if session is not None:
+                    session.rollback()
+                with self._fold_lock:
+                    for key, delta in self._inflight.items():
+                        if key in self._deltas:
+                            delta.merge(self._deltas[key])
+                        self._deltas[key] = delta
+                    self._inflight = {}
+                return False
+            finally:
+                if session is not None:
+                    session.close()
+            
+            # The cached rows are now missing exactly these deltas
+            self._apply_deltas_to_cache(deltas)
+            with self._fold_lock:
+                self._inflight = {}
+            self.logger.info(f"Flushed usage for {len(deltas)} tool/query keys")
+            return True
+        finally:
+            self._flush_lock.release()
+    
+    def close(self):
+        """Stop the flush timer, flush pending usage and close the session this instance opened"""
+        self._stop_timer.set()
+        timer = self._flush_timer
+        if timer is not None and timer is not threading.current_thread():
+            timer.join(timeout=5)
+        self.flush()
+        if self._owns_session:
+            self.db_session.close()
+        _live_instances.discard(self)
+    
+    @staticmethod
+    def _default_session_factory(db_session: Optional[Session]) -> Callable[[], Session]:
+        """Sessions on the caller's database, or the background pool without one"""
+        if db_session is not None:
+            try:
+                return sessionmaker(bind=db_session.get_bind(), **SESSION_OPTIONS)
+            except Exception:
+                pass
+        return BackgroundSessionLocal
+    
+    def _start_flush_timer(self):
+        if self.flush_interval <= 0 or self._stop_timer.is_set():
+            return
+        # The thread only holds a weak reference so an unused instance can still be collected
+        self._flush_timer = threading.Thread(
+            target=_flush_periodically,
+            args=(weakref.ref(self), self._stop_timer, self.flush_interval),
+            name="tool-usage-flush",
+            daemon=True
+        )
+        self._flush_timer.start()
+    
+    def get_latency_percentiles(
+        self,
+        tool_name: str,
+        quantiles: Iterable[float] = (0.5, 0.95, 0.99)
+    ) -> Dict[str, float]:
+        """Latency percentiles for a tool, from samples recorded by this process"""
+        with self._fold_lock:
+            self._fold_pending()
+            sketch = self._latency.get(tool_name)
+            if sketch is None:
+                return {}
+            return {f"p{int(q * 100)}": sketch.quantile(q) for q in quantiles}
+    
     def get_tool_recommendations(
         self,
         query: str,
@@ -219,10 +430,13 @@ class ToolUsageAnalytics:
             List of performance reports
         """
         try:
+            # Reports read the table directly, so write pending usage first
+            self.flush()
             cutoff_date = datetime.now(timezone.utc) - time_period
             
             # Build query
-            query = self.db_session.query(ToolUsageMetrics).filter(
+            # Flushes commit through their own sessions, so refresh loaded rows
+            query = self.db_session.query(ToolUsageMetrics).populate_existing().filter(
                 ToolUsageMetrics.last_used >= cutoff_date
             )
             
@@ -296,24 +510,25 @@ class ToolUsageAnalytics:
         try:
             cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
             
-            metrics = self.db_session.query(ToolUsageMetrics).filter(
+            metrics = self.db_session.query(ToolUsageMetrics).populate_existing().filter(
                 and_(
                     ToolUsageMetrics.tool_name == tool_name,
                     ToolUsageMetrics.last_used >= cutoff_date
                 )
             ).all()
             
-            if not metrics:
-                return 0.5  # Default neutral success rate
+            deltas = self._unflushed_deltas(tool_name)
             
             # Calculate weighted average success rate
             total_weight = sum(metric.usage_count for metric in metrics)
+            total_weight += sum(delta.count for delta in deltas)
             if total_weight == 0:
-                return 0.5
+                return 0.5  # Default neutral success rate
             
             weighted_success = sum(
                 metric.success_rate * metric.usage_count for metric in metrics
             )
+            weighted_success += sum(delta.success_sum for delta in deltas)
             
             return weighted_success / total_weight
             
@@ -324,9 +539,11 @@ class ToolUsageAnalytics:
     def get_usage_statistics(self, days: int = 30) -> Dict[str, Any]:
         """Get comprehensive usage statistics"""
         try:
+            # Reports read the table directly, so write pending usage first
+            self.flush()
             cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
             
-            metrics = self.db_session.query(ToolUsageMetrics).filter(
+            metrics = self.db_session.query(ToolUsageMetrics).populate_existing().filter(
                 ToolUsageMetrics.last_used >= cutoff_date
             ).all()
             
@@ -438,77 +655,189 @@ class ToolUsageAnalytics:
         
         return min(base_confidence + keyword_boost, 1.0)
     
-    def _update_existing_metrics(
-        self,
-        metric: ToolUsageMetrics,
-        success: bool,
-        response_quality: float,
-        response_time: Optional[float]
-    ):
-        """Update existing metrics with new data"""
-        # Update usage count
-        metric.usage_count += 1
-        
-        # Update success rate (weighted average)
-        old_success_rate = metric.success_rate
-        new_success_rate = 1.0 if success else 0.0
-        metric.success_rate = (
-            (old_success_rate * (metric.usage_count - 1) + new_success_rate) / 
-            metric.usage_count
+    def _flush_due(self) -> bool:
+        """Whether the flush interval has elapsed or too many samples are waiting"""
+        return (
+            time.monotonic() - self._last_flush >= self.flush_interval or
+            len(self._pending) >= self.max_pending
+        )
+    
+    def _fold_pending(self):
+        """Fold raw samples into per-key deltas; caller holds _fold_lock"""
+        while True:
+            try:
+                tool_name, query_hash, query_type, success, quality, response_time, used_at = \
+                    self._pending.popleft()
+            except IndexError:
+                break
+            key = (tool_name, query_hash)
+            delta = self._deltas.get(key)
+            if delta is None:
+                delta = self._deltas[key] = ToolUsageDelta(tool_name, query_hash, query_type)
+            delta.add(success, quality, response_time, used_at)
+            if response_time is not None:
+                sketch = self._latency.get(tool_name)
+                if sketch is None:
+                    sketch = self._latency[tool_name] = LatencySketch()
+                sketch.add(response_time)
+    
+    def _dialect_name(self, session: Session) -> Optional[str]:
+        try:
+            return session.get_bind().dialect.name
+        except Exception:
+            return None
+    
+    def _write_deltas(self, deltas: List[ToolUsageDelta], session: Session):
+        """Apply deltas with a single UPSERT where supported, otherwise row by row"""
+        dialect = self._dialect_name(session)
+        if self._upsert_supported and dialect in ('postgresql', 'sqlite'):
+            try:
+                self._upsert_deltas(deltas, dialect, session)
+                return
+            except Exception as e:
+                # Tables created before uq_tool_metrics_name_hash existed have
+                # no conflict target; anything else is a real failure
+                if 'on conflict' not in str(e).lower():
+                    raise
+                self.logger.warning(
+                    "tool_usage_metrics has no unique (tool_name, query_hash) constraint; "
+                    "falling back to row-by-row updates"
+                )
+                session.rollback()
+                self._upsert_supported = False
+        self._merge_deltas_row_by_row(deltas, session, lock_rows=(dialect == 'postgresql'))
+    
+    def _upsert_deltas(self, deltas: List[ToolUsageDelta], dialect: str, session: Session):
+        """INSERT ... ON CONFLICT DO UPDATE, folding each delta into the stored averages"""
+        table = ToolUsageMetrics.__table__
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(table)
+        excluded = stmt.excluded
+        total = table.c.usage_count + excluded.usage_count
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.tool_name, table.c.query_hash],
+            set_={
+                'usage_count': total,
+                'success_rate': (
+                    table.c.success_rate * table.c.usage_count +
+                    excluded.success_rate * excluded.usage_count
+                ) / total,
+                'response_quality_score': (
+                    table.c.response_quality_score * table.c.usage_count +
+                    excluded.response_quality_score * excluded.usage_count
+                ) / total,
+                # Samples without a response time keep the stored average
+                'average_response_time': (
+                    table.c.average_response_time * (total - bindparam('delta_timed_count')) +
+                    bindparam('delta_time_sum')
+                ) / total,
+                'last_used': excluded.last_used,
+            }
         )
+        session.execute(stmt, [delta.to_row() for delta in deltas])
+    
+    def _merge_deltas_row_by_row(self, deltas: List[ToolUsageDelta], session: Session, lock_rows: bool = False):
+        """Read-modify-write fallback for databases without a conflict target"""
+        for delta in deltas:
+            query = session.query(ToolUsageMetrics).filter(
+                and_(
+                    ToolUsageMetrics.tool_name == delta.tool_name,
+                    ToolUsageMetrics.query_hash == delta.query_hash
+                )
+            )
+            if lock_rows:
+                query = query.with_for_update()
+            metric = query.first()
+            
+            if metric:
+                self._apply_delta_to_metric(metric, delta)
+            else:
+                row = delta.to_row()
+                row.pop('delta_timed_count')
+                row.pop('delta_time_sum')
+                session.add(ToolUsageMetrics(**row))
+    
+    def _apply_delta_to_metric(self, metric: ToolUsageMetrics, delta: ToolUsageDelta):
+        """Fold a delta into an existing metrics row"""
+        old_count = metric.usage_count or 0
+        total = old_count + delta.count
         
-        # Update quality score (weighted average)
-        old_quality = metric.response_quality_score
+        metric.success_rate = (metric.success_rate * old_count + delta.success_sum) / total
         metric.response_quality_score = (
-            (old_quality * (metric.usage_count - 1) + response_quality) / 
-            metric.usage_count
+            (metric.response_quality_score * old_count + delta.quality_sum) / total
+        )
+        metric.average_response_time = (
+            (metric.average_response_time * (total - delta.timed_count) + delta.time_sum) / total
         )
+        metric.usage_count = total
+        metric.last_used = delta.last_used or datetime.now(timezone.utc)
+    
+    def _unflushed_deltas(self, tool_name: str, query_type: Optional[str] = None) -> List[ToolUsageDelta]:
+        """Deltas for a tool that are not in the database yet"""
+        with self._fold_lock:
+            self._fold_pending()
+            return [
+                delta for source in (self._deltas, self._inflight)
+                for delta in source.values()
+                if delta.tool_name == tool_name and
+                (query_type is None or delta.query_type == query_type)
+            ]
+    
+    @staticmethod
+    def _combine_performance(
+        base: Optional[Dict[str, float]],
+        deltas: List[ToolUsageDelta]
+    ) -> Optional[Dict[str, float]]:
+        """Performance figures for a stored aggregate plus unflushed deltas"""
+        base_count = base['usage_count'] if base else 0
+        delta_count = sum(delta.count for delta in deltas)
+        total = base_count + delta_count
+        if total == 0:
+            return base
         
-        # Update response time if provided
-        if response_time is not None:
-            old_time = metric.average_response_time
-            metric.average_response_time = (
-                (old_time * (metric.usage_count - 1) + response_time) / 
-                metric.usage_count
-            )
+        timed = sum(delta.timed_count for delta in deltas)
+        base_success = base['success_rate'] if base else 0.0
+        base_quality = base['quality_score'] if base else 0.0
+        base_time = base['response_time'] if base else 0.0
         
-        metric.last_used = datetime.now(timezone.utc)
+        return {
+            'success_rate': (base_success * base_count + sum(d.success_sum for d in deltas)) / total,
+            'quality_score': (base_quality * base_count + sum(d.quality_sum for d in deltas)) / total,
+            'response_time': (
+                (base_time * (total - timed) + sum(d.time_sum for d in deltas)) / total
+                if base else
+                (sum(d.time_sum for d in deltas) / timed if timed else 0.0)
+            ),
+            'usage_count': total
+        }
     
-    def _create_new_metrics(
-        self,
-        tool_name: str,
-        query_type: str,
-        query_hash: str,
-        success: bool,
-        response_quality: float,
-        response_time: Optional[float]
-    ):
-        """Create new metrics entry"""
-        new_metric = ToolUsageMetrics(
-            tool_name=tool_name,
-            query_type=query_type,
-            query_hash=query_hash,
-            success_rate=1.0 if success else 0.0,
-            average_response_time=response_time or 0.0,
-            response_quality_score=response_quality,
-            usage_count=1
-        )
-        
-        self.db_session.add(new_metric)
+    def _apply_deltas_to_cache(self, deltas: List[ToolUsageDelta]):
+        """Advance cached performance by flushed deltas instead of invalidating it"""
+        grouped = defaultdict(list)
+        for delta in deltas:
+            grouped[f"{delta.tool_name}_{delta.query_type}"].append(delta)
+        for cache_key, cache_deltas in grouped.items():
+            if cache_key in self._performance_cache:
+                self._performance_cache[cache_key] = self._combine_performance(
+                    self._performance_cache[cache_key], cache_deltas
+                )
     
     def _get_tool_performance(self, tool_name: str, query_type: str) -> Optional[Dict[str, float]]:
-        """Get cached or fresh performance data for a tool"""
+        """Get cached or fresh performance data for a tool, including unflushed usage"""
         cache_key = f"{tool_name}_{query_type}"
         
         # Check cache first
         if (cache_key in self._performance_cache and 
             cache_key in self._cache_expiry and
             datetime.now() < self._cache_expiry[cache_key]):
-            return self._performance_cache[cache_key]
+            return self._combine_performance(
+                self._performance_cache[cache_key],
+                self._unflushed_deltas(tool_name, query_type)
+            )
         
         # Fetch fresh data
         try:
-            metrics = self.db_session.query(ToolUsageMetrics).filter(
+            metrics = self.db_session.query(ToolUsageMetrics).populate_existing().filter(
                 and_(
                     ToolUsageMetrics.tool_name == tool_name,
                     ToolUsageMetrics.query_type == query_type
@@ -516,12 +845,12 @@ class ToolUsageAnalytics:
             ).all()
             
             if not metrics:
-                return None
+                return self._combine_performance(None, self._unflushed_deltas(tool_name, query_type))
             
             # Calculate aggregated performance
             total_usage = sum(m.usage_count for m in metrics)
             if total_usage == 0:
-                return None
+                return self._combine_performance(None, self._unflushed_deltas(tool_name, query_type))
                 
             weighted_success = sum(m.success_rate * m.usage_count for m in metrics) / total_usage
             weighted_quality = sum(m.response_quality_score * m.usage_count for m in metrics) / total_usage
@@ -534,11 +863,11 @@ class ToolUsageAnalytics:
                 'usage_count': total_usage
             }
             
-            # Cache the result
+            # Cache the stored aggregate; unflushed usage is merged on read
             self._performance_cache[cache_key] = performance
             self._cache_expiry[cache_key] = datetime.now() + timedelta(seconds=self._cache_ttl)
             
-            return performance
+            return self._combine_performance(performance, self._unflushed_deltas(tool_name, query_type))
             
         except Exception as e:
             self.logger.error(f"Error getting performance for {tool_name}: {e}")
@@ -742,4 +1071,31 @@ class ToolUsageAnalytics:
             try:
                 self.db_session.close()
             except Exception:
-                pass
\ No newline at end of file
+                pass
+
+
+# Instances whose usage still has to be flushed at shutdown
+_live_instances: "weakref.WeakSet[ToolUsageAnalytics]" = weakref.WeakSet()
+
+
+def _flush_periodically(ref: "weakref.ref[ToolUsageAnalytics]", stop: threading.Event, interval: float):
+    """Flush timer loop, ending with the instance or when it is closed"""
+    while not stop.wait(interval):
+        analytics = ref()
+        if analytics is None:
+            return
+        if analytics._pending or analytics._deltas:
+            analytics.flush()
+        del analytics
+
+
+def close_tool_usage_analytics() -> int:
+    """Flush and close every open ToolUsageAnalytics, returning how many were closed"""
+    closed = 0
+    for analytics in list(_live_instances):
+        try:
+            analytics.close()
+            closed += 1
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Error closing tool usage analytics: {e}")
+    return closed
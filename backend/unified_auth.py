@@ -21,6 +21,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_
 
 from .database import get_db
+from .request_tracing import traced, STAGE_AUTH
 from .unified_models import UnifiedUser, UnifiedUserSession, UserRole
 
 logger = logging.getLogger(__name__)
@@ -405,6 +406,7 @@ auth_service = UnifiedAuthService(
 )
 
 # Dependency functions for FastAPI
+@traced(STAGE_AUTH)
 async def get_current_user_session(
     session_token: str = Cookie(None),
     db: Session = Depends(get_db)
@@ -419,6 +421,7 @@ async def get_current_user_session(
     
     return user
 
+@traced(STAGE_AUTH)
 async def get_current_user_jwt(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -442,6 +445,7 @@ async def get_optional_bearer_token(
         return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
     return None
 
+@traced(STAGE_AUTH)
 async def get_current_user_flexible(
     session_token: str = Cookie(None),
     db: Session = Depends(get_db),
@@ -421,6 +421,25 @@ class UnifiedChatHistory(Base):
     user = relationship("UnifiedUser")
     ticket = relationship("UnifiedTicket")
 
+class SyncOutboxEvent(Base):
+    """Transactional outbox of synchronization events awaiting dispatch"""
+    __tablename__ = "sync_outbox_events"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String(100), nullable=False)
+    table_name = Column(String(100), nullable=False)
+    operation = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=True)
+    entity_key = Column(String(150), nullable=False, index=True)  # "<table>:<id>", used for per-entity ordering
+    payload = Column(JSON)
+    status = Column(String(20), nullable=False, default="pending", index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+    claimed_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    dispatched_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
 # Diagnostic Error Logging Model
 class DiagnosticErrorLog(Base):
     """Database model for storing diagnostic errors"""
@@ -7,20 +7,22 @@ including the AI Agent backend, admin dashboard, data synchronization, and monit
 Requirements: 6.1, 6.2, 6.3, 6.4
 """
 
+import time
 import logging
 import asyncio
 from contextlib import asynccontextmanager
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Tuple
 from datetime import datetime
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from .static_assets import StaticAssetApp, get_asset_index
 
 from .unified_config import get_config_manager, ConfigManager, UnifiedConfig
 from .database import init_db
 from .unified_error_handler import UnifiedErrorHandler, setup_error_middleware
 from .health_endpoints import health_router
+from .startup_profiler import startup_profiler, is_fast_start, TIMING_INIT, TIMING_WARMUP
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +37,61 @@ class UnifiedApplicationManager:
         self.app: Optional[FastAPI] = None
         self.startup_errors: List[str] = []
         self.initialized_services: List[str] = []
+        self.fast_start = is_fast_start()
+        self.step_timings: Dict[str, float] = {}
+        self._warmups: List[Tuple[str, Callable]] = []
+        self.warmup_task: Optional[asyncio.Task] = None
+    
+    # Steps that only start background work, run after startup in fast-start mode
+    DEFERRABLE_STEPS = ("AI Agent", "Data Synchronization", "Background Tasks")
+    
+    def register_warmup(self, name: str, func: Callable) -> None:
+        """Register a sync or async initializer deferred to the warm-up phase"""
+        self._warmups.append((name, func))
+    
+    async def _run_step(self, step_name: str, step_func: Callable, kind: str = TIMING_INIT) -> None:
+        """Run one initialization step, recording its duration"""
+        step_start = time.perf_counter()
+        error = None
+        try:
+            success = await step_func()
+            if not success and self.config and self.config.is_production():
+                logger.error(f"❌ Critical initialization failure in production: {step_name}")
+                raise RuntimeError(f"Critical initialization failure: {step_name}")
+        except Exception as e:
+            error = str(e)
+            logger.error(f"❌ Initialization step '{step_name}' failed: {e}")
+            if self.config and self.config.is_production() and kind == TIMING_INIT:
+                raise
+            else:
+                self.startup_errors.append(f"{step_name}: {str(e)}")
+        finally:
+            duration = time.perf_counter() - step_start
+            self.step_timings[step_name] = duration
+            startup_profiler.record(step_name, duration, kind, error)
+    
+    async def _run_warmup(self, deferred_steps: List[Tuple[str, Callable]]) -> None:
+        """Run registered warm-ups, then steps deferred by fast-start mode"""
+        warmup_start = time.perf_counter()
+        for name, func in self._warmups:
+            async def warmup(func=func):
+                if asyncio.iscoroutinefunction(func):
+                    await func()
+                else:
+                    await asyncio.to_thread(func)
+                return True
+            await self._run_step(name, warmup, TIMING_WARMUP)
+        
+        for step_name, step_func in deferred_steps:
+            await self._run_step(step_name, step_func, TIMING_WARMUP)
+        
+        if self._warmups or deferred_steps:
+            logger.info(f"🔥 Warm-up completed in {time.perf_counter() - warmup_start:.2f} seconds")
+    
+    async def wait_for_warmup(self) -> None:
+        """Wait until the background warm-up has finished"""
+        if self.warmup_task is not None:
+            await asyncio.shield(self.warmup_task)
     
     async def initialize_configuration(self) -> bool:
         """Initialize and validate configuration"""
@@ -360,6 +417,14 @@ class UnifiedApplicationManager:
                 except Exception as cleanup_error:
                     logger.warning(f"⚠️ Memory cleanup task failed to start: {cleanup_error}")
             
+            # Start rolling conversation summary task; summaries are extractive,
+            # so they do not depend on the AI agent being available
+            try:
+                asyncio.create_task(self._conversation_summary_task())
+                logger.info("✅ Conversation summary background task started")
+            except Exception as summary_error:
+                logger.warning(f"⚠️ Conversation summary task failed to start: {summary_error}")
+            
             self.initialized_services.append("background_tasks")
             return True
             
@@ -392,6 +457,27 @@ class UnifiedApplicationManager:
             # Wait for next cleanup interval
             await asyncio.sleep(self.config.ai_agent.memory_cleanup_interval_hours * 3600)
     
+    async def _conversation_summary_task(self):
+        """Background task folding older turns into rolling conversation summaries"""
+        from .memory_layer_manager import MemoryLayerManager
+        from .memory_config import load_config
+        
+        memory_config = load_config()
+        if not memory_config.enable_conversation_summaries:
+            return
+        
+        # One manager keeps the summarizer watermark between passes
+        memory_manager = MemoryLayerManager(config=memory_config)
+        while True:
+            try:
+                result = await asyncio.to_thread(memory_manager.summarize_conversations)
+                if result['turns_folded']:
+                    logger.info(f"Conversation summaries updated: {result}")
+            except Exception as e:
+                logger.error(f"Conversation summary task error: {e}")
+            
+            await asyncio.sleep(memory_config.performance.summary_interval_seconds)
+    
     def setup_middleware(self) -> None:
         """Setup FastAPI middleware"""
         try:
@@ -431,18 +517,21 @@ class UnifiedApplicationManager:
                 else:
                     raise
             
-            # Request validation and sanitization middleware
+            # Consolidated middleware pipeline: rate limiting, request validation,
+            # security headers and error handling in one pure ASGI layer
             try:
-                from .request_validation_middleware import setup_request_validation_middleware
-                setup_request_validation_middleware(self.app)
-                logger.info("✅ Request validation middleware added")
+                from .middleware_pipeline import setup_middleware_pipeline
+                if setup_middleware_pipeline(self.app, error_handler=self.error_handler):
+                    logger.info("✅ Middleware pipeline added")
+                else:
+                    logger.info("ℹ️ Middleware pipeline already configured")
             except RuntimeError as e:
                 if "Cannot add middleware after an application has started" in str(e):
-                    logger.info("ℹ️ Request validation middleware already configured")
+                    logger.info("ℹ️ Middleware pipeline already configured")
                 else:
                     raise
             except Exception as e:
-                logger.warning(f"⚠️ Request validation middleware setup failed: {e}")
+                logger.warning(f"⚠️ Middleware pipeline setup failed: {e}")
             
             # Comprehensive error handling middleware
             if hasattr(self, 'error_manager') and self.error_manager:
@@ -469,8 +558,8 @@ class UnifiedApplicationManager:
         try:
             logger.info("📁 Setting up static file serving...")
             
-            # Serve main frontend
-            self.app.mount("/static", StaticFiles(directory="frontend"), name="static")
+            # Serve main frontend from the in-memory, precompressed asset index
+            self.app.mount("/static", StaticAssetApp(get_asset_index("frontend", "/static")), name="static")
             
             # Serve admin dashboard frontend if enabled
             if self.config.admin_dashboard.enabled:
@@ -478,7 +567,8 @@ class UnifiedApplicationManager:
                     from pathlib import Path
                     admin_path = Path(self.config.admin_dashboard.frontend_path)
                     if admin_path.exists():
-                        self.app.mount("/admin-static", StaticFiles(directory=str(admin_path)), name="admin-static")
+                        admin_assets = get_asset_index(str(admin_path), "/admin-static")
+                        self.app.mount("/admin-static", StaticAssetApp(admin_assets), name="admin-static")
                         logger.info("✅ Admin dashboard static files mounted")
                     else:
                         logger.warning(f"⚠️ Admin dashboard frontend path not found: {admin_path}")
@@ -539,18 +629,12 @@ class UnifiedApplicationManager:
             ("Background Tasks", self.initialize_background_tasks),
         ]
         
+        deferred_steps = []
         for step_name, step_func in initialization_steps:
-            try:
-                success = await step_func()
-                if not success and self.config and self.config.is_production():
-                    logger.error(f"❌ Critical initialization failure in production: {step_name}")
-                    raise RuntimeError(f"Critical initialization failure: {step_name}")
-            except Exception as e:
-                logger.error(f"❌ Initialization step '{step_name}' failed: {e}")
-                if self.config and self.config.is_production():
-                    raise
-                else:
-                    self.startup_errors.append(f"{step_name}: {str(e)}")
+            if self.fast_start and step_name in self.DEFERRABLE_STEPS:
+                deferred_steps.append((step_name, step_func))
+                continue
+            await self._run_step(step_name, step_func)
         
         # Setup middleware and static files
         self.setup_middleware()
@@ -573,11 +657,22 @@ class UnifiedApplicationManager:
         if self.config:
             logger.info(f"   Server: {self.config.server.host}:{self.config.server.port}")
             logger.info(f"   Debug mode: {self.config.server.debug}")
+        
+        # Warm-ups run in the background in fast-start mode so the worker
+        # accepts requests immediately; otherwise startup waits for them
+        if self.fast_start:
+            logger.info(f"   Fast start: deferred {', '.join(name for name, _ in self._warmups + deferred_steps) or 'nothing'}")
+            self.warmup_task = asyncio.create_task(self._run_warmup(deferred_steps))
+        else:
+            await self._run_warmup(deferred_steps)
     
     async def shutdown_sequence(self) -> None:
         """Execute the shutdown sequence"""
         logger.info("🛑 Shutting down AI Agent Customer Support application...")
         
+        if self.warmup_task is not None and not self.warmup_task.done():
+            self.warmup_task.cancel()
+        
         # Shutdown data synchronization
         if "data_sync" in self.initialized_services:
             try:
@@ -587,6 +682,15 @@ class UnifiedApplicationManager:
             except Exception as e:
                 logger.error(f"❌ Error shutting down data sync: {e}")
         
+        # Write tool usage still buffered in memory
+        try:
+            from .tool_usage_analytics import close_tool_usage_analytics
+            closed = await asyncio.to_thread(close_tool_usage_analytics)
+            if closed:
+                logger.info(f"✅ Tool usage analytics flushed ({closed} instance(s))")
+        except Exception as e:
+            logger.error(f"❌ Error flushing tool usage analytics: {e}")
+        
         # Additional cleanup can be added here
         
         logger.info("✅ Application shutdown completed")
@@ -669,4 +773,9 @@ def create_unified_app() -> FastAPI:
         expose_headers=["Set-Cookie"],
     )
     
+    # Stage tracing: outermost middleware so Server-Timing covers the whole request
+    from .request_tracing import ServerTimingMiddleware, metrics_router
+    app.add_middleware(ServerTimingMiddleware)
+    app.include_router(metrics_router)
+    
     return app
\ No newline at end of file
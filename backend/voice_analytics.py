@@ -31,8 +31,9 @@ from sqlalchemy import func, desc, and_, or_
 
 from backend.models import VoiceAnalytics as VoiceAnalyticsDB, User
 from backend.voice_models import VoiceActionType, VoiceAnalytics
-from backend.database import SessionLocal
+from backend.database import AnalyticsSessionLocal as SessionLocal
 from backend.tool_usage_analytics import ToolUsageAnalytics
+from backend.privacy_utils import PrivacyUtils
 
 
 class VoiceFeatureType(str, Enum):
@@ -104,6 +105,9 @@ class VoiceAnalyticsManager:
         # Integration with existing tool analytics
         self.tool_analytics = ToolUsageAnalytics(self.db_session)
         
+        # Single-pass PII scrubbing for free-text metadata values
+        self.privacy_utils = PrivacyUtils()
+        
         # Cache for performance data
         self._performance_cache = {}
         self._cache_expiry = {}
@@ -657,6 +661,8 @@ class VoiceAnalyticsManager:
             if key.lower() not in identifying_keys:
                 if isinstance(value, dict):
                     anonymized[key] = self._anonymize_metadata(value)
+                elif isinstance(value, str):
+                    anonymized[key] = self.privacy_utils.anonymize_text(value)
                 else:
                     anonymized[key] = value
         
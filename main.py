@@ -1,31 +1,25 @@
+import os
+import sys
+
+# Fast start has to be known before the module-level imports below run
+if __name__ == "__main__" and "--fast-start" in sys.argv:
+    os.environ["FAST_START"] = "true"
+
 from dotenv import load_dotenv
 from pydantic import BaseModel as PydanticBaseModel
 from typing import Optional, Dict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-
-from langchain.agents import create_tool_calling_agent, AgentExecutor
-from langchain.tools import Tool
-from backend.tools import (
-    search_tool, wiki_tool, save_tool, bt_website_tool, 
-    bt_support_hours_tool_instance, bt_plans_tool,
-    intelligent_orchestrator_tool, context_memory, create_ticket_tool_instance
-)
-from backend.customer_db_tool import get_customer_orders
-import os
 import json
 import asyncio
+import threading
 from fastapi import FastAPI, HTTPException, Request, Response, status, Cookie, Form, BackgroundTasks, Depends
 from sqlalchemy.orm import Session
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 # Removed unused HTTPBasic imports
-from fastapi.staticfiles import StaticFiles
+from backend.static_assets import StaticAssetApp, StaticAssetIndex, get_asset_index
 import secrets
 # Removed unused pandas import
-from langchain_core.messages import HumanMessage, AIMessage
-from langchain.schema import Document
 from backend.database import SessionLocal, get_db
 # Import unified authentication components
 from backend.unified_auth import auth_service, get_current_user_flexible, AuthenticatedUser
@@ -35,7 +29,6 @@ from backend.unified_models import (
     UserRole
 )
 from backend.db_utils import search_knowledge_entries, get_knowledge_entries, save_chat_history, get_chat_history
-from backend.enhanced_rag_orchestrator import search_with_priority
 import logging
 from sqlalchemy import text
 from datetime import datetime, timedelta, timezone
@@ -53,27 +46,14 @@ from backend.intelligent_chat.tool_orchestrator import ToolOrchestrator
 from backend.intelligent_chat.context_retriever import ContextRetriever
 from backend.intelligent_chat.response_renderer import ResponseRenderer
 from backend.intelligent_chat.models import ChatResponse as IntelligentChatResponse, ContentType, UIState
+from backend.admission_control import get_admission_controller, AdmissionDecision, PRIORITY_HIGH, PRIORITY_NORMAL
 
-# Voice assistant imports
-from backend.voice_api import voice_router
-
-# Data synchronization imports
-from backend.data_sync_integration import startup_data_sync, shutdown_data_sync, include_sync_router
+# Startup profiling and fast-start mode
+from backend.startup_profiler import is_fast_start, startup_profiler, TIMING_INIT, TIMING_WARMUP
 
-# Admin dashboard integration imports
-from backend.admin_frontend_integration import setup_admin_frontend_integration
-from backend.admin_api_proxy import setup_admin_api_proxy
-from backend.admin_auth_proxy import setup_admin_auth_proxy
-
-# Comprehensive error handling imports
-from backend.comprehensive_error_integration import (
-    setup_comprehensive_error_handling, initialize_error_monitoring,
-    log_login_attempt, log_admin_access_attempt
-)
-from backend.error_monitoring_endpoints import error_monitoring_router
-
-# Tool imports (moved from middle of file)
-from backend.tools import set_shared_memory_manager
+# LangChain, the agent tools (web scraping, search) and the voice, admin,
+# data-sync and error-monitoring subsystems are imported where they are
+# used: in the AI component setup below or in the unified startup steps.
 
 load_dotenv()
 
@@ -88,23 +68,28 @@ logger = logging.getLogger(__name__)
 
 
 # Setup Gemini LLM
-llm = None
-try:
-    google_api_key = os.getenv("GOOGLE_API_KEY")
-    if not google_api_key:
-        logger.warning("GOOGLE_API_KEY not found. LLM functionality will be limited.")
-        # Continue without LLM for now
-    else:
+def create_llm():
+    """Create the Gemini LLM, or None when it is not configured"""
+    try:
+        google_api_key = os.getenv("GOOGLE_API_KEY")
+        if not google_api_key:
+            logger.warning("GOOGLE_API_KEY not found. LLM functionality will be limited.")
+            # Continue without LLM for now
+            return None
+        
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        
         llm = ChatGoogleGenerativeAI(
             model="gemini-2.0-flash",
             temperature=0.3,
             google_api_key=google_api_key
         )
         logger.info("Gemini LLM initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize Gemini LLM: {e}")
-    logger.warning("Continuing without LLM functionality")
-    llm = None
+        return llm
+    except Exception as e:
+        logger.error(f"Failed to initialize Gemini LLM: {e}")
+        logger.warning("Continuing without LLM functionality")
+        return None
 
 
 
@@ -114,6 +99,8 @@ except Exception as e:
 def rag_tool_func(query: str) -> str:
     """RAG tool using database knowledge base"""
     try:
+        from backend.enhanced_rag_orchestrator import search_with_priority
+        
         # Use the enhanced RAG orchestrator for unified database search
         results = search_with_priority(query, max_results=3)
         
@@ -248,29 +235,72 @@ def support_knowledge_tool_func(query: str) -> str:
         logger.error(f"Support knowledge tool error: {e}")
         return "Error accessing support knowledge base."
 
-# Create RAG tool
-rag_tool = Tool.from_function(
-    func=rag_tool_func,
-    name="ContextRetriever",
-    description="Use this tool to fetch relevant information from the database knowledge base using RAG."
-)
-
-# Create support knowledge tool
-support_knowledge_tool = Tool.from_function(
-    func=support_knowledge_tool_func,
-    name="SupportKnowledgeBase",
-    description="Use this tool to fetch customer support responses from the database knowledge base."
-)
+# Tools imported lazily from backend.tools on first access, see __getattr__
+_LAZY_ATTRIBUTES = {
+    "search_tool": "backend.tools",
+    "wiki_tool": "backend.tools",
+    "save_tool": "backend.tools",
+    "bt_website_tool": "backend.tools",
+    "bt_support_hours_tool_instance": "backend.tools",
+    "bt_plans_tool": "backend.tools",
+    "intelligent_orchestrator_tool": "backend.tools",
+    "context_memory": "backend.tools",
+    "create_ticket_tool_instance": "backend.tools",
+    "get_customer_orders": "backend.customer_db_tool",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    return getattr(importlib.import_module(module_name), name)
+
+
+def create_agent_tools() -> list:
+    """Create the database tools and collect the agent tool list"""
+    global rag_tool, support_knowledge_tool
+    from langchain.tools import Tool
+    from backend.tools import (
+        search_tool, wiki_tool, save_tool, bt_website_tool, 
+        bt_support_hours_tool_instance, bt_plans_tool,
+        intelligent_orchestrator_tool, create_ticket_tool_instance
+    )
+    
+    # Create RAG tool
+    rag_tool = Tool.from_function(
+        func=rag_tool_func,
+        name="ContextRetriever",
+        description="Use this tool to fetch relevant information from the database knowledge base using RAG."
+    )
+    
+    # Create support knowledge tool
+    support_knowledge_tool = Tool.from_function(
+        func=support_knowledge_tool_func,
+        name="SupportKnowledgeBase",
+        description="Use this tool to fetch customer support responses from the database knowledge base."
+    )
+    
+    # Enhanced tools list with intelligent orchestration and context memory
+    return [
+        rag_tool,  # Database knowledge base first
+        support_knowledge_tool,  # Support responses
+        create_ticket_tool_instance,  # Support ticket creation for customer issues
+        intelligent_orchestrator_tool,  # Intelligent tool orchestrator with context memory
+        bt_website_tool,  # BT.com specific information with scraping
+        bt_support_hours_tool_instance,  # BT support hours with real-time data
+        bt_plans_tool,  # BT plans and pricing with scraping
+        search_tool,  # General web search for additional context
+        wiki_tool,  # Wikipedia for background information
+        save_tool  # Save important information for future reference
+    ]
 
 # ---------------------- 🤖 Agent Setup -----------------------
 
 # Prompt template
 
-prompt = ChatPromptTemplate.from_messages(
-    [
-        (
-            "system",
-            """
+AGENT_SYSTEM_PROMPT = """
           You are a highly professional, friendly, and knowledgeable customer support agent for a telecom company. Your mission is to provide comprehensive, accurate, and helpful answers using multiple information sources and tools with intelligent context understanding.
 
           **ENHANCED TOOL USAGE STRATEGY:**
@@ -307,36 +337,32 @@ prompt = ChatPromptTemplate.from_messages(
           - Provide follow-up suggestions based on conversation history
           
           **IMPORTANT**: Provide your response in natural, conversational language that directly answers the customer's question. Do NOT use any special formatting, structure, or technical language. Just give a clear, helpful answer as if you're speaking directly to the customer.
-            """,
-        ),
-        ("placeholder", "{chat_history}"),
-        ("human", "{query}"),
-        ("placeholder", "{agent_scratchpad}"),
-    ]
-)
+            """
+
+
+def create_agent_prompt():
+    """Build the chat prompt template of the support agent"""
+    from langchain_core.prompts import ChatPromptTemplate
+    
+    return ChatPromptTemplate.from_messages(
+        [
+            ("system", AGENT_SYSTEM_PROMPT),
+            ("placeholder", "{chat_history}"),
+            ("human", "{query}"),
+            ("placeholder", "{agent_scratchpad}"),
+        ]
+    )
 
-# Enhanced tools list with intelligent orchestration and context memory
-tools = [
-    rag_tool,  # Database knowledge base first
-    support_knowledge_tool,  # Support responses
-    create_ticket_tool_instance,  # Support ticket creation for customer issues
-    intelligent_orchestrator_tool,  # Intelligent tool orchestrator with context memory
-    bt_website_tool,  # BT.com specific information with scraping
-    bt_support_hours_tool_instance,  # BT support hours with real-time data
-    bt_plans_tool,  # BT plans and pricing with scraping
-    search_tool,  # General web search for additional context
-    wiki_tool,  # Wikipedia for background information
-    save_tool  # Save important information for future reference
-]
-
-# Agent creation
-agent = None
-agent_executor = None
 
-try:
-    if llm is None:
-        logger.warning("LLM not available, agent creation skipped")
-    else:
+def create_agent_executor(llm, prompt, tools):
+    """Create the tool-calling agent and its executor, or (None, None)"""
+    try:
+        if llm is None:
+            logger.warning("LLM not available, agent creation skipped")
+            return None, None
+        
+        from langchain.agents import create_tool_calling_agent, AgentExecutor
+        
         agent = create_tool_calling_agent(
             llm=llm,
             prompt=prompt,
@@ -345,52 +371,110 @@ try:
 
         agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
         logger.info("Agent and executor created successfully")
-except Exception as e:
-    logger.error(f"Failed to create agent: {e}")
-    logger.warning("Continuing without agent functionality")
-    agent = None
-    agent_executor = None
+        return agent, agent_executor
+    except Exception as e:
+        logger.error(f"Failed to create agent: {e}")
+        logger.warning("Continuing without agent functionality")
+        return None, None
+
+
+def create_intelligent_chat_manager(tools, llm, agent_executor):
+    """Initialize intelligent chat UI components around the agent tools"""
+    global intelligent_tool_orchestrator, intelligent_context_retriever, intelligent_response_renderer
+    try:
+        # Convert tools list to dictionary for ToolOrchestrator
+        tools_dict = {tool.name: tool for tool in tools}
+        
+        # Initialize components with existing integrations
+        intelligent_tool_orchestrator = ToolOrchestrator(
+            available_tools=tools_dict,
+            max_concurrent_tools=3,
+            default_timeout=30.0
+        )
+        
+        intelligent_context_retriever = ContextRetriever(
+            memory_manager=memory_manager
+        )
+        
+        intelligent_response_renderer = ResponseRenderer()
+        
+        # Initialize ChatManager with all components including LLM and agent executor
+        chat_manager = ChatManager(
+            tool_orchestrator=intelligent_tool_orchestrator,
+            context_retriever=intelligent_context_retriever,
+            response_renderer=intelligent_response_renderer,
+            memory_manager=memory_manager,
+            llm=llm,
+            agent_executor=agent_executor
+        )
+        
+        logger.info("Intelligent chat UI components initialized successfully")
+        return chat_manager
+        
+    except Exception as e:
+        logger.error(f"Failed to initialize intelligent chat UI components: {e}")
+        return None
+
 
 # Initialize memory layer manager (singleton instance)
 memory_config = load_config()
 memory_manager = MemoryLayerManager(config=memory_config)
 
-# Set shared memory manager for tools
-set_shared_memory_manager(memory_manager)
+# AI components, built by init_ai_components()
+llm = None
+rag_tool = None
+support_knowledge_tool = None
+prompt = None
+tools = []
+agent = None
+agent_executor = None
+intelligent_tool_orchestrator = None
+intelligent_context_retriever = None
+intelligent_response_renderer = None
+intelligent_chat_manager = None
+
+_ai_components_lock = threading.Lock()
+_ai_components_ready = threading.Event()
 
-# Initialize intelligent chat UI components
-try:
-    # Convert tools list to dictionary for ToolOrchestrator
-    tools_dict = {tool.name: tool for tool in tools}
-    
-    # Initialize components with existing integrations
-    intelligent_tool_orchestrator = ToolOrchestrator(
-        available_tools=tools_dict,
-        max_concurrent_tools=3,
-        default_timeout=30.0
-    )
-    
-    intelligent_context_retriever = ContextRetriever(
-        memory_manager=memory_manager
-    )
-    
-    intelligent_response_renderer = ResponseRenderer()
-    
-    # Initialize ChatManager with all components including LLM and agent executor
-    intelligent_chat_manager = ChatManager(
-        tool_orchestrator=intelligent_tool_orchestrator,
-        context_retriever=intelligent_context_retriever,
-        response_renderer=intelligent_response_renderer,
-        memory_manager=memory_manager,
-        llm=llm,
-        agent_executor=agent_executor
-    )
-    
-    logger.info("Intelligent chat UI components initialized successfully")
-    
-except Exception as e:
-    logger.error(f"Failed to initialize intelligent chat UI components: {e}")
-    intelligent_chat_manager = None
+
+def init_ai_components() -> None:
+    """Build the LLM, agent tools, agent executor and intelligent chat manager
+
+    Runs at import time by default. In fast-start mode it runs in the
+    background warm-up, or earlier on the first request that needs it.
+    """
+    global llm, tools, prompt, agent, agent_executor, intelligent_chat_manager
+    if _ai_components_ready.is_set():
+        return
+    with _ai_components_lock:
+        if _ai_components_ready.is_set():
+            return
+        kind = TIMING_WARMUP if is_fast_start() else TIMING_INIT
+        
+        with startup_profiler.measure("LLM", kind):
+            llm = create_llm()
+        with startup_profiler.measure("Agent tools", kind):
+            tools = create_agent_tools()
+            from backend.tools import set_shared_memory_manager
+            # Set shared memory manager for tools
+            set_shared_memory_manager(memory_manager)
+        with startup_profiler.measure("Agent executor", kind):
+            prompt = create_agent_prompt()
+            agent, agent_executor = create_agent_executor(llm, prompt, tools)
+        with startup_profiler.measure("Intelligent chat", kind):
+            intelligent_chat_manager = create_intelligent_chat_manager(tools, llm, agent_executor)
+        
+        _ai_components_ready.set()
+
+
+async def ensure_ai_components() -> None:
+    """Wait for the AI components when they have not been built yet"""
+    if not _ai_components_ready.is_set():
+        await asyncio.to_thread(init_ai_components)
+
+
+if not is_fast_start():
+    init_ai_components()
 
 # Import unified startup system
 from backend.unified_startup import create_unified_app, get_app_manager
@@ -399,6 +483,14 @@ from backend.unified_config import get_config_manager
 # Create unified FastAPI application
 app = create_unified_app()
 
+if is_fast_start():
+    get_app_manager().register_warmup("AI Components", init_ai_components)
+
+# Ticket similarity indexes are built before searches need them, not in the
+# first search request
+from backend.ticket_similarity import warm_ticket_indexes
+get_app_manager().register_warmup("Ticket similarity index", warm_ticket_indexes)
+
 # Include authentication routes
 from backend.auth_routes import auth_router, admin_auth_router
 from backend.admin_routes import admin_router, ticket_router
@@ -505,17 +597,26 @@ async def admin_dashboard_login_compatibility(
 config_manager = get_config_manager()
 config = config_manager.config
 
+# Static files are fingerprinted, precompressed and held in memory once per worker
+frontend_assets = get_asset_index("frontend", "/static")
+admin_assets = get_asset_index("admin-dashboard/frontend", "/admin")
+
+def serve_asset(index: StaticAssetIndex, path: str, request: Request) -> Response:
+    """Serve an indexed page or asset from memory, answering revalidations with 304"""
+    response = index.response(path, request.headers)
+    if response is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return response
+
 # Serve admin dashboard HTML files at /admin/ before mounting static files
 @app.get("/admin/")
-async def admin_dashboard_root():
+async def admin_dashboard_root(request: Request):
     """Serve the main admin dashboard index.html"""
-    return FileResponse("admin-dashboard/frontend/index.html")
+    return serve_asset(admin_assets, "index.html", request)
 
 @app.get("/admin/{filename}")
-async def admin_dashboard_files(filename: str):
+async def admin_dashboard_files(filename: str, request: Request):
     """Serve specific admin dashboard HTML files"""
-    import os
-    from fastapi import HTTPException
     
     # List of allowed admin dashboard HTML files
     allowed_files = [
@@ -532,20 +633,11 @@ async def admin_dashboard_files(filename: str):
     if filename not in allowed_files:
         raise HTTPException(status_code=404, detail="File not found")
     
-    # Construct the file path
-    file_path = f"admin-dashboard/frontend/{filename}"
-    
-    # Check if file exists
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    return FileResponse(file_path)
+    return serve_asset(admin_assets, filename, request)
 
 @app.get("/admin/admin/{filename}")
-async def admin_subdirectory_files(filename: str):
+async def admin_subdirectory_files(filename: str, request: Request):
     """Serve admin dashboard HTML files from the admin subdirectory"""
-    import os
-    from fastapi import HTTPException
     
     # List of allowed admin subdirectory HTML files
     allowed_files = [
@@ -556,25 +648,18 @@ async def admin_subdirectory_files(filename: str):
     if filename not in allowed_files:
         raise HTTPException(status_code=404, detail="File not found")
     
-    # Construct the file path
-    file_path = f"admin-dashboard/frontend/admin/{filename}"
-    
-    # Check if file exists
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    return FileResponse(file_path)
+    return serve_asset(admin_assets, f"admin/{filename}", request)
 
 # Mount static files - order is important for proper route resolution
 # Root-level mounts for admin dashboard static files (for compatibility with relative paths)
-app.mount("/css", StaticFiles(directory="admin-dashboard/frontend/css"), name="admin_css")
-app.mount("/js", StaticFiles(directory="admin-dashboard/frontend/js"), name="admin_js")
+app.mount("/css", StaticAssetApp(admin_assets, "css"), name="admin_css")
+app.mount("/js", StaticAssetApp(admin_assets, "js"), name="admin_js")
 
 # Main application static files
-app.mount("/static", StaticFiles(directory="frontend"), name="static")
+app.mount("/static", StaticAssetApp(frontend_assets), name="static")
 
 # Admin dashboard files (maintains existing functionality)
-app.mount("/admin", StaticFiles(directory="admin-dashboard/frontend"), name="admin")
+app.mount("/admin", StaticAssetApp(admin_assets), name="admin")
 
 # Middleware and routers are now handled by the unified startup system
 # This ensures proper initialization order and configuration management
@@ -625,6 +710,7 @@ async def get_learning_insights(
     """Get learning insights for the current user"""
     try:
         user_id = current_user.user_id
+        await ensure_ai_components()
 
         # Get learning insights from intelligent chat manager
         if intelligent_chat_manager:
@@ -703,48 +789,48 @@ async def get_conversation_patterns(
 # Static file serving is now handled by the unified startup system
 
 @app.get("/")
-async def root():
-    return FileResponse("frontend/login.html")
+async def root(request: Request):
+    return serve_asset(frontend_assets, "login.html", request)
 
 @app.get("/login.html")
-async def login_page():
-    return FileResponse("frontend/login.html")
+async def login_page(request: Request):
+    return serve_asset(frontend_assets, "login.html", request)
 
 @app.get("/chat.html")
-async def chat_page():
-    return FileResponse("frontend/chat.html")
+async def chat_page(request: Request):
+    return serve_asset(frontend_assets, "chat.html", request)
 
 @app.get("/register.html")
-async def register_page():
-    return FileResponse("frontend/register.html")
+async def register_page(request: Request):
+    return serve_asset(frontend_assets, "register.html", request)
 
 @app.get("/test-voice-button.html")
-async def test_voice_button_page():
-    return FileResponse("frontend/test-voice-button.html")
+async def test_voice_button_page(request: Request):
+    return serve_asset(frontend_assets, "test-voice-button.html", request)
 
 @app.get("/voice-integration-debug.html")
-async def voice_integration_debug_page():
-    return FileResponse("frontend/voice-integration-debug.html")
+async def voice_integration_debug_page(request: Request):
+    return serve_asset(frontend_assets, "voice-integration-debug.html", request)
 
 @app.get("/simple-voice-test.html")
-async def simple_voice_test_page():
-    return FileResponse("frontend/simple-voice-test.html")
+async def simple_voice_test_page(request: Request):
+    return serve_asset(frontend_assets, "simple-voice-test.html", request)
 
 @app.get("/voice-page-integration.js")
-async def voice_page_integration_js():
-    return FileResponse("frontend/voice-page-integration.js")
+async def voice_page_integration_js(request: Request):
+    return serve_asset(frontend_assets, "voice-page-integration.js", request)
 
 @app.get("/voice-assistant-test.html")
-async def voice_assistant_test_page():
-    return FileResponse("frontend/voice-assistant-test.html")
+async def voice_assistant_test_page(request: Request):
+    return serve_asset(frontend_assets, "voice-assistant-test.html", request)
 
 @app.get("/analytics-dashboard.html")
-async def analytics_dashboard_page():
-    return FileResponse("frontend/analytics-dashboard.html")
+async def analytics_dashboard_page(request: Request):
+    return serve_asset(frontend_assets, "analytics-dashboard.html", request)
 
 @app.get("/admin-diagnostic-tools.html")
-async def admin_diagnostic_tools_page():
-    return FileResponse("frontend/admin-diagnostic-tools.html")
+async def admin_diagnostic_tools_page(request: Request):
+    return serve_asset(frontend_assets, "admin-diagnostic-tools.html", request)
 
 # Redirect common admin dashboard URLs to the correct paths for backward compatibility
 @app.get("/tickets.html")
@@ -961,11 +1047,41 @@ async def chat_endpoint(
     chat_request: ChatRequest, 
     current_user: AuthenticatedUser = Depends(get_current_user_flexible)
 ):
+    # Bound in-flight chat turns; excess load is shed before it slows everyone down
+    admission_controller = get_admission_controller()
+    priority = PRIORITY_HIGH if current_user.is_admin else PRIORITY_NORMAL
+    async with admission_controller.admit(priority) as decision:
+        if decision == AdmissionDecision.ADMITTED:
+            return await _process_chat_request(chat_request, current_user)
+        
+        if decision == AdmissionDecision.DEGRADED and intelligent_chat_manager:
+            shed_response = await intelligent_chat_manager.process_shed_message(
+                chat_request.query, current_user.user_id, current_user.session_id
+            )
+            return ChatResponse(
+                topic=chat_request.query,
+                summary=shed_response.content,
+                confidence_score=shed_response.confidence_score,
+                execution_time=shed_response.execution_time,
+                content_type=shed_response.content_type.value
+            )
+        
+        retry_after = admission_controller.retry_after()
+        logger.warning(f"Chat request rejected by admission control, retry after {retry_after}s")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "The assistant is busy right now. Please try again shortly."},
+            headers={"Retry-After": str(retry_after)}
+        )
+
+async def _process_chat_request(chat_request: ChatRequest, current_user: AuthenticatedUser):
     start_time = time.time()
     user_id = current_user.user_id  # Use user_id (string) instead of id (int)
     session_token = current_user.session_id
     
     try:
+        # In fast-start mode the first chat request may arrive before warm-up
+        await ensure_ai_components()
 
         # Try intelligent chat manager first, fallback to legacy agent executor
         if intelligent_chat_manager:
@@ -1033,21 +1149,31 @@ async def chat_endpoint(
         
         logger.info(f"Retrieved {len(context_entries)} context entries for user {user_id}")
         
+        def message_type(context):
+            return (context.metadata or {}).get("message_type", context.context_type)
+        
+        # Rolling summaries cover the turns older than the raw ones below
+        summaries = [context for context in context_entries if context.context_type == "summary"]
+        context_entries = [context for context in context_entries if context.context_type != "summary"]
+        
         # Sort context entries by timestamp to maintain conversation order
-        sorted_contexts = sorted(context_entries, key=lambda x: x.timestamp if x.timestamp else datetime.min)
+        sorted_contexts = sorted(
+            context_entries,
+            key=lambda x: (x.timestamp if x.timestamp else datetime.min, message_type(x) != "user_message")
+        )
         
         # Group consecutive user/bot messages to maintain conversation flow
         conversation_pairs = []
         current_pair = {"user": None, "bot": None}
         
         for context in sorted_contexts:
-            if context.context_type == "user_message":
+            if message_type(context) == "user_message":
                 # If we have a complete pair, save it and start new one
                 if current_pair["user"] is not None:
                     conversation_pairs.append(current_pair)
                     current_pair = {"user": None, "bot": None}
                 current_pair["user"] = context
-            elif context.context_type == "bot_response":
+            elif message_type(context) == "bot_response":
                 current_pair["bot"] = context
                 # Complete pair - add to list
                 conversation_pairs.append(current_pair)
@@ -1057,6 +1183,13 @@ async def chat_endpoint(
         if current_pair["user"] is not None:
             conversation_pairs.append(current_pair)
         
+        from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+        
+        if summaries:
+            summary_text = "\n".join(summary.content for summary in summaries)
+            chat_history.append(SystemMessage(content=f"Summary of earlier conversation:\n{summary_text}"))
+            context_used.extend(summary.source for summary in summaries)
+        
         # Build chat history from conversation pairs (most recent first for context)
         for pair in conversation_pairs[-5:]:  # Last 5 conversation exchanges
             if pair["user"]:
@@ -1777,6 +1910,7 @@ async def get_chat_status(
             "intelligent_chat_enabled": intelligent_chat_manager is not None,
             "legacy_agent_enabled": agent_executor is not None,
             "memory_layer_enabled": memory_manager is not None,
+            "ai_components_ready": _ai_components_ready.is_set(),
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
         
@@ -1831,6 +1965,7 @@ async def get_conversation_context(
     """Get conversation context for the current user."""
     try:
         user_id = current_user.user_id
+        await ensure_ai_components()
         
         # Get context using intelligent chat manager if available
         context_entries = []
@@ -1894,6 +2029,7 @@ async def get_available_tools(
 ):
     """Get information about available tools and their current status."""
     try:
+        await ensure_ai_components()
         
         # Get available tools information
         available_tools = []
@@ -1992,6 +2128,7 @@ async def get_ui_state(
         if session_id != current_user.session_id:
             # Could add additional authorization logic here
             pass
+        await ensure_ai_components()
         
         # Get UI state from intelligent chat manager if available
         ui_state_data = {
@@ -2067,7 +2204,21 @@ async def get_ui_state(
         raise HTTPException(status_code=500, detail=f"Failed to get UI state: {e}")
 
 if __name__ == "__main__":
+    import argparse
     import uvicorn
+    
+    parser = argparse.ArgumentParser(description="AI Agent Customer Support server")
+    parser.add_argument("--fast-start", action="store_true",
+                        help="Defer the LLM, agent tools and data sync to a background warm-up")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report per-module import time and startup step durations, then exit")
+    args = parser.parse_args()
+    
+    if args.profile_startup:
+        from backend.startup_profiler import run_startup_profile
+        print(run_startup_profile(app, get_app_manager(), target="main"))
+        sys.exit(0)
+    
     try:
         logger.info("Starting FastAPI application...")
         uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
@@ -12,20 +12,26 @@ This script migrates data from SQLite to PostgreSQL database with:
 Requirements: 2.1, 2.2, 2.3, 2.4
 """
 
+import io
 import os
 import sys
 import json
 import logging
 import hashlib
 import shutil
-from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, time, timezone
+from decimal import Decimal
+from typing import Dict, List, Any, Optional, Tuple, Iterator
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
 import psycopg2
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from sqlalchemy import create_engine, text, inspect, MetaData, Table, Column
+from sqlalchemy import (
+    create_engine, text, inspect, MetaData, Table, Column,
+    String, BigInteger, Boolean, DateTime
+)
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from dotenv import load_dotenv
@@ -54,6 +60,12 @@ class MigrationConfig:
     validate_data: bool = True
     create_rollback: bool = True
     preserve_ids: bool = True
+    # Streaming mode: chunked source reads, COPY loads, parallel tables and
+    # resumable per-table checkpoints
+    streaming: bool = False
+    use_copy: bool = True
+    parallel_tables: int = 4
+    resume: bool = True
     
 @dataclass
 class TableMigrationResult:
@@ -79,6 +91,64 @@ class MigrationReport:
     table_results: List[TableMigrationResult]
     rollback_available: bool
 
+# Progress of streaming table copies, stored in the target database and
+# updated in the same transaction as each loaded batch
+CHECKPOINT_TABLE_NAME = "migration_checkpoints"
+
+checkpoint_metadata = MetaData()
+checkpoint_table = Table(
+    CHECKPOINT_TABLE_NAME, checkpoint_metadata,
+    Column("table_name", String(255), primary_key=True),
+    Column("last_rowid", BigInteger, nullable=False, default=0),
+    Column("rows_copied", BigInteger, nullable=False, default=0),
+    Column("completed", Boolean, nullable=False, default=False),
+    Column("updated_at", DateTime(timezone=True)),
+)
+
+# Escapes for PostgreSQL COPY text format; NUL is not valid in text columns
+_COPY_ESCAPES = str.maketrans({
+    "\\": "\\\\",
+    "\t": "\\t",
+    "\n": "\\n",
+    "\r": "\\r",
+    "\x00": "",
+})
+
+def encode_copy_value(value: Any, is_json: bool = False) -> str:
+    """
+    Encode a Python value as a field of PostgreSQL COPY text format
+    
+    Values of JSON/JSONB columns are always serialized, so strings, numbers
+    and None stay valid JSON documents (None is stored as JSON null, as the
+    row-by-row insert path does).
+    """
+    if is_json:
+        return json.dumps(value).translate(_COPY_ESCAPES)
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # bytea hex input; the backslash itself is escaped for COPY
+        return "\\\\x" + bytes(value).hex()
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return str(value).translate(_COPY_ESCAPES)
+
+def encode_copy_rows(rows: List[Dict], columns: List[str],
+                     json_columns: frozenset = frozenset()) -> bytes:
+    """Encode processed rows as a UTF-8 COPY text payload"""
+    lines = [
+        "\t".join(encode_copy_value(row.get(column), column in json_columns) for column in columns)
+        for row in rows
+    ]
+    lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
 class DatabaseMigrator:
     """Comprehensive database migration handler"""
     
@@ -267,28 +337,7 @@ class DatabaseMigrator:
                 rows = result.fetchall()
                 
                 # Convert to list of dictionaries with proper type handling
-                data = []
-                for row in rows:
-                    row_dict = {}
-                    for i, value in enumerate(row):
-                        column_name = columns[i]
-                        
-                        # Handle special data types
-                        if value is not None:
-                            # Convert datetime strings to proper format
-                            if isinstance(value, str) and self._is_datetime_string(value):
-                                try:
-                                    # Parse and convert to ISO format
-                                    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                                    row_dict[column_name] = dt.isoformat()
-                                except:
-                                    row_dict[column_name] = value
-                            else:
-                                row_dict[column_name] = value
-                        else:
-                            row_dict[column_name] = None
-                            
-                    data.append(row_dict)
+                data = [self._convert_source_row(columns, row) for row in rows]
                 
                 logger.info(f"Exported {len(data)} records from {table_name}")
                 return data
@@ -297,6 +346,25 @@ class DatabaseMigrator:
             logger.error(f"Failed to export data from table {table_name}: {e}")
             return None
     
+    def _convert_source_row(self, columns: List[str], row) -> Dict[str, Any]:
+        """Convert a SQLite row to a dictionary with proper type handling"""
+        row_dict = {}
+        for i, value in enumerate(row):
+            column_name = columns[i]
+            
+            # Convert datetime strings to proper format
+            if isinstance(value, str) and self._is_datetime_string(value):
+                try:
+                    # Parse and convert to ISO format
+                    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                    row_dict[column_name] = dt.isoformat()
+                except:
+                    row_dict[column_name] = value
+            else:
+                row_dict[column_name] = value
+        
+        return row_dict
+    
     def _is_datetime_string(self, value: str) -> bool:
         """Check if string looks like a datetime"""
         datetime_patterns = [
@@ -514,6 +582,298 @@ class DatabaseMigrator:
         except Exception as e:
             logger.warning(f"Failed to update sequences for table {table_name}: {e}")
     
+    # Streaming migration
+    
+    def _source_table_exists(self, conn, table_name: str) -> bool:
+        result = conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=:table_name"
+        ), {"table_name": table_name})
+        return result.fetchone() is not None
+    
+    def iter_table_batches(self, table_name: str, after_rowid: int = 0) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Stream a SQLite table in batches of ``batch_size`` rows
+        
+        Rows are read in rowid order through a streaming cursor, so only one
+        batch is held in memory at a time. Each item is ``(last_rowid, rows)``;
+        the rowid is the resume position recorded in the checkpoint.
+        """
+        with self.sqlite_engine.connect() as conn:
+            if not self._source_table_exists(conn, table_name):
+                return
+            
+            result = conn.execution_options(stream_results=True).execute(
+                text(f"SELECT rowid AS _migration_rowid, * FROM {table_name} "
+                     f"WHERE rowid > :after_rowid ORDER BY rowid"),
+                {"after_rowid": after_rowid}
+            )
+            columns = list(result.keys())[1:]
+            
+            for partition in result.partitions(self.config.batch_size):
+                rows = [self._convert_source_row(columns, row[1:]) for row in partition]
+                yield partition[-1][0], rows
+    
+    def count_source_rows(self, table_name: str) -> int:
+        """Count rows in a SQLite table, returning 0 if it does not exist"""
+        with self.sqlite_engine.connect() as conn:
+            if not self._source_table_exists(conn, table_name):
+                return 0
+            return conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar() or 0
+    
+    def _ensure_checkpoint_table(self):
+        checkpoint_metadata.create_all(self.postgresql_engine, checkfirst=True)
+    
+    def get_checkpoint(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """Get the streaming checkpoint for a table, if any"""
+        with self.postgresql_engine.connect() as conn:
+            row = conn.execute(
+                checkpoint_table.select().where(checkpoint_table.c.table_name == table_name)
+            ).mappings().fetchone()
+            return dict(row) if row else None
+    
+    def _save_checkpoint(self, conn, table_name: str, last_rowid: int,
+                         rows_copied: int, completed: bool = False):
+        values = {
+            "last_rowid": last_rowid,
+            "rows_copied": rows_copied,
+            "completed": completed,
+            "updated_at": datetime.now(timezone.utc),
+        }
+        result = conn.execute(
+            checkpoint_table.update()
+            .where(checkpoint_table.c.table_name == table_name)
+            .values(**values)
+        )
+        if result.rowcount == 0:
+            conn.execute(checkpoint_table.insert().values(table_name=table_name, **values))
+    
+    def _copy_batch(self, conn, table: Table, rows: List[Dict]):
+        """Load processed rows with COPY FROM STDIN in the connection's transaction"""
+        columns = [column.name for column in table.columns]
+        json_columns = frozenset(
+            column.name for column in table.columns if 'JSON' in str(column.type).upper()
+        )
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        payload = io.BytesIO(encode_copy_rows(rows, columns, json_columns))
+        
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f'COPY "{table.name}" ({column_list}) FROM STDIN WITH (FORMAT text, ENCODING \'UTF8\')',
+                payload
+            )
+        finally:
+            cursor.close()
+    
+    def _load_batch(self, table: Table, table_name: str, batch_num: int, last_rowid: int,
+                    rows: List[Dict], rows_copied: int, use_copy: bool) -> Tuple[int, List[str]]:
+        """
+        Load one batch and advance the checkpoint atomically
+        
+        Falls back to row-by-row inserts (each in its own transaction) when
+        the batch load fails. Returns the number of rows loaded and errors.
+        """
+        errors = []
+        processed = [p for p in (self._process_row_for_postgresql(row, table) for row in rows) if p]
+        
+        try:
+            with self.postgresql_engine.begin() as conn:
+                if processed:
+                    if use_copy:
+                        self._copy_batch(conn, table, processed)
+                    else:
+                        conn.execute(table.insert(), processed)
+                self._save_checkpoint(conn, table_name, last_rowid, rows_copied + len(processed))
+            
+            logger.info(f"Streamed batch {batch_num} ({len(processed)} records) for table {table_name}")
+            return len(processed), errors
+            
+        except Exception as batch_error:
+            error_msg = f"Batch {batch_num} failed: {batch_error}"
+            errors.append(error_msg)
+            logger.error(error_msg)
+        
+        loaded = 0
+        for row in processed:
+            try:
+                with self.postgresql_engine.begin() as conn:
+                    conn.execute(table.insert(), [row])
+                loaded += 1
+            except Exception as row_error:
+                error_msg = f"Row insertion failed: {row_error}"
+                errors.append(error_msg)
+                logger.warning(error_msg)
+        
+        with self.postgresql_engine.begin() as conn:
+            self._save_checkpoint(conn, table_name, last_rowid, rows_copied + loaded)
+        
+        return loaded, errors
+    
+    def migrate_table_streaming(self, table_name: str) -> TableMigrationResult:
+        """
+        Copy one table with constant memory
+        
+        Source rows are read batch by batch, converted lazily through
+        _process_row_for_postgresql and loaded with COPY (PostgreSQL targets)
+        or batched inserts. Progress is checkpointed with each batch, so a
+        rerun continues after the last committed batch.
+        """
+        start_time = datetime.now()
+        errors = []
+        
+        try:
+            source_count = self.count_source_rows(table_name)
+            
+            inspector = inspect(self.postgresql_engine)
+            if table_name not in inspector.get_table_names():
+                if source_count:
+                    logger.warning(f"Table {table_name} does not exist in PostgreSQL, skipping")
+                    errors.append(f"Table {table_name} does not exist in PostgreSQL")
+                return TableMigrationResult(
+                    table_name=table_name,
+                    source_count=source_count,
+                    migrated_count=0,
+                    errors=errors,
+                    duration_seconds=(datetime.now() - start_time).total_seconds(),
+                    success=source_count == 0
+                )
+            
+            checkpoint = self.get_checkpoint(table_name) if self.config.resume else None
+            if checkpoint and checkpoint["completed"]:
+                logger.info(f"Table {table_name} already migrated, skipping")
+                return TableMigrationResult(
+                    table_name=table_name,
+                    source_count=source_count,
+                    migrated_count=checkpoint["rows_copied"],
+                    errors=[],
+                    duration_seconds=0.0,
+                    success=True
+                )
+            
+            last_rowid = checkpoint["last_rowid"] if checkpoint else 0
+            migrated_count = checkpoint["rows_copied"] if checkpoint else 0
+            if last_rowid:
+                logger.info(f"Resuming table {table_name} after rowid {last_rowid} "
+                            f"({migrated_count} records already copied)")
+            
+            table = Table(table_name, MetaData(), autoload_with=self.postgresql_engine)
+            use_copy = self.config.use_copy and self.postgresql_engine.dialect.name == "postgresql"
+            
+            for batch_num, (batch_rowid, rows) in enumerate(
+                self.iter_table_batches(table_name, last_rowid), start=1
+            ):
+                loaded, batch_errors = self._load_batch(
+                    table, table_name, batch_num, batch_rowid, rows, migrated_count, use_copy
+                )
+                migrated_count += loaded
+                last_rowid = batch_rowid
+                errors.extend(batch_errors)
+            
+            with self.postgresql_engine.begin() as conn:
+                self._update_sequences_from_table(conn, table_name)
+                self._save_checkpoint(conn, table_name, last_rowid, migrated_count, completed=True)
+            
+            duration = (datetime.now() - start_time).total_seconds()
+            logger.info(f"Completed streaming table {table_name}: "
+                        f"{migrated_count}/{source_count} records in {duration:.2f}s")
+            
+            return TableMigrationResult(
+                table_name=table_name,
+                source_count=source_count,
+                migrated_count=migrated_count,
+                errors=errors,
+                duration_seconds=duration,
+                success=migrated_count > 0 or source_count == 0
+            )
+            
+        except Exception as e:
+            error_msg = f"Failed to stream table {table_name}: {e}"
+            errors.append(error_msg)
+            logger.error(error_msg)
+            return TableMigrationResult(
+                table_name=table_name,
+                source_count=0,
+                migrated_count=0,
+                errors=errors,
+                duration_seconds=(datetime.now() - start_time).total_seconds(),
+                success=False
+            )
+    
+    def _update_sequences_from_table(self, conn, table_name: str):
+        """Advance PostgreSQL sequences to the maximum value already in the table"""
+        if conn.dialect.name != "postgresql":
+            return
+        
+        try:
+            for column in inspect(self.postgresql_engine).get_columns(table_name):
+                if not (column.get('autoincrement') or 'nextval' in str(column.get('default', ''))):
+                    continue
+                
+                column_name = column['name']
+                max_value = conn.execute(
+                    text(f'SELECT MAX("{column_name}") FROM "{table_name}"')
+                ).scalar()
+                if max_value:
+                    sequence_name = f"{table_name}_{column_name}_seq"
+                    conn.execute(text(f"SELECT setval('{sequence_name}', {int(max_value)}, true)"))
+                    logger.info(f"Updated sequence {sequence_name} to {max_value}")
+        except Exception as e:
+            logger.warning(f"Failed to update sequences for table {table_name}: {e}")
+    
+    def plan_table_waves(self, table_names: List[str]) -> List[List[str]]:
+        """
+        Group tables into waves that can be copied in parallel
+        
+        A table is placed in a later wave than every table it references
+        through a foreign key, so each wave only contains tables that are
+        independent of one another. Order within a wave follows
+        migration_order.
+        """
+        try:
+            inspector = inspect(self.postgresql_engine)
+            existing = set(inspector.get_table_names())
+            dependencies = {}
+            for table_name in table_names:
+                referred = set()
+                if table_name in existing:
+                    referred = {fk['referred_table'] for fk in inspector.get_foreign_keys(table_name)}
+                dependencies[table_name] = (referred & set(table_names)) - {table_name}
+        except Exception as e:
+            logger.warning(f"Could not inspect foreign keys, copying tables sequentially: {e}")
+            return [[table_name] for table_name in table_names]
+        
+        waves = []
+        placed = set()
+        remaining = list(table_names)
+        while remaining:
+            wave = [t for t in remaining if dependencies[t] <= placed]
+            if not wave:
+                # Circular references: fall back to the configured order
+                wave = [remaining[0]]
+            waves.append(wave)
+            placed.update(wave)
+            remaining = [t for t in remaining if t not in placed]
+        
+        return waves
+    
+    def migrate_tables_streaming(self) -> List[TableMigrationResult]:
+        """Stream every table, running independent tables in parallel"""
+        self._ensure_checkpoint_table()
+        
+        results = {}
+        workers = max(1, self.config.parallel_tables)
+        for wave in self.plan_table_waves(self.migration_order):
+            logger.info(f"Streaming {len(wave)} table(s) in parallel: {', '.join(wave)}")
+            if workers == 1 or len(wave) == 1:
+                for table_name in wave:
+                    results[table_name] = self.migrate_table_streaming(table_name)
+            else:
+                with ThreadPoolExecutor(max_workers=min(workers, len(wave))) as executor:
+                    for table_name, result in zip(wave, executor.map(self.migrate_table_streaming, wave)):
+                        results[table_name] = result
+        
+        return [results[table_name] for table_name in self.migration_order]
+    
     def validate_migration(self, table_results: List[TableMigrationResult]) -> Dict[str, Any]:
         """Validate migration results and data integrity"""
         logger.info("Validating migration results...")
@@ -687,6 +1047,10 @@ class DatabaseMigrator:
                         f.write(f"-- Reset sequences for {table_name}\n")
                         f.write(f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), 1, false);\n")
                 
+                if self.config.streaming:
+                    f.write("\n-- Remove streaming checkpoints\n")
+                    f.write(f"DROP TABLE IF EXISTS {CHECKPOINT_TABLE_NAME};\n")
+                
                 f.write(f"\n-- Restore from backup: {self.backup_path}\n")
                 f.write("-- Use appropriate tools to restore SQLite data\n")
             
@@ -730,19 +1094,13 @@ class DatabaseMigrator:
             else:
                 report.rollback_available = True
             
-            # Migrate tables in dependency order
-            for table_name in self.migration_order:
-                logger.info(f"Processing table: {table_name}")
-                
-                # Export data from SQLite
-                data = self.export_table_data(table_name)
-                if data is None:
-                    error_msg = f"Failed to export data from table {table_name}"
-                    report.errors.append(error_msg)
-                    continue
-                
-                # Import data to PostgreSQL
-                result = self.import_table_data(table_name, data)
+            if self.config.streaming:
+                # Stream tables with constant memory, independent tables in parallel
+                table_results = self.migrate_tables_streaming()
+            else:
+                table_results = self._migrate_tables_in_memory(report)
+            
+            for result in table_results:
                 report.table_results.append(result)
                 report.total_tables += 1
                 report.total_records += result.source_count
@@ -781,6 +1139,24 @@ class DatabaseMigrator:
             logger.error(error_msg)
             return report
     
+    def _migrate_tables_in_memory(self, report: MigrationReport) -> List[TableMigrationResult]:
+        """Migrate tables in dependency order, loading each table fully"""
+        table_results = []
+        for table_name in self.migration_order:
+            logger.info(f"Processing table: {table_name}")
+            
+            # Export data from SQLite
+            data = self.export_table_data(table_name)
+            if data is None:
+                error_msg = f"Failed to export data from table {table_name}"
+                report.errors.append(error_msg)
+                continue
+            
+            # Import data to PostgreSQL
+            table_results.append(self.import_table_data(table_name, data))
+        
+        return table_results
+    
     def generate_migration_report(self, report: MigrationReport) -> str:
         """Generate detailed migration report"""
         report_lines = [
@@ -853,8 +1229,12 @@ def main():
         batch_size=1000,
         validate_data=True,
         create_rollback=True,
-        preserve_ids=True
+        preserve_ids=True,
+        streaming="--streaming" in sys.argv,
+        parallel_tables=int(os.getenv("MIGRATION_PARALLEL_TABLES", "4"))
     )
+    if config.streaming:
+        config.batch_size = int(os.getenv("MIGRATION_BATCH_SIZE", "10000"))
     
     # Create migrator
     migrator = DatabaseMigrator(config)
@@ -120,6 +120,8 @@ class PostgreSQLSchemaOptimizer:
             "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memory_context_cache_expires_active ON memory_context_cache(expires_at) WHERE expires_at > NOW();",
             "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tool_usage_metrics_name_quality ON tool_usage_metrics(tool_name, response_quality_score DESC);",
             "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tool_usage_metrics_usage_success ON tool_usage_metrics(usage_count DESC, success_rate DESC);",
+            # Conflict target for the tool usage UPSERT (fails if duplicate keys exist)
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_tool_metrics_name_hash ON tool_usage_metrics(tool_name, query_hash);",
             
             # Performance metrics optimization
             "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_unified_performance_metrics_agent_date ON unified_performance_metrics(agent_id, date DESC);",
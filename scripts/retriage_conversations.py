@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Conversation Re-triage Script
+
+Re-analyzes AI conversations in bulk and updates the category, priority, tags
+and analysis metadata of the open tickets they are linked to. Intended to run
+nightly in a maintenance window.
+"""
+
+import sys
+import argparse
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add the parent directory to the path so we can import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.database import SessionLocal
+from backend.unified_models import UnifiedChatHistory
+from backend.conversation_to_ticket_utils import conversation_analyzer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    """Main function for conversation re-triage"""
+    parser = argparse.ArgumentParser(
+        description="Re-analyze conversations and re-triage their linked open tickets"
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        help="Only conversations from the last N days (default: all)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Conversations per chunk (default: 1000)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Analyze without updating tickets"
+    )
+    args = parser.parse_args()
+    
+    with SessionLocal() as db:
+        query = db.query(UnifiedChatHistory).filter(UnifiedChatHistory.ticket_id.isnot(None))
+        if args.days:
+            since = datetime.now(timezone.utc) - timedelta(days=args.days)
+            query = query.filter(UnifiedChatHistory.created_at >= since)
+        
+        summary = conversation_analyzer.analyze_conversations(
+            query,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            write_results=not args.dry_run
+        )
+    
+    logger.info(f"Results: {summary.results}")
+    logger.info(
+        f"Processed {summary.processed} conversations in {summary.duration_seconds:.1f}s "
+        f"({summary.conversations_per_second:.0f}/s), {summary.tickets_updated} tickets updated, "
+        f"{summary.errors} errors"
+    )
+    return 0 if summary.errors == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
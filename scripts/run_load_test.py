@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+End-to-end Load Test Runner
+
+Boots the application with a stub LLM and stub tools, seeds the database and
+drives login, chat, context, analytics and admin traffic at a target request
+rate. Prints p50/p95/p99 and throughput per endpoint, writes the JSON report
+and, given a baseline report, fails when an endpoint regressed.
+
+Examples:
+    # In process against a throwaway SQLite database
+    python scripts/run_load_test.py --database-url sqlite:///./loadtest.db --rps 20 --duration 60 --output report.json
+
+    # Compare with the report of a previous commit
+    python scripts/run_load_test.py --database-url sqlite:///./loadtest.db --baseline baseline.json
+
+    # Serve the stubbed app, then drive it from another process
+    python scripts/run_load_test.py --serve --port 8001
+    python scripts/run_load_test.py --base-url http://localhost:8001 --skip-seed
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+import logging
+from pathlib import Path
+
+# Add the parent directory to the path so we can import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from backend.load_testing import (
+    LoadTestConfig, default_workload, boot_application, asgi_lifespan, seed_database,
+    load_test_users, run_load_test, save_report, load_report, compare_reports, format_report,
+    LatencyDistribution, DEFAULT_LLM_LATENCY, DEFAULT_TOOL_LATENCY, LOAD_TEST_SEED,
+    LOAD_TEST_CUSTOMERS, LOAD_TEST_ADMINS, LOAD_TEST_HISTORY_PER_USER, LOAD_TEST_MAX_IN_FLIGHT,
+    LOAD_TEST_REGRESSION_TOLERANCE
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run an end-to-end load test with a stub LLM")
+    parser.add_argument("--rps", type=float, default=10.0, help="Target requests per second (default: 10)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds (default: 30)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured warm-up seconds (default: 5)")
+    parser.add_argument("--sessions", type=int, default=10, help="Logged-in customer sessions (default: 10)")
+    parser.add_argument("--max-in-flight", type=int, default=LOAD_TEST_MAX_IN_FLIGHT,
+                        help=f"Concurrent request cap of the driver (default: {LOAD_TEST_MAX_IN_FLIGHT})")
+    parser.add_argument("--mix", action="append", default=[], metavar="ENDPOINT=WEIGHT",
+                        help="Override an endpoint weight, e.g. chat=0.8 (repeatable)")
+    parser.add_argument("--slo", action="append", default=[], metavar="ENDPOINT=P99_MS",
+                        help="Override an endpoint p99 SLO in milliseconds (repeatable)")
+    parser.add_argument("--llm-latency", default=DEFAULT_LLM_LATENCY,
+                        help=f"Stub LLM latency distribution (default: {DEFAULT_LLM_LATENCY})")
+    parser.add_argument("--tool-latency", default=DEFAULT_TOOL_LATENCY,
+                        help=f"Stub tool latency distribution (default: {DEFAULT_TOOL_LATENCY})")
+    parser.add_argument("--seed", type=int, default=LOAD_TEST_SEED, help="Random seed of workload and stubs")
+    parser.add_argument("--database-url", help="Database to seed and serve from (default: DATABASE_URL)")
+    parser.add_argument("--customers", type=int, default=LOAD_TEST_CUSTOMERS, help="Seeded customers")
+    parser.add_argument("--admins", type=int, default=LOAD_TEST_ADMINS, help="Seeded admins")
+    parser.add_argument("--history-per-user", type=int, default=LOAD_TEST_HISTORY_PER_USER,
+                        help="Seeded chat turns per customer")
+    parser.add_argument("--skip-seed", action="store_true", help="Use the users of an earlier seeding")
+    parser.add_argument("--base-url", help="Drive a running server instead of the app in process")
+    parser.add_argument("--serve", action="store_true", help="Serve the stubbed app instead of driving it")
+    parser.add_argument("--port", type=int, default=8001, help="Port for --serve (default: 8001)")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report to compare against; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=LOAD_TEST_REGRESSION_TOLERANCE,
+                        help=f"Allowed relative regression (default: {LOAD_TEST_REGRESSION_TOLERANCE})")
+    return parser.parse_args()
+
+
+def _overrides(values, option):
+    overrides = {}
+    for value in values:
+        name, _, number = value.partition("=")
+        try:
+            overrides[name] = float(number)
+        except ValueError:
+            raise SystemExit(f"Invalid {option} value '{value}', expected ENDPOINT=NUMBER")
+    return overrides
+
+
+def build_config(args) -> LoadTestConfig:
+    workload = default_workload()
+    names = {spec.name for spec in workload}
+    weights = _overrides(args.mix, "--mix")
+    slos = _overrides(args.slo, "--slo")
+    unknown = (set(weights) | set(slos)) - names
+    if unknown:
+        raise SystemExit(f"Unknown endpoint(s) {', '.join(sorted(unknown))}; known: {', '.join(sorted(names))}")
+    for spec in workload:
+        spec.weight = weights.get(spec.name, spec.weight)
+        spec.slo_p99_ms = slos.get(spec.name, spec.slo_p99_ms)
+    return LoadTestConfig(
+        rps=args.rps,
+        duration_seconds=args.duration,
+        warmup_seconds=args.warmup,
+        sessions=args.sessions,
+        max_in_flight=args.max_in_flight,
+        seed=args.seed,
+        workload=workload
+    )
+
+
+async def drive(args, config: LoadTestConfig, seeded, app=None):
+    if app is None:
+        limits = httpx.Limits(max_connections=config.max_in_flight)
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits) as client:
+            return await run_load_test(client, config, seeded)
+    async with asgi_lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            return await run_load_test(client, config, seeded)
+
+
+def main():
+    """Main function for the load test"""
+    args = parse_args()
+    for spec in (args.llm_latency, args.tool_latency):
+        try:
+            LatencyDistribution.parse(spec)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    if args.serve and args.base_url:
+        raise SystemExit("--serve and --base-url cannot be combined")
+    config = build_config(args)
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    app = None
+    if not args.base_url:
+        app = boot_application(args.llm_latency, args.tool_latency, args.seed)
+
+    if args.skip_seed:
+        seeded = load_test_users(args.customers, args.admins)
+    else:
+        from backend.database import engine
+        seeded = seed_database(engine, args.customers, args.admins, args.history_per_user, seed=args.seed)
+
+    if args.serve:
+        import uvicorn
+        uvicorn.run(app, host="127.0.0.1", port=args.port)
+        return 0
+
+    report = asyncio.run(drive(args, config, seeded, app))
+    print(format_report(report))
+    if args.output:
+        save_report(report, args.output)
+        logger.info(f"Report written to {args.output}")
+
+    exit_code = 0
+    if not report["slo_met"]:
+        logger.warning("One or more endpoints missed their p99 SLO")
+        exit_code = 1
+    if args.baseline:
+        regressions = compare_reports(load_report(args.baseline), report, args.tolerance)
+        for regression in regressions:
+            logger.warning(f"Regression: {regression}")
+        if regressions:
+            exit_code = 1
+        else:
+            logger.info(f"No regressions against {args.baseline} beyond {args.tolerance:.0%}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark Runner
+
+Times the retrieval, scoring and rendering hot functions on synthetic corpora
+of growing size. It reports ops/sec, allocations per operation and the scaling
+exponent, writes the JSON results and, given a baseline, fails when a
+benchmark regressed.
+
+Examples:
+    # Quick run (100 to 10k entries), saved as the baseline
+    python scripts/run_microbenchmarks.py --output benchmarks_baseline.json
+
+    # Full scaling curves up to 1M entries for two benchmarks
+    python scripts/run_microbenchmarks.py --full --benchmark anonymize_text --benchmark performance_cache_get
+
+    # Prove an optimization did not regress anything
+    python scripts/run_microbenchmarks.py --baseline benchmarks_baseline.json
+"""
+
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+
+# Add the parent directory to the path so we can import backend modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.microbenchmarks import (
+    BENCHMARKS, QUICK_SIZES, FULL_SIZES, run_suite, compare_results, format_results,
+    MICROBENCH_MIN_TIME, MICROBENCH_MAX_PASS_SECONDS, MICROBENCH_REGRESSION_TOLERANCE, MICROBENCH_SEED
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Main function for the microbenchmarks"""
+    parser = argparse.ArgumentParser(description="Benchmark the retrieval, scoring and rendering hot functions")
+    parser.add_argument("--benchmark", action="append", choices=[b.name for b in BENCHMARKS],
+                        help="Benchmark to run (repeatable, default: all)")
+    parser.add_argument("--sizes", help=f"Comma-separated corpus sizes (default: {','.join(map(str, QUICK_SIZES))})")
+    parser.add_argument("--full", action="store_true", help=f"Use sizes {','.join(map(str, FULL_SIZES))}")
+    parser.add_argument("--min-time", type=float, default=MICROBENCH_MIN_TIME,
+                        help=f"Seconds of passes per size (default: {MICROBENCH_MIN_TIME})")
+    parser.add_argument("--max-pass-seconds", type=float, default=MICROBENCH_MAX_PASS_SECONDS,
+                        help=f"Skip sizes whose pass would take longer (default: {MICROBENCH_MAX_PASS_SECONDS})")
+    parser.add_argument("--no-allocations", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--seed", type=int, default=MICROBENCH_SEED, help="Seed of the synthetic corpora")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=MICROBENCH_REGRESSION_TOLERANCE,
+                        help=f"Allowed relative regression (default: {MICROBENCH_REGRESSION_TOLERANCE})")
+    args = parser.parse_args()
+
+    sizes = FULL_SIZES if args.full else QUICK_SIZES
+    if args.sizes:
+        try:
+            sizes = tuple(int(size) for size in args.sizes.split(",") if size.strip())
+        except ValueError:
+            parser.error(f"Invalid --sizes '{args.sizes}', expected comma-separated integers")
+
+    # The benchmarked code logs per call in places; keep that out of the timings
+    logging.getLogger("backend").setLevel(logging.WARNING)
+
+    report = run_suite(
+        args.benchmark, sizes,
+        min_time=args.min_time,
+        max_pass_seconds=args.max_pass_seconds,
+        measure_allocations=not args.no_allocations,
+        seed=args.seed
+    )
+    print(format_results(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+        logger.info(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare_results(baseline, report, args.tolerance)
+        for regression in regressions:
+            logger.warning(f"Regression: {regression}")
+        if regressions:
+            return 1
+        logger.info(f"No regressions against {args.baseline} beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
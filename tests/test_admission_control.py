@@ -0,0 +1,194 @@
+"""
+Tests for chat admission control and load shedding
+"""
+
+import asyncio
+from typing import Dict
+
+import pytest
+
+from backend.admission_control import (
+    AdaptiveConcurrencyLimit, AdmissionController, AdmissionDecision,
+    PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+)
+
+
+def _controller(limit=1, **options):
+    return AdmissionController(AdaptiveConcurrencyLimit(initial_limit=limit, min_limit=limit, max_limit=limit),
+                               **options)
+
+
+class TestAdaptiveConcurrencyLimit:
+    """Test cases for the latency gradient limit"""
+
+    def test_grows_while_fast_and_shrinks_when_latency_rises(self):
+        """Test the limit grows at saturation, ignores idle samples and backs off on slowdowns"""
+        limiter = AdaptiveConcurrencyLimit(initial_limit=10, min_limit=2, max_limit=50)
+        for _ in range(20):
+            limiter.update(0.2, in_flight=2)
+        assert limiter.value == 10
+
+        for _ in range(20):
+            limiter.update(0.2, in_flight=limiter.value)
+        grown = limiter.value
+        assert grown > 10
+
+        for _ in range(20):
+            limiter.update(1.5, in_flight=limiter.value)
+        assert limiter.value < grown / 2
+        assert limiter.value >= 2
+
+
+class TestAdmissionController:
+    """Test cases for queueing and shedding"""
+
+    @pytest.mark.asyncio
+    async def test_waiters_are_admitted_by_priority(self):
+        """Test a released slot goes to the best priority, then the oldest waiter"""
+        controller = _controller(limit=1)
+        assert await controller.acquire() == AdmissionDecision.ADMITTED
+
+        order = []
+
+        async def wait(name, priority):
+            decision = await controller.acquire(priority)
+            order.append((name, decision))
+            controller.release(decision, 0.01)
+
+        tasks = [asyncio.create_task(wait("low", PRIORITY_LOW)), asyncio.create_task(wait("normal", PRIORITY_NORMAL))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(wait("high", PRIORITY_HIGH)))
+        await asyncio.sleep(0)
+        assert controller.queue_length == 3
+
+        controller.release(AdmissionDecision.ADMITTED, 0.01)
+        await asyncio.gather(*tasks)
+
+        assert order == [(name, AdmissionDecision.ADMITTED) for name in ("high", "normal", "low")]
+        assert controller.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_full_queue_sheds_to_degraded_then_rejects(self):
+        """Test overflow is degraded while cheap capacity lasts and rejected after"""
+        controller = _controller(limit=1, max_queue=1, queue_timeout=5, degraded_limit=1)
+        await controller.acquire()
+        queued = asyncio.create_task(controller.acquire(PRIORITY_LOW))
+        await asyncio.sleep(0)
+
+        # A better priority takes the queued request's place
+        evicting = asyncio.create_task(controller.acquire(PRIORITY_HIGH))
+        assert await queued == AdmissionDecision.DEGRADED
+        assert await controller.acquire(PRIORITY_NORMAL) == AdmissionDecision.REJECTED
+        assert controller.retry_after() >= 1
+
+        controller.release(AdmissionDecision.ADMITTED, 0.01)
+        assert await evicting == AdmissionDecision.ADMITTED
+        stats = controller.get_stats()
+        assert stats["evicted"] == 1 and stats["degraded"] == 1 and stats["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout_sheds(self):
+        """Test a waiter gives up after the queue timeout and leaves the queue"""
+        controller = _controller(limit=1, queue_timeout=0.01)
+        await controller.acquire()
+
+        assert await controller.acquire() == AdmissionDecision.DEGRADED
+        assert controller.queue_length == 0
+        assert controller.get_stats()["queue_timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiters_leave_no_entry_or_slot_behind(self):
+        """Test a waiter cancelled in the queue, or right after being granted, frees its place"""
+        controller = _controller(limit=1, queue_timeout=5)
+        await controller.acquire()
+
+        queued = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert controller.queue_length == 0 and controller.in_flight == 1
+
+        granted = asyncio.create_task(controller.acquire())
+        after = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        controller.release(AdmissionDecision.ADMITTED, 0.01)
+        granted.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await granted
+
+        # The slot granted to the cancelled waiter passed on to the next one
+        assert await after == AdmissionDecision.ADMITTED
+        assert controller.in_flight == 1 and controller.queue_length == 0
+
+
+class TestGoodputUnderOverload:
+    """Test cases for goodput with and without admission control"""
+
+    CAPACITY = 4
+    BASE_LATENCY = 0.01
+    DEADLINE = 0.1
+    STEP = 0.001
+
+    async def _run(self, controller, requests=80):
+        """Step-based simulation on a fake clock
+
+        Each step lets the request tasks run until they block, then advances
+        the clock by STEP and shares CAPACITY among the turns being served.
+        """
+        now = [0.0]
+        if controller is not None:
+            controller.clock = lambda: now[0]
+        serving: Dict[asyncio.Future, float] = {}
+        on_time = 0
+
+        async def serve():
+            done = asyncio.get_running_loop().create_future()
+            serving[done] = self.BASE_LATENCY
+            await done
+
+        async def request():
+            nonlocal on_time
+            start = now[0]
+            if controller is None:
+                await serve()
+            else:
+                async with controller.admit() as decision:
+                    if decision != AdmissionDecision.ADMITTED:
+                        return
+                    await serve()
+            if now[0] - start <= self.DEADLINE:
+                on_time += 1
+
+        async def settle():
+            for _ in range(20):
+                await asyncio.sleep(0)
+
+        tasks = [asyncio.create_task(request()) for _ in range(requests)]
+        await settle()
+        while not all(task.done() for task in tasks):
+            now[0] += self.STEP
+            # Processor sharing: past CAPACITY concurrent turns every turn slows down
+            share = min(1.0, self.CAPACITY / max(len(serving), 1))
+            for done in list(serving):
+                serving[done] -= self.STEP * share
+                if serving[done] <= 1e-9:
+                    del serving[done]
+                    done.set_result(None)
+            await settle()
+        return on_time
+
+    @pytest.mark.asyncio
+    async def test_goodput_stays_up_with_admission_control(self):
+        """Test requests served within the deadline do not collapse under a spike"""
+        controller = AdmissionController(
+            AdaptiveConcurrencyLimit(initial_limit=4, min_limit=2, max_limit=16),
+            max_queue=24, queue_timeout=60
+        )
+
+        unbounded = await self._run(None)
+        admitted = await self._run(controller)
+
+        assert unbounded == 0
+        assert admitted >= 20
+        assert controller.in_flight == 0 and controller.queue_length == 0
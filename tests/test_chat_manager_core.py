@@ -24,7 +24,8 @@ from intelligent_chat import (
     ErrorSeverity,
     ChatUIException,
     ToolExecutionError,
-    ContextRetrievalError
+    ContextRetrievalError,
+    SessionStateStore
 )
 
 
@@ -89,7 +90,7 @@ class TestChatManagerCore:
         assert manager.tool_orchestrator is None
         assert manager.context_retriever is None
         assert manager.response_renderer is None
-        assert isinstance(manager._active_sessions, dict)
+        assert isinstance(manager._active_sessions, SessionStateStore)
         assert manager._conversation_count == 0
         assert manager._total_processing_time == 0.0
     
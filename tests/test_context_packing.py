@@ -0,0 +1,103 @@
+"""
+Tests for token-budget context packing
+"""
+
+from datetime import datetime, timezone
+
+from backend.intelligent_chat.context_packing import (
+    estimate_tokens, truncate_to_tokens, pack_context_entries, ENTRY_OVERHEAD_TOKENS
+)
+from backend.intelligent_chat.context_retriever import ContextRetriever
+from backend.intelligent_chat.models import ContextEntry
+
+
+def _entry(content, relevance=0.8, source="knowledge_base", context_type="knowledge"):
+    return ContextEntry(
+        content=content,
+        source=source,
+        relevance_score=relevance,
+        timestamp=datetime.now(timezone.utc),
+        context_type=context_type
+    )
+
+
+LONG_RESPONSE = "The router restarts itself when the firmware updates overnight. " * 60
+SHORT_SNIPPETS = [f"Hub {i} lights flash orange during setup." for i in range(20)]
+
+
+class TestTokenEstimation:
+    """Test cases for the local tokenizer approximation"""
+
+    def test_estimates_and_truncation(self):
+        """Test words, numbers and punctuation are counted and truncation fits the limit"""
+        assert estimate_tokens("reset the router") == 3
+        assert estimate_tokens("call 08001234567 now!") == 7
+        assert estimate_tokens("internationalization") == 4
+
+        truncated = truncate_to_tokens(LONG_RESPONSE, 50)
+        assert estimate_tokens(truncated) <= 50
+        assert truncated.endswith("...")
+        assert truncate_to_tokens("short text", 50) == "short text"
+
+
+class TestPackContextEntries:
+    """Test cases for the value per token knapsack"""
+
+    def test_short_relevant_snippets_beat_long_responses(self):
+        """Test a budget is filled with many short entries instead of two long ones"""
+        contexts = [_entry(LONG_RESPONSE, 0.9, source="bot"), _entry(LONG_RESPONSE + "!", 0.85, source="bot")]
+        contexts += [_entry(text, 0.8) for text in SHORT_SNIPPETS]
+
+        result = pack_context_entries(contexts, token_budget=400)
+
+        assert result.tokens_used <= 400
+        packed = {entry.content for entry in result.entries}
+        assert set(SHORT_SNIPPETS) <= packed
+        assert result.tokens_available > 1000
+
+    def test_leftover_space_takes_a_truncated_fragment(self):
+        """Test the best entry that does not fit is truncated into the remaining budget"""
+        result = pack_context_entries([_entry(LONG_RESPONSE, 0.9)], token_budget=200)
+
+        assert len(result.entries) == 1 and result.truncated == 1
+        assert result.entries[0].metadata["truncated"] is True
+        assert result.tokens_used <= 200
+
+    def test_diversity_after_half_the_budget(self):
+        """Test a second source gets in although one source has denser entries"""
+        dense = [_entry(f"Outage {i} fixed.", 0.9, source="status_page") for i in range(30)]
+        other = _entry("Broadband speeds drop when many devices stream video at once.", 0.5,
+                       source="conversation", context_type="conversation_history")
+
+        result = pack_context_entries(dense + [other], token_budget=120)
+
+        assert other in result.entries
+        assert sum(estimate_tokens(e.content) + ENTRY_OVERHEAD_TOKENS for e in result.entries) <= 120
+
+
+class TestContextRetrieverPacking:
+    """Test cases for packing in ContextRetriever"""
+
+    def test_compress_with_token_budget(self):
+        """Test a token budget bounds the prompt while the count only caps entries"""
+        retriever = ContextRetriever()
+        contexts = [_entry(LONG_RESPONSE, 0.9, source="bot")] + [_entry(text, 0.8) for text in SHORT_SNIPPETS]
+
+        by_count = retriever.compress_context_window(contexts, 5)
+        by_tokens = retriever.compress_context_window(contexts, 15, token_budget=300)
+
+        assert len(by_count) == 5
+        assert len(by_tokens) == 15
+        assert sum(estimate_tokens(entry.content) for entry in by_tokens) <= 300
+        stats = retriever.get_context_compression_stats()["token_packing"]
+        assert stats["total_packed_windows"] == 1 and stats["entries_dropped"] == 6
+
+    def test_speed_mode_with_budget_keeps_high_relevance_only(self):
+        """Test speed mode packs only highly relevant entries into the budget"""
+        retriever = ContextRetriever(context_token_budget=500)
+        contexts = [_entry(text, 0.9 if i % 2 else 0.5) for i, text in enumerate(SHORT_SNIPPETS)]
+
+        packed = retriever.optimize_context_for_performance(contexts, "speed")
+
+        assert len(packed) == 10
+        assert all(entry.relevance_score > 0.7 for entry in packed)
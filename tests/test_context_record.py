@@ -0,0 +1,84 @@
+"""
+Tests for the context record shared by the memory layer and intelligent chat
+"""
+
+import pickle
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+from backend.context_record import ContextRecord
+from backend.memory_models import ContextEntry as MemoryContextEntry, ContextEntryDTO
+from backend.intelligent_chat.models import ContextEntry as ChatContextEntry
+from backend.intelligent_chat.chat_manager import ChatManager
+from backend.intelligent_chat.context_packing import pack_context_entries
+
+
+def _record(**overrides):
+    values = dict(content="Router keeps dropping", source="conversation_1", relevance_score=0.8,
+                  context_type="conversation", metadata={"session_id": "s1"})
+    values.update(overrides)
+    return ContextRecord(**values)
+
+
+class TestContextRecord:
+    """Test cases for the slotted immutable record"""
+
+    def test_one_type_for_both_layers(self):
+        """Test the memory layer and intelligent chat names refer to the same class"""
+        assert MemoryContextEntry is ChatContextEntry is ContextEntryDTO is ContextRecord
+
+    def test_compact_and_immutable(self):
+        """Test records have no instance dict and change only through replace"""
+        record = _record()
+
+        assert not hasattr(record, "__dict__")
+        assert sys.getsizeof(record) < 100
+        with pytest.raises(AttributeError):
+            record.relevance_score = 0.1
+
+        rescored = record.replace(relevance_score=0.3)
+        assert rescored.relevance_score == 0.3 and record.relevance_score == 0.8
+        assert rescored.replace(relevance_score=0.8) == record
+        with pytest.raises(TypeError):
+            record.replace(score=0.1)
+
+    def test_validation_only_at_boundaries(self):
+        """Test construction skips checks while from_dict and validate apply them"""
+        unchecked = _record(context_type="tool_result", relevance_score=1.4)
+        assert unchecked.context_type == "tool_result"
+
+        with pytest.raises(ValueError, match="relevance_score"):
+            unchecked.validate()
+        with pytest.raises(ValueError, match="context_type must be one of"):
+            ContextRecord.from_dict({**_record().to_dict(), "context_type": "tool_result"})
+
+        stamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        restored = ContextRecord.from_dict(_record(timestamp=stamp).to_dict())
+        assert restored == _record(timestamp=stamp)
+        assert pickle.loads(pickle.dumps(restored)) == restored
+
+
+class TestContextPassThrough:
+    """Test cases for entries crossing from the memory layer into chat"""
+
+    def test_memory_contexts_are_not_copied(self):
+        """Test chat receives the memory layer's records themselves"""
+        manager = ChatManager(auto_create_context_engine=False)
+        records = [_record(), _record(source="conversation_2")]
+
+        converted = manager._convert_memory_contexts_to_context_entries(records)
+
+        assert all(a is b for a, b in zip(converted, records))
+        assert manager._convert_engine_contexts_to_context_entries(records)[1] is records[1]
+
+    def test_truncation_leaves_original_untouched(self):
+        """Test packing a truncated fragment does not alter the source record"""
+        long_record = _record(content="modem " * 400)
+
+        packed = pack_context_entries([long_record], token_budget=120).entries
+
+        assert packed[0].metadata.get("truncated") is True
+        assert len(packed[0].content) < len(long_record.content)
+        assert "truncated" not in long_record.metadata
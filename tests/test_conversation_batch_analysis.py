@@ -0,0 +1,156 @@
+"""
+Tests for bulk conversation analysis and the keyword matcher behind it
+"""
+
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.unified_models import (
+    UnifiedUser, UnifiedTicket, UnifiedChatHistory, TicketStatus, TicketPriority, TicketCategory
+)
+import backend.conversation_to_ticket_utils as analysis_module
+from backend.conversation_to_ticket_utils import (
+    ConversationAnalyzer, ConversationAnalysisResult, KeywordMatcher
+)
+
+
+PROBLEM = "This is urgent, my internet is not working and I get error 504 on the router"
+BILLING = "I have a problem with my bill, I was charged twice for the payment"
+QUESTION = "What is the difference between your broadband plans?"
+
+
+class TestKeywordMatcher:
+    """Test cases for KeywordMatcher"""
+
+    def test_matches_like_substring_search(self):
+        """Test keywords match inside words and overlapping each other"""
+        matcher = KeywordMatcher(["now", "add", "address", "not working", "working now", "bill", "billing"])
+
+        assert matcher.match("i know my address") == {"now", "add", "address"}
+        assert matcher.match("it's not working now") == {"now", "not working", "working now"}
+        assert matcher.match("billing") == {"bill", "billing"}
+        assert matcher.match("not  working") == frozenset()
+        assert matcher.match("") == frozenset()
+
+    def test_agrees_with_substring_search(self):
+        """Test every keyword family gives the same result as 'in'"""
+        analyzer = ConversationAnalyzer()
+        keywords = analyzer.matcher.keywords
+        text = f"{PROBLEM} {BILLING} {QUESTION} can't work, fed up! thank you".lower()
+
+        assert analyzer.matcher.match(text) == {keyword for keyword in keywords if keyword in text}
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    """SQLite database with conversations, some linked to tickets"""
+    engine = create_engine(f"sqlite:///{tmp_path}/conversations.db")
+    Base.metadata.create_all(engine, tables=[
+        UnifiedUser.__table__, UnifiedTicket.__table__, UnifiedChatHistory.__table__
+    ])
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(analysis_module, "SessionLocal", factory)
+    monkeypatch.setattr(analysis_module, "BackgroundSessionLocal", factory)
+
+    with factory() as db:
+        open_ticket = UnifiedTicket(title="Internet", description="Internet down",
+                                    priority=TicketPriority.LOW, category=TicketCategory.GENERAL)
+        resolved_ticket = UnifiedTicket(title="Bill", description="Double charge",
+                                        status=TicketStatus.RESOLVED, priority=TicketPriority.LOW,
+                                        category=TicketCategory.GENERAL)
+        db.add_all([open_ticket, resolved_ticket])
+        db.flush()
+        for index in range(25):
+            message, ticket_id = [
+                (PROBLEM, open_ticket.id), (BILLING, resolved_ticket.id), (QUESTION, None)
+            ][index % 3]
+            db.add(UnifiedChatHistory(session_id=f"s{index}", user_message=message,
+                                      bot_response="Let me look into that.", ticket_id=ticket_id))
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+class TestBatchAnalysis:
+    """Test cases for ConversationAnalyzer.analyze_conversations"""
+
+    def test_matches_single_conversation_analysis(self, session_factory):
+        """Test bulk results equal analyzing each conversation on its own"""
+        analyzer = ConversationAnalyzer()
+
+        summary = analyzer.analyze_conversations(chunk_size=4, workers=0,
+                                                 write_results=False, collect_results=True)
+
+        assert summary.processed == 25
+        assert summary.chunks == 7
+        assert summary.results == {"needs_ticket": 17, "informational": 8}
+        assert [analysis.conversation_id for analysis in summary.analyses] == list(range(1, 26))
+        for analysis in summary.analyses[:3]:
+            single = analyzer.analyze_conversation(analysis.conversation_id)
+            assert single == analysis
+
+    def test_ids_and_queries(self, session_factory):
+        """Test conversations can be selected by id or by query"""
+        analyzer = ConversationAnalyzer()
+
+        by_ids = analyzer.analyze_conversations([3, 1, 2, 99, 1], chunk_size=2, workers=0,
+                                                write_results=False)
+        assert by_ids.processed == 3
+
+        with session_factory() as db:
+            query = db.query(UnifiedChatHistory).filter(UnifiedChatHistory.ticket_id.is_(None))
+            by_query = analyzer.analyze_conversations(query, chunk_size=3, workers=0,
+                                                      write_results=False)
+        assert by_query.results == {"informational": 8}
+
+    def test_writes_metadata_to_open_tickets_only(self, session_factory):
+        """Test re-triage updates linked open tickets and leaves resolved ones alone"""
+        summary = ConversationAnalyzer().analyze_conversations(chunk_size=30, workers=0)
+
+        assert summary.tickets_updated == 1
+        with session_factory() as db:
+            open_ticket, resolved_ticket = db.query(UnifiedTicket).order_by(UnifiedTicket.id).all()
+            assert open_ticket.priority == TicketPriority.CRITICAL
+            assert open_ticket.category == TicketCategory.TECHNICAL
+            assert "urgent" in open_ticket.tags.split(",")
+            metadata = json.loads(open_ticket.ticket_metadata)
+            assert metadata["analysis_result"] == ConversationAnalysisResult.NEEDS_TICKET.value
+            assert metadata["urgency_score"] > 0.3
+            assert resolved_ticket.priority == TicketPriority.LOW
+            assert resolved_ticket.ticket_metadata is None
+
+    def test_keeps_agent_triage_and_merges_metadata(self, session_factory):
+        """Test re-triage merges metadata and leaves an in-progress ticket's triage alone"""
+        with session_factory() as db:
+            ticket = db.query(UnifiedTicket).order_by(UnifiedTicket.id).first()
+            ticket.status = TicketStatus.IN_PROGRESS
+            ticket.ticket_metadata = json.dumps({"source": "email", "urgency_score": 0.0})
+            db.commit()
+
+        summary = ConversationAnalyzer().analyze_conversations(chunk_size=30, workers=0)
+
+        assert summary.tickets_updated == 1
+        with session_factory() as db:
+            ticket = db.query(UnifiedTicket).order_by(UnifiedTicket.id).first()
+            assert ticket.priority == TicketPriority.LOW
+            assert ticket.category == TicketCategory.GENERAL
+            assert "urgent" in ticket.tags.split(",")
+            metadata = json.loads(ticket.ticket_metadata)
+            assert metadata["source"] == "email"
+            assert metadata["analysis_result"] == ConversationAnalysisResult.NEEDS_TICKET.value
+            assert metadata["urgency_score"] > 0.3
+
+    def test_process_pool(self, session_factory):
+        """Test chunks fanned out to worker processes give the same results"""
+        analyzer = ConversationAnalyzer()
+        inline = analyzer.analyze_conversations(chunk_size=4, workers=0, write_results=False)
+
+        pooled = analyzer.analyze_conversations(chunk_size=4, workers=2, write_results=False)
+
+        assert pooled.processed == 25
+        assert pooled.results == inline.results
+        assert pooled.errors == 0
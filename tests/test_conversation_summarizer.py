@@ -0,0 +1,201 @@
+"""
+Tests for incremental rolling conversation summaries
+"""
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from backend.memory_models import EnhancedChatHistory, ConversationSummary
+from backend.memory_config import MemoryConfig
+from backend.memory_layer_manager import MemoryLayerManager
+from backend.conversation_summarizer import ConversationSummarizer, extractive_summary, load_summarized_history
+
+
+USER_ID = "summary_user"
+TOPICS = ["router", "billing", "broadband", "password", "engineer visit", "refund"]
+
+
+def _add_turns(db, count, session_id="session_1", start=0):
+    for i in range(start, start + count):
+        topic = TOPICS[i % len(TOPICS)]
+        db.add(EnhancedChatHistory(
+            session_id=session_id,
+            user_id=USER_ID,
+            user_message=f"My {topic} question number {i} needs help. Thanks.",
+            bot_response=f"Here is how the {topic} issue number {i} gets resolved quickly.",
+        ))
+    db.commit()
+
+
+@pytest.fixture
+def db():
+    """SQLite database with chat history and summary tables"""
+    engine = create_engine("sqlite://")
+    # Tables only: their indexes get declared twice when the models are imported under two module names
+    with engine.begin() as connection:
+        for table in (EnhancedChatHistory.__table__, ConversationSummary.__table__):
+            connection.execute(CreateTable(table))
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+class TestExtractiveSummary:
+    """Test cases for the local extractive method"""
+
+    def test_keeps_frequent_lines_in_order(self):
+        """Test lines about recurring terms are kept in conversation order"""
+        lines = [
+            "User: The router keeps dropping broadband overnight.",
+            "Assistant: Weather looks sunny tomorrow afternoon.",
+            "User: Router lights flash while broadband drops.",
+            "Assistant: Restart the router to restore broadband.",
+        ]
+
+        text, topics = extractive_summary(lines, max_sentences=3)
+
+        assert text.splitlines() == [lines[0], lines[2], lines[3]]
+        assert topics[:2] == ["router", "broadband"]
+
+
+class TestConversationSummarizer:
+    """Test cases for folding turns into rolling summaries"""
+
+    def test_folds_only_new_turns_past_the_recent_window(self, db):
+        """Test older turns are folded once and later passes only read new turns"""
+        _add_turns(db, 12)
+        summarizer = ConversationSummarizer(recent_turns=5, max_sentences=6)
+
+        first = summarizer.summarize_pending(db)
+        session_summary = db.query(ConversationSummary).filter_by(session_id="session_1").one()
+        user_summary = db.query(ConversationSummary).filter(ConversationSummary.session_id.is_(None)).one()
+
+        assert first == {"sessions_checked": 1, "turns_folded": 7, "users_updated": 1}
+        assert session_summary.important_context["last_turn_id"] == 7
+        assert len(session_summary.summary_text.splitlines()) <= 6
+        assert user_summary.important_context["turns_folded"] == 7
+        assert summarizer.summarize_pending(db)["sessions_checked"] == 0
+
+        _add_turns(db, 2, start=12)
+        second = summarizer.summarize_pending(db)
+        db.refresh(session_summary)
+
+        assert second["turns_folded"] == 2
+        assert session_summary.important_context["turns_folded"] == 9
+        assert db.query(ConversationSummary).count() == 2
+
+    def test_duplicate_rows_from_concurrent_workers_collapse(self, db):
+        """Test a second summarizer continues from the shared row and older duplicates are removed"""
+        _add_turns(db, 12)
+        ConversationSummarizer(recent_turns=5).summarize_pending(db)
+        first = db.query(ConversationSummary).filter_by(session_id="session_1").one()
+        # What a second worker inserting the same summary without the lock leaves behind
+        db.add(ConversationSummary(user_id=USER_ID, session_id="session_1", summary_text=first.summary_text,
+                                   important_context=dict(first.important_context)))
+        db.commit()
+
+        _add_turns(db, 2, start=12)
+        result = ConversationSummarizer(recent_turns=5).summarize_pending(db)
+        rows = db.query(ConversationSummary).filter_by(session_id="session_1").all()
+
+        assert result["turns_folded"] == 2
+        assert len(rows) == 1 and rows[0].important_context["turns_folded"] == 9
+
+    def test_batch_limit_does_not_skip_remaining_turns(self, db):
+        """Test sessions cut off by the batch limit are folded on the following passes"""
+        _add_turns(db, 12, session_id="first")
+        _add_turns(db, 12, session_id="second", start=12)
+        summarizer = ConversationSummarizer(recent_turns=5, batch_limit=3)
+
+        folded = [summarizer.summarize_pending(db)["turns_folded"] for _ in range(4)]
+        rows = {row.session_id: row for row in db.query(ConversationSummary).filter(
+            ConversationSummary.session_id.isnot(None))}
+
+        assert folded == [6, 6, 2, 0]
+        assert rows["first"].important_context["turns_folded"] == 7
+        assert rows["second"].important_context["turns_folded"] == 7
+
+    def test_llm_summary_with_extractive_fallback(self, db):
+        """Test a working LLM writes the summary and a failing one falls back"""
+        class Model:
+            def __init__(self, fail):
+                self.fail = fail
+
+            def invoke(self, prompt):
+                if self.fail:
+                    raise RuntimeError("model unavailable")
+                return "User had router and billing questions."
+
+        _add_turns(db, 8, session_id="llm")
+        _add_turns(db, 8, session_id="broken")
+        ConversationSummarizer(recent_turns=5, llm=Model(False)).fold_session(db, USER_ID, "llm")
+        ConversationSummarizer(recent_turns=5, llm=Model(True)).fold_session(db, USER_ID, "broken")
+
+        llm_row = db.query(ConversationSummary).filter_by(session_id="llm").one()
+        fallback_row = db.query(ConversationSummary).filter_by(session_id="broken").one()
+        assert llm_row.summary_text == "User had router and billing questions."
+        assert llm_row.important_context["method"] == "llm"
+        assert fallback_row.important_context["method"] == "extractive"
+        assert fallback_row.summary_text.startswith("User: ")
+
+
+class TestSummarizedContextRetrieval:
+    """Test cases for reading summaries plus the latest raw turns"""
+
+    def _queries(self, db, manager):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.get_bind(), "before_cursor_execute", listener)
+        try:
+            entries = manager.retrieve_context("router help", USER_ID, limit=15)
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", listener)
+        return entries, statements
+
+    def test_reads_stay_constant_as_history_grows(self, db):
+        """Test retrieval returns the summaries and at most N raw turns in three queries"""
+        manager = MemoryLayerManager(config=MemoryConfig(), db_session=db)
+        _add_turns(db, 10)
+        manager.summarize_conversations()
+
+        short_entries, short_queries = self._queries(db, manager)
+        _add_turns(db, 40, start=10)
+        manager.summarize_conversations()
+        long_entries, long_queries = self._queries(db, manager)
+
+        assert len(short_queries) == len(long_queries) == 3
+        summaries = [entry for entry in long_entries if entry.context_type == "summary"]
+        raw = [entry for entry in long_entries if entry.context_type == "conversation"]
+        assert len(summaries) == 2 and long_entries[0].context_type == "summary"
+        assert len(raw) <= 2 * MemoryConfig().performance.summary_recent_turns
+        assert {entry.metadata["session_id"] for entry in summaries} == {None, "session_1"}
+
+    def test_turns_after_the_summary_are_read_per_session(self, db):
+        """Test turns waiting for the next pass stay in context in every recent session"""
+        _add_turns(db, 12, session_id="older")
+        ConversationSummarizer(recent_turns=5).summarize_pending(db)
+        _add_turns(db, 6, session_id="older", start=12)
+        _add_turns(db, 6, session_id="newer", start=18)
+
+        history = load_summarized_history(db, USER_ID)
+        ids = {session_id: sorted(turn.id for turn in history.recent_turns if turn.session_id == session_id)
+               for session_id in ("older", "newer")}
+
+        assert ids["older"] == list(range(8, 19))
+        assert ids["newer"] == list(range(19, 25))
+        assert {summary.session_id for summary in history.summaries} == {None, "older"}
+        assert load_summarized_history(db, USER_ID, sessions=1).recent_turns[0].session_id == "newer"
+
+    def test_disabled_summaries_keep_raw_history(self, db):
+        """Test retrieval without summaries reads recent turns up to the limit"""
+        config = MemoryConfig()
+        config.enable_conversation_summaries = False
+        manager = MemoryLayerManager(config=config, db_session=db)
+        _add_turns(db, 10)
+
+        assert manager.summarize_conversations()["turns_folded"] == 0
+        entries = manager.retrieve_context("router help", USER_ID, limit=15)
+        assert entries and all(entry.context_type == "conversation" for entry in entries)
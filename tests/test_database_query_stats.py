@@ -0,0 +1,141 @@
+"""
+Tests for per-statement latency histograms and the slow-query log
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.database_monitoring import (
+    DatabaseMonitor, LatencyHistogram, normalize_sql, fingerprint_sql, describe_parameters
+)
+
+
+@pytest.fixture
+def monitored_engine():
+    """In-memory SQLite engine with its own monitor attached"""
+    engine = create_engine("sqlite://")
+    monitor = DatabaseMonitor(slow_query_ms=1000, max_fingerprints=3, bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+    yield engine, monitor
+    engine.dispose()
+
+
+class TestNormalization:
+    """Test cases for statement fingerprinting"""
+
+    def test_literals_and_placeholders_collapse(self):
+        """Test statements differing only in values share a fingerprint"""
+        first = normalize_sql("SELECT * FROM items WHERE id = 5 AND name = 'a''b' -- lookup")
+        second = normalize_sql("select * from items\n WHERE id = :id_1 AND name = %(name)s")
+
+        assert first == "SELECT * FROM items WHERE id = ? AND name = ?"
+        assert fingerprint_sql(first) == fingerprint_sql(second.replace("select * from", "SELECT * FROM"))
+
+    def test_in_and_values_lists_collapse(self):
+        """Test list lengths do not create new fingerprints"""
+        assert normalize_sql("SELECT 1 FROM t WHERE id IN (1, 2, 3)") == normalize_sql(
+            "SELECT 1 FROM t WHERE id IN ($1)")
+        assert normalize_sql("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)") == \
+            "INSERT INTO t (a, b) VALUES (?, ?), ..."
+        assert normalize_sql("SELECT x::text FROM t") == "SELECT x::text FROM t"
+
+    def test_parameter_shape(self):
+        """Test parameter values are reduced to their types"""
+        assert describe_parameters({"id": 1, "name": "x"}) == {"id": "int", "name": "str"}
+        assert describe_parameters((1, None)) == ["int", "NoneType"]
+        assert describe_parameters([{"id": 1}, {"id": 2}], executemany=True) == {
+            "rows": 2, "row": {"id": "int"}}
+
+
+class TestLatencyHistogram:
+    """Test cases for the log-bucketed histogram"""
+
+    def test_percentiles_within_bucket_error(self):
+        """Test percentiles stay within one bucket of the exact value"""
+        histogram = LatencyHistogram()
+        for millis in range(1, 1001):
+            histogram.record(millis / 1000.0)
+
+        assert histogram.count == 1000
+        assert histogram.max == 1.0
+        for percentile, exact in ((50, 0.5), (95, 0.95), (99, 0.99)):
+            assert exact <= histogram.percentile(percentile) <= exact * 2 ** 0.25
+
+    def test_memory_is_fixed(self):
+        """Test the bucket array does not grow with observations"""
+        histogram = LatencyHistogram()
+        buckets = len(histogram.counts)
+        for value in (0.0, 1e-9, 5.0, 10_000.0):
+            histogram.record(value)
+
+        assert len(histogram.counts) == buckets
+        assert histogram.percentile(100) == 10_000.0
+
+    def test_merge(self):
+        """Test merged histograms combine counts and extremes"""
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(0.01)
+        second.record(0.2)
+        first.merge(second)
+
+        assert first.count == 2
+        assert (first.min, first.max) == (0.01, 0.2)
+
+
+class TestDatabaseMonitorQueryStats:
+    """Test cases for statement statistics collected from cursor hooks"""
+
+    def test_statements_are_grouped_by_fingerprint(self, monitored_engine):
+        """Test repeated statements with different values land in one entry"""
+        engine, monitor = monitored_engine
+        with engine.begin() as conn:
+            for index in range(5):
+                conn.execute(text(f"INSERT INTO items (id, name) VALUES ({index}, 'n{index}')"))
+            conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": 1})
+
+        stats = monitor.get_query_stats(order_by="count")
+        top = stats["statements"][0]
+
+        assert top["statement"] == "INSERT INTO items (id, name) VALUES (?, ?)"
+        assert top["count"] == 5
+        assert top["rows"] == 5
+        assert stats["overall"]["count"] == 7
+
+    def test_fingerprints_are_bounded(self, monitored_engine):
+        """Test statements beyond the limit share the catch-all entry"""
+        engine, monitor = monitored_engine
+        with engine.connect() as conn:
+            for column in ("id", "name", "id, name", "name, id", "id AS x"):
+                conn.execute(text(f"SELECT {column} FROM items"))
+
+        stats = monitor.get_query_stats(limit=10)
+
+        assert stats["tracked_fingerprints"] == 3
+        other = [entry for entry in stats["statements"] if entry["fingerprint"] == "other"]
+        assert other and other[0]["count"] == 3
+
+    def test_slow_queries_capture_shape_and_call_site(self, monitored_engine):
+        """Test slow statements record normalized SQL, parameter types and caller"""
+        engine, monitor = monitored_engine
+        monitor.slow_query_seconds = 0.0
+        with engine.connect() as conn:
+            conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": 42})
+
+        slow = monitor.get_slow_queries()[0]
+
+        assert slow["statement"] == "SELECT name FROM items WHERE id = ?"
+        assert slow["parameters"] == ["int"]
+        assert "test_database_query_stats.py" in slow["call_site"]
+        assert slow["explain"] is None
+
+    def test_reset(self, monitored_engine):
+        """Test statistics and the slow log can be cleared"""
+        engine, monitor = monitored_engine
+        monitor.slow_query_seconds = 0.0
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        monitor.reset_query_stats()
+
+        assert monitor.get_query_stats()["statements"] == []
+        assert monitor.get_slow_queries() == []
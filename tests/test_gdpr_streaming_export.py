@@ -0,0 +1,218 @@
+"""
+Tests for streaming GDPR access and portability exports
+"""
+
+import io
+import json
+import asyncio
+import zipfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.memory_models import Base, EnhancedChatHistory, UserSession, MemoryContextCache
+from backend.security_manager import SecurityManager, AccessControlPolicy
+from backend.privacy_utils import PrivacyUtils
+from backend.gdpr_compliance import GDPRComplianceManager, DataSubjectRightType, RequestStatus
+from backend.gdpr_export import GDPRStreamingExporter
+
+
+USER_ID = "export_user"
+
+
+@pytest.fixture
+def session_factory():
+    """SQLite database holding the exported tables"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        EnhancedChatHistory.__table__, UserSession.__table__, MemoryContextCache.__table__
+    ])
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    session = factory()
+    for i in range(25):
+        session.add(EnhancedChatHistory(
+            session_id=f"session_{i % 3}",
+            user_id=USER_ID,
+            user_message=f"message {i} from me@example.com",
+            bot_response=f"response {i}",
+            tools_used=["tool"],
+        ))
+    session.add(EnhancedChatHistory(session_id="other", user_id="someone_else",
+                                    user_message="not mine", bot_response="no"))
+    for i in range(3):
+        session.add(UserSession(session_id=f"session_{i}", user_id=USER_ID, is_active=True))
+    session.commit()
+    session.close()
+
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def gdpr_manager():
+    """GDPR manager whose user may export data"""
+    security_manager = SecurityManager()
+    security_manager.set_access_policy(
+        USER_ID, AccessControlPolicy(user_id=USER_ID, allowed_operations=["read", "export"])
+    )
+    manager = GDPRComplianceManager(security_manager, PrivacyUtils())
+    manager.record_consent(USER_ID, "conversation_memory", True)
+    return manager
+
+
+@pytest.fixture
+def exporter(gdpr_manager, tmp_path):
+    """Exporter with small chunks so several flushes happen"""
+    return GDPRStreamingExporter(gdpr_manager, chunk_size=10, export_dir=str(tmp_path))
+
+
+def _parse_ndjson(data: bytes):
+    return [json.loads(line) for line in data.decode("utf-8").splitlines() if line]
+
+
+class TestStreamingExport:
+    """Test cases for GDPRStreamingExporter encoders"""
+
+    def test_ndjson_contains_every_record(self, exporter, session_factory):
+        """Test NDJSON export is complete and scoped to the user"""
+        session = session_factory()
+        chunks = list(exporter.iter_ndjson(USER_ID, session))
+        session.close()
+
+        lines = _parse_ndjson(b"".join(chunks))
+        types = [line["type"] for line in lines]
+
+        assert len(chunks) > 2
+        assert types[0] == "metadata"
+        assert types.count("chat_history") == 25
+        assert types.count("user_sessions") == 3
+        assert types[-2:] == ["consent_records", "processing_info"]
+        assert all(line["data"]["user_message"] != "not mine"
+                   for line in lines if line["type"] == "chat_history")
+
+    def test_ndjson_anonymizes_on_the_fly(self, exporter, session_factory):
+        """Test PII is scrubbed when anonymization is requested"""
+        session = session_factory()
+        data = b"".join(exporter.iter_ndjson(USER_ID, session, anonymize=True))
+        session.close()
+
+        assert b"me@example.com" not in data
+        assert USER_ID.encode() not in data
+
+    def test_zip_contains_json_document(self, exporter, session_factory):
+        """Test zipped JSON export matches the dictionary export shape"""
+        session = session_factory()
+        data = b"".join(exporter.iter_zip(USER_ID, session))
+        session.close()
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            document = json.loads(archive.read("export.json"))
+
+        assert len(document["chat_history"]) == 25
+        assert len(document["user_sessions"]) == 3
+        assert document["context_cache"] == []
+        assert document["consent_records"][0]["purpose"] == "conversation_memory"
+
+    def test_export_requires_permission(self, gdpr_manager, session_factory):
+        """Test users without export permission are refused"""
+        gdpr_manager.security_manager._access_policies.clear()
+        exporter = GDPRStreamingExporter(gdpr_manager)
+        session = session_factory()
+
+        with pytest.raises(PermissionError):
+            list(exporter.iter_ndjson(USER_ID, session))
+        session.close()
+
+
+class TestStreamingRequests:
+    """Test cases for request tracking and background jobs"""
+
+    def test_stream_access_request_completes_request(self, gdpr_manager, session_factory):
+        """Test request status is completed after the stream is consumed"""
+        request_id = gdpr_manager.submit_data_subject_request(USER_ID, DataSubjectRightType.ACCESS)
+        session = session_factory()
+
+        stream = gdpr_manager.stream_access_request(request_id, session)
+        assert gdpr_manager._data_requests[request_id].status == RequestStatus.PENDING
+        size = sum(len(chunk) for chunk in stream)
+        session.close()
+
+        request = gdpr_manager._data_requests[request_id]
+        assert request.status == RequestStatus.COMPLETED
+        assert request.response_data["export_size"] == size
+
+    def test_stream_portability_rejects_wrong_type(self, gdpr_manager, session_factory):
+        """Test portability streaming validates the request type"""
+        request_id = gdpr_manager.submit_data_subject_request(USER_ID, DataSubjectRightType.ACCESS)
+
+        with pytest.raises(ValueError):
+            gdpr_manager.stream_portability_request(request_id, session_factory())
+
+    def test_background_job_resumes_from_checkpoint(self, exporter, gdpr_manager, session_factory):
+        """Test an interrupted job resumes without duplicating records"""
+        request_id = gdpr_manager.submit_data_subject_request(
+            USER_ID, DataSubjectRightType.DATA_PORTABILITY
+        )
+        job = exporter.create_job(request_id)
+
+        calls = {"count": 0}
+        original = exporter._serialize
+
+        def failing_serialize(section, row, anonymize):
+            calls["count"] += 1
+            if calls["count"] == 15:
+                raise RuntimeError("connection lost")
+            return original(section, row, anonymize)
+
+        exporter._serialize = failing_serialize
+        job = exporter.run_job(job.job_id, session_factory)
+        assert job.status == RequestStatus.PENDING.value
+        assert job.records_written == 10
+
+        exporter._serialize = original
+        exporter._jobs.clear()
+        job = exporter.run_job(job.job_id, session_factory)
+
+        assert job.status == RequestStatus.COMPLETED.value
+        with open(job.output_path, "rb") as f:
+            lines = _parse_ndjson(f.read())
+        assert [line["type"] for line in lines].count("chat_history") == 25
+        assert [line["type"] for line in lines].count("metadata") == 1
+        assert gdpr_manager._data_requests[request_id].status == RequestStatus.COMPLETED
+
+    def test_cancelled_job_is_requeued(self, exporter, gdpr_manager, session_factory):
+        """Test a job cancelled mid-run is checkpointed as pending and then completes"""
+        request_id = gdpr_manager.submit_data_subject_request(USER_ID, DataSubjectRightType.ACCESS)
+        job = exporter.create_job(request_id)
+
+        original = exporter._serialize
+
+        def cancelled_serialize(section, row, anonymize):
+            raise asyncio.CancelledError()
+
+        exporter._serialize = cancelled_serialize
+        with pytest.raises(asyncio.CancelledError):
+            exporter.run_job(job.job_id, session_factory)
+
+        exporter._jobs.clear()
+        reloaded = exporter.get_job(job.job_id)
+        assert reloaded.status == RequestStatus.PENDING.value
+        assert reloaded.error == "CancelledError"
+        assert gdpr_manager._data_requests[request_id].status == RequestStatus.PENDING
+
+        exporter._serialize = original
+        assert exporter.run_job(job.job_id, session_factory).status == RequestStatus.COMPLETED.value
+
+    def test_background_zip_job(self, exporter, gdpr_manager, session_factory):
+        """Test zip jobs compress the finished NDJSON"""
+        request_id = gdpr_manager.submit_data_subject_request(USER_ID, DataSubjectRightType.ACCESS)
+        job = exporter.create_job(request_id, export_format="zip")
+
+        job = exporter.run_job(job.job_id, session_factory)
+
+        assert job.output_path.endswith(".zip")
+        with zipfile.ZipFile(job.output_path) as archive:
+            lines = _parse_ndjson(archive.read("export.ndjson"))
+        assert lines[0]["type"] == "metadata"
@@ -0,0 +1,186 @@
+"""
+Tests for the end-to-end load-test harness
+"""
+
+import asyncio
+import random
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI, Cookie, Form, HTTPException
+from langchain_core.messages import HumanMessage, ToolMessage
+from sqlalchemy import create_engine, text
+
+from backend.load_testing import (
+    LatencyDistribution, StubChatModel, StubTool, LoadTestConfig, SeededData,
+    default_workload, run_load_test, compare_reports, seed_database, asgi_lifespan, disable_rate_limits
+)
+from backend.middleware_pipeline import setup_middleware_pipeline
+
+SEEDED = SeededData(customers=["alice", "bob"], admins=["root"], password="secret")
+
+
+def _fake_app():
+    """Stands in for main.app with the routes of the default workload"""
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.started = True
+        yield
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.started = False
+    sessions = {}
+
+    def user(token):
+        if token not in sessions:
+            raise HTTPException(status_code=403, detail="Not authenticated")
+        return sessions[token]
+
+    @app.post("/login")
+    async def login(username: str = Form(...), password: str = Form(...)):
+        if password != SEEDED.password:
+            raise HTTPException(status_code=401)
+        token = f"token-{username}-{len(sessions)}"
+        sessions[token] = username
+        return {"access_token": token}
+
+    @app.post("/chat")
+    async def chat(body: dict, session_token: str = Cookie(None)):
+        user(session_token)
+        await asyncio.sleep(0.02)
+        return {"summary": body["query"]}
+
+    @app.get("/chat/context")
+    async def context(limit: int, session_token: str = Cookie(None)):
+        user(session_token)
+        return {"limit": limit}
+
+    @app.get("/api/analytics/unified-dashboard")
+    async def analytics(period: str, session_token: str = Cookie(None)):
+        raise HTTPException(status_code=500)
+
+    @app.get("/api/admin/dashboard")
+    async def dashboard(session_token: str = Cookie(None)):
+        if user(session_token) not in SEEDED.admins:
+            raise HTTPException(status_code=403)
+        return {}
+
+    return app
+
+
+class TestStubs:
+    """Test cases for the latency distributions and the stub LLM and tools"""
+
+    def test_latency_distributions(self):
+        """Test specs parse and lognormal draws match the requested median and p99"""
+        with pytest.raises(ValueError):
+            LatencyDistribution.parse("gamma:1")
+        with pytest.raises(ValueError):
+            LatencyDistribution.parse("uniform:0.1")
+
+        rng = random.Random(7)
+        samples = sorted(LatencyDistribution.parse("lognormal:0.2,1.0").sample(rng) for _ in range(20000))
+
+        assert samples[10000] == pytest.approx(0.2, rel=0.05)
+        assert samples[19800] == pytest.approx(1.0, rel=0.1)
+        assert LatencyDistribution.parse("fixed:0.05").sample(rng) == 0.05
+
+    def test_stub_llm_calls_a_tool_then_answers_deterministically(self):
+        """Test bound tools are called on the first turn and the answer follows the result"""
+        llm = StubChatModel(latency="fixed:0", tool_call_ratio=1.0).bind_tools([StubTool(name="BTSupportHours")])
+        question = [HumanMessage(content="What are your support hours?")]
+
+        first = llm.invoke(question)
+        call = first.tool_calls[0]
+        answer = llm.invoke(question + [first, ToolMessage(content="8-8", tool_call_id=call["id"], name=call["name"])])
+
+        assert call["name"] == "BTSupportHours" and call["args"] == {"query": "What are your support hours?"}
+        assert answer.content.startswith("Summary: ") and not answer.tool_calls
+        assert llm.invoke(question).tool_calls == first.tool_calls
+        assert StubTool(name="Search", latency="fixed:0")("router") == "Search result for: router"
+
+
+class TestLoadTestRun:
+    """Test cases for driving the workload"""
+
+    @pytest.mark.asyncio
+    async def test_open_loop_run_reports_per_endpoint_percentiles(self):
+        """Test the schedule, session roles, warm-up exclusion and the report layout"""
+        app = _fake_app()
+        config = LoadTestConfig(rps=200, duration_seconds=0.5, warmup_seconds=0.1, sessions=2, workload=default_workload())
+
+        async with asgi_lifespan(app):
+            assert app.state.started
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+                report = await run_load_test(client, config, SEEDED)
+
+        endpoints = report["endpoints"]
+        assert report["total"]["requests"] == 100
+        assert sum(summary["requests"] for summary in endpoints.values()) == 100
+        assert endpoints["chat"]["p50_ms"] >= 20
+        assert endpoints["chat"]["p50_ms"] <= endpoints["chat"]["p95_ms"] <= endpoints["chat"]["p99_ms"]
+        assert endpoints["admin_dashboard"]["status_codes"] == {"200": endpoints["admin_dashboard"]["requests"]}
+        assert endpoints["analytics"]["error_rate"] == 1.0
+        assert endpoints["analytics"]["slo"]["p99_ms"] == 2000
+        assert set(endpoints["login"]["status_codes"]) <= {"200"}
+        assert report["achieved_rps"] > 100
+
+    @pytest.mark.asyncio
+    async def test_run_through_rate_limited_pipeline(self):
+        """Test logins and chat from the one harness address get through once limits are disabled"""
+        app = _fake_app()
+        setup_middleware_pipeline(app, rate_limit_per_minute=60, login_rate_limit_per_minute=5)
+        config = LoadTestConfig(rps=200, duration_seconds=0.5, warmup_seconds=0, sessions=2,
+                                workload=[spec for spec in default_workload() if spec.name in ("login", "chat")])
+
+        assert disable_rate_limits(app)
+        async with asgi_lifespan(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+                report = await run_load_test(client, config, SEEDED)
+
+        endpoints = report["endpoints"]
+        assert endpoints["login"]["requests"] > 5
+        assert set(endpoints["login"]["status_codes"]) == {"200"}
+        assert set(endpoints["chat"]["status_codes"]) == {"200"}
+        assert not disable_rate_limits(FastAPI())
+
+
+class TestReports:
+    """Test cases for comparing reports across commits"""
+
+    def test_regressions_beyond_tolerance_are_listed(self):
+        """Test slower percentiles, lower throughput and more errors are flagged"""
+        def report(p99, rps, error_rate):
+            return {"endpoints": {"chat": {"p50_ms": 100, "p95_ms": 200, "p99_ms": p99,
+                                           "throughput_rps": rps, "error_rate": error_rate}}}
+
+        baseline = report(300, 10.0, 0.0)
+
+        assert compare_reports(baseline, report(320, 9.5, 0.005), tolerance=0.1) == []
+        regressions = compare_reports(baseline, report(400, 8.0, 0.05), tolerance=0.1)
+        assert [line.split(":")[0] for line in regressions] == ["chat p99_ms", "chat throughput_rps", "chat error_rate"]
+
+
+class TestSeeding:
+    """Test cases for seeding the database"""
+
+    def test_seeds_sqlite_once(self, tmp_path):
+        """Test users, history and tickets are created and reseeding is skipped"""
+        from backend.unified_auth import auth_service
+        engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+
+        seeded = seed_database(engine, customers=3, admins=1, history_per_user=10, tickets_per_user=2)
+        again = seed_database(engine, customers=3, admins=1, history_per_user=10, tickets_per_user=2)
+
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT COUNT(*) FROM unified_chat_history")).scalar() == 30
+            assert connection.execute(text("SELECT COUNT(*) FROM unified_tickets")).scalar() == 6
+            admin_flags = connection.execute(text("SELECT is_admin FROM unified_users ORDER BY user_id")).scalars().all()
+            password_hash = connection.execute(text("SELECT password_hash FROM unified_users LIMIT 1")).scalar()
+        assert sorted(admin_flags) == [False, False, False, True]
+        assert auth_service.verify_password(seeded.password, password_hash)
+        assert (seeded.history_rows, again.history_rows) == (30, 0)
+        assert again.customers == seeded.customers
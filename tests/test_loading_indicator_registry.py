@@ -0,0 +1,114 @@
+"""
+Tests for the per-session loading indicator registry and its shared ticker
+"""
+
+import asyncio
+
+import pytest
+
+from intelligent_chat.loading_indicators import (
+    LoadingIndicatorManager, LoadingConfiguration, TimingWheel, ToolType
+)
+from intelligent_chat.visual_feedback import VisualFeedbackSystem
+from intelligent_chat.models import LoadingState
+
+
+def _manager(duration=0.04, steps=2):
+    manager = LoadingIndicatorManager(tick_interval=0.01, cleanup_delay=0.02)
+    manager.register_tool_configuration("search", LoadingConfiguration(
+        tool_type=ToolType.SEARCH,
+        estimated_duration=duration,
+        progress_steps=[f"Step {i}" for i in range(steps)]
+    ))
+    return manager
+
+
+class TestTimingWheel:
+    """Test cases for the timing wheel"""
+
+    def test_timers_fire_on_their_tick_across_revolutions(self):
+        """Test timers beyond one revolution wait for their tick and rescheduling replaces"""
+        wheel = TimingWheel(tick_interval=1.0, slots=4)
+        wheel.schedule("near", 2.0, "a")
+        wheel.schedule("far", 6.0, "b")
+        wheel.schedule("moved", 1.0, "c")
+        wheel.schedule("moved", 3.0, "d")
+        wheel.schedule("gone", 1.0, "e")
+        assert wheel.cancel("gone")
+
+        fired = {tick: wheel.advance() for tick in range(1, 8)}
+
+        assert fired[2] == [("near", "a")]
+        assert fired[3] == [("moved", "d")]
+        assert fired[6] == [("far", "b")]
+        assert sum(len(due) for due in fired.values()) == 3
+        assert len(wheel) == 0
+
+
+class TestSessionRegistry:
+    """Test cases for indicators keyed by session and tool"""
+
+    @pytest.mark.asyncio
+    async def test_sessions_running_the_same_tool_are_independent(self):
+        """Test one session's progress and completion leave the other's indicator alone"""
+        manager = LoadingIndicatorManager()
+        manager.start_loading("search", ToolType.SEARCH, session_id="alice")
+        manager.start_loading("search", ToolType.SEARCH, session_id="bob")
+
+        await manager.update_progress("search", 0.5, "Halfway", session_id="alice")
+        manager.complete_loading("search", False, session_id="bob")
+
+        assert manager.get_indicator("search", "alice").progress == 0.5
+        assert manager.get_indicator("search", "bob").state == LoadingState.ERROR
+        assert manager.is_loading("search", "alice") and not manager.is_loading("search", "bob")
+        assert manager.get_loading_summary()["sessions"] == 2
+        manager.manual_cleanup("search", "alice")
+        manager.manual_cleanup("search", "bob")
+
+
+class TestSharedTicker:
+    """Test cases for the single progress ticker"""
+
+    @pytest.mark.asyncio
+    async def test_one_task_drives_every_indicator_in_batches(self):
+        """Test hundreds of indicators add a single task and advance in per-tick batches"""
+        manager = _manager()
+        batches = []
+        manager.add_batch_callback(batches.append)
+        before = len(asyncio.all_tasks())
+
+        for i in range(300):
+            manager.start_loading("search", session_id=f"session_{i}")
+
+        assert len(asyncio.all_tasks()) - before == 1
+        await asyncio.sleep(0.1)
+
+        assert max(len(batch) for batch in batches) == 300
+        assert all(indicator.progress == 1.0 for indicator in manager.get_active_indicators())
+        assert {update.session_id for batch in batches for update in batch} == {f"session_{i}" for i in range(300)}
+
+        for i in range(300):
+            manager.complete_loading("search", session_id=f"session_{i}")
+        await asyncio.sleep(0.08)
+
+        assert manager.get_active_indicators() == []
+        assert manager._ticker_task.done()
+
+    @pytest.mark.asyncio
+    async def test_feedback_system_updates_each_session_once_per_batch(self):
+        """Test a batch of updates refreshes the UI state once per affected session"""
+        feedback = VisualFeedbackSystem()
+        refreshed = []
+        feedback.add_ui_callback(lambda state: refreshed.append(state.metadata["session_id"]))
+        feedback._active_sessions = {"alice": ["search", "lookup"], "bob": ["search"]}
+
+        updates = []
+        for session_id, tool_name in (("alice", "search"), ("alice", "lookup"), ("bob", "search")):
+            feedback.loading_manager.start_loading(tool_name, ToolType.SEARCH, session_id=session_id)
+            updates.append(feedback.loading_manager._advance_step((session_id, tool_name)))
+        refreshed.clear()
+        await feedback.loading_manager._notify_batch_callbacks(updates)
+
+        assert refreshed == ["alice", "bob"]
+        feedback.cleanup_session("alice")
+        feedback.cleanup_session("bob")
@@ -37,7 +37,7 @@ class TestLoadingIndicatorManager:
         assert indicator.state == LoadingState.LOADING
         assert indicator.progress == 0.0
         assert indicator.estimated_time > 0
-        assert "test_tool" in manager._active_indicators
+        assert manager._active_indicators[(None, "test_tool")] is indicator
     
     def test_start_loading_custom_message(self, manager):
         """Test starting loading with custom message."""
@@ -148,7 +148,7 @@ class TestContextEntry:
                 source="test_source",
                 relevance_score=0.5,
                 context_type="invalid_type"
-            )
+            ).validate()
     
     def test_context_entry_validation_invalid_relevance_score(self):
         """Test validation fails for invalid relevance score"""
@@ -158,7 +158,7 @@ class TestContextEntry:
                 source="test_source",
                 relevance_score=2.0,
                 context_type="conversation"
-            )
+            ).validate()
     
     def test_context_entry_to_dict(self):
         """Test converting context entry to dictionary"""
@@ -0,0 +1,109 @@
+"""
+Tests for the hot-path microbenchmark suite
+"""
+
+import time
+
+from backend.microbenchmarks import (
+    Benchmark, Workload, get_benchmark, run_benchmark, scaling_exponent, compare_results
+)
+
+
+def _sleeping_benchmark(seconds_per_op):
+    def setup(size, rng):
+        def run():
+            time.sleep(size * seconds_per_op)
+            return size
+        return run
+    return Benchmark("sleep", "time.sleep", "sleep per entry", setup)
+
+
+def _allocating_benchmark(bytes_per_op):
+    def setup(size, rng):
+        def op(index):
+            bytearray(bytes_per_op)
+            return 1
+
+        def run():
+            for index in range(size):
+                op(index)
+            return size
+        return Workload(run, op)
+    return Benchmark("allocate", "bytearray", "allocate per entry", setup)
+
+
+class TestRunBenchmark:
+    """Test cases for timing a benchmark across corpus sizes"""
+
+    def test_reports_rate_allocations_and_scaling(self):
+        """Test each size gets ops/sec and allocation figures and the curve a slope"""
+        summary = run_benchmark(get_benchmark("anonymize_text"), sizes=(100, 10), min_time=0.01)
+
+        assert [result["size"] for result in summary["results"]] == [10, 100]
+        for result in summary["results"]:
+            assert result["operations"] == result["size"]
+            assert result["ops_per_sec"] > 0 and result["ns_per_op"] > 0
+            assert result["peak_alloc_bytes"] >= 0 and "alloc_bytes_per_op" in result
+        assert summary["scaling_exponent"] is not None
+        assert summary["target"] == "PrivacyUtils.anonymize_text"
+
+    def test_allocations_are_per_operation_at_any_size(self):
+        """Test bytes per op do not shrink with the corpus and a 10x regression is flagged"""
+        def report(bytes_per_op):
+            summary = run_benchmark(_allocating_benchmark(bytes_per_op), sizes=(100, 1000, 10000),
+                                    min_time=0, max_passes=1)
+            return {"benchmarks": {"allocate": summary}}
+
+        baseline = report(100)
+        current = report(1000)
+
+        for result in baseline["benchmarks"]["allocate"]["results"]:
+            assert 100 <= result["alloc_bytes_per_op"] < 400
+        flagged = [line.split(":")[0] for line in compare_results(baseline, current)]
+        assert [label for label in flagged if label.endswith("alloc_bytes_per_op")] == [
+            f"allocate[{size}] alloc_bytes_per_op" for size in (100, 1000, 10000)
+        ]
+
+    def test_sizes_over_the_pass_budget_are_skipped(self):
+        """Test sizes whose estimated pass exceeds the budget are not run"""
+        summary = run_benchmark(_sleeping_benchmark(0.0005), sizes=(10, 100, 1000), min_time=0,
+                                max_pass_seconds=0.3, measure_allocations=False)
+
+        assert [result["size"] for result in summary["results"]] == [10, 100]
+        assert summary["skipped_sizes"] == [1000]
+
+    def test_unavailable_targets_are_reported(self):
+        """Test a benchmark whose module cannot be imported is marked instead of failing"""
+        def setup(size, rng):
+            raise ImportError("missing dependency")
+
+        summary = run_benchmark(Benchmark("broken", "x", "y", setup), sizes=(10,))
+
+        assert summary["error"] == "unavailable: missing dependency"
+        assert summary["results"] == []
+
+
+class TestScalingAndComparison:
+    """Test cases for scaling curves and baseline comparison"""
+
+    def test_scaling_exponent(self):
+        """Test linear and quadratic curves have slopes 1 and 2"""
+        assert scaling_exponent([(100, 0.001), (1000, 0.01), (10000, 0.1)]) == 1.0
+        assert scaling_exponent([(100, 0.001), (1000, 0.1)]) == 2.0
+        assert scaling_exponent([(100, 0.001)]) is None
+
+    def test_regressions_beyond_tolerance_are_listed(self):
+        """Test slower or more allocating sizes are flagged and noise is not"""
+        def report(ops, alloc):
+            return {"benchmarks": {"score_tools": {"results": [
+                {"size": 100, "ops_per_sec": ops, "alloc_bytes_per_op": alloc},
+                {"size": 1000, "ops_per_sec": 1000.0, "alloc_bytes_per_op": 10.0},
+            ]}}}
+
+        baseline = report(1000.0, 500.0)
+
+        assert compare_results(baseline, report(900.0, 560.0), tolerance=0.15) == []
+        regressions = compare_results(baseline, report(700.0, 700.0), tolerance=0.15)
+        assert [line.split(":")[0] for line in regressions] == [
+            "score_tools[100] ops_per_sec", "score_tools[100] alloc_bytes_per_op"
+        ]
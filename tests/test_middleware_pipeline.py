@@ -0,0 +1,214 @@
+"""
+Tests for the consolidated ASGI middleware pipeline
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.middleware_pipeline import (
+    MiddlewarePipeline, RouteTable, PayloadScanner, FixedWindowRateLimiter, setup_middleware_pipeline,
+    ROUTE_STATIC, ROUTE_HEALTH, ROUTE_PUBLIC, ROUTE_LOGIN, ROUTE_API, ROUTE_ADMIN, ROUTE_PAGE
+)
+from backend.unified_error_handler import UnifiedErrorHandler
+
+
+class FakeUser:
+    username = "alice"
+    is_admin = False
+    role = None
+
+    def has_permission(self, permission):
+        return False
+
+
+def _app(**options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/items")
+    async def items(q: str = ""):
+        return {"q": q}
+
+    @app.post("/api/echo")
+    async def echo(payload: dict):
+        return payload
+
+    @app.get("/api/stream")
+    async def stream():
+        async def chunks():
+            for index in range(3):
+                yield f"chunk-{index}\n"
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/api/fail")
+    async def fail():
+        raise ValueError("boom")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    options.setdefault("error_handler", UnifiedErrorHandler())
+    setup_middleware_pipeline(app, **options)
+    return app
+
+
+class TestRouteTable:
+    """Test cases for route classification"""
+
+    def test_longest_prefix_wins(self):
+        """Test prefixes sharing a start are told apart and "/" only matches exactly"""
+        table = RouteTable()
+
+        assert table.classify("/static/app.js") == ROUTE_STATIC
+        assert table.classify("/admin-static/admin.css") == ROUTE_STATIC
+        assert table.classify("/health/detailed") == ROUTE_HEALTH
+        assert table.classify("/") == ROUTE_PUBLIC
+        assert table.classify("/login.html") == ROUTE_PUBLIC
+        assert table.classify("/login") == ROUTE_LOGIN
+        assert table.classify("/api/auth/token") == ROUTE_LOGIN
+        assert table.classify("/api/chat") == ROUTE_API
+        assert table.classify("/admin/users") == ROUTE_ADMIN
+        assert table.classify("/chat.html") == ROUTE_PAGE
+
+
+class TestPayloadScanner:
+    """Test cases for the combined security pattern"""
+
+    def test_single_pass_matches_every_pattern(self):
+        """Test each original pattern is still detected and clean values pass"""
+        scanner = PayloadScanner()
+        for value in ("<script>alert(1)</script>", "javascript:void(0)", "<img onerror=x>",
+                      "1 UNION SELECT password", "../../etc/passwd"):
+            assert scanner.contains_malicious_content(value), value
+
+        assert scanner.first_match([("accept", "application/json"), ("x-note", "hello")]) is None
+        assert scanner.first_match([("accept", "text/html"), ("x-evil", "javascript:x")]) == "x-evil"
+
+
+class TestRateLimiter:
+    """Test cases for the fixed window limiter"""
+
+    def test_previous_window_counts_then_ages_out(self):
+        """Test the limit covers the previous window and stale clients are pruned"""
+        now = [0.0]
+        limiter = FixedWindowRateLimiter(limit=3, clock=lambda: now[0])
+        assert all(limiter.allow("1.1.1.1") for _ in range(3))
+        assert not limiter.allow("1.1.1.1")
+
+        now[0] = 61
+        assert not limiter.allow("1.1.1.1")
+
+        now[0] = 125
+        assert limiter.allow("2.2.2.2")
+        assert limiter.allow("1.1.1.1")
+        now[0] = 250
+        limiter.allow("3.3.3.3")
+        assert len(limiter) == 1
+
+
+class TestMiddlewarePipeline:
+    """Test cases for the pipeline stages"""
+
+    def test_validation_and_security_headers(self):
+        """Test plain-text queries pass, markup is rejected unless opted out, and JSON responses get security headers"""
+        client = TestClient(_app())
+        lenient = TestClient(_app(reject_suspicious=False))
+
+        ok = client.get("/api/items", params={"q": "how do I update my plan"},
+                        headers={"Cookie": "session_token=abc", "Referer": "http://testserver/chat?conversation_id=5"})
+        logged = lenient.get("/api/items", params={"q": "<script>alert(1)</script>"})
+        rejected = client.get("/api/items", params={"q": "<script>alert(1)</script>"})
+
+        assert ok.status_code == 200 and ok.json() == {"q": "how do I update my plan"}
+        assert ok.headers["x-frame-options"] == "DENY"
+        assert client.get("/api/items", params={"q": "1 union select password"}).status_code == 200
+        assert logged.status_code == 200
+        assert rejected.status_code == 400
+        assert rejected.json() == {"detail": "Invalid query parameter content: q"}
+
+    def test_json_body_is_checked_and_replayed(self):
+        """Test the body read for validation still reaches the route, invalid JSON does not"""
+        client = TestClient(_app())
+
+        echoed = client.post("/api/echo", json={"message": "hello"})
+        invalid = client.post("/api/echo", content=b"{not json", headers={"Content-Type": "application/json"})
+
+        assert echoed.json() == {"message": "hello"}
+        assert invalid.status_code == 400 and invalid.json() == {"detail": "Invalid JSON format"}
+
+    def test_streaming_response_passes_through(self):
+        """Test streamed chunks arrive unchanged and untouched by security headers"""
+        client = TestClient(_app())
+
+        response = client.get("/api/stream")
+
+        assert response.text == "chunk-0\nchunk-1\nchunk-2\n"
+        assert "x-frame-options" not in response.headers
+
+    def test_errors_become_unified_responses(self):
+        """Test route exceptions are turned into error responses with a request id"""
+        client = TestClient(_app())
+
+        response = client.get("/api/fail")
+
+        assert response.status_code == 400
+        assert response.json()["error"] is True
+        assert response.headers["x-request-id"] == response.json()["request_id"]
+
+    def test_rate_limits_skip_health_checks(self):
+        """Test clients over the limit get 429 while health checks keep answering"""
+        client = TestClient(_app(rate_limit_per_minute=2))
+
+        statuses = [client.get("/api/items").status_code for _ in range(3)]
+
+        assert statuses == [200, 200, 429]
+        assert client.get("/health").status_code == 200
+        assert all(TestClient(_app(rate_limit_per_minute=0)).get("/api/items").status_code == 200 for _ in range(100))
+
+    def test_baseline_limits_apply_by_default(self):
+        """Test the sixth login in a minute is refused without any configuration"""
+        client = TestClient(_app())
+
+        statuses = [client.post("/login", data={"username": "a", "password": "b"}).status_code for _ in range(6)]
+
+        assert 429 not in statuses[:5] and statuses[5] == 429
+
+    def test_rate_limits_count_sessions_and_forwarded_clients(self):
+        """Test sessions sharing an address and clients behind a trusted proxy are counted apart"""
+        client = TestClient(_app(rate_limit_per_minute=1, trusted_proxies=["testclient"]))
+
+        first = client.get("/api/items", headers={"Cookie": "session_token=a"})
+        second = client.get("/api/items", headers={"Cookie": "session_token=b"})
+        forwarded = [client.get("/api/items", headers={"X-Forwarded-For": f"10.0.0.{index}, testclient"}).status_code
+                     for index in (1, 2, 1)]
+
+        assert (first.status_code, second.status_code) == (200, 200)
+        assert forwarded == [200, 200, 429]
+
+    def test_auth_stage(self):
+        """Test protected routes need a user and public routes do not"""
+        def user_loader(session_token, authorization):
+            return FakeUser() if authorization == "Bearer good" else None
+        client = TestClient(_app(auth_enabled=True, user_loader=user_loader), follow_redirects=False)
+
+        assert client.get("/api/items").status_code == 401
+        assert client.get("/api/items", headers={"Authorization": "Bearer good"}).status_code == 200
+        assert client.get("/health").status_code == 200
+        admin = client.get("/admin/users", headers={"Authorization": "Bearer good"})
+        assert admin.status_code == 302 and "access_denied" in admin.headers["location"]
+
+    def test_setup_is_idempotent(self):
+        """Test the legacy setup helpers share one pipeline layer"""
+        from backend.error_middleware import setup_error_middleware
+        from backend.request_validation_middleware import setup_request_validation_middleware
+
+        app = FastAPI()
+        setup_request_validation_middleware(app)
+        handler = UnifiedErrorHandler()
+        setup_error_middleware(app, handler)
+
+        layers = [middleware for middleware in app.user_middleware if middleware.cls is MiddlewarePipeline]
+        assert len(layers) == 1
+        assert layers[0].kwargs["error_handler"] is handler
@@ -0,0 +1,168 @@
+"""
+Tests for the streaming table copy mode of the PostgreSQL migration script
+"""
+
+import pytest
+from sqlalchemy import (
+    create_engine, text, MetaData, Table, Column, Integer, String, ForeignKey
+)
+
+from scripts.migrate_to_postgresql import (
+    DatabaseMigrator, MigrationConfig, encode_copy_value, encode_copy_rows
+)
+
+
+def _define_tables(metadata):
+    Table("parents", metadata,
+          Column("id", Integer, primary_key=True),
+          Column("name", String(50)))
+    Table("children", metadata,
+          Column("id", Integer, primary_key=True),
+          Column("parent_id", Integer, ForeignKey("parents.id")),
+          Column("note", String(50)))
+    Table("tags", metadata,
+          Column("id", Integer, primary_key=True),
+          Column("label", String(50)))
+
+
+@pytest.fixture
+def migrator(temp_dir):
+    """Migrator streaming between two SQLite databases"""
+    source = create_engine(f"sqlite:///{temp_dir}/source.db")
+    target = create_engine(f"sqlite:///{temp_dir}/target.db")
+
+    source_metadata = MetaData()
+    _define_tables(source_metadata)
+    source_metadata.create_all(source)
+    with source.begin() as conn:
+        conn.execute(text("INSERT INTO parents (id, name) VALUES (:id, :name)"),
+                     [{"id": i, "name": f"parent {i}"} for i in range(1, 51)])
+        conn.execute(text("INSERT INTO children (id, parent_id, note) VALUES (:id, :p, :n)"),
+                     [{"id": i, "p": (i % 50) + 1, "n": f"note\t{i}"} for i in range(1, 121)])
+
+    target_metadata = MetaData()
+    _define_tables(target_metadata)
+    target_metadata.create_all(target)
+
+    config = MigrationConfig(
+        sqlite_url=str(source.url),
+        postgresql_url=str(target.url),
+        backup_dir=f"{temp_dir}/backups",
+        batch_size=16,
+        streaming=True,
+        parallel_tables=2,
+    )
+    migrator = DatabaseMigrator(config)
+    migrator.sqlite_engine = source
+    migrator.postgresql_engine = target
+    migrator.migration_order = ["parents", "children", "tags", "missing_table"]
+
+    yield migrator
+
+    source.dispose()
+    target.dispose()
+
+
+def _count(engine, table_name):
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+
+
+class TestCopyEncoding:
+    """Test cases for COPY text format encoding"""
+
+    def test_special_values(self):
+        """Test NULL, boolean, bytea and JSON encoding"""
+        assert encode_copy_value(None) == "\\N"
+        assert encode_copy_value(True) == "t"
+        assert encode_copy_value(b"\x00\xff") == "\\\\x00ff"
+        assert encode_copy_value({"a": 1}) == '{"a": 1}'
+
+    def test_text_escaping(self):
+        """Test delimiters and backslashes are escaped"""
+        assert encode_copy_value("a\\b\tc\nd\re\x00") == "a\\\\b\\tc\\nd\\re"
+
+    def test_rows_payload(self):
+        """Test rows are tab separated and newline terminated"""
+        payload = encode_copy_rows([{"id": 1, "name": None}, {"id": 2, "name": "x"}], ["id", "name"])
+
+        assert payload == b"1\t\\N\n2\tx\n"
+
+    def test_json_column_scalars_and_null(self):
+        """Test JSON column values are serialized even when scalar or null"""
+        rows = [
+            {"id": 1, "data": "text"},
+            {"id": 2, "data": 5},
+            {"id": 3, "data": None},
+            {"id": 4, "data": {"a": "b\tc"}},
+        ]
+
+        payload = encode_copy_rows(rows, ["id", "data"], frozenset({"data"}))
+
+        assert payload.decode("utf-8").splitlines() == [
+            '1\t"text"',
+            "2\t5",
+            "3\tnull",
+            '4\t{"a": "b\\\\tc"}',
+        ]
+
+
+class TestStreamingMigration:
+    """Test cases for streaming table copies"""
+
+    def test_iter_table_batches(self, migrator):
+        """Test source rows are streamed in fixed-size batches"""
+        batches = list(migrator.iter_table_batches("children"))
+
+        assert [len(rows) for _, rows in batches] == [16] * 7 + [8]
+        assert batches[-1][0] == 120
+        assert list(migrator.iter_table_batches("missing_table")) == []
+
+    def test_plan_table_waves(self, migrator):
+        """Test foreign-key dependents are placed after their parents"""
+        waves = migrator.plan_table_waves(["parents", "children", "tags"])
+
+        assert waves == [["parents", "tags"], ["children"]]
+
+    def test_streaming_migration_copies_all_rows(self, migrator):
+        """Test every table is copied and checkpointed as completed"""
+        results = migrator.migrate_tables_streaming()
+
+        by_table = {result.table_name: result for result in results}
+        assert by_table["parents"].migrated_count == 50
+        assert by_table["children"].migrated_count == 120
+        assert all(result.success for result in results)
+        assert _count(migrator.postgresql_engine, "children") == 120
+        assert migrator.get_checkpoint("children")["completed"] is True
+
+    def test_resume_continues_after_last_checkpoint(self, migrator):
+        """Test an interrupted table resumes without duplicating rows"""
+        migrator._ensure_checkpoint_table()
+        original = migrator._load_batch
+        calls = {"count": 0}
+
+        def interrupted_load(*args, **kwargs):
+            calls["count"] += 1
+            if calls["count"] == 3:
+                raise RuntimeError("connection lost")
+            return original(*args, **kwargs)
+
+        migrator._load_batch = interrupted_load
+        result = migrator.migrate_table_streaming("parents")
+        assert result.success is False
+        assert migrator.get_checkpoint("parents")["rows_copied"] == 32
+
+        migrator._load_batch = original
+        result = migrator.migrate_table_streaming("parents")
+
+        assert result.success is True
+        assert result.migrated_count == 50
+        assert _count(migrator.postgresql_engine, "parents") == 50
+
+    def test_completed_tables_are_skipped(self, migrator):
+        """Test rerunning a finished migration copies nothing twice"""
+        migrator.migrate_tables_streaming()
+        results = migrator.migrate_tables_streaming()
+
+        assert all(result.success for result in results)
+        assert _count(migrator.postgresql_engine, "parents") == 50
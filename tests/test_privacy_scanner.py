@@ -0,0 +1,123 @@
+"""
+Tests for the single-pass PII scanner and batch anonymization
+"""
+
+import pytest
+
+from privacy_utils import PrivacyUtils, PIIScanner, AnonymizationConfig
+
+
+class TestPIIScanner:
+    """Test cases for PIIScanner"""
+
+    @pytest.fixture
+    def scanner(self):
+        """Create scanner over the default PII patterns"""
+        return PIIScanner(PrivacyUtils.PII_PATTERNS)
+
+    def test_scan_finds_all_types_in_text_order(self, scanner):
+        """Test that one pass detects every PII type in order"""
+        text = ("Mail john.doe@example.com, call 555-123-4567, "
+                "server 192.168.1.1, see https://example.com/help")
+
+        detections = scanner.scan(text)
+
+        assert [d["type"] for d in detections] == ["email", "phone", "ip_address", "url"]
+        assert detections[0]["value"] == "john.doe@example.com"
+        assert all(text[d["start"]:d["end"]] == d["value"] for d in detections)
+
+    def test_detections_do_not_overlap(self, scanner):
+        """Test that ambiguous spans are reported once"""
+        detections = scanner.scan("card 4111 1111 1111 1111 on file")
+
+        assert len(detections) == 1
+        assert detections[0]["type"] == "credit_card"
+
+    def test_redact_uses_placeholders(self, scanner):
+        """Test placeholder redaction"""
+        redacted = scanner.redact("write to a@b.com now")
+
+        assert redacted == "write to [EMAIL] now"
+
+    def test_redact_with_replacer(self, scanner):
+        """Test custom replacement callback"""
+        redacted = scanner.redact("a@b.com", lambda value, pii_type: pii_type.upper())
+
+        assert redacted == "EMAIL"
+
+
+class TestPrivacyUtilsSinglePass:
+    """Test cases for PrivacyUtils backed by the scanner"""
+
+    @pytest.fixture
+    def privacy_utils(self):
+        """Create PrivacyUtils instance for testing"""
+        return PrivacyUtils(AnonymizationConfig(preserve_structure=True))
+
+    def test_detect_pii(self, privacy_utils):
+        """Test email and phone detection"""
+        detected = privacy_utils.detect_pii("Contact me at john.doe@example.com or call 555-123-4567")
+
+        assert len(detected) == 2
+        assert {d["type"] for d in detected} == {"email", "phone"}
+
+    def test_anonymize_text_preserves_structure(self, privacy_utils):
+        """Test structured replacement of several matches"""
+        text = "john@example.com / 555-123-4567 / jane@example.org"
+
+        anonymized = privacy_utils.anonymize_text(text)
+
+        assert anonymized == "xxxx@xxxxxxxxxxx / xxx-xxx-xxxx / xxxx@xxxxxxxxxxx"
+
+    def test_anonymize_text_placeholders(self):
+        """Test placeholder replacement when structure is not preserved"""
+        utils = PrivacyUtils(AnonymizationConfig(preserve_structure=False))
+
+        assert utils.anonymize_text("ip 10.0.0.1") == "ip [IP_ADDRESS]"
+
+    def test_long_transcript(self, privacy_utils):
+        """Test that every occurrence in a long transcript is removed"""
+        text = "hello john@example.com and 555-123-4567. " * 2000
+
+        anonymized = privacy_utils.anonymize_text(text)
+
+        assert "john@example.com" not in anonymized
+        assert "555-123-4567" not in anonymized
+        assert len(anonymized) == len(text)
+
+
+class TestBatchAnonymization:
+    """Test cases for anonymize_conversations_batch"""
+
+    def _conversations(self, count):
+        return [
+            {
+                "user_id": f"user_{i % 7}",
+                "session_id": f"session_{i}",
+                "user_message": f"my email is user{i}@example.com",
+                "bot_response": "Thanks, noted",
+                "context_used": ["call 555-123-4567"]
+            }
+            for i in range(count)
+        ]
+
+    def test_batch_matches_single_in_process(self):
+        """Test small batches run in-process with identical output"""
+        utils = PrivacyUtils()
+        conversations = self._conversations(10)
+
+        batch = utils.anonymize_conversations_batch(conversations)
+
+        assert batch == [utils.anonymize_conversation_data(c) for c in conversations]
+
+    def test_batch_process_pool_preserves_order(self):
+        """Test process pool fan-out keeps input order and hashing"""
+        utils = PrivacyUtils()
+        utils.BATCH_PARALLEL_THRESHOLD = 1
+        conversations = self._conversations(60)
+
+        batch = utils.anonymize_conversations_batch(conversations, max_workers=2, chunk_size=16)
+
+        assert len(batch) == 60
+        assert batch == [utils.anonymize_conversation_data(c) for c in conversations]
+        assert all("example.com" not in c["user_message"] for c in batch)
@@ -0,0 +1,145 @@
+"""
+Tests for chat pipeline stage tracing and the Prometheus metrics endpoint
+"""
+
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.request_tracing import (
+    StageMetrics, RequestTrace, ServerTimingMiddleware, metrics_router,
+    trace_stage, traced, record_stage, current_trace, get_stage_metrics,
+    STAGE_AUTH, STAGE_CACHE_LOOKUP, STAGE_CONTEXT, STAGE_RESPONSE, STAGE_CHAT_TOTAL
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    """Start every test with empty stage histograms and no shared cached answers"""
+    from backend.intelligent_chat.semantic_cache import get_semantic_response_cache
+
+    get_semantic_response_cache().clear()
+    get_stage_metrics().reset()
+    yield
+    get_stage_metrics().reset()
+
+
+def _app(mode: str) -> FastAPI:
+    app = FastAPI()
+
+    @traced(STAGE_AUTH)
+    async def authenticate():
+        return "user"
+
+    @app.get("/work")
+    async def work():
+        await authenticate()
+        with trace_stage(STAGE_RESPONSE):
+            pass
+        return {"stages": list(current_trace().totals())}
+
+    app.add_middleware(ServerTimingMiddleware, mode=mode)
+    app.include_router(metrics_router)
+    return app
+
+
+class TestStageMetrics:
+    """Test cases for stage histograms"""
+
+    def test_prometheus_rendering(self):
+        """Test buckets are cumulative and end with +Inf, sum and count"""
+        metrics = StageMetrics(buckets=(0.01, 0.1))
+        metrics.observe("auth", 0.005)
+        metrics.observe("auth", 0.05)
+        metrics.observe("auth", 2.0)
+
+        lines = metrics.render_prometheus().splitlines()
+
+        assert "# TYPE chat_stage_duration_seconds histogram" in lines
+        assert 'chat_stage_duration_seconds_bucket{stage="auth",le="0.01"} 1' in lines
+        assert 'chat_stage_duration_seconds_bucket{stage="auth",le="0.1"} 2' in lines
+        assert 'chat_stage_duration_seconds_bucket{stage="auth",le="+Inf"} 3' in lines
+        assert 'chat_stage_duration_seconds_count{stage="auth"} 3' in lines
+
+    def test_summary_and_stage_limit(self):
+        """Test percentiles use bucket bounds and stages are bounded"""
+        metrics = StageMetrics(buckets=(0.01, 0.1), max_stages=2)
+        for stage in ("a", "b", "c", "d"):
+            metrics.observe(stage, 0.05)
+
+        summary = metrics.summary()
+
+        assert set(summary) == {"a", "b", "other"}
+        assert summary["other"]["count"] == 2
+        assert summary["a"]["p95_le_ms"] == 100.0
+
+    def test_server_timing_format(self):
+        """Test repeated stages are summed and names made header safe"""
+        trace = RequestTrace()
+        trace.add("tool.Support KB", 0.002)
+        trace.add("tool.Support KB", 0.003)
+
+        assert trace.server_timing() == "tool.Support_KB;dur=5.00"
+
+    def test_span_overhead(self):
+        """Test a span costs a few microseconds, far below 1% of a request"""
+        iterations = 20000
+        start = time.perf_counter()
+        for _ in range(iterations):
+            with trace_stage("overhead"):
+                pass
+        per_span = (time.perf_counter() - start) / iterations
+
+        assert per_span < 50e-6
+
+
+class TestServerTiming:
+    """Test cases for the tracing middleware and metrics endpoint"""
+
+    def test_header_on_request(self):
+        """Test Server-Timing is only sent to clients that ask for it"""
+        client = TestClient(_app("request"))
+
+        plain = client.get("/work")
+        timed = client.get("/work", headers={"X-Server-Timing": "1"})
+
+        assert "server-timing" not in plain.headers
+        header = timed.headers["server-timing"]
+        assert header.startswith("auth;dur=")
+        assert "response_generation;dur=" in header and "total;dur=" in header
+        assert timed.json()["stages"] == [STAGE_AUTH, STAGE_RESPONSE]
+
+    def test_metrics_endpoint(self):
+        """Test /metrics exposes the stages recorded by requests"""
+        client = TestClient(_app("off"))
+        client.get("/work")
+
+        response = client.get("/metrics")
+
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'chat_stage_duration_seconds_count{stage="auth"} 1' in response.text
+
+    def test_no_trace_outside_requests(self):
+        """Test spans outside a request only feed the histograms"""
+        record_stage(STAGE_CACHE_LOOKUP, 0.001)
+
+        assert current_trace() is None
+        assert get_stage_metrics().summary()[STAGE_CACHE_LOOKUP]["count"] == 1
+
+
+class TestChatManagerStages:
+    """Test cases for the instrumented chat pipeline"""
+
+    @pytest.mark.asyncio
+    async def test_process_message_records_stages(self):
+        """Test a chat turn records its pipeline stages"""
+        from backend.intelligent_chat.chat_manager import ChatManager
+
+        manager = ChatManager()
+        await manager.process_message("What are your support hours?", "user-1", "session-1")
+
+        stages = get_stage_metrics().summary()
+        for stage in (STAGE_CACHE_LOOKUP, STAGE_CONTEXT, STAGE_RESPONSE, STAGE_CHAT_TOTAL):
+            assert stages[stage]["count"] == 1
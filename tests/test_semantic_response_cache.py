@@ -0,0 +1,161 @@
+"""
+Tests for the semantic response cache shared across users
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from backend.intelligent_chat.models import ChatResponse, ContentType, ContextEntry, ToolResult
+from backend.intelligent_chat.semantic_cache import (
+    SemanticResponseCache, normalize_query, get_semantic_response_cache
+)
+
+
+def _response(content="Our support team is available 8am to 8pm, seven days a week.",
+              tools=("BTSupportHours",), confidence=0.9, session_id="session-a"):
+    return ChatResponse(
+        content=content,
+        content_type=ContentType.PLAIN_TEXT,
+        tools_used=list(tools),
+        confidence_score=confidence,
+        execution_time=1.5,
+        ui_hints={"session_id": session_id, "cached": False}
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSemanticResponseCache:
+    """Test cases for paraphrase matching and cacheability"""
+
+    def test_paraphrases_share_an_entry(self):
+        """Test normalized paraphrases hit the same entry across sessions"""
+        cache = SemanticResponseCache()
+        assert normalize_query("What are your support hours?") == normalize_query("support hours please")
+
+        assert cache.store("What are your support hours?", _response())
+        hit = cache.lookup("support hours please", session_id="session-b")
+
+        assert hit.content.startswith("Our support team")
+        assert hit.ui_hints["session_id"] == "session-b"
+        assert hit.ui_hints["semantic_cache"] == {"intent": "support_hours", "similarity": 1.0}
+        assert cache.get_stats()["exact_hits"] == 1
+
+    def test_similar_query_above_threshold(self):
+        """Test near-duplicates match by similarity and distinct topics do not"""
+        cache = SemanticResponseCache(threshold=0.7)
+        cache.store("How do I reset my broadband router to factory settings?",
+                    _response("Hold the reset button for 20 seconds.", tools=("SupportKnowledgeBase",)))
+
+        hit = cache.lookup("reset the broadband router back to factory settings")
+        miss = cache.lookup("how do I install the wifi extender app")
+
+        assert hit is not None and 0.7 <= hit.ui_hints["semantic_cache"]["similarity"] < 1.0
+        assert miss is None
+        assert cache.get_stats()["similar_hits"] == 1
+
+    def test_user_specific_answers_are_not_shared(self):
+        """Test personal queries, personal tools and echoed history are never cached"""
+        cache = SemanticResponseCache()
+        history = [ContextEntry(content="I called at 9pm and nobody answered", source="session_a",
+                                relevance_score=1.0, timestamp=datetime.now(timezone.utc),
+                                context_type="user_message")]
+
+        assert not cache.store("Why is my bill higher this month?", _response())
+        assert not cache.store("What are your opening hours?", _response(tools=("ContextRetriever",)))
+        assert not cache.store("What are your opening hours?", _response(tools=()))
+        assert not cache.store("What are your opening hours?",
+                               _response(content="You said: I called at 9pm and nobody answered"), history)
+        assert len(cache) == 0
+        assert cache.lookup("Why is my bill higher this month?") is None
+
+    def test_per_intent_ttl_and_lru_bound(self):
+        """Test entries expire on their intent's TTL and the cache stays bounded"""
+        clock = FakeClock()
+        cache = SemanticResponseCache(max_entries=2, clock=clock)
+        cache.store("support hours", _response())
+        cache.store("how do I reset my router", _response(tools=("SupportKnowledgeBase",)))
+
+        clock.now += 901
+        assert cache.lookup("reset router") is None
+        assert cache.lookup("support hours") is not None
+
+        cache.store("install wifi extender", _response(tools=("SupportKnowledgeBase",)))
+        cache.store("restart hub", _response(tools=("SupportKnowledgeBase",)))
+        assert len(cache) == 2
+        assert cache.lookup("support hours") is None
+
+    def test_knowledge_entry_writes_invalidate(self):
+        """Test writes to knowledge rows drop knowledge-based answers"""
+        Base = declarative_base()
+
+        class Knowledge(Base):
+            __tablename__ = "knowledge"
+            id = Column(Integer, primary_key=True)
+            title = Column(String(100))
+
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+
+        cache = SemanticResponseCache()
+        cache.register_knowledge_listeners([Knowledge])
+        try:
+            cache.store("what are your support hours", _response())
+            entry = Knowledge(title="Support hours")
+            session.add(entry)
+            session.commit()
+            assert cache.lookup("support hours") is None
+
+            cache.store("what are your support hours", _response())
+            session.delete(entry)
+            session.commit()
+            assert cache.lookup("support hours") is None
+            assert cache.get_stats()["invalidations"] == 2
+        finally:
+            cache.unregister_listeners()
+            session.close()
+
+
+class TestChatManagerSemanticCache:
+    """Test cases for the cache in front of the chat pipeline"""
+
+    @pytest.fixture(autouse=True)
+    def clean_cache(self):
+        get_semantic_response_cache().clear()
+        yield
+        get_semantic_response_cache().clear()
+
+    @pytest.mark.asyncio
+    async def test_paraphrase_skips_tool_execution(self):
+        """Test a second user asking a paraphrase is answered without running tools"""
+        from backend.intelligent_chat.chat_manager import ChatManager
+
+        class Orchestrator:
+            calls = 0
+
+            async def execute_tools(self, tools, query, context):
+                Orchestrator.calls += 1
+                return [ToolResult(tool_name="BTSupportHours", success=True, result="8am-8pm", execution_time=0.2)]
+
+            async def select_tools(self, query, context):
+                return []
+
+        manager = ChatManager(tool_orchestrator=Orchestrator())
+        first = await manager.process_message("What are your support hours?", "user-1", "session-1")
+        second = await manager.process_message("support hours please", "user-2", "session-2")
+
+        assert Orchestrator.calls == 1
+        assert second.content == first.content
+        assert second.ui_hints["cached"] is True
+        assert second.ui_hints["session_id"] == "session-2"
+        assert manager.get_session_stats("user-2", "session-2")["message_count"] == 1
@@ -0,0 +1,132 @@
+"""
+Tests for the bounded chat session state store
+"""
+
+from backend.intelligent_chat.session_store import (
+    MessageRecord, MessageRing, SessionState, SessionStateStore, InMemorySessionBackend,
+    SESSION_BASE_BYTES
+)
+from backend.intelligent_chat.chat_manager import ChatManager
+from backend.intelligent_chat.models import ChatResponse, ContentType
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMessageRing:
+    """Test cases for the fixed-size history"""
+
+    def test_wraps_and_keeps_latest_in_order(self):
+        """Test the oldest records are overwritten and iteration stays chronological"""
+        ring = MessageRing(3)
+        replaced = [ring.append(MessageRecord("user_message", f"m{i}")) for i in range(5)]
+
+        assert [record.content for record in ring] == ["m2", "m3", "m4"]
+        assert [record.content for record in ring.tail(2)] == ["m3", "m4"]
+        assert [record.content for record in replaced if record] == ["m0", "m1"]
+        assert not hasattr(MessageRecord("user_message", "x"), "__dict__")
+
+
+class TestSessionStateStore:
+    """Test cases for eviction and accounting"""
+
+    def test_lru_and_memory_budget(self):
+        """Test the least recently used session goes first when count or budget is exceeded"""
+        evicted = []
+        store = SessionStateStore(max_sessions=3, memory_budget_bytes=16_000, on_evict=evicted.append)
+        for name in ("a", "b", "c"):
+            store.get_or_create("user", name)
+        store.get_session("user", "a")
+        store.get_or_create("user", "d")
+
+        assert [state.session_id for state in evicted] == ["b"]
+        assert list(store) == ["user:c", "user:a", "user:d"]
+
+        busy = store.get_session("user", "c")
+        for i in range(10):
+            busy.record_exchange("question " * 50, "answer " * 100)
+            store.save(busy)
+
+        assert store.memory_bytes <= 16_000
+        assert "user:c" in store and len(store) < 3
+        assert store.memory_bytes == sum(state.size_bytes for state in store.values())
+
+    def test_idle_sessions_expire(self):
+        """Test sessions idle past the TTL are evicted while recent ones stay"""
+        clock = FakeClock()
+        store = SessionStateStore(idle_ttl_seconds=60, clock=clock)
+        store.get_or_create("user", "old")
+        clock.now = 30
+        store.get_or_create("user", "recent")
+        clock.now = 70
+
+        assert store.evict_idle() == 1
+        assert list(store) == ["user:recent"]
+        assert store.get_stats()["evicted_idle"] == 1
+
+    def test_shared_backend_between_workers(self):
+        """Test a session saved by one worker is loaded with its history by another"""
+        backend = InMemorySessionBackend()
+        worker_a = SessionStateStore(backend=backend)
+        worker_b = SessionStateStore(backend=backend)
+
+        state = worker_a.get_or_create("user", "shared")
+        state.record_exchange("my router is down", "restart it", ["RouterTool"], 0.9, 1.2)
+        worker_a.save(state)
+        loaded = worker_b.get_session("user", "shared")
+
+        assert loaded.message_count == 1
+        assert [record.content for record in loaded.history] == ["my router is down", "restart it"]
+        assert loaded.history.tail(1)[0].tools_used == ("RouterTool",)
+        del worker_b["user:shared"]
+        assert worker_a.backend.load("user:shared") is None
+
+    def test_stale_local_copy_is_refreshed_before_use(self):
+        """Test a worker's older copy is replaced by a newer save of another worker"""
+        clock = FakeClock()
+        backend = InMemorySessionBackend()
+        worker_a = SessionStateStore(backend=backend, local_ttl_seconds=1, clock=clock)
+        worker_b = SessionStateStore(backend=backend, local_ttl_seconds=1, clock=clock)
+
+        first = worker_a.get_or_create("user", "shared")
+        first.record_exchange("my router is down", "restart it")
+        worker_a.save(first)
+        second = worker_b.get_session("user", "shared")
+        second.record_exchange("still down", "book an engineer")
+        worker_b.save(second)
+
+        assert worker_a.get_session("user", "shared") is first
+        clock.now = 2
+        current = worker_a.get_session("user", "shared")
+        current.record_exchange("when will they come", "tomorrow")
+        worker_a.save(current)
+
+        assert current is not first and current.version == 3
+        assert backend.load("user:shared")["message_count"] == 3
+        assert worker_a.get_stats()["refreshed"] == 1
+
+
+class TestChatManagerSessions:
+    """Test cases for ChatManager on the session store"""
+
+    def test_history_is_bounded_and_idle_sessions_are_small(self):
+        """Test long sessions keep 20 messages and a fresh session stays tiny"""
+        manager = ChatManager(auto_create_context_engine=False)
+        manager._ensure_session("user", "idle")
+        manager._ensure_session("user", "busy")
+        response = ChatResponse(content="ok", content_type=ContentType.PLAIN_TEXT, tools_used=["tool"])
+        for i in range(30):
+            manager._update_session_state("user", "busy", f"message {i}", response)
+
+        busy = manager._active_sessions["user:busy"]
+        idle = manager._active_sessions["user:idle"]
+        assert len(busy.history) == 20
+        assert busy["conversation_history"][-2]["content"] == "message 29"
+        assert manager.get_session_stats("user", "busy")["message_count"] == 30
+        assert idle.size_bytes < SESSION_BASE_BYTES + 64
+        assert isinstance(idle, SessionState)
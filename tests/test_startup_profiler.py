@@ -0,0 +1,117 @@
+"""
+Tests for startup profiling and the fast-start warm-up
+"""
+
+import pytest
+
+from backend.startup_profiler import (
+    StartupProfiler, parse_importtime, profile_imports, format_report,
+    TIMING_INIT, TIMING_WARMUP
+)
+from backend.unified_startup import UnifiedApplicationManager
+
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _json
+import time:      1500 |       1620 |   json.decoder
+import time:      3000 |       4620 | json
+Traceback (most recent call last):
+"""
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """Application manager whose steps only record their call order"""
+    calls = []
+    manager = UnifiedApplicationManager()
+
+    def step(name):
+        async def run():
+            calls.append(name)
+            return True
+        return run
+
+    for method in ("initialize_configuration", "initialize_error_handling", "initialize_database",
+                   "initialize_authentication", "initialize_ai_agent", "initialize_admin_dashboard",
+                   "initialize_data_sync", "initialize_voice_assistant", "initialize_analytics",
+                   "initialize_background_tasks"):
+        monkeypatch.setattr(manager, method, step(method))
+    for method in ("setup_middleware", "setup_static_files", "setup_health_checks"):
+        monkeypatch.setattr(manager, method, lambda: None)
+    manager.register_warmup("AI Components", lambda: calls.append("warmup"))
+    return manager, calls
+
+
+class TestImportProfiling:
+    """Test cases for per-module import timing"""
+
+    def test_parse_importtime(self):
+        """Test self and cumulative times and nesting depth are parsed"""
+        modules = parse_importtime(IMPORTTIME_OUTPUT)
+
+        assert [module["module"] for module in modules] == ["_json", "json.decoder", "json"]
+        assert modules[2] == {"module": "json", "self_ms": 3.0, "cumulative_ms": 4.62, "depth": 0}
+        assert modules[0]["depth"] == 2
+
+    def test_profile_imports_in_subprocess(self):
+        """Test a fresh interpreter reports the target and its direct imports"""
+        profile = profile_imports(target="json", top=5)
+
+        assert profile["returncode"] == 0
+        assert profile["import_ms"] > 0
+        assert profile["direct_imports"]
+        assert "error" not in profile
+
+    def test_report(self):
+        """Test the report lists imports, startup steps and failures"""
+        profiler = StartupProfiler()
+        profiler.record("Database", 0.25)
+        with pytest.raises(RuntimeError):
+            with profiler.measure("AI Components", TIMING_WARMUP):
+                raise RuntimeError("no api key")
+
+        report = format_report(
+            {"target": "json", "import_ms": 4.62, "wall_seconds": 0.05, "module_count": 3,
+             "direct_imports": parse_importtime(IMPORTTIME_OUTPUT)[1:2],
+             "slowest_self": parse_importtime(IMPORTTIME_OUTPUT)},
+            profiler.timings()
+        )
+
+        assert "Import of json: 4.6 ms" in report
+        assert "250.0  Database" in report
+        assert "AI Components  [failed: no api key]" in report
+        assert [entry["kind"] for entry in profiler.timings()] == [TIMING_INIT, TIMING_WARMUP]
+
+
+class TestFastStart:
+    """Test cases for deferring startup work to the warm-up"""
+
+    @pytest.mark.asyncio
+    async def test_default_startup_runs_everything(self, manager):
+        """Test without fast start every step and warm-up runs before startup returns"""
+        manager, calls = manager
+        manager.fast_start = False
+
+        await manager.startup_sequence(app=None)
+
+        assert calls[-1] == "warmup"
+        assert "initialize_data_sync" in calls
+        assert manager.warmup_task is None
+        assert set(manager.step_timings) >= {"Database", "AI Agent", "AI Components"}
+
+    @pytest.mark.asyncio
+    async def test_fast_start_defers_heavy_steps(self, manager):
+        """Test fast start returns before the deferred steps and runs them in the background"""
+        manager, calls = manager
+        manager.fast_start = True
+
+        await manager.startup_sequence(app=None)
+        deferred = {"initialize_ai_agent", "initialize_data_sync", "initialize_background_tasks"}
+        assert not deferred & set(calls)
+        assert "initialize_voice_assistant" in calls
+
+        await manager.wait_for_warmup()
+
+        assert calls[-4:] == ["warmup", "initialize_ai_agent", "initialize_data_sync",
+                              "initialize_background_tasks"]
+        assert "Background Tasks" in manager.step_timings
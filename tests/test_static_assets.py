@@ -0,0 +1,97 @@
+"""
+Tests for the precompressed, fingerprinted static asset index
+"""
+
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from backend.static_assets import StaticAssetApp, StaticAssetIndex, fingerprint_name, IMMUTABLE_CACHE_CONTROL
+
+SCRIPT = "function greet(name) { return 'Hello ' + name; }\n" * 40
+STYLE = "body { margin: 0; padding: 0; font-family: sans-serif; }\n" * 20
+PAGE = """<html><head>
+<link rel="stylesheet" href="css/site.css">
+<script src="/static/js/app.js"></script>
+<script src="https://cdn.example.com/lib.js"></script>
+</head><body><a href="other.html">Other</a></body></html>
+"""
+
+
+@pytest.fixture
+def asset_dir(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "js").mkdir()
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "css" / "site.css").write_text(STYLE)
+    (tmp_path / "js" / "app.js").write_text(SCRIPT)
+    (tmp_path / "index.html").write_text(PAGE)
+    (tmp_path / "other.html").write_text("<html></html>")
+    (tmp_path / "node_modules" / "dep.js").write_text("module.exports = 1;")
+    return tmp_path
+
+
+@pytest.fixture
+def client(asset_dir):
+    index = StaticAssetIndex(str(asset_dir), "/static").build()
+    app = Starlette(routes=[Mount("/static", app=StaticAssetApp(index))])
+    return index, TestClient(app)
+
+
+class TestStaticAssetIndex:
+    """Test cases for building the index"""
+
+    def test_fingerprints_assets_and_rewrites_html(self, asset_dir):
+        """Test assets get content-hashed names that the HTML references"""
+        index = StaticAssetIndex(str(asset_dir), "/static").build()
+        script = index.get("js/app.js")[0]
+        page = index.get("index.html")[0].variants[None].body.decode()
+
+        assert script.fingerprinted_path == fingerprint_name("js/app.js", script.digest)
+        assert index.url_for("js/app.js") in page
+        assert index.url_for("css/site.css") in page
+        assert 'href="other.html"' in page and "https://cdn.example.com/lib.js" in page
+        assert "node_modules/dep.js" not in index
+        assert gzip.decompress(script.variants["gzip"].body).decode() == SCRIPT
+        assert len(script.variants["gzip"].body) < len(SCRIPT) / 5
+        # Too small to be worth compressing
+        assert list(index.get("other.html")[0].variants) == [None]
+
+
+class TestStaticAssetApp:
+    """Test cases for serving assets from memory"""
+
+    def test_fingerprinted_names_are_immutable_and_compressed(self, client, asset_dir):
+        """Test the hashed URL is cached for a year and served gzip from memory"""
+        index, http = client
+        (asset_dir / "js" / "app.js").unlink()
+
+        response = http.get(index.url_for("js/app.js"), headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.text == SCRIPT
+
+    def test_conditional_requests_get_304(self, client):
+        """Test a matching ETag is answered without a body and original names revalidate"""
+        index, http = client
+        first = http.get("/static/css/site.css", headers={"Accept-Encoding": "identity"})
+        again = http.get("/static/css/site.css", headers={"If-None-Match": first.headers["etag"]})
+
+        assert first.headers["cache-control"] == "no-cache"
+        assert "content-encoding" not in first.headers
+        assert again.status_code == 304
+        assert again.content == b""
+        assert again.headers["etag"]
+
+    def test_unindexed_files_fall_back_to_disk(self, client):
+        """Test files outside the index are still served by StaticFiles"""
+        _, http = client
+
+        assert http.get("/static/node_modules/dep.js").text == "module.exports = 1;"
+        assert http.get("/static/missing.js").status_code == 404
@@ -12,7 +12,7 @@ from intelligent_chat.status_monitor import (
     ExecutionMetrics, StatusUpdate, Notification, RecoveryOption, ErrorVisualization
 )
 from intelligent_chat.loading_indicators import LoadingIndicatorManager, ToolType
-from intelligent_chat.models import ErrorSeverity
+from intelligent_chat.models import ErrorSeverity, LoadingState
 
 
 class TestToolExecutionMonitor:
@@ -43,10 +43,10 @@ class TestToolExecutionMonitor:
         tool_name = monitor.start_monitoring("test_tool", ToolType.DATABASE_QUERY)
         
         assert tool_name == "test_tool"
-        assert monitor._execution_status["test_tool"] == ExecutionStatus.PENDING
-        assert "test_tool" in monitor._execution_metrics
-        assert "test_tool" in monitor._status_history
-        assert len(monitor._status_history["test_tool"]) == 1
+        assert monitor._execution_status[(None, "test_tool")] == ExecutionStatus.PENDING
+        assert (None, "test_tool") in monitor._execution_metrics
+        assert (None, "test_tool") in monitor._status_history
+        assert len(monitor._status_history[(None, "test_tool")]) == 1
         
         # Check that loading indicator was started
         assert monitor.loading_manager.is_loading("test_tool")
@@ -68,7 +68,7 @@ class TestToolExecutionMonitor:
         success = await monitor.update_status("test_tool", ExecutionStatus.RUNNING, "Now running")
         assert success
         
-        assert monitor._execution_status["test_tool"] == ExecutionStatus.RUNNING
+        assert monitor._execution_status[(None, "test_tool")] == ExecutionStatus.RUNNING
         status_history = monitor.get_status_history("test_tool")
         assert len(status_history) == 2  # Initial + update
         assert status_history[-1].status == ExecutionStatus.RUNNING
@@ -87,7 +87,7 @@ class TestToolExecutionMonitor:
         
         await monitor.update_status("test_tool", ExecutionStatus.COMPLETED, "Task completed")
         
-        assert monitor._execution_status["test_tool"] == ExecutionStatus.COMPLETED
+        assert monitor._execution_status[(None, "test_tool")] == ExecutionStatus.COMPLETED
         
         # Check metrics were updated
         metrics = monitor.get_execution_metrics("test_tool")
@@ -127,7 +127,7 @@ class TestToolExecutionMonitor:
         success = monitor.complete_execution("test_tool", True, "Success!", {"result": "data"})
         assert success
         
-        assert monitor._execution_status["test_tool"] == ExecutionStatus.COMPLETED
+        assert monitor._execution_status[(None, "test_tool")] == ExecutionStatus.COMPLETED
         
         # Check final status update
         status_history = monitor.get_status_history("test_tool")
@@ -150,7 +150,7 @@ class TestToolExecutionMonitor:
         success = monitor.complete_execution("test_tool", False, "Failed!")
         assert success
         
-        assert monitor._execution_status["test_tool"] == ExecutionStatus.FAILED
+        assert monitor._execution_status[(None, "test_tool")] == ExecutionStatus.FAILED
         
         # Check notification
         notifications = monitor.get_active_notifications()
@@ -159,6 +159,22 @@ class TestToolExecutionMonitor:
         assert completion_notification.notification_type == NotificationType.ERROR
         assert not completion_notification.auto_dismiss  # Error notifications should not auto-dismiss
     
+    def test_same_tool_in_two_sessions_is_tracked_separately(self, monitor, loading_manager):
+        """Test completing one session's execution leaves the other session's running"""
+        monitor.start_monitoring("test_tool", ToolType.DATABASE_QUERY, session_id="session_a")
+        monitor.start_monitoring("test_tool", ToolType.DATABASE_QUERY, session_id="session_b")
+
+        assert monitor.complete_execution("test_tool", False, "Failed!", session_id="session_a")
+
+        assert monitor.get_execution_status("test_tool", "session_a") == ExecutionStatus.FAILED
+        assert monitor.get_execution_status("test_tool", "session_b") == ExecutionStatus.PENDING
+        assert loading_manager.get_indicator("test_tool", "session_a").state == LoadingState.ERROR
+        assert loading_manager.get_indicator("test_tool", "session_b").state == LoadingState.LOADING
+        assert len(monitor.get_status_history("test_tool", "session_b")) == 1
+        assert [n.session_id for n in monitor.get_active_notifications()
+                if n.notification_id.endswith("_completed")] == ["session_a"]
+        assert monitor.get_monitoring_summary()["tools"] == ["test_tool"]
+
     def test_complete_execution_nonexistent_tool(self, monitor):
         """Test completing execution for non-existent tool."""
         success = monitor.complete_execution("nonexistent", True)
@@ -0,0 +1,233 @@
+"""
+Tests for outbox-based sync event dispatch
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.unified_models import (
+    UnifiedUser, UnifiedTicket, UnifiedTicketComment, UnifiedChatHistory, SyncOutboxEvent,
+    TicketPriority, TicketCategory
+)
+import backend.sync_events as sync_events
+from backend.sync_events import EventDrivenSyncManager, OutboxDispatcher, OutboxStatus
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    """File-backed SQLite database shared by the writer and the dispatcher"""
+    engine = create_engine(f"sqlite:///{tmp_path}/sync.db")
+    Base.metadata.create_all(engine, tables=[
+        UnifiedUser.__table__, UnifiedTicket.__table__, UnifiedTicketComment.__table__,
+        UnifiedChatHistory.__table__, SyncOutboxEvent.__table__
+    ])
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(sync_events, "SessionLocal", factory)
+    monkeypatch.setattr(sync_events, "engine", engine)
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def manager(session_factory):
+    """Initialized manager whose listeners are removed after the test"""
+    manager = EventDrivenSyncManager()
+    manager.initialize()
+    manager.dispatcher = OutboxDispatcher(manager, session_factory, batch_size=50, max_attempts=2)
+    yield manager
+    manager.shutdown()
+
+
+def _outbox(session_factory):
+    with session_factory() as db:
+        return db.query(SyncOutboxEvent).order_by(SyncOutboxEvent.id).all()
+
+
+def _add_chats(session_factory, count, session_id="s1"):
+    with session_factory() as db:
+        for i in range(count):
+            db.add(UnifiedChatHistory(session_id=session_id, user_message=f"hello {i}", bot_response="hi"))
+        db.commit()
+
+
+class TestOutboxWrites:
+    """Test cases for writing events to the outbox"""
+
+    def test_insert_writes_outbox_row_without_event_loop(self, manager, session_factory):
+        """Test listeners enqueue instead of scheduling tasks"""
+        _add_chats(session_factory, 2)
+
+        rows = _outbox(session_factory)
+        assert [row.event_type for row in rows] == ["chat_history_changed"] * 2
+        assert rows[0].status == OutboxStatus.PENDING.value
+        assert rows[0].payload["user_message"] == "hello 0"
+        assert rows[0].entity_key == f"unified_chat_history:{rows[0].entity_id}"
+
+    def test_rollback_discards_outbox_row(self, manager, session_factory):
+        """Test the outbox row shares the writing transaction"""
+        with session_factory() as db:
+            db.add(UnifiedChatHistory(session_id="s1", user_message="gone", bot_response="x"))
+            db.flush()
+            db.rollback()
+
+        assert _outbox(session_factory) == []
+
+    def test_shutdown_removes_listeners(self, manager, session_factory):
+        """Test no events are written once the manager is shut down"""
+        manager.shutdown()
+        _add_chats(session_factory, 1)
+
+        assert _outbox(session_factory) == []
+
+
+class TestOutboxDispatcher:
+    """Test cases for OutboxDispatcher delivery"""
+
+    def test_drain_delivers_and_marks_dispatched(self, manager, session_factory):
+        """Test handlers receive every event exactly once on success"""
+        received = []
+        manager.register_event_handler("chat_history_changed", lambda data: received.append(data))
+        _add_chats(session_factory, 5)
+
+        stats = manager.dispatcher.drain_sync()
+
+        assert stats["dispatched"] == 5
+        assert len(received) == 5
+        assert received[0].new_values["user_message"] == "hello 0"
+        assert {row.status for row in _outbox(session_factory)} == {OutboxStatus.DISPATCHED.value}
+
+    def test_per_entity_order_with_parallel_entities(self, manager, session_factory):
+        """Test one entity's events run in order while entities run concurrently"""
+        with session_factory() as db:
+            user = UnifiedUser(user_id="u1", username="u1", email="u1@example.com", password_hash="x")
+            db.add(user)
+            db.flush()
+            tickets = [UnifiedTicket(title=f"t{i}", description="d", customer_id=user.id,
+                                     priority=TicketPriority.LOW, category=TicketCategory.GENERAL)
+                       for i in range(3)]
+            db.add_all(tickets)
+            db.commit()
+            for step in range(3):
+                for ticket in tickets:
+                    ticket.title = f"{ticket.id}-{step}"
+                db.commit()
+
+        seen = {}
+        active = {"now": 0, "peak": 0}
+
+        async def handler(data):
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            await asyncio.sleep(0.01)
+            seen.setdefault(data.entity_id, []).append(data.new_values["title"])
+            active["now"] -= 1
+
+        manager.register_event_handler("ticket_changed", handler)
+        manager.dispatcher.drain_sync()
+
+        for ticket_id, titles in seen.items():
+            assert titles[1:] == [f"{ticket_id}-{step}" for step in range(3)]
+        assert active["peak"] > 1
+
+    def test_failed_event_is_retried_and_blocks_later_events(self, manager, session_factory):
+        """Test at-least-once retry keeps later events for the entity waiting"""
+        with session_factory() as db:
+            chat = UnifiedChatHistory(session_id="s1", user_message="first", bot_response="x")
+            db.add(chat)
+            db.commit()
+            chat.bot_response = "second"
+            db.commit()
+
+        calls = []
+
+        def flaky(data):
+            calls.append(data.operation)
+            if len(calls) == 1:
+                raise RuntimeError("handler down")
+
+        manager.register_event_handler("chat_history_changed", flaky)
+
+        stats = manager.dispatcher.drain_sync()
+        rows = _outbox(session_factory)
+        assert stats["retried"] == 1 and stats["released"] == 1
+        assert [row.status for row in rows] == [OutboxStatus.PENDING.value] * 2
+        assert rows[0].attempts == 1 and rows[0].last_error == "handler down"
+
+        manager.dispatcher.drain_sync()
+
+        assert calls == ["insert", "insert", "update"]
+        assert {row.status for row in _outbox(session_factory)} == {OutboxStatus.DISPATCHED.value}
+
+    def test_event_parked_after_max_attempts(self, manager, session_factory):
+        """Test permanently failing events stop being retried"""
+        def broken(data):
+            raise RuntimeError("always fails")
+
+        manager.register_event_handler("chat_history_changed", broken)
+        _add_chats(session_factory, 1)
+
+        manager.dispatcher.drain_sync()
+        manager.dispatcher.drain_sync()
+        stats = manager.dispatcher.drain_sync()
+
+        assert stats["claimed"] == 0
+        assert _outbox(session_factory)[0].status == OutboxStatus.FAILED.value
+        assert manager.dispatcher.get_stats() == {OutboxStatus.FAILED.value: 1}
+
+    @pytest.mark.asyncio
+    async def test_run_purges_old_dispatched_events(self, manager, session_factory):
+        """Test the polling loop deletes dispatched events past the retention window"""
+        manager.register_event_handler("chat_history_changed", lambda data: None)
+        _add_chats(session_factory, 2)
+        await manager.dispatcher.drain()
+        with session_factory() as db:
+            old = db.query(SyncOutboxEvent).order_by(SyncOutboxEvent.id).first()
+            old.dispatched_at = datetime.now(timezone.utc) - timedelta(hours=48)
+            db.commit()
+
+        manager.dispatcher.poll_interval = 0.01
+        manager.dispatcher.start()
+        await asyncio.sleep(0.1)
+        await manager.dispatcher.stop()
+
+        assert len(_outbox(session_factory)) == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_database_work_runs_off_the_event_loop(self, manager, session_factory):
+        """Test claiming and recording run in worker threads while the loop keeps running"""
+        manager.register_event_handler("chat_history_changed", lambda data: None)
+        _add_chats(session_factory, 2)
+        dispatcher = manager.dispatcher
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def tracked(method):
+            def wrapper(*args):
+                threads.append(threading.get_ident())
+                time.sleep(0.05)
+                return method(*args)
+            return wrapper
+
+        dispatcher.claim_batch = tracked(dispatcher.claim_batch)
+        dispatcher._record_results = tracked(dispatcher._record_results)
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        stats = await dispatcher.dispatch_batch()
+        ticking.cancel()
+
+        assert stats["dispatched"] == 2
+        assert len(threads) == 2 and loop_thread not in threads
+        assert len(ticks) >= 5
@@ -0,0 +1,203 @@
+"""
+Tests for the partitioned DataSyncService event processor
+"""
+
+import asyncio
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from backend.data_sync_service import (
+    DataSyncService, PartitionedSyncProcessor, SyncEvent, SyncEventType
+)
+
+
+def _event(entity_id, event_type=SyncEventType.USER_DATA_UPDATE, **data):
+    return SyncEvent(
+        event_type=event_type,
+        entity_id=entity_id,
+        entity_type="user",
+        timestamp=datetime.now(timezone.utc),
+        data=data
+    )
+
+
+class Recorder:
+    """Batch handler that records what each call received"""
+
+    def __init__(self, delay=0.0, fail_on=None):
+        self.batches = []
+        self.delay = delay
+        self.fail_on = fail_on
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, events):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.batches.append(events)
+        self.active -= 1
+        return sum(1 for event in events if event.entity_id == self.fail_on)
+
+    def seen(self, entity_id):
+        return [event.data.get("seq") for batch in self.batches
+                for event in batch if event.entity_id == entity_id]
+
+
+class TestPartitionedSyncProcessor:
+    """Test cases for PartitionedSyncProcessor"""
+
+    def test_lane_assignment_is_stable(self):
+        """Test an entity always maps to the same lane"""
+        processor = PartitionedSyncProcessor(Recorder(), num_lanes=8)
+
+        lanes = {processor.lane_for(_event(42)) for _ in range(5)}
+
+        assert len(lanes) == 1
+        assert len({processor.lane_for(_event(i)) for i in range(100)}) == 8
+
+    def test_coalesce_collapses_consecutive_events_per_entity(self):
+        """Test redundant events merge without reordering an entity's events"""
+        processor = PartitionedSyncProcessor(Recorder())
+        items = [
+            (1.0, _event(1, a=1)),
+            (2.0, _event(2, seq=0)),
+            (3.0, _event(1, b=2)),
+            (4.0, _event(1, SyncEventType.CONVERSATION_UPDATE)),
+            (5.0, _event(1, c=3)),
+        ]
+
+        result = processor.coalesce(items)
+
+        entity_one = [(t, e.event_type, e.data) for t, e in result if e.entity_id == 1]
+        assert entity_one == [
+            (1.0, SyncEventType.USER_DATA_UPDATE, {"a": 1, "b": 2}),
+            (4.0, SyncEventType.CONVERSATION_UPDATE, {}),
+            (5.0, SyncEventType.USER_DATA_UPDATE, {"c": 3}),
+        ]
+        assert processor.get_stats()["coalesced"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lanes_preserve_order_and_run_concurrently(self):
+        """Test per-entity order holds while lanes overlap"""
+        recorder = Recorder(delay=0.01)
+        processor = PartitionedSyncProcessor(recorder, num_lanes=4, batch_size=3,
+                                             coalesce_window=0)
+        processor.start()
+        for seq in range(6):
+            for entity_id in range(8):
+                processor.submit(_event(entity_id, SyncEventType(
+                    ["user_data_update", "conversation_update"][seq % 2]), seq=seq))
+        await processor.stop(drain=True)
+
+        for entity_id in range(8):
+            assert recorder.seen(entity_id) == list(range(6))
+        assert recorder.peak > 1
+        stats = processor.get_stats()
+        assert stats["processed"] == 48
+        assert stats["queue_depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_submit_from_other_threads(self):
+        """Test producers on worker threads wake the lanes"""
+        recorder = Recorder()
+        processor = PartitionedSyncProcessor(recorder, num_lanes=2, coalesce_window=0)
+        processor.start()
+
+        threads = [threading.Thread(target=processor.submit, args=(_event(i, seq=i),))
+                   for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for _ in range(100):
+            if processor.get_stats()["processed"] == 10:
+                break
+            await asyncio.sleep(0.01)
+        await processor.stop()
+
+        assert processor.get_stats()["processed"] == 10
+
+    @pytest.mark.asyncio
+    async def test_full_lanes_defer_events_and_failures_counted(self):
+        """Test full lanes defer events in order and failures reach the stats"""
+        recorder = Recorder(fail_on=7)
+        processor = PartitionedSyncProcessor(recorder, num_lanes=1, batch_size=2, max_queue_size=5)
+
+        accepted = [processor.submit(_event(i, seq=i)) for i in range(8)]
+        assert accepted == [True] * 5 + [False] * 3
+        stats = processor.get_stats()
+        assert stats["lane_depths"] == [5]
+        assert stats["overflow_depth"] == 3
+        assert stats["queue_depth"] == 8
+        assert stats["oldest_pending_age_seconds"] >= 0
+
+        await processor.drain()
+
+        stats = processor.get_stats()
+        assert stats["deferred"] == 3
+        assert stats["failed"] == 1
+        assert stats["processed"] == 7
+        assert stats["queue_depth"] == 0
+        assert [e.entity_id for b in recorder.batches for e in b] == list(range(8))
+
+    def test_events_after_a_deferral_keep_their_order(self):
+        """Test an entity's events queue behind its deferred ones once the lane has room"""
+        processor = PartitionedSyncProcessor(Recorder(), num_lanes=1, batch_size=1, max_queue_size=1)
+
+        processor.submit(_event(1, seq=1))
+        processor.submit(_event(1, seq=2))
+        processor._take(processor.lanes[0])
+        processor.submit(_event(1, seq=3))
+
+        lane = processor.lanes[0]
+        assert [event.data["seq"] for _, event in lane.pending] == [2]
+        assert [event.data["seq"] for _, event in lane.overflow] == [3]
+
+
+class TestDataSyncServiceProcessing:
+    """Test cases for DataSyncService batch processing"""
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_retries_individually(self, monkeypatch):
+        """Test one bad event does not fail the rest of its batch"""
+        service = DataSyncService(num_lanes=2)
+        commits = []
+
+        class FakeSession:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+            def commit(self):
+                commits.append(1)
+
+        monkeypatch.setattr("backend.data_sync_service.SessionLocal", FakeSession)
+        original = service._apply_sync_event
+
+        def apply(db, event):
+            if event.entity_id == 2:
+                raise RuntimeError("bad row")
+            original(db, event)
+
+        service._apply_sync_event = apply
+
+        failed = await service._process_sync_batch([_event(1), _event(2), _event(3)])
+
+        assert failed == 1
+        assert len(commits) == 2
+
+    def test_stats_expose_processor_metrics(self):
+        """Test queue depth is reported through the service stats"""
+        service = DataSyncService()
+        service._queue_sync_event(_event(1))
+
+        stats = service.get_stats()
+
+        assert stats["recent_events"] == 1
+        assert stats["processor"]["queue_depth"] == 1
+        assert stats["processor"]["lanes"] == 4
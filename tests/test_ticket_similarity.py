@@ -0,0 +1,228 @@
+"""
+Tests for the ticket similarity index and duplicate detection
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.unified_models import (
+    UnifiedUser, UnifiedTicket, UnifiedTicketActivity, UnifiedTicketComment, UnifiedChatHistory,
+    UnifiedChatSession, UnifiedCustomerSatisfaction, TicketStatus
+)
+from backend.ticket_similarity import (
+    TicketSimilarityIndex, ModelTicketIndex, tokenize, open_tickets_for
+)
+import backend.data_sync_service as data_sync_module
+from backend.data_sync_service import DataSyncService
+
+
+TICKETS = {
+    1: "Broadband connection keeps dropping every evening",
+    2: "Internet connection drops each evening since Monday",
+    3: "Charged twice on my latest invoice",
+    4: "Cannot log in to my account after password reset",
+    5: "Mobile data roaming not working in France",
+}
+
+
+@pytest.fixture
+def index():
+    """Index holding a few support tickets"""
+    index = TicketSimilarityIndex()
+    for ticket_id, text in TICKETS.items():
+        index.add(ticket_id, text, {"status": "open", "customer_id": ticket_id % 2})
+    return index
+
+
+class TestTicketSimilarityIndex:
+    """Test cases for TicketSimilarityIndex"""
+
+    def test_tokenize_normalizes_terms(self):
+        """Test stop words are dropped and inflections share a stem"""
+        assert tokenize("The connection keeps DROPPING") == ["connection", "keep", "dropp"]
+        assert tokenize("drops") == tokenize("drop")
+
+    def test_paraphrase_ranks_first(self, index):
+        """Test a reworded complaint finds the matching tickets"""
+        results = index.query("my broadband connection drops in the evening", limit=3)
+
+        assert [result.ticket_id for result in results][:2] == [1, 2]
+        assert results[0].score > results[-1].score
+
+    def test_short_keyword_query(self, index):
+        """Test single-term queries are served from term postings"""
+        results = index.query("invoice")
+
+        assert [result.ticket_id for result in results] == [3]
+
+    def test_update_and_remove(self, index):
+        """Test re-adding replaces a ticket and removal drops it everywhere"""
+        index.add(3, "Roaming charges in Spain", {"status": "open"})
+        assert index.query("invoice") == []
+        assert 3 in [result.ticket_id for result in index.query("roaming")]
+
+        index.remove(3)
+
+        assert 3 not in index
+        assert all(3 not in bucket for bucket in index._buckets.values())
+
+    def test_duplicates_respect_threshold_and_filter(self, index):
+        """Test duplicate detection only returns close, matching tickets"""
+        text = "Cannot log in to my account after a password reset"
+
+        assert [d.ticket_id for d in index.find_duplicates(text, threshold=0.8)] == [4]
+        assert index.find_duplicates(text, threshold=0.8, where=open_tickets_for(customer_id=1)) == []
+        index.update_metadata(4, status="resolved")
+        assert index.find_duplicates(text, where=open_tickets_for()) == []
+
+    def test_lookup_does_not_score_every_ticket(self):
+        """Test candidate generation keeps lookups sub-linear"""
+        index = TicketSimilarityIndex()
+        for ticket_id in range(2000):
+            index.add(ticket_id, f"customer {ticket_id} issue topic{ticket_id % 400} "
+                                 f"detail{ticket_id} code{ticket_id * 7}")
+        scored = []
+        original = index._cosine
+        index._cosine = lambda weights, norm, ticket_id: scored.append(ticket_id) or original(weights, norm, ticket_id)
+
+        results = index.query("issue topic17 detail417")
+
+        assert results[0].ticket_id == 417
+        assert len(scored) < 100
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    """SQLite database with unified tickets and conversations"""
+    engine = create_engine(f"sqlite:///{tmp_path}/tickets.db")
+    Base.metadata.create_all(engine, tables=[
+        UnifiedUser.__table__, UnifiedTicket.__table__, UnifiedTicketActivity.__table__,
+        UnifiedTicketComment.__table__, UnifiedChatHistory.__table__, UnifiedChatSession.__table__,
+        UnifiedCustomerSatisfaction.__table__
+    ])
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(data_sync_module, "SessionLocal", factory)
+    with factory() as db:
+        db.add(UnifiedUser(user_id="u1", username="u1", email="u1@example.com", password_hash="x"))
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def model_index(session_factory, monkeypatch):
+    """Unified ticket index with listeners, used by the data sync service"""
+    model_index = ModelTicketIndex(UnifiedTicket, refresh_interval=3600)
+    model_index.register_listeners()
+    monkeypatch.setattr(data_sync_module, "get_ticket_index", lambda model: model_index)
+    yield model_index
+    model_index.unregister_listeners()
+
+
+class TestModelTicketIndex:
+    """Test cases for the database-bound index"""
+
+    def test_build_listen_and_refresh(self, session_factory, model_index):
+        """Test rows are indexed on build, on write and on refresh"""
+        with session_factory() as db:
+            db.add(UnifiedTicket(title="Router lights flashing red", description="No internet", customer_id=1))
+            db.commit()
+            assert model_index.sync(db) == 1
+
+            db.add(UnifiedTicket(title="Refund for duplicate invoice", description="Billing", customer_id=1))
+            db.commit()
+            assert [m.ticket_id for m in model_index.query(db, "refund")] == [2]
+
+            model_index.unregister_listeners()
+            ticket = db.get(UnifiedTicket, 1)
+            ticket.status = TicketStatus.RESOLVED
+            db.commit()
+            assert model_index.index._metadata[1]["status"] == "open"
+            model_index.sync(db, force=True)
+
+        assert model_index.index._metadata[1]["status"] == "resolved"
+
+    def test_index_follows_commits_rollbacks_and_deletes(self, session_factory, model_index):
+        """Test writes reach the index only on commit and deleted tickets leave it"""
+        with session_factory() as db:
+            model_index.sync(db)
+            db.add(UnifiedTicket(title="Router lights flashing red", description="No internet", customer_id=1))
+            db.flush()
+            assert len(model_index.index) == 0
+            db.rollback()
+            assert len(model_index.index) == 0
+
+            ticket = UnifiedTicket(title="Refund for duplicate invoice", description="Billing", customer_id=1)
+            db.add(ticket)
+            db.commit()
+            assert ticket.id in model_index.index
+
+            db.delete(ticket)
+            db.commit()
+
+        assert len(model_index.index) == 0
+
+    def test_conversation_linked_to_duplicate_ticket(self, session_factory, model_index):
+        """Test a repeated complaint is linked instead of creating a ticket"""
+        message = "My broadband keeps dropping every evening and I need help fixing it today"
+        with session_factory() as db:
+            model_index.build(db)
+            for _ in range(2):
+                db.add(UnifiedChatHistory(session_id="s1", user_id=1, user_message=message,
+                                          bot_response="Please restart your router"))
+            db.commit()
+
+        service = DataSyncService()
+        first = service.create_ticket_from_conversation(1)
+        second = service.create_ticket_from_conversation(2)
+
+        assert first.success and "ticket_created" in first.actions_taken
+        assert second.success and "duplicate_detected" in second.actions_taken
+        assert second.entity_id == first.entity_id
+        with session_factory() as db:
+            assert db.query(UnifiedTicket).count() == 1
+            assert db.get(UnifiedChatHistory, 2).ticket_id == first.entity_id
+
+        forced = service.create_ticket_from_conversation(2, check_duplicates=False)
+        assert forced.entity_id != first.entity_id
+
+    def test_first_search_builds_in_background(self, session_factory, model_index):
+        """Test a search on an unbuilt index returns nothing and builds it off the request"""
+        with session_factory() as db:
+            db.add(UnifiedTicket(title="Router lights flashing red", description="No internet", customer_id=1))
+            db.commit()
+
+            assert model_index.query(db, "router lights") == []
+            model_index.build_in_background(session_factory).join(timeout=10)
+
+            assert model_index.is_built
+            assert [m.ticket_id for m in model_index.query(db, "router lights")] == [1]
+
+    def test_tickets_deleted_elsewhere_are_forgotten(self, session_factory, model_index):
+        """Test matches whose rows another worker deleted are dropped from the index"""
+        message = "My broadband keeps dropping every evening and I need help fixing it today"
+        with session_factory() as db:
+            db.add(UnifiedChatHistory(session_id="s1", user_id=1, user_message=message,
+                                      bot_response="Please restart your router"))
+            db.add(UnifiedChatHistory(session_id="s1", user_id=1, user_message=message,
+                                      bot_response="Please restart your router"))
+            db.commit()
+        service = DataSyncService()
+        with session_factory() as db:
+            model_index.build(db)
+        first = service.create_ticket_from_conversation(1)
+        with session_factory() as db:
+            db.add(UnifiedTicket(title="Charged twice", description="Billing", customer_id=1))
+            db.commit()
+            # Another worker's delete, which this process's listeners never see
+            db.execute(text("DELETE FROM unified_tickets WHERE id = :id"), {"id": first.entity_id})
+            db.commit()
+
+        second = service.create_ticket_from_conversation(2)
+
+        assert "duplicate_detected" not in second.actions_taken
+        assert second.entity_id != first.entity_id
+        assert first.entity_id not in model_index.index
+        assert second.entity_id in model_index.index
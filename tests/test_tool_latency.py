@@ -0,0 +1,172 @@
+"""
+Tests for adaptive tool timeouts, hedged execution and tool circuit breakers
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.graceful_degradation import GracefulDegradationHandler
+from backend.intelligent_chat.tool_latency import RollingLatencyHistogram, ToolLatencyTracker
+from backend.intelligent_chat.tool_orchestrator import ToolOrchestrator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _orchestrator(tools, **kwargs) -> ToolOrchestrator:
+    orchestrator = ToolOrchestrator(
+        available_tools=tools, cache_policies={name: None for name in tools},
+        degradation_handler=GracefulDegradationHandler(), **kwargs
+    )
+    orchestrator.latency_tracker = ToolLatencyTracker(min_samples=20, timeout_floor=0.05)
+    return orchestrator
+
+
+def _warm_up(orchestrator, tool_name, seconds=0.01, samples=50):
+    for _ in range(samples):
+        orchestrator.latency_tracker.record(tool_name, seconds)
+
+
+class TestToolLatencyTracker:
+    """Test cases for live latency quantiles"""
+
+    def test_window_rotation(self):
+        """Test old windows age out so quantiles follow recent latency"""
+        clock = FakeClock()
+        histogram = RollingLatencyHistogram(window_seconds=60, clock=clock)
+        for _ in range(10):
+            histogram.record(2.0)
+
+        clock.now = 70
+        histogram.record(0.1)
+        assert histogram.snapshot().count == 11
+
+        clock.now = 130
+        histogram.record(0.1)
+        assert histogram.snapshot().count == 2
+        assert histogram.snapshot().percentile(99) < 0.2
+
+    def test_timeout_from_p99_with_cap(self):
+        """Test timeouts follow p99 once sampled and never exceed the static timeout"""
+        tracker = ToolLatencyTracker(min_samples=20, timeout_multiplier=1.5, timeout_floor=0.05)
+        assert tracker.timeout_for("kb", 10.0) == 10.0
+
+        for _ in range(100):
+            tracker.record("kb", 0.2)
+        timeout = tracker.timeout_for("kb", 10.0)
+
+        assert 0.3 <= timeout < 0.4
+        assert tracker.timeout_for("kb", 0.25) == 0.25
+        assert tracker.hedge_delay("kb") == pytest.approx(0.2, rel=0.2)
+
+
+class TestAdaptiveExecution:
+    """Test cases for adaptive timeouts and hedging in ToolOrchestrator"""
+
+    @pytest.mark.asyncio
+    async def test_hanging_call_bounded_by_p99(self):
+        """Test a usually fast tool that hangs fails at its p99 timeout, not the static one"""
+        async def search(query):
+            await asyncio.sleep(5)
+        orchestrator = _orchestrator({"web_search": search}, hedging_enabled=False)
+        _warm_up(orchestrator, "web_search")
+
+        start = time.perf_counter()
+        result = (await orchestrator.execute_tools(["web_search"], "q", {}))[0]
+
+        assert not result.success and "timed out" in result.error_message
+        assert time.perf_counter() - start < 1.0
+        assert result.metadata["timeout"] < orchestrator._tool_timeouts["web_search"]
+
+    @pytest.mark.asyncio
+    async def test_hedge_takes_first_result(self):
+        """Test an idempotent tool past its p95 gets a duplicate call that can win"""
+        calls = []
+
+        async def kb(query):
+            calls.append(query)
+            await asyncio.sleep(5 if len(calls) == 1 else 0.01)
+            return "article"
+        orchestrator = _orchestrator({"SupportKnowledgeBase": kb})
+        orchestrator._tool_timeouts["SupportKnowledgeBase"] = 10.0
+        orchestrator.latency_tracker.timeout_floor = 2.0
+        _warm_up(orchestrator, "SupportKnowledgeBase")
+
+        start = time.perf_counter()
+        result = (await orchestrator.execute_tools(["SupportKnowledgeBase"], "q", {}))[0]
+
+        assert result.success and result.result == "article"
+        assert result.metadata["hedged"] and result.metadata["hedge_won"]
+        assert len(calls) == 2
+        assert time.perf_counter() - start < 1.0
+
+    @pytest.mark.asyncio
+    async def test_sync_hedges_use_bounded_threads(self):
+        """Test sync tools are hedged on their own threads and not at all while those are busy"""
+        calls = []
+
+        def search(query):
+            calls.append(query)
+            time.sleep(0.3 if len(calls) == 1 else 0.01)
+            return "page"
+        orchestrator = _orchestrator({"web_search": search}, max_hedge_threads=1)
+        orchestrator.latency_tracker.timeout_floor = 2.0
+        _warm_up(orchestrator, "web_search")
+
+        hedged = (await orchestrator.execute_tools(["web_search"], "q", {}))[0]
+        orchestrator._hedge_threads_busy = 1
+        calls.clear()
+        saturated = (await orchestrator.execute_tools(["web_search"], "q", {}))[0]
+
+        assert hedged.success and hedged.metadata["hedged"] and hedged.metadata["hedge_won"]
+        assert saturated.success and not saturated.metadata["hedged"]
+        assert calls == ["q"]
+
+    @pytest.mark.asyncio
+    async def test_side_effecting_tools_are_not_hedged(self):
+        """Test tools outside the idempotent set are called once"""
+        calls = []
+
+        async def create_ticket(query):
+            calls.append(query)
+            await asyncio.sleep(0.1)
+            return "ticket"
+        orchestrator = _orchestrator({"CreateSupportTicket": create_ticket})
+        _warm_up(orchestrator, "CreateSupportTicket", seconds=0.01)
+        orchestrator.latency_tracker.timeout_floor = 1.0
+
+        result = (await orchestrator.execute_tools(["CreateSupportTicket"], "q", {}))[0]
+
+        assert result.success and not result.metadata["hedged"]
+        assert len(calls) == 1
+
+
+class TestToolCircuitBreaker:
+    """Test cases for per-tool circuit breakers"""
+
+    @pytest.mark.asyncio
+    async def test_breaker_opens_after_repeated_failures(self):
+        """Test a failing tool is short-circuited once its breaker opens"""
+        calls = []
+
+        async def broken(query):
+            calls.append(query)
+            raise RuntimeError("upstream down")
+        orchestrator = _orchestrator({"BTWebsiteSearch": broken})
+
+        for _ in range(5):
+            await orchestrator.execute_tools(["BTWebsiteSearch"], "q", {})
+        result = (await orchestrator.execute_tools(["BTWebsiteSearch"], "q", {}))[0]
+
+        assert len(calls) == 5
+        assert not result.success and result.metadata["circuit_open"]
+        assert orchestrator.degradation_handler.circuit_breaker_state["tool.BTWebsiteSearch"]["state"] == "open"
+        stats = orchestrator.get_execution_stats()["BTWebsiteSearch"]
+        assert stats["total_executions"] == 5 and stats["short_circuited"] == 1
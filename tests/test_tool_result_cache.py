@@ -0,0 +1,194 @@
+"""
+Tests for declarative tool result caching and request coalescing
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from backend.intelligent_chat.models import CacheScope, ToolCachePolicy
+from backend.intelligent_chat.performance_cache import get_performance_cache
+from backend.intelligent_chat.semantic_cache import SemanticResponseCache
+from backend.intelligent_chat.tool_orchestrator import ToolOrchestrator, cacheable_tool
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    get_performance_cache().clear_category("tool_results")
+    yield
+    get_performance_cache().clear_category("tool_results")
+
+
+def counting_tool(delay: float = 0.0):
+    """Async tool that counts its executions in ``calls``"""
+    async def tool(query):
+        tool.calls += 1
+        await asyncio.sleep(delay)
+        return f"answer {tool.calls} to {query}"
+    tool.calls = 0
+    return tool
+
+
+def _orchestrator(**tools) -> ToolOrchestrator:
+    return ToolOrchestrator(available_tools=tools)
+
+
+class TestToolResultCache:
+    """Test cases for cached tool results"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_skips_execution(self):
+        """Test a deterministic tool runs once for repeated, reformatted queries"""
+        tool = counting_tool()
+        orchestrator = _orchestrator(BTSupportHours=tool)
+
+        first = await orchestrator.execute_tools(["BTSupportHours"], "Support hours?", {})
+        second = await orchestrator.execute_tools(["BTSupportHours"], "  support   HOURS ", {})
+
+        assert tool.calls == 1
+        assert second[0].result == first[0].result
+        assert first[0].metadata["cache"] == "miss"
+        assert second[0].metadata["cache"] == "hit"
+        assert second[0].metadata["cached_execution_time"] == first[0].execution_time
+
+        stats = orchestrator.get_execution_stats()["BTSupportHours"]
+        assert stats["total_executions"] == 1 and stats["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_uncached_tools_always_run(self):
+        """Test tools without a policy run on every call"""
+        tool = counting_tool()
+        orchestrator = _orchestrator(CreateSupportTicket=tool)
+
+        await orchestrator.execute_tools(["CreateSupportTicket"], "broken router", {})
+        await orchestrator.execute_tools(["CreateSupportTicket"], "broken router", {})
+
+        assert tool.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_user_scoped_results(self):
+        """Test user-scoped results are only reused by the same user"""
+        @cacheable_tool(ttl=60, scope=CacheScope.USER)
+        async def my_plan(query):
+            my_plan.calls += 1
+            return "plan"
+        my_plan.calls = 0
+        orchestrator = _orchestrator(MyPlan=my_plan)
+
+        await orchestrator.execute_tools(["MyPlan"], "my plan", {"user_id": "u1"})
+        await orchestrator.execute_tools(["MyPlan"], "my plan", {"user_id": "u1"})
+        await orchestrator.execute_tools(["MyPlan"], "my plan", {"user_id": "u2"})
+        await orchestrator.execute_tools(["MyPlan"], "my plan", {})
+
+        assert my_plan.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_custom_key_and_invalidation(self):
+        """Test configured key functions and explicit invalidation"""
+        tool = counting_tool()
+        orchestrator = ToolOrchestrator(
+            available_tools={"Hours": tool},
+            cache_policies={"Hours": ToolCachePolicy(ttl=60, key_func=lambda query: "hours")}
+        )
+
+        await orchestrator.execute_tools(["Hours"], "when are you open", {})
+        await orchestrator.execute_tools(["Hours"], "opening times", {})
+        assert tool.calls == 1
+
+        assert orchestrator.invalidate_tool_results("Hours") == 1
+        await orchestrator.execute_tools(["Hours"], "opening times", {})
+        assert tool.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_knowledge_entry_writes_drop_knowledge_base_results(self):
+        """Test knowledge entry writes drop cached knowledge base results only"""
+        Base = declarative_base()
+
+        class Knowledge(Base):
+            __tablename__ = "knowledge"
+            id = Column(Integer, primary_key=True)
+            title = Column(String(100))
+
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        knowledge, hours = counting_tool(), counting_tool()
+        orchestrator = _orchestrator(SupportKnowledgeBase=knowledge, BTSupportHours=hours)
+        cache = SemanticResponseCache()
+        cache.register_knowledge_listeners([Knowledge])
+        try:
+            for _ in range(2):
+                await orchestrator.execute_tools(["SupportKnowledgeBase", "BTSupportHours"], "reset router", {})
+            assert (knowledge.calls, hours.calls) == (1, 1)
+
+            session.add(Knowledge(title="Resetting your router"))
+            session.commit()
+            await orchestrator.execute_tools(["SupportKnowledgeBase", "BTSupportHours"], "reset router", {})
+
+            assert (knowledge.calls, hours.calls) == (2, 1)
+        finally:
+            cache.unregister_listeners()
+            session.close()
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        """Test failed executions are retried on the next call"""
+        async def flaky(query):
+            flaky.calls += 1
+            if flaky.calls == 1:
+                raise RuntimeError("upstream down")
+            return "ok"
+        flaky.calls = 0
+        orchestrator = _orchestrator(BTWebsiteSearch=flaky)
+
+        first = await orchestrator.execute_tools(["BTWebsiteSearch"], "fibre", {})
+        second = await orchestrator.execute_tools(["BTWebsiteSearch"], "fibre", {})
+
+        assert not first[0].success
+        assert second[0].success and flaky.calls == 2
+
+
+class TestRequestCoalescing:
+    """Test cases for collapsing concurrent identical calls"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test identical concurrent calls wait for a single execution"""
+        tool = counting_tool(delay=0.05)
+        orchestrator = _orchestrator(SupportKnowledgeBase=tool)
+
+        results = await asyncio.gather(*[
+            orchestrator.execute_tools(["SupportKnowledgeBase"], "reset router", {})
+            for _ in range(5)
+        ])
+
+        assert tool.calls == 1
+        statuses = sorted(result[0].metadata["cache"] for result in results)
+        assert statuses == ["coalesced"] * 4 + ["miss"]
+        assert len({result[0].result for result in results}) == 1
+        assert orchestrator.get_execution_stats()["SupportKnowledgeBase"]["coalesced_executions"] == 4
+        assert not orchestrator._in_flight
+
+    @pytest.mark.asyncio
+    async def test_cancelled_owner_fails_waiters_without_cancelling_them(self):
+        """Test waiters of an execution whose caller was cancelled get a failed result"""
+        tool = counting_tool(delay=5)
+        orchestrator = _orchestrator(SupportKnowledgeBase=tool)
+
+        owner = asyncio.create_task(
+            orchestrator._execute_single_tool_with_timeout("SupportKnowledgeBase", "reset router", {}, [])
+        )
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(
+            orchestrator._execute_single_tool_with_timeout("SupportKnowledgeBase", "reset router", {}, [])
+        )
+        await asyncio.sleep(0)
+        owner.cancel()
+        shared = await waiter
+
+        assert owner.cancelled()
+        assert not shared.success and shared.metadata["cache"] == "coalesced"
+        assert "did not complete" in shared.error_message
+        assert not orchestrator._in_flight
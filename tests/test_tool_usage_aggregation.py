@@ -0,0 +1,239 @@
+"""
+Tests for in-memory tool usage accumulation and UPSERT flushing
+"""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, text, MetaData
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.memory_models import ToolUsageMetrics
+from backend.tool_usage_analytics import ToolUsageAnalytics, LatencySketch, close_tool_usage_analytics
+
+
+QUERY = "What are BT mobile plans?"
+
+
+@pytest.fixture
+def session_factory():
+    """SQLite database with the tool metrics table"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    # Importing memory_models under two module names registers its indexes
+    # twice on the shared table, so create the table from a de-duplicated copy
+    table = ToolUsageMetrics.__table__.to_metadata(MetaData())
+    names = set()
+    for index in sorted(table.indexes, key=lambda index: index.name):
+        if index.name in names:
+            table.indexes.discard(index)
+        names.add(index.name)
+    table.create(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def analytics(session_factory):
+    """Analytics that only flushes when asked"""
+    analytics = ToolUsageAnalytics(db_session=session_factory(), flush_interval=3600)
+    analytics._last_flush = float("inf")
+    yield analytics
+    analytics.db_session.close()
+
+
+def _rows(session_factory):
+    with session_factory() as db:
+        return db.query(ToolUsageMetrics).order_by(ToolUsageMetrics.id).all()
+
+
+class TestAccumulation:
+    """Test cases for recording without database round-trips"""
+
+    def test_record_does_not_touch_database(self, analytics, session_factory):
+        """Test samples stay in memory until flushed"""
+        for _ in range(3):
+            assert analytics.record_tool_usage("BTPlansInformation", QUERY, True, 0.9, 1.0)
+
+        assert _rows(session_factory) == []
+
+    def test_reads_include_unflushed_usage(self, analytics):
+        """Test performance merges in-memory deltas"""
+        analytics.record_tool_usage("BTPlansInformation", QUERY, True, 0.9, 1.0)
+        analytics.record_tool_usage("BTPlansInformation", QUERY, False, 0.5, 3.0)
+
+        performance = analytics._get_tool_performance("BTPlansInformation", "plans")
+
+        assert performance["usage_count"] == 2
+        assert performance["success_rate"] == pytest.approx(0.5)
+        assert performance["quality_score"] == pytest.approx(0.7)
+        assert performance["response_time"] == pytest.approx(2.0)
+        assert analytics.get_tool_success_rate("BTPlansInformation") == pytest.approx(0.5)
+
+    def test_cached_base_advances_after_flush(self, analytics):
+        """Test flushing updates the cache instead of invalidating it"""
+        analytics.record_tool_usage("BTPlansInformation", QUERY, True, 1.0, 1.0)
+        analytics.flush()
+        assert analytics._get_tool_performance("BTPlansInformation", "plans")["usage_count"] == 1
+
+        analytics.record_tool_usage("BTPlansInformation", QUERY, False, 0.0, None)
+        analytics.flush()
+
+        cached = analytics._performance_cache["BTPlansInformation_plans"]
+        assert cached["usage_count"] == 2
+        assert cached["success_rate"] == pytest.approx(0.5)
+        assert cached["response_time"] == pytest.approx(1.0)
+
+
+class TestUpsertFlush:
+    """Test cases for flushing deltas with INSERT ... ON CONFLICT"""
+
+    def test_flush_inserts_then_updates_one_row(self, analytics, session_factory):
+        """Test repeated flushes fold deltas into the stored averages"""
+        analytics.record_tool_usage("BTPlansInformation", QUERY, True, 0.8, 2.0)
+        analytics.record_tool_usage("BTPlansInformation", "bt mobile plans what are", True, 0.6, None)
+        assert analytics.flush()
+
+        analytics.record_tool_usage("BTPlansInformation", QUERY, False, 0.4, 4.0)
+        assert analytics.flush()
+
+        rows = _rows(session_factory)
+        assert len(rows) == 1
+        assert rows[0].usage_count == 3
+        assert rows[0].success_rate == pytest.approx(2 / 3)
+        assert rows[0].response_quality_score == pytest.approx(0.6)
+        # The untimed sample keeps the stored average's weight
+        assert rows[0].average_response_time == pytest.approx(8 / 3)
+
+    def test_two_writers_do_not_lose_updates(self, session_factory):
+        """Test concurrent instances add their deltas instead of overwriting"""
+        writers = [ToolUsageAnalytics(db_session=session_factory(), flush_interval=3600)
+                   for _ in range(2)]
+        for writer in writers:
+            for _ in range(5):
+                writer.record_tool_usage("BTWebsiteSearch", QUERY, True, 1.0, 1.0)
+        for writer in writers:
+            writer.flush()
+            writer.db_session.close()
+
+        assert _rows(session_factory)[0].usage_count == 10
+
+    def test_failed_flush_keeps_deltas(self, analytics, session_factory):
+        """Test deltas survive a failed flush and are written on the next one"""
+        analytics.record_tool_usage("BTPlansInformation", QUERY, True, 0.8, 1.0)
+        original = analytics._write_deltas
+
+        def failing(deltas, session):
+            raise RuntimeError("database unavailable")
+
+        analytics._write_deltas = failing
+        assert analytics.flush() is False
+        analytics.record_tool_usage("BTPlansInformation", QUERY, True, 0.8, 1.0)
+
+        analytics._write_deltas = original
+        assert analytics.flush() is True
+        assert _rows(session_factory)[0].usage_count == 2
+
+    def test_flush_never_uses_the_callers_session(self, session_factory):
+        """Test flushes commit through their own sessions and reads still see the flushed rows"""
+        caller = session_factory()
+        caller.commit = caller.rollback = lambda: pytest.fail("flush touched the caller's session")
+        opened = []
+
+        def factory():
+            opened.append(session_factory())
+            return opened[-1]
+
+        analytics = ToolUsageAnalytics(db_session=caller, flush_interval=3600, session_factory=factory)
+        analytics.record_tool_usage("BTPlansInformation", QUERY, True, 0.8, 1.0)
+        assert analytics.flush()
+        assert analytics.get_tool_success_rate("BTPlansInformation") == pytest.approx(1.0)
+        held = caller.query(ToolUsageMetrics).all()  # keeps the loaded row in the identity map
+
+        analytics.record_tool_usage("BTPlansInformation", QUERY, False, 0.8, 1.0)
+        assert analytics.flush()
+        assert analytics.get_tool_success_rate("BTPlansInformation") == pytest.approx(0.5)
+
+        analytics.close()
+        assert held[0].usage_count == 2
+        assert len(opened) == 2
+        assert caller.execute(text("SELECT COUNT(*) FROM tool_usage_metrics")).scalar() == 1
+        default = ToolUsageAnalytics(db_session=caller, flush_interval=0).session_factory
+        assert default.kw["bind"] is session_factory.kw["bind"]
+        caller.close()
+
+    def test_falls_back_without_unique_constraint(self, session_factory):
+        """Test legacy tables without the conflict target still aggregate"""
+        engine = session_factory.kw["bind"]
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE tool_usage_metrics"))
+            conn.execute(text(
+                "CREATE TABLE tool_usage_metrics (id INTEGER PRIMARY KEY, tool_name VARCHAR(100), "
+                "query_type VARCHAR(50), query_hash VARCHAR(64), success_rate FLOAT, "
+                "average_response_time FLOAT, response_quality_score FLOAT, usage_count INTEGER, "
+                "last_used TIMESTAMP, created_at TIMESTAMP)"
+            ))
+        analytics = ToolUsageAnalytics(db_session=session_factory(), flush_interval=3600)
+
+        for _ in range(2):
+            analytics.record_tool_usage("BTPlansInformation", QUERY, True, 0.8, 1.0)
+            assert analytics.flush()
+
+        assert analytics._upsert_supported is False
+        assert [row.usage_count for row in _rows(session_factory)] == [2]
+        analytics.db_session.close()
+
+    def test_interval_triggers_flush(self, session_factory):
+        """Test record_tool_usage flushes once the interval has elapsed"""
+        analytics = ToolUsageAnalytics(db_session=session_factory(), flush_interval=0)
+
+        analytics.record_tool_usage("BTPlansInformation", QUERY, True, 0.8, 1.0)
+
+        assert _rows(session_factory)[0].usage_count == 1
+        analytics.db_session.close()
+
+    def test_timer_flushes_idle_buffer_and_close_stops_it(self, session_factory):
+        """Test usage recorded before traffic stops is written without another recording"""
+        analytics = ToolUsageAnalytics(db_session=session_factory(), flush_interval=0.05)
+        analytics._last_flush = time.monotonic()
+
+        analytics.record_tool_usage("BTPlansInformation", QUERY, True, 0.8, 1.0)
+        assert _rows(session_factory) == []
+        time.sleep(0.3)
+        assert _rows(session_factory)[0].usage_count == 1
+
+        analytics.record_tool_usage("BTPlansInformation", QUERY, True, 0.8, 1.0)
+        assert close_tool_usage_analytics() >= 1
+        assert not analytics._flush_timer.is_alive()
+        assert _rows(session_factory)[0].usage_count == 2
+
+
+class TestLatencySketch:
+    """Test cases for latency percentiles"""
+
+    def test_quantiles_within_bucket_error(self):
+        """Test percentile estimates stay within one bucket"""
+        sketch = LatencySketch()
+        for value in range(1, 101):
+            sketch.add(value / 100)
+
+        assert sketch.quantile(0.5) == pytest.approx(0.5, rel=0.25)
+        assert sketch.quantile(0.99) == pytest.approx(0.99, rel=0.25)
+        assert sketch.quantile(1.0) == 1.0
+
+    def test_percentiles_from_recorded_usage(self, analytics):
+        """Test concurrently recorded latencies are all counted"""
+        threads = [threading.Thread(target=analytics.record_tool_usage,
+                                    args=("BTWebsiteSearch", QUERY, True, 1.0, 0.2))
+                   for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        percentiles = analytics.get_latency_percentiles("BTWebsiteSearch")
+
+        assert analytics._latency["BTWebsiteSearch"].count == 20
+        assert percentiles["p50"] == pytest.approx(0.2, rel=0.25)
@@ -30,7 +30,11 @@ class TestToolUsageAnalytics(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures"""
         self.mock_db_session = Mock()
-        self.analytics = ToolUsageAnalytics(db_session=self.mock_db_session)
+        # Reads refresh loaded rows; keep the mocked query chain the same
+        query = self.mock_db_session.query.return_value
+        query.populate_existing.return_value = query
+        self.analytics = ToolUsageAnalytics(db_session=self.mock_db_session,
+                                            session_factory=lambda: self.mock_db_session)
         
         # Sample test data
         self.sample_tool_name = "BTWebsiteSearch"
@@ -450,6 +454,7 @@ class TestToolUsageAnalytics(unittest.TestCase):
                     average_response_time=2.0
                 )
             ]
+            mock_query.return_value.populate_existing.return_value = mock_query.return_value
             mock_query.return_value.filter.return_value.all.return_value = mock_metrics
             
             # First call should query database
@@ -531,7 +536,11 @@ class TestIntegrationScenarios(unittest.TestCase):
     def setUp(self):
         """Set up integration test fixtures"""
         self.mock_db_session = Mock()
-        self.analytics = ToolUsageAnalytics(db_session=self.mock_db_session)
+        # Reads refresh loaded rows; keep the mocked query chain the same
+        query = self.mock_db_session.query.return_value
+        query.populate_existing.return_value = query
+        self.analytics = ToolUsageAnalytics(db_session=self.mock_db_session,
+                                            session_factory=lambda: self.mock_db_session)
     
     def test_complete_workflow(self):
         """Test complete workflow from recording to recommendation"""